@@ -215,26 +215,11 @@ class ObtenerEstadisticasUsuariosUseCase:
 
     def execute(self) -> EstadisticasUsuariosDTO:
         """Ejecuta la obtención de estadísticas"""
-        total = self.repository.contar()
-
-        usuarios_activos = self.repository.obtener_todos(
-            filtros={"activo": True},
-            pagina=1,
-            tamaño_pagina=1000,
-        )
-        activos = len(usuarios_activos.get("items", []))
-
-        inactivos = total - activos
-
-        # Contar por rol
-        por_rol = {}
-        for rol in ["ADMIN", "FUNCIONARIO", "VISITADOR_TECNICO"]:
-            usuarios_rol = self.repository.obtener_por_rol(rol)
-            por_rol[rol] = len(usuarios_rol)
+        estadisticas = self.repository.obtener_estadisticas()
 
         return EstadisticasUsuariosDTO(
-            total=total,
-            activos=activos,
-            inactivos=inactivos,
-            por_rol=por_rol,
+            total=estadisticas["total"],
+            activos=estadisticas["activos"],
+            inactivos=estadisticas["inactivos"],
+            por_rol=estadisticas["por_rol"],
         )
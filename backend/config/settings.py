@@ -12,7 +12,9 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 
 import os
 from pathlib import Path
+from corsheaders.defaults import default_headers
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -131,6 +133,74 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'documentos'
 
+# Storage de documentos. Con DOCUMENTOS_DEDUPLICADOS=True las subidas se
+# guardan por su SHA-256 y los archivos repetidos se reutilizan en lugar de
+# escribirse de nuevo (ver infrastructure.storage.dedup_storage).
+DOCUMENTOS_DEDUPLICADOS = config('DOCUMENTOS_DEDUPLICADOS', default=False, cast=bool)
+STORAGES = {
+    'default': {
+        'BACKEND': (
+            'infrastructure.storage.dedup_storage.ContenidoDireccionadoStorage'
+            if DOCUMENTOS_DEDUPLICADOS
+            else 'django.core.files.storage.FileSystemStorage'
+        ),
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
+# Exportaciones masivas (ZIP) generadas en segundo plano; fuera de MEDIA_ROOT
+# para que solo se descarguen a través de la API.
+EXPORTACIONES_ROOT = config('EXPORTACIONES_ROOT', default=str(BASE_DIR / 'exportaciones'))
+
+# Fragmentos de las cargas reanudables mientras se completa la subida; las
+# cargas sin terminar se descartan tras CARGAS_FRAGMENTADAS_HORAS.
+CARGAS_FRAGMENTADAS_ROOT = config('CARGAS_FRAGMENTADAS_ROOT', default=str(BASE_DIR / 'cargas_fragmentadas'))
+CARGAS_FRAGMENTADAS_HORAS = config('CARGAS_FRAGMENTADAS_HORAS', default=24, cast=int)
+
+# Ingesta diferida del registro del hogar: con INGESTA_DIFERIDA el envío se
+# guarda en la cola local (INGESTA_ROOT) y se responde de inmediato con un
+# radicado provisional; el comando procesar_registros lo escribe por lotes.
+INGESTA_DIFERIDA = config('INGESTA_DIFERIDA', default=False, cast=bool)
+INGESTA_ROOT = config('INGESTA_ROOT', default=str(BASE_DIR / 'ingesta'))
+INGESTA_LOTE = config('INGESTA_LOTE', default=50, cast=int)
+INGESTA_MAX_INTENTOS = config('INGESTA_MAX_INTENTOS', default=5, cast=int)
+
+# Idempotency-Key en los envíos públicos: vigencia de las respuestas
+# guardadas (comando limpiar_respuestas_idempotentes) y tiempo tras el cual
+# una petición en curso se da por abandonada.
+IDEMPOTENCIA_TTL_HORAS = config('IDEMPOTENCIA_TTL_HORAS', default=24, cast=int)
+IDEMPOTENCIA_EN_CURSO_SEGUNDOS = config('IDEMPOTENCIA_EN_CURSO_SEGUNDOS', default=60, cast=int)
+
+# Cache compartido entre procesos (Redis). Sin REDIS_URL cada proceso usa
+# su propio cache en memoria.
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+
+# Sala de espera de los endpoints públicos: peticiones anónimas simultáneas
+# = CAPACIDAD - RESERVA_PERSONAL (0 desactiva). Requiere el cache
+# compartido: con un cache por proceso el límite no sería global, así que
+# sin REDIS_URL viene desactivada y activarla es un error de configuración.
+# CUPO_VIGENCIA libera el cupo de una petición cuyo proceso murió; debe
+# superar el timeout de los workers.
+SALA_ESPERA_CAPACIDAD = config('SALA_ESPERA_CAPACIDAD', default=100 if REDIS_URL else 0, cast=int)
+SALA_ESPERA_RESERVA_PERSONAL = config('SALA_ESPERA_RESERVA_PERSONAL', default=20, cast=int)
+SALA_ESPERA_REINTENTO_SEGUNDOS = config('SALA_ESPERA_REINTENTO_SEGUNDOS', default=2, cast=int)
+SALA_ESPERA_TURNO_VIGENCIA = config('SALA_ESPERA_TURNO_VIGENCIA', default=600, cast=int)
+SALA_ESPERA_CUPO_VIGENCIA = config('SALA_ESPERA_CUPO_VIGENCIA', default=120, cast=int)
+if SALA_ESPERA_CAPACIDAD and not REDIS_URL:
+    raise ImproperlyConfigured(
+        'SALA_ESPERA_CAPACIDAD requiere un cache compartido entre procesos: configure REDIS_URL '
+        'o desactive la sala de espera con SALA_ESPERA_CAPACIDAD=0.'
+    )
+
 # File upload limits (5 MB)
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024
@@ -173,11 +243,31 @@ REST_FRAMEWORK = {
         'anon': '60/minute',
         'consulta_publica': '5/minute',
         'login': '5/minute',
+        'cargas_fragmentadas': '300/minute',
     },
 }
 
+# Cache en memoria de los usuarios autenticados (SignedTokenAuthentication).
+# Los cambios hechos desde la API la invalidan; en otros procesos el cambio
+# se ve a más tardar tras AUTH_USUARIOS_CACHE_TTL segundos (0 = sin cache).
+AUTH_USUARIOS_CACHE_TTL = config('AUTH_USUARIOS_CACHE_TTL', default=60, cast=int)
+AUTH_USUARIOS_CACHE_MAX = config('AUTH_USUARIOS_CACHE_MAX', default=1024, cast=int)
+
+# Estadísticas de usuarios en cache (se invalidan al guardar un usuario)
+ESTADISTICAS_USUARIOS_TTL = config('ESTADISTICAS_USUARIOS_TTL', default=300, cast=int)
+
+# Respuestas de la consulta pública de estado en cache (incluidas las no
+# encontradas). Un cambio de estado se ve a más tardar tras este tiempo.
+CONSULTA_ESTADO_TTL = config('CONSULTA_ESTADO_TTL', default=30, cast=int)
+
+# Formularios públicos por etapa: TTL del cache del servidor (se invalida al
+# publicar, inhabilitar o guardar la configuración) y max-age para clientes.
+FORMULARIOS_PUBLICOS_TTL = config('FORMULARIOS_PUBLICOS_TTL', default=300, cast=int)
+FORMULARIOS_PUBLICOS_MAX_AGE = config('FORMULARIOS_PUBLICOS_MAX_AGE', default=60, cast=int)
+
 CORS_ALLOW_CREDENTIALS = True
-CORS_EXPOSE_HEADERS = ['Content-Disposition']
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key', 'x-sala-espera-turno')
+CORS_EXPOSE_HEADERS = ['Content-Disposition', 'Idempotent-Replayed', 'Retry-After']
 
 # Email settings for password recovery and notifications
 EMAIL_BACKEND = config(
@@ -193,5 +283,12 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='no-reply@localhost')
+# Bandeja de salida (comando enviar_correos): correos por conexión y reintentos
+CORREOS_LOTE = config('CORREOS_LOTE', default=50, cast=int)
+CORREOS_MAX_INTENTOS = config('CORREOS_MAX_INTENTOS', default=5, cast=int)
+CORREOS_REINTENTO_SEGUNDOS = config('CORREOS_REINTENTO_SEGUNDOS', default=60, cast=int)
+# Aviso del resultado del sorteo (comando notificar_sorteos): hogares por lote y por minuto
+NOTIFICACIONES_LOTE = config('NOTIFICACIONES_LOTE', default=200, cast=int)
+NOTIFICACIONES_POR_MINUTO = config('NOTIFICACIONES_POR_MINUTO', default=600, cast=int)
 PASSWORD_RESET_TOKEN_MAX_AGE = config('PASSWORD_RESET_TOKEN_MAX_AGE', default=86400, cast=int)
 PASSWORD_RESET_URL = config('PASSWORD_RESET_URL', default='http://localhost:5173/reset-password')
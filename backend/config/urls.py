@@ -18,7 +18,8 @@ from presentation.views.miembro_hogar_viewset import MiembroHogarViewSet
 from presentation.views.visita_etapa2_viewset import VisitaEtapa2ViewSet
 from presentation.views.visita_viewset import VisitaViewSet
 from presentation.views.documento_proceso_interno_viewset import DocumentoProcesoInternoViewSet
-from presentation.views.dashboard_view import dashboard_estadisticas
+from presentation.views.carga_fragmentada_viewset import CargaFragmentadaViewSet
+from presentation.views.dashboard_view import dashboard_estadisticas, dashboard_series
 from presentation.views.email_view import list_emails, get_email
 
 router = DefaultRouter()
@@ -30,11 +31,13 @@ router.register(r'miembros-hogar', MiembroHogarViewSet,  basename='miembro-hogar
 router.register(r'visitas-etapa2', VisitaEtapa2ViewSet,  basename='visita-etapa2')
 router.register(r'visitas',        VisitaViewSet,        basename='visita')
 router.register(r'documentos-proceso-interno', DocumentoProcesoInternoViewSet, basename='documento-proceso-interno')
+router.register(r'cargas-fragmentadas', CargaFragmentadaViewSet, basename='carga-fragmentada')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include(router.urls)),
     path('api/dashboard/estadisticas/', dashboard_estadisticas, name='dashboard-estadisticas'),
+    path('api/dashboard/series/', dashboard_series, name='dashboard-series'),
     path('api/emails/', list_emails, name='list-emails'),
     path('api/emails/<str:filename>/', get_email, name='get-email'),
 ]
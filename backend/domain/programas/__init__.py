@@ -8,6 +8,12 @@ eventos, excepciones y la interfaz del repositorio.
 from .programa import Programa, EstadoPrograma, TRANSICIONES_VALIDAS
 from .programa_value_objects import NombrePrograma, CodigoPrograma, DescripcionPrograma
 from .programas_repository import ProgramaRepositoryInterface
+from .programa_specification import (
+    ProgramaPorEstadoSpecification,
+    ProgramaPorEntidadSpecification,
+    ProgramaCreadoDesdeSpecification,
+    ProgramaCreadoHastaSpecification,
+)
 from .programa_exceptions import (
     ProgramaException,
     ProgramaNoEncontradoException,
@@ -32,6 +38,11 @@ __all__ = [
     "DescripcionPrograma",
     # Repositorio
     "ProgramaRepositoryInterface",
+    # Especificaciones
+    "ProgramaPorEstadoSpecification",
+    "ProgramaPorEntidadSpecification",
+    "ProgramaCreadoDesdeSpecification",
+    "ProgramaCreadoHastaSpecification",
     # Excepciones
     "ProgramaException",
     "ProgramaNoEncontradoException",
@@ -0,0 +1,52 @@
+"""
+Especificaciones de Programas.
+
+Reglas de filtrado reutilizables sobre la entidad Programa. Se evalúan en
+memoria con `esta_satisfecha_por` y el repositorio Django las traduce a
+consultas para filtrar en la base de datos.
+"""
+
+from datetime import datetime
+
+from shared.base_specification import BaseSpecification
+from .programa import EstadoPrograma
+
+
+class ProgramaPorEstadoSpecification(BaseSpecification):
+    """Programas en el estado indicado."""
+
+    def __init__(self, estado):
+        self.estado = estado if isinstance(estado, EstadoPrograma) else EstadoPrograma(str(estado).upper())
+
+    def esta_satisfecha_por(self, programa) -> bool:
+        return programa.estado == self.estado
+
+
+class ProgramaPorEntidadSpecification(BaseSpecification):
+    """Programas cuya entidad responsable contiene el texto (sin distinguir mayúsculas)."""
+
+    def __init__(self, entidad: str):
+        self.entidad = entidad.strip()
+
+    def esta_satisfecha_por(self, programa) -> bool:
+        return self.entidad.lower() in programa.entidad_responsable.lower()
+
+
+class ProgramaCreadoDesdeSpecification(BaseSpecification):
+    """Programas creados desde una fecha."""
+
+    def __init__(self, fecha_desde: datetime):
+        self.fecha_desde = fecha_desde
+
+    def esta_satisfecha_por(self, programa) -> bool:
+        return programa.fecha_creacion >= self.fecha_desde
+
+
+class ProgramaCreadoHastaSpecification(BaseSpecification):
+    """Programas creados hasta una fecha."""
+
+    def __init__(self, fecha_hasta: datetime):
+        self.fecha_hasta = fecha_hasta
+
+    def esta_satisfecha_por(self, programa) -> bool:
+        return programa.fecha_creacion <= self.fecha_hasta
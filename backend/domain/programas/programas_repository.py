@@ -9,6 +9,7 @@ from abc import abstractmethod
 from typing import Any, Dict, List, Optional
 
 from shared.base_repository import BaseRepository
+from shared.base_specification import BaseSpecification
 from .programa import Programa
 
 
@@ -40,6 +41,16 @@ class ProgramaRepositoryInterface(BaseRepository):
     ) -> Dict[str, Any]:
         pass
 
+    @abstractmethod
+    def filtrar(
+        self,
+        especificacion: BaseSpecification,
+        pagina: int = 1,
+        tamaño_pagina: int = 10,
+    ) -> Dict[str, Any]:
+        """Programas que satisfacen la especificación, paginados como `listar`."""
+        pass
+
     @abstractmethod
     def eliminar(self, id: int) -> bool:
         pass
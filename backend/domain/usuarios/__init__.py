@@ -34,6 +34,12 @@ from .usuario_specification import (
     UsuarioAdminSpecification,
     UsuarioFuncionarioSpecification,
     UsuarioVisitadorSpecification,
+    UsuarioCreadoDesdeSpecification,
+    UsuarioCreadoHastaSpecification,
+    UsuarioModificadoDesdeSpecification,
+    EspecificacionAnd,
+    EspecificacionOr,
+    EspecificacionNot,
     CriteriosListadoUsuarios,
 )
 from .usuario_events import (
@@ -77,6 +83,12 @@ __all__ = [
     "UsuarioAdminSpecification",
     "UsuarioFuncionarioSpecification",
     "UsuarioVisitadorSpecification",
+    "UsuarioCreadoDesdeSpecification",
+    "UsuarioCreadoHastaSpecification",
+    "UsuarioModificadoDesdeSpecification",
+    "EspecificacionAnd",
+    "EspecificacionOr",
+    "EspecificacionNot",
     "CriteriosListadoUsuarios",
     # Eventos de Dominio
     "DomainEvent",
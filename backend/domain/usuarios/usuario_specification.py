@@ -3,19 +3,25 @@ Especificación de Usuarios - Patrón Specification para DDD
 
 Implementa el patrón Specification para encapsular lógica de filtrado
 y búsqueda de usuarios de forma reutilizable.
+
+Las especificaciones se evalúan en memoria con `esta_satisfecha_por`; el
+repositorio Django las traduce a consultas (ver
+infrastructure/database/specifications.py) para filtrar en la base de datos.
 """
 
-from abc import ABC, abstractmethod
+from abc import abstractmethod
 from typing import Optional, List
 from datetime import datetime
 
+from shared.base_specification import BaseSpecification
+
 
-class UsuarioSpecification(ABC):
+class UsuarioSpecification(BaseSpecification):
     """
     Clase base para especificaciones de Usuario
     
     El patrón Specification encapsula la lógica de búsqueda
-    en objetos reutilizables.
+    en objetos reutilizables. Se combinan con &, | y ~.
     """
     
     @abstractmethod
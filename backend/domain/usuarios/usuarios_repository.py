@@ -9,6 +9,7 @@ from abc import ABC, abstractmethod
 from typing import List, Optional, Dict, Any
 
 from .usuario import Usuario
+from .usuario_specification import UsuarioSpecification
 
 
 class UsuarioRepository(ABC):
@@ -96,6 +97,29 @@ class UsuarioRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def filtrar(
+        self,
+        especificacion: UsuarioSpecification,
+        pagina: int = 1,
+        tamaño_pagina: int = 10,
+    ) -> Dict[str, Any]:
+        """
+        Obtiene los usuarios que satisfacen una especificación
+
+        La implementación debe resolver el filtro en la fuente de datos
+        en lugar de cargar todos los usuarios y evaluarlos en memoria.
+
+        Args:
+            especificacion: Especificación (simple o compuesta con &, |, ~)
+            pagina: Número de página (default: 1)
+            tamaño_pagina: Cantidad de registros por página (default: 10)
+
+        Returns:
+            Diccionario con la misma forma que obtener_todos
+        """
+        pass
+
     @abstractmethod
     def obtener_por_rol(self, rol: str) -> List[Usuario]:
         """
@@ -132,6 +156,16 @@ class UsuarioRepository(ABC):
         """
         pass
 
+    @abstractmethod
+    def obtener_estadisticas(self) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas generales de usuarios
+        
+        Returns:
+            Diccionario con total, activos, inactivos y por_rol
+        """
+        pass
+
     @abstractmethod
     def existe_correo(self, correo: str) -> bool:
         """
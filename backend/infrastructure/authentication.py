@@ -3,9 +3,20 @@ Custom DRF authentication backend.
 
 Validates Bearer tokens created with django.core.signing.dumps()
 in the login endpoint (UsuarioViewSet.login).
+
+Resolved users are kept in a small in-process LRU cache with TTL
+(AUTH_USUARIOS_CACHE_MAX / AUTH_USUARIOS_CACHE_TTL) so most authenticated
+requests need no database query. UsuarioViewSet invalidates the entry when it
+changes a user; other worker processes pick the change up when the TTL
+expires.
 """
+import copy
 import logging
+import threading
+import time
+from collections import OrderedDict
 
+from django.conf import settings
 from django.core import signing
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
@@ -18,6 +29,58 @@ logger = logging.getLogger(__name__)
 TOKEN_MAX_AGE = 86400
 
 
+class CacheUsuarios:
+    """Thread-safe LRU cache of active users keyed by uid, with per-entry TTL."""
+
+    def __init__(self):
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _ttl():
+        return getattr(settings, 'AUTH_USUARIOS_CACHE_TTL', 60)
+
+    def obtener(self, uid):
+        with self._lock:
+            entrada = self._entradas.get(uid)
+            if entrada is None:
+                return None
+            usuario, expira = entrada
+            if expira <= time.monotonic():
+                del self._entradas[uid]
+                return None
+            self._entradas.move_to_end(uid)
+        # Each request gets its own instance
+        return copy.copy(usuario)
+
+    def guardar(self, uid, usuario):
+        ttl = self._ttl()
+        if ttl <= 0:
+            return
+        maximo = getattr(settings, 'AUTH_USUARIOS_CACHE_MAX', 1024)
+        with self._lock:
+            self._entradas[uid] = (copy.copy(usuario), time.monotonic() + ttl)
+            self._entradas.move_to_end(uid)
+            while len(self._entradas) > maximo:
+                self._entradas.popitem(last=False)
+
+    def invalidar(self, uid):
+        with self._lock:
+            self._entradas.pop(uid, None)
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+
+
+cache_usuarios = CacheUsuarios()
+
+
+def invalidar_usuario(uid):
+    """Drops a user from the authentication cache after it was modified."""
+    cache_usuarios.invalidar(int(uid))
+
+
 class SignedTokenAuthentication(BaseAuthentication):
     """Authenticate requests via ``Authorization: Bearer <signed-token>``."""
 
@@ -45,10 +108,13 @@ class SignedTokenAuthentication(BaseAuthentication):
         if uid is None:
             raise AuthenticationFailed('Token inválido.')
 
-        try:
-            usuario = UsuarioSistema.objects.get(pk=uid, activo=True)
-        except UsuarioSistema.DoesNotExist:
-            raise AuthenticationFailed('Usuario no encontrado o inactivo.')
+        usuario = cache_usuarios.obtener(uid)
+        if usuario is None:
+            try:
+                usuario = UsuarioSistema.objects.get(pk=uid, activo=True)
+            except UsuarioSistema.DoesNotExist:
+                raise AuthenticationFailed('Usuario no encontrado o inactivo.')
+            cache_usuarios.guardar(uid, usuario)
 
         return (usuario, token)
 
@@ -0,0 +1,10 @@
+"""
+Correo saliente: bandeja persistente y envío diferido por lotes.
+"""
+from .outbox import encolar_correo, enviar_lote, send_mail
+
+__all__ = [
+    "encolar_correo",
+    "enviar_lote",
+    "send_mail",
+]
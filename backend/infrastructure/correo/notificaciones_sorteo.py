@@ -0,0 +1,165 @@
+"""
+Notificación masiva del resultado del sorteo a los hogares.
+
+Cada lote:
+
+  1. lee los siguientes resultados del sorteo (orden > ultimo_orden) con el
+     correo del titular (Ciudadano) en una sola consulta, y en otra el
+     correo del cabeza de hogar (MiembroHogar) de los que no lo tienen;
+  2. aplica los datos del programa a las plantillas una vez por lote y
+     solo sustituye nombre y radicado por hogar;
+  3. encola los correos en la bandeja de salida (bulk_create) y avanza el
+     punto de control en la misma transacción.
+
+Si el proceso se cae, el lote en curso se revierte completo y la siguiente
+ejecución retoma desde `ultimo_orden`: ningún hogar recibe el aviso dos
+veces. El ritmo de envío lo regula el comando `notificar_sorteos`.
+"""
+from string import Template
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from infrastructure.database.models import (
+    CorreoSaliente,
+    MiembroHogar,
+    NotificacionSorteo,
+    ResultadoSorteo,
+)
+
+PLANTILLAS = {
+    True: (
+        'Resultado del sorteo – $programa',
+        'Hola $nombre,\n\n'
+        'Nos complace informarte que el hogar con radicado $radicado resultó '
+        'BENEFICIADO en el sorteo del programa "$programa".\n\n'
+        'Pronto te contactaremos para indicarte los siguientes pasos.',
+    ),
+    False: (
+        'Resultado del sorteo – $programa',
+        'Hola $nombre,\n\n'
+        'Te informamos que el hogar con radicado $radicado no resultó '
+        'beneficiado en el sorteo del programa "$programa".\n\n'
+        'Gracias por tu participación.',
+    ),
+}
+
+
+def crear_notificacion(sorteo, usuario=None) -> tuple[NotificacionSorteo, bool]:
+    """Registra la notificación del sorteo (una por sorteo). Retorna (notificación, creada)."""
+    return NotificacionSorteo.objects.get_or_create(
+        sorteo=sorteo,
+        defaults={
+            'usuario_solicitante': usuario,
+            'total': sorteo.resultados.count(),
+        },
+    )
+
+
+def _plantillas_lote(programa):
+    """Plantillas con los datos comunes ya aplicados: {beneficiado: (asunto, Template)}."""
+    return {
+        beneficiado: (
+            Template(asunto).safe_substitute(programa=programa),
+            Template(Template(cuerpo).safe_substitute(programa=programa)),
+        )
+        for beneficiado, (asunto, cuerpo) in PLANTILLAS.items()
+    }
+
+
+def _filas_lote(notificacion, tamano):
+    filas = list(
+        ResultadoSorteo.objects
+        .filter(sorteo_id=notificacion.sorteo_id, orden__gt=notificacion.ultimo_orden)
+        .order_by('orden')
+        .values(
+            'orden', 'beneficiado', 'postulacion_id',
+            gestion_id=F('postulacion__gestion_hogar__id'),
+            radicado=F('postulacion__gestion_hogar__numero_radicado'),
+            primer_nombre=F('postulacion__gestion_hogar__ciudadano__primer_nombre'),
+            correo=F('postulacion__gestion_hogar__ciudadano__correo_electronico'),
+        )[:tamano]
+    )
+    sin_correo = [f['gestion_id'] for f in filas if not f['correo'] and f['gestion_id']]
+    if sin_correo:
+        cabezas = {}
+        for gestion_id, correo, nombre in (
+            MiembroHogar.objects
+            .filter(postulacion_id__in=sin_correo, es_cabeza_hogar=True)
+            .exclude(correo_electronico='')
+            .order_by('id')
+            .values_list('postulacion_id', 'correo_electronico', 'primer_nombre')
+        ):
+            cabezas.setdefault(gestion_id, (correo, nombre))
+        for fila in filas:
+            if not fila['correo'] and fila['gestion_id'] in cabezas:
+                fila['correo'], fila['primer_nombre'] = cabezas[fila['gestion_id']]
+    return filas
+
+
+def procesar_lote(notificacion_id, tamano=None) -> int:
+    """
+    Encola los correos del siguiente lote. Retorna cuántos hogares se
+    procesaron; 0 cuando la notificación terminó (o la procesa otro worker).
+    """
+    tamano = tamano or getattr(settings, 'NOTIFICACIONES_LOTE', 200)
+
+    with transaction.atomic():
+        notificacion = (
+            NotificacionSorteo.objects
+            .select_for_update(skip_locked=True)
+            .select_related('sorteo__programa')
+            .filter(pk=notificacion_id, estado__in=['PENDIENTE', 'EN_PROCESO'])
+            .first()
+        )
+        if notificacion is None:
+            return 0
+
+        ahora = timezone.now()
+        if notificacion.estado == 'PENDIENTE':
+            notificacion.estado = 'EN_PROCESO'
+            notificacion.fecha_inicio = ahora
+
+        filas = _filas_lote(notificacion, tamano)
+        if not filas:
+            notificacion.estado = 'COMPLETADA'
+            notificacion.fecha_fin = ahora
+            notificacion.save()
+            return 0
+
+        plantillas = _plantillas_lote(notificacion.sorteo.programa.nombre)
+        remitente = settings.DEFAULT_FROM_EMAIL
+        correos = []
+        for fila in filas:
+            if not fila['correo']:
+                notificacion.sin_correo += 1
+                continue
+            asunto, cuerpo = plantillas[fila['beneficiado']]
+            correos.append(CorreoSaliente(
+                asunto=asunto,
+                mensaje=cuerpo.safe_substitute(
+                    nombre=fila['primer_nombre'] or 'postulante',
+                    radicado=fila['radicado'] or f'POST-{fila["postulacion_id"]}',
+                ),
+                remitente=remitente,
+                destinatarios=[fila['correo']],
+                proximo_intento=ahora,
+            ))
+        CorreoSaliente.objects.bulk_create(correos)
+
+        notificacion.encolados += len(correos)
+        notificacion.ultimo_orden = filas[-1]['orden']
+        notificacion.save()
+    return len(filas)
+
+
+def pendientes() -> list[int]:
+    """Ids de las notificaciones por procesar, de la más antigua a la más reciente."""
+    return list(
+        NotificacionSorteo.objects
+        .filter(estado__in=['PENDIENTE', 'EN_PROCESO'])
+        .order_by('fecha_creacion')
+        .values_list('id', flat=True)
+    )
@@ -0,0 +1,143 @@
+"""
+Bandeja de salida de correos (tabla correos_salientes).
+
+Las peticiones HTTP no hablan con el servidor SMTP: `encolar_correo`
+registra el mensaje y el comando `enviar_correos` lo entrega después con
+`enviar_lote`, que:
+
+  * toma hasta CORREOS_LOTE mensajes pendientes con SKIP LOCKED y los
+    reserva (RESERVA_ENVIO) en una transacción corta, así varios workers
+    pueden drenar la bandeja a la vez sin enviar dos veces;
+  * los envía con `transaction.on_commit`, fuera de la transacción: un SMTP
+    lento no retiene bloqueos y nada sale si la reserva se revierte. Si el
+    proceso muere a mitad de envío, el lote se reintenta al vencer la reserva;
+  * usa una única conexión del EMAIL_BACKEND configurado (SMTP en
+    producción, filebased en desarrollo y pruebas);
+  * reprograma los que fallan con espera exponencial
+    (CORREOS_REINTENTO_SEGUNDOS * 2^(intentos-1)) y los marca FALLIDO al
+    llegar a CORREOS_MAX_INTENTOS.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from infrastructure.database.models import CorreoSaliente
+
+logger = logging.getLogger(__name__)
+
+# Tope de la espera entre reintentos
+MAX_ESPERA_REINTENTO = timedelta(hours=6)
+# Tiempo que un lote tomado queda fuera del alcance de otros workers
+RESERVA_ENVIO = timedelta(minutes=10)
+
+
+def encolar_correo(asunto, mensaje, destinatarios, remitente=None, mensaje_html='') -> CorreoSaliente:
+    """Registra un correo para envío diferido y retorna la fila creada."""
+    return CorreoSaliente.objects.create(
+        asunto=asunto,
+        mensaje=mensaje,
+        mensaje_html=mensaje_html or '',
+        remitente=remitente or settings.DEFAULT_FROM_EMAIL,
+        destinatarios=list(destinatarios),
+    )
+
+
+def send_mail(subject, message, from_email, recipient_list, fail_silently=False, html_message=None):
+    """
+    Misma firma que django.core.mail.send_mail, pero encola el mensaje en
+    lugar de enviarlo. Retorna 1 como el original.
+    """
+    encolar_correo(subject, message, recipient_list, remitente=from_email, mensaje_html=html_message)
+    return 1
+
+
+def _mensaje(correo: CorreoSaliente, conexion) -> EmailMultiAlternatives:
+    email = EmailMultiAlternatives(
+        subject=correo.asunto,
+        body=correo.mensaje,
+        from_email=correo.remitente,
+        to=correo.destinatarios,
+        connection=conexion,
+    )
+    if correo.mensaje_html:
+        email.attach_alternative(correo.mensaje_html, 'text/html')
+    return email
+
+
+def _programar_reintento(correo: CorreoSaliente, error: Exception, ahora):
+    base = timedelta(seconds=getattr(settings, 'CORREOS_REINTENTO_SEGUNDOS', 60))
+    max_intentos = getattr(settings, 'CORREOS_MAX_INTENTOS', 5)
+
+    correo.intentos += 1
+    correo.ultimo_error = str(error)[:2000]
+    if correo.intentos >= max_intentos:
+        correo.estado = 'FALLIDO'
+        logger.error('Correo #%s descartado tras %s intentos: %s', correo.pk, correo.intentos, error)
+    else:
+        correo.proximo_intento = ahora + min(base * 2 ** (correo.intentos - 1), MAX_ESPERA_REINTENTO)
+        logger.warning('Correo #%s falló (intento %s): %s', correo.pk, correo.intentos, error)
+
+
+def _entregar(lote, ahora):
+    """Envía un lote ya reservado y registra el resultado de cada correo."""
+    conexion = get_connection(fail_silently=False)
+    try:
+        conexion.open()
+    except Exception as error:
+        for correo in lote:
+            _programar_reintento(correo, error, ahora)
+    else:
+        try:
+            for correo in lote:
+                try:
+                    _mensaje(correo, conexion).send()
+                except Exception as error:
+                    _programar_reintento(correo, error, ahora)
+                    # La conexión puede haber quedado inutilizable
+                    conexion.close()
+                    try:
+                        conexion.open()
+                    except Exception:
+                        logger.warning('No se pudo reabrir la conexión de correo')
+                else:
+                    correo.estado = 'ENVIADO'
+                    correo.fecha_envio = timezone.now()
+                    correo.ultimo_error = ''
+        finally:
+            conexion.close()
+
+    CorreoSaliente.objects.bulk_update(
+        lote, ['estado', 'intentos', 'ultimo_error', 'proximo_intento', 'fecha_envio'],
+    )
+
+
+def enviar_lote(tamano=None) -> int:
+    """
+    Envía un lote de correos pendientes. Retorna cuántos se procesaron
+    (enviados o reprogramados); 0 si la bandeja estaba vacía.
+
+    El envío ocurre al confirmar la reserva; dentro de un `atomic` externo
+    se aplaza hasta que este confirme.
+    """
+    tamano = tamano or getattr(settings, 'CORREOS_LOTE', 50)
+    ahora = timezone.now()
+
+    with transaction.atomic():
+        lote = list(
+            CorreoSaliente.objects
+            .select_for_update(skip_locked=True)
+            .filter(estado='PENDIENTE', proximo_intento__lte=ahora)
+            .order_by('proximo_intento', 'id')[:tamano]
+        )
+        if not lote:
+            return 0
+
+        CorreoSaliente.objects.filter(pk__in=[c.pk for c in lote]).update(
+            proximo_intento=ahora + RESERVA_ENVIO,
+        )
+        transaction.on_commit(lambda: _entregar(lote, ahora))
+    return len(lote)
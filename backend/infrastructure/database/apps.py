@@ -9,5 +9,4 @@ class Config(AppConfig):
     name = 'infrastructure.database'
 
     def ready(self):
-        # Importar señales aquí si es necesario
-        pass
+        from infrastructure.database import signals  # noqa: F401
@@ -0,0 +1,62 @@
+"""
+Búsqueda de usuarios por subcadena.
+
+El listado de usuarios busca el texto en numero_documento, correo y
+nombre_completo con `icontains`, que en PostgreSQL se traduce a
+UPPER(columna) LIKE UPPER('%texto%'). Un LIKE con comodín inicial no puede
+usar un B-tree, así que cada columna tiene un índice GIN de trigramas
+(pg_trgm) sobre UPPER(columna): el planificador combina los tres con un
+BitmapOr y la búsqueda no recorre la tabla.
+
+Los índices no se declaran en el modelo porque dependen de la extensión;
+`instalar_indices_busqueda` los crea si pg_trgm está disponible en el
+servidor y, si no, la búsqueda sigue funcionando sin índice.
+"""
+import logging
+
+from django.db import connections
+from django.db.models import Q
+
+from infrastructure.database.usuarios_models import UsuarioSistema
+
+logger = logging.getLogger(__name__)
+
+CAMPOS_BUSQUEDA = ('numero_documento', 'correo', 'nombre_completo')
+
+
+def _nombre_indice(campo):
+    return f'idx_usuarios_trgm_{campo}'
+
+
+def filtro_busqueda(texto: str) -> Q:
+    """Usuarios cuyo documento, correo o nombre contienen `texto` (sin distinguir mayúsculas)."""
+    filtro = Q()
+    for campo in CAMPOS_BUSQUEDA:
+        filtro |= Q(**{f'{campo}__icontains': texto})
+    return filtro
+
+
+def instalar_indices_busqueda(using='default') -> bool:
+    """
+    Crea la extensión pg_trgm y los índices de trigramas (idempotente).
+    Retorna False si el servidor no tiene pg_trgm.
+    """
+    tabla = UsuarioSistema._meta.db_table
+    with connections[using].cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            logger.warning('pg_trgm no está disponible: la búsqueda de usuarios no tendrá índice.')
+            return False
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for campo in CAMPOS_BUSQUEDA:
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {_nombre_indice(campo)} '
+                f'ON {tabla} USING gin (UPPER({campo}) gin_trgm_ops)'
+            )
+    return True
+
+
+def eliminar_indices_busqueda(using='default'):
+    with connections[using].cursor() as cursor:
+        for campo in CAMPOS_BUSQUEDA:
+            cursor.execute(f'DROP INDEX IF EXISTS {_nombre_indice(campo)}')
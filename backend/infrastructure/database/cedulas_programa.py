@@ -0,0 +1,117 @@
+"""
+Registro de cédulas por programa (tabla cedulas_programa).
+
+Una fila por miembro de hogar con el programa de su postulación, con
+restricción única (programa, tipo_documento, numero_documento). Un trigger
+por sentencia sobre miembros_hogar la mantiene en la misma transacción:
+al insertar un miembro con una cédula ya registrada en el programa la
+sentencia falla con `uq_cedula_programa`, aunque otro envío simultáneo
+haya pasado la verificación previa.
+
+El programa se toma de la etapa del hogar al insertar el miembro.
+`instalar_cedulas_programa` es idempotente: corre en la migración y en
+cada post_migrate (las BD de pruebas se crean sin migraciones).
+"""
+from django.db import connection, connections, transaction
+
+from infrastructure.database.models import CedulaPrograma, Etapa, GestionHogarEtapa1, MiembroHogar
+
+RESTRICCION = 'uq_cedula_programa'
+
+_T_CEDULAS = CedulaPrograma._meta.db_table
+_T_MIEMBROS = MiembroHogar._meta.db_table
+_T_GESTION = GestionHogarEtapa1._meta.db_table
+_T_ETAPAS = Etapa._meta.db_table
+
+_INSERCION = f"""
+    INSERT INTO {_T_CEDULAS} (programa_id, tipo_documento, numero_documento, miembro_id)
+    SELECT e.programa_id, m.tipo_documento, m.numero_documento, m.id
+    FROM {{origen}} m
+    JOIN {_T_GESTION} g ON g.id = m.postulacion_id
+    JOIN {_T_ETAPAS} e ON e.id = g.etapa_id
+"""
+
+
+# Miembros actualizados cuyo programa, tipo o número de documento cambió
+_CAMBIADOS = f"""
+    SELECT n.id, en.programa_id, n.tipo_documento, n.numero_documento, n.postulacion_id
+    FROM nuevas n
+    JOIN viejas v ON v.id = n.id
+    JOIN {_T_GESTION} gn ON gn.id = n.postulacion_id
+    JOIN {_T_ETAPAS} en ON en.id = gn.etapa_id
+    JOIN {_T_GESTION} gv ON gv.id = v.postulacion_id
+    JOIN {_T_ETAPAS} ev ON ev.id = gv.etapa_id
+    WHERE (en.programa_id, n.tipo_documento, n.numero_documento)
+          IS DISTINCT FROM (ev.programa_id, v.tipo_documento, v.numero_documento)
+"""
+
+
+def _sql_instalacion():
+    # En UPDATE solo se reescriben las filas cuya clave cambió: las cédulas
+    # repetidas de antes de la restricción (sin fila en el registro) pueden
+    # seguir actualizándose.
+    sentencias = [
+        f"""
+        CREATE OR REPLACE FUNCTION cedulas_programa_trg() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                DELETE FROM {_T_CEDULAS} c USING viejas v WHERE c.miembro_id = v.id;
+            ELSIF TG_OP = 'INSERT' THEN
+                {_INSERCION.format(origen='nuevas')};
+            ELSE
+                DELETE FROM {_T_CEDULAS} c USING ({_CAMBIADOS}) x WHERE c.miembro_id = x.id;
+                {_INSERCION.format(origen=f'({_CAMBIADOS})')};
+            END IF;
+            RETURN NULL;
+        END
+        $$
+        """,
+    ]
+    referencias = {
+        'INSERT': 'NEW TABLE AS nuevas',
+        'UPDATE': 'OLD TABLE AS viejas NEW TABLE AS nuevas',
+        'DELETE': 'OLD TABLE AS viejas',
+    }
+    for evento, referencia in referencias.items():
+        nombre = f'cedulas_programa_{evento.lower()}'
+        sentencias += [
+            f'DROP TRIGGER IF EXISTS {nombre} ON {_T_MIEMBROS}',
+            f'CREATE TRIGGER {nombre} AFTER {evento} ON {_T_MIEMBROS} REFERENCING {referencia} '
+            'FOR EACH STATEMENT EXECUTE FUNCTION cedulas_programa_trg()',
+        ]
+    return sentencias
+
+
+def instalar_cedulas_programa(using='default'):
+    """Crea o actualiza la función y los triggers del registro de cédulas."""
+    with connections[using].cursor() as cursor:
+        for sentencia in _sql_instalacion():
+            cursor.execute(sentencia)
+
+
+def eliminar_cedulas_programa(using='default'):
+    """Quita los triggers y la función (al revertir la migración)."""
+    with connections[using].cursor() as cursor:
+        cursor.execute('DROP FUNCTION IF EXISTS cedulas_programa_trg() CASCADE')
+
+
+def reconstruir_cedulas_programa() -> int:
+    """
+    Recalcula el registro desde miembros_hogar. Si hay cédulas repetidas
+    en un programa (registradas antes de existir la restricción) se
+    conserva la del primer miembro. Retorna las filas escritas.
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f'LOCK TABLE {_T_CEDULAS} IN EXCLUSIVE MODE')
+            cursor.execute(f'DELETE FROM {_T_CEDULAS}')
+            cursor.execute(
+                _INSERCION.format(origen=_T_MIEMBROS) + ' ORDER BY m.id ON CONFLICT DO NOTHING'
+            )
+            return cursor.rowcount
+
+
+def es_cedula_duplicada(error) -> bool:
+    """True si el IntegrityError viene de la restricción del registro."""
+    diag = getattr(error.__cause__, 'diag', None)
+    return getattr(diag, 'constraint_name', None) == RESTRICCION
@@ -0,0 +1,191 @@
+"""
+Consulta pública de estado de postulación.
+
+`consulta_estado_publica` tiene una fila por cabeza de hogar con
+postulación, indexada por número de documento, con lo que muestra la
+página pública (radicado, programa, estado, fecha, nombre). La consulta
+lee solo esa tabla, y sus respuestas (también las no encontradas) quedan
+en el cache de Django por CONSULTA_ESTADO_TTL segundos, así que en los
+picos posteriores a una publicación casi no llega a la base de datos.
+
+Triggers por sentencia la mantienen sincronizada dentro de la misma
+transacción del cambio:
+
+  miembros_hogar / gestion_hogar_etapa1  recalculan las filas de los
+                                         hogares afectados
+  postulaciones                          copian estado, programa y fecha
+  gestion_programa                       copian nombre y estado del programa
+
+`instalar_consulta_estado` es idempotente: corre en la migración y en cada
+post_migrate (las BD de pruebas se crean sin migraciones).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, connections, transaction
+
+from infrastructure.database.models import (
+    ConsultaEstadoPublica,
+    GestionHogarEtapa1,
+    MiembroHogar,
+    Postulacion,
+    Programa,
+)
+
+CLAVE_CACHE = 'consulta_estado:{}'
+
+_T_CONSULTA = ConsultaEstadoPublica._meta.db_table
+_T_MIEMBROS = MiembroHogar._meta.db_table
+_T_GESTION = GestionHogarEtapa1._meta.db_table
+_T_POSTULACIONES = Postulacion._meta.db_table
+_T_PROGRAMAS = Programa._meta.db_table
+
+_COLUMNAS = (
+    'miembro_id, gestion_id, postulacion_id, programa_id, numero_documento, numero_radicado, '
+    'nombre_postulante, programa_nombre, programa_estado, estado, fecha_postulacion'
+)
+
+_PROYECCION = f"""
+    SELECT m.id, g.id, p.id, p.programa_id, m.numero_documento, g.numero_radicado,
+           m.primer_nombre || ' ' || m.primer_apellido,
+           coalesce(pr.nombre, ''), coalesce(pr.estado, ''), p.estado, p.fecha_postulacion
+    FROM {_T_MIEMBROS} m
+    JOIN {_T_GESTION} g ON g.id = m.postulacion_id
+    JOIN {_T_POSTULACIONES} p ON p.id = g.postulacion_id
+    LEFT JOIN {_T_PROGRAMAS} pr ON pr.id = p.programa_id
+    WHERE m.es_cabeza_hogar
+"""
+
+
+def _sql_instalacion():
+    # Columna con el hogar (gestión) de cada fila cambiada: se recalculan sus filas
+    hogares = {
+        _T_MIEMBROS: 'postulacion_id',
+        _T_GESTION: 'id',
+    }
+    sentencias = [
+        f"""
+        CREATE OR REPLACE FUNCTION consulta_estado_refrescar(gestiones bigint[]) RETURNS void
+        LANGUAGE sql AS $$
+            DELETE FROM {_T_CONSULTA} WHERE gestion_id = ANY(gestiones);
+            INSERT INTO {_T_CONSULTA} ({_COLUMNAS})
+            {_PROYECCION} AND g.id = ANY(gestiones);
+        $$
+        """,
+    ]
+    for tabla, columna in hogares.items():
+        seleccion = 'SELECT {columna} FROM {transicion}'
+        nuevas = seleccion.format(columna=columna, transicion='nuevas')
+        viejas = seleccion.format(columna=columna, transicion='viejas')
+        refrescar = 'PERFORM consulta_estado_refrescar(ARRAY(SELECT DISTINCT c FROM ({}) t(c)))'
+        sentencias.append(f"""
+            CREATE OR REPLACE FUNCTION consulta_estado_trg_{tabla}() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    {refrescar.format(nuevas)};
+                ELSIF TG_OP = 'DELETE' THEN
+                    {refrescar.format(viejas)};
+                ELSE
+                    {refrescar.format(f'{viejas} UNION {nuevas}')};
+                END IF;
+                RETURN NULL;
+            END
+            $$
+        """)
+        sentencias += _triggers(tabla, f'consulta_estado_trg_{tabla}', ('INSERT', 'UPDATE', 'DELETE'))
+
+    # Cambios que no alteran qué filas existen: se copian los valores
+    copias = {
+        _T_POSTULACIONES: (
+            'estado = n.estado, programa_id = n.programa_id, fecha_postulacion = n.fecha_postulacion, '
+            "programa_nombre = coalesce(pr.nombre, ''), programa_estado = coalesce(pr.estado, '')",
+            f'nuevas n LEFT JOIN {_T_PROGRAMAS} pr ON pr.id = n.programa_id',
+            'c.postulacion_id = n.id',
+        ),
+        _T_PROGRAMAS: (
+            'programa_nombre = n.nombre, programa_estado = n.estado',
+            'nuevas n',
+            'c.programa_id = n.id',
+        ),
+    }
+    for tabla, (asignaciones, origen, condicion) in copias.items():
+        funcion = f'consulta_estado_trg_{tabla}'
+        sentencias.append(
+            f'CREATE OR REPLACE FUNCTION {funcion}() RETURNS trigger LANGUAGE plpgsql AS $$ '
+            f'BEGIN UPDATE {_T_CONSULTA} c SET {asignaciones} FROM {origen} WHERE {condicion}; '
+            'RETURN NULL; END $$'
+        )
+        sentencias += _triggers(tabla, funcion, ('UPDATE',))
+    return sentencias
+
+
+def _triggers(tabla, funcion, eventos):
+    referencias = {
+        'INSERT': 'NEW TABLE AS nuevas',
+        'UPDATE': 'OLD TABLE AS viejas NEW TABLE AS nuevas',
+        'DELETE': 'OLD TABLE AS viejas',
+    }
+    sentencias = []
+    for evento in eventos:
+        nombre = f'consulta_estado_{evento.lower()}_{tabla}'
+        sentencias += [
+            f'DROP TRIGGER IF EXISTS {nombre} ON {tabla}',
+            f'CREATE TRIGGER {nombre} AFTER {evento} ON {tabla} REFERENCING {referencias[evento]} '
+            f'FOR EACH STATEMENT EXECUTE FUNCTION {funcion}()',
+        ]
+    return sentencias
+
+
+def instalar_consulta_estado(using='default'):
+    """Crea o actualiza las funciones y triggers de la consulta pública."""
+    with connections[using].cursor() as cursor:
+        for sentencia in _sql_instalacion():
+            cursor.execute(sentencia)
+
+
+def eliminar_consulta_estado(using='default'):
+    """Quita los triggers y funciones (al revertir la migración)."""
+    with connections[using].cursor() as cursor:
+        for tabla in (_T_MIEMBROS, _T_GESTION, _T_POSTULACIONES, _T_PROGRAMAS):
+            cursor.execute(f'DROP FUNCTION IF EXISTS consulta_estado_trg_{tabla}() CASCADE')
+        cursor.execute('DROP FUNCTION IF EXISTS consulta_estado_refrescar(bigint[])')
+
+
+def reconstruir_consulta_estado() -> int:
+    """Recalcula la tabla completa desde las tablas fuente. Retorna las filas escritas."""
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f'LOCK TABLE {_T_CONSULTA} IN EXCLUSIVE MODE')
+            cursor.execute(f'DELETE FROM {_T_CONSULTA}')
+            cursor.execute(f'INSERT INTO {_T_CONSULTA} ({_COLUMNAS}) {_PROYECCION}')
+            return cursor.rowcount
+
+
+def consultar_estado_publico(numero_documento: str) -> list[dict]:
+    """
+    Postulaciones visibles del cabeza de hogar con ese documento (lista
+    vacía si no hay). Se oculta el resultado de los no beneficiarios de
+    programas culminados.
+    """
+    clave = CLAVE_CACHE.format(numero_documento)
+    resultados = cache.get(clave)
+    if resultados is None:
+        estados = dict(Postulacion.ESTADOS)
+        filas = (
+            ConsultaEstadoPublica.objects
+            .filter(numero_documento=numero_documento)
+            .exclude(programa_estado='CULMINADO', estado='NO_BENEFICIARIO')
+            .order_by('fecha_postulacion', 'postulacion_id')
+        )
+        resultados = [
+            {
+                'numero_radicado': fila.numero_radicado,
+                'programa': fila.programa_nombre,
+                'estado': fila.estado,
+                'estado_label': estados.get(fila.estado, fila.estado),
+                'fecha_postulacion': fila.fecha_postulacion,
+                'nombre_postulante': fila.nombre_postulante,
+            }
+            for fila in filas
+        ]
+        cache.set(clave, resultados, getattr(settings, 'CONSULTA_ESTADO_TTL', 30))
+    return resultados
@@ -0,0 +1,177 @@
+"""
+Contadores del dashboard mantenidos por la base de datos.
+
+Cada tabla contada tiene una función SQL `contadores_claves_<tabla>(fila)`
+que devuelve las claves a las que aporta la fila (p. ej.
+'postulaciones.estado.APROBADA'). Triggers por sentencia (con tablas de
+transición) restan las claves de las filas viejas, suman las de las nuevas
+y aplican el neto en `contadores_dashboard` dentro de la misma transacción,
+así que también cubren los `QuerySet.update()` y el SQL del sorteo.
+
+Para no convertir cada contador en una fila caliente, el valor se reparte
+en SLOTS filas (según el backend que escribe); el dashboard lee la suma por
+clave en una sola consulta.
+
+`instalar_contadores` es idempotente: corre en la migración y en cada
+post_migrate (las BD de pruebas se crean sin migraciones).
+`recalcular_contadores` reconstruye todo desde las tablas fuente y
+devuelve la deriva encontrada.
+"""
+from django.db import connections, transaction
+
+from infrastructure.database.models import (
+    ContadorDashboard,
+    DocumentoProcesoInterno,
+    Etapa,
+    GestionHogarEtapa1,
+    MiembroHogar,
+    Postulacion,
+    Programa,
+    Visita,
+)
+from infrastructure.database.usuarios_models import UsuarioSistema
+
+SLOTS = 8
+
+_VACIO = "'{}'::text[]"
+
+# Claves que aporta una fila `r` de cada tabla (expresión SQL text[])
+CLAVES = {
+    Programa: "ARRAY['programas.estado.' || r.estado]",
+    Etapa: (
+        "CASE WHEN r.activo_logico THEN ARRAY[CASE WHEN r.finalizada "
+        f"THEN 'etapas.finalizadas' ELSE 'etapas.activas' END] ELSE {_VACIO} END"
+    ),
+    Postulacion: f"CASE WHEN r.activo_logico THEN ARRAY['postulaciones.estado.' || r.estado] ELSE {_VACIO} END",
+    Visita: (
+        "CASE WHEN r.activo_logico THEN array_remove(ARRAY["
+        "'visitas.estado.' || r.estado_visita, "
+        "CASE r.visita_efectiva WHEN true THEN 'visitas.efectivas' WHEN false THEN 'visitas.no_efectivas' END"
+        f"], NULL) ELSE {_VACIO} END"
+    ),
+    UsuarioSistema: (
+        "array_remove(ARRAY['usuarios.total', 'usuarios.rol.' || r.id_rol, "
+        "CASE WHEN r.activo THEN 'usuarios.activos' END], NULL)"
+    ),
+    GestionHogarEtapa1: (
+        "array_remove(ARRAY['hogares.total', 'hogares.estrato.' || r.estrato, "
+        "CASE WHEN r.zona <> '' THEN 'hogares.zona.' || r.zona END], NULL)"
+    ),
+    MiembroHogar: (
+        "array_remove(ARRAY['miembros.total', "
+        "CASE WHEN r.tiene_discapacidad THEN 'miembros.discapacidad' END, "
+        "CASE WHEN r.es_victima_conflicto THEN 'miembros.victima' END, "
+        "CASE WHEN r.es_desplazado THEN 'miembros.desplazado' END, "
+        "CASE WHEN r.es_firmante_paz THEN 'miembros.firmante_paz' END], NULL)"
+    ),
+    DocumentoProcesoInterno: f"CASE WHEN r.activo_logico THEN ARRAY['documentos_internos.total'] ELSE {_VACIO} END",
+}
+
+
+def _sql_instalacion():
+    tabla_contadores = ContadorDashboard._meta.db_table
+    sentencias = []
+    for modelo, claves in CLAVES.items():
+        tabla = modelo._meta.db_table
+        fuente = "SELECT c AS clave, {delta} AS delta FROM {transicion} r, unnest(contadores_claves_{tabla}(r)) c"
+        viejas = fuente.format(delta=-1, transicion='viejas', tabla=tabla)
+        nuevas = fuente.format(delta=1, transicion='nuevas', tabla=tabla)
+        aplicar = (
+            f"INSERT INTO {tabla_contadores} (clave, slot, valor) "
+            f"SELECT clave, mod(pg_backend_pid(), {SLOTS}), sum(delta) FROM ({{deltas}}) d "
+            "GROUP BY clave HAVING sum(delta) <> 0 ORDER BY clave "
+            f"ON CONFLICT (clave, slot) DO UPDATE SET valor = {tabla_contadores}.valor + EXCLUDED.valor"
+        )
+        sentencias += [
+            f"CREATE OR REPLACE FUNCTION contadores_claves_{tabla}(r {tabla}) RETURNS text[] "
+            f"LANGUAGE sql IMMUTABLE AS $$ SELECT {claves} $$",
+
+            f"""
+            CREATE OR REPLACE FUNCTION contadores_trg_{tabla}() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    {aplicar.format(deltas=nuevas)};
+                ELSIF TG_OP = 'DELETE' THEN
+                    {aplicar.format(deltas=viejas)};
+                ELSE
+                    {aplicar.format(deltas=f'{viejas} UNION ALL {nuevas}')};
+                END IF;
+                RETURN NULL;
+            END
+            $$
+            """,
+        ]
+        for evento, referencias in (
+            ('INSERT', 'NEW TABLE AS nuevas'),
+            ('UPDATE', 'OLD TABLE AS viejas NEW TABLE AS nuevas'),
+            ('DELETE', 'OLD TABLE AS viejas'),
+        ):
+            nombre = f'contadores_{evento.lower()}_{tabla}'
+            sentencias += [
+                f'DROP TRIGGER IF EXISTS {nombre} ON {tabla}',
+                f'CREATE TRIGGER {nombre} AFTER {evento} ON {tabla} REFERENCING {referencias} '
+                f'FOR EACH STATEMENT EXECUTE FUNCTION contadores_trg_{tabla}()',
+            ]
+    return sentencias
+
+
+def instalar_contadores(using='default'):
+    """Crea o actualiza las funciones y triggers de los contadores."""
+    with connections[using].cursor() as cursor:
+        for sentencia in _sql_instalacion():
+            cursor.execute(sentencia)
+
+
+def eliminar_contadores(using='default'):
+    """Quita los triggers y funciones (al revertir la migración)."""
+    with connections[using].cursor() as cursor:
+        for modelo in CLAVES:
+            tabla = modelo._meta.db_table
+            cursor.execute(f'DROP FUNCTION IF EXISTS contadores_trg_{tabla}() CASCADE')
+            cursor.execute(f'DROP FUNCTION IF EXISTS contadores_claves_{tabla}({tabla})')
+
+
+def leer_contadores(using='default') -> dict[str, int]:
+    """{clave: valor} de todos los contadores (una consulta)."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f'SELECT clave, SUM(valor) FROM {ContadorDashboard._meta.db_table} GROUP BY clave'
+        )
+        return {clave: int(valor) for clave, valor in cursor.fetchall()}
+
+
+def _contar_desde_fuentes(using) -> dict[str, int]:
+    consultas = [
+        f'SELECT c, count(*) FROM {m._meta.db_table} r, '
+        f'unnest(contadores_claves_{m._meta.db_table}(r)) c GROUP BY c'
+        for m in CLAVES
+    ]
+    with connections[using].cursor() as cursor:
+        cursor.execute(' UNION ALL '.join(consultas))
+        return {clave: int(valor) for clave, valor in cursor.fetchall()}
+
+
+def recalcular_contadores(aplicar=True, using='default') -> dict[str, tuple[int, int]]:
+    """
+    Cuenta de nuevo desde las tablas fuente. Retorna la deriva
+    {clave: (valor_actual, valor_real)}; con aplicar=True reemplaza los
+    contadores por los valores reales.
+    """
+    tabla = ContadorDashboard._meta.db_table
+    with transaction.atomic(using=using):
+        with connections[using].cursor() as cursor:
+            # Los triggers concurrentes esperan a que termine la reconstrucción
+            cursor.execute(f'LOCK TABLE {tabla} IN EXCLUSIVE MODE')
+        actuales = leer_contadores(using)
+        reales = _contar_desde_fuentes(using)
+        deriva = {
+            clave: (actuales.get(clave, 0), reales.get(clave, 0))
+            for clave in actuales.keys() | reales.keys()
+            if actuales.get(clave, 0) != reales.get(clave, 0)
+        }
+        if aplicar:
+            ContadorDashboard.objects.using(using).all().delete()
+            ContadorDashboard.objects.using(using).bulk_create(
+                ContadorDashboard(clave=clave, slot=0, valor=valor) for clave, valor in reales.items()
+            )
+    return deriva
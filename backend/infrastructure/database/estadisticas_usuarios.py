@@ -0,0 +1,60 @@
+"""
+Estadísticas de usuarios compartidas por UsuarioViewSet (listado y
+/estadisticas/) y por UsuarioApplicationService.
+
+Se calculan con una sola consulta de agregados condicionales sobre los
+roles y se guardan en el cache de Django por ESTADISTICAS_USUARIOS_TTL
+segundos. Las señales de UsuarioSistema las invalidan al confirmar la
+transacción que crea, elimina o modifica un usuario.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+from infrastructure.database.roles_models import Rol
+
+CLAVE_CACHE = 'estadisticas_usuarios'
+
+
+def calcular_estadisticas_usuarios() -> dict:
+    """
+    {total, activos, inactivos, por_rol: {nombre_rol: total}} de los
+    usuarios no eliminados.
+    """
+    vigentes = Q(usuariosistema__activo_logico=True)
+    roles = (
+        Rol.objects
+        .annotate(
+            total=Count('usuariosistema', filter=vigentes),
+            activos=Count('usuariosistema', filter=vigentes & Q(usuariosistema__activo=True)),
+        )
+        .order_by('id_rol')
+        .values('nombre_rol', 'total', 'activos')
+    )
+    total = activos = 0
+    por_rol = {}
+    for rol in roles:
+        por_rol[rol['nombre_rol']] = rol['total']
+        total += rol['total']
+        activos += rol['activos']
+    return {
+        'total': total,
+        'activos': activos,
+        'inactivos': total - activos,
+        'por_rol': por_rol,
+    }
+
+
+def estadisticas_usuarios() -> dict:
+    """Estadísticas desde el cache; se calculan si no están."""
+    estadisticas = cache.get(CLAVE_CACHE)
+    if estadisticas is None:
+        estadisticas = calcular_estadisticas_usuarios()
+        cache.set(CLAVE_CACHE, estadisticas, getattr(settings, 'ESTADISTICAS_USUARIOS_TTL', 300))
+    return estadisticas
+
+
+def invalidar_estadisticas_usuarios():
+    """Descarta las estadísticas en cache cuando la transacción en curso confirma."""
+    transaction.on_commit(lambda: cache.delete(CLAVE_CACHE))
@@ -0,0 +1,127 @@
+"""
+Respuestas de configuración de formularios compiladas por etapa.
+
+Lo que carga cada ciudadano antes de llenar el formulario
+(`formulario-publico`, `info-publica`) y la configuración del registro del
+hogar se arman una vez por etapa y se guardan en el cache de Django junto
+con su ETag. Las vistas responden desde el cache (y con 304 si el cliente
+ya tiene esa versión) sin leer Etapa, FormularioEtapa ni CampoFormulario.
+
+Las señales de Programa, Etapa, FormularioEtapa y ConfigRegistroHogar
+descartan las entradas de la etapa al confirmar la transacción, así que
+publicar, inhabilitar o guardar la configuración se ve en la siguiente
+petición. FORMULARIOS_PUBLICOS_TTL acota lo que tarda en verse en otros
+procesos si el cache no es compartido.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from infrastructure.database.models import ConfigRegistroHogar, Etapa, FormularioEtapa
+
+CLAVE_CACHE = 'formularios_publicos:{vista}:{etapa_id}'
+
+NO_ENCONTRADA = {'detail': 'No encontrado.'}
+
+
+def _etapa(etapa_id):
+    return (
+        Etapa.objects
+        .filter(pk=etapa_id, activo_logico=True)
+        .select_related('programa', 'formulario', 'config_registro_hogar')
+        .first()
+    )
+
+
+def _formulario_publico(etapa):
+    try:
+        formulario = etapa.formulario
+    except FormularioEtapa.DoesNotExist:
+        return 404, {'detail': 'Esta etapa aún no tiene formulario configurado.'}
+    if formulario.estado != 'PUBLICADO':
+        return 404, {'detail': 'El formulario de esta etapa aún no ha sido publicado.'}
+
+    campos = list(
+        formulario.campos.order_by('orden').values(
+            'campo_catalogo', 'orden', 'obligatorio', 'texto_ayuda'
+        )
+    )
+    return 200, {
+        'etapa_id': etapa.id,
+        'numero_etapa': etapa.numero_etapa,
+        'modulo_principal': etapa.modulo_principal,
+        'programa_nombre': etapa.programa.nombre,
+        'estado': formulario.estado,
+        'fecha_publicacion': formulario.fecha_publicacion,
+        'campos': campos,
+    }
+
+
+def _info_publica(etapa):
+    try:
+        registro_hogar_publicado = etapa.config_registro_hogar.publicado
+    except ConfigRegistroHogar.DoesNotExist:
+        registro_hogar_publicado = False
+    return 200, {
+        'etapa_id':       etapa.id,
+        'numero_etapa':   etapa.numero_etapa,
+        'programa_nombre': etapa.programa.nombre,
+        'registro_hogar_publicado': registro_hogar_publicado,
+    }
+
+
+def _registro_hogar_config(etapa):
+    try:
+        config = etapa.config_registro_hogar
+    except ConfigRegistroHogar.DoesNotExist:
+        return 200, {'campos': {}, 'fecha_modificacion': None}
+    return 200, {
+        'campos': config.campos,
+        'fecha_modificacion': config.fecha_modificacion,
+    }
+
+
+VISTAS = {
+    'formulario_publico': _formulario_publico,
+    'info_publica': _info_publica,
+    'registro_hogar_config': _registro_hogar_config,
+}
+
+
+def _etag(data) -> str:
+    contenido = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True).encode()
+    return '"{}"'.format(hashlib.sha256(contenido).hexdigest()[:32])
+
+
+def respuesta_compilada(vista: str, etapa_id) -> dict:
+    """
+    {'status', 'data', 'etag'} de la vista para la etapa, desde el cache o
+    compilada (y guardada) si no está. Una etapa inexistente o eliminada
+    da status 404.
+    """
+    clave = CLAVE_CACHE.format(vista=vista, etapa_id=etapa_id)
+    entrada = cache.get(clave)
+    if entrada is None:
+        etapa = _etapa(etapa_id)
+        if etapa is None:
+            codigo, data = 404, NO_ENCONTRADA
+        else:
+            codigo, data = VISTAS[vista](etapa)
+        entrada = {'status': codigo, 'data': data, 'etag': _etag(data)}
+        cache.set(clave, entrada, getattr(settings, 'FORMULARIOS_PUBLICOS_TTL', 300))
+    return entrada
+
+
+def invalidar_etapas(*etapa_ids):
+    """Descarta las respuestas de las etapas cuando la transacción en curso confirma."""
+    claves = [
+        CLAVE_CACHE.format(vista=vista, etapa_id=etapa_id)
+        for etapa_id in etapa_ids
+        for vista in VISTAS
+    ]
+    if claves:
+        transaction.on_commit(lambda: cache.delete_many(claves))
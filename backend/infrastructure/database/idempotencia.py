@@ -0,0 +1,96 @@
+"""
+Claves de idempotencia de los envíos públicos.
+
+La primera petición con una clave la reserva (fila con estado_http nulo)
+y, si termina bien, guarda su respuesta. Los reintentos con la misma clave
+y el mismo contenido leen esa fila y reciben la misma respuesta: una sola
+lectura, sin validaciones ni escrituras. Si la petición original falla la
+reserva se libera para que el cliente pueda reintentar.
+
+Las respuestas vencen a las IDEMPOTENCIA_TTL_HORAS; el comando
+`limpiar_respuestas_idempotentes` borra las vencidas. Una reserva sin
+respuesta por más de IDEMPOTENCIA_EN_CURSO_SEGUNDOS se considera abandonada
+y la puede tomar otra petición.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from infrastructure.database.models import RespuestaIdempotente
+
+
+class ClaveEnUso(Exception):
+    """Otra petición con la misma clave todavía está en curso."""
+
+
+class ClaveReutilizada(Exception):
+    """La clave ya se usó con un contenido distinto."""
+
+
+def _vencimiento(ahora):
+    return ahora + timedelta(hours=getattr(settings, 'IDEMPOTENCIA_TTL_HORAS', 24))
+
+
+def _insertar(clave, huella, ahora) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {RespuestaIdempotente._meta.db_table} '
+            '(clave, huella, cabeceras, fecha_creacion, fecha_expiracion) '
+            "VALUES (%s, %s, '{}', %s, %s) ON CONFLICT (clave) DO NOTHING",
+            [clave, huella, ahora, _vencimiento(ahora)],
+        )
+        return cursor.rowcount == 1
+
+
+def reclamar(clave: str, huella: str) -> RespuestaIdempotente | None:
+    """
+    Reserva la clave para esta petición y retorna None, o retorna la
+    respuesta ya guardada. Lanza ClaveReutilizada si la clave se usó con
+    otra huella y ClaveEnUso si su petición original sigue en curso.
+    """
+    ahora = timezone.now()
+    guardada = RespuestaIdempotente.objects.filter(clave=clave).first()
+    if guardada is None:
+        if _insertar(clave, huella, ahora):
+            return None
+        raise ClaveEnUso(clave)
+
+    if guardada.fecha_expiracion > ahora:
+        if guardada.huella != huella:
+            raise ClaveReutilizada(clave)
+        if guardada.estado_http is not None:
+            return guardada
+        limite = timedelta(seconds=getattr(settings, 'IDEMPOTENCIA_EN_CURSO_SEGUNDOS', 60))
+        if guardada.fecha_creacion > ahora - limite:
+            raise ClaveEnUso(clave)
+
+    # Vencida o abandonada: se toma solo si nadie la tomó antes
+    tomada = RespuestaIdempotente.objects.filter(
+        pk=guardada.pk, fecha_creacion=guardada.fecha_creacion,
+    ).update(
+        huella=huella, estado_http=None, cuerpo=None, cabeceras={},
+        fecha_creacion=ahora, fecha_expiracion=_vencimiento(ahora),
+    )
+    if not tomada:
+        raise ClaveEnUso(clave)
+    return None
+
+
+def guardar(clave: str, estado_http: int, cuerpo, cabeceras: dict) -> None:
+    """Guarda la respuesta de la petición que reservó la clave."""
+    RespuestaIdempotente.objects.filter(clave=clave, estado_http__isnull=True).update(
+        estado_http=estado_http, cuerpo=cuerpo, cabeceras=cabeceras,
+    )
+
+
+def liberar(clave: str) -> None:
+    """Quita la reserva de una petición que no terminó bien."""
+    RespuestaIdempotente.objects.filter(clave=clave, estado_http__isnull=True).delete()
+
+
+def limpiar_vencidas() -> int:
+    """Borra las respuestas vencidas. Retorna cuántas se borraron."""
+    borradas, _ = RespuestaIdempotente.objects.filter(fecha_expiracion__lte=timezone.now()).delete()
+    return borradas
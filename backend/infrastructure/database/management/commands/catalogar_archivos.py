@@ -0,0 +1,62 @@
+"""
+Llena el catálogo de archivos con los documentos ya existentes.
+
+Uso:
+    python manage.py catalogar_archivos                # los que faltan o no tienen SHA-256
+    python manage.py catalogar_archivos --reverificar  # vuelve a verificar todos
+"""
+from django.core.management.base import BaseCommand
+
+from infrastructure.database.models import (
+    ArchivoCatalogo,
+    DocumentoGestionHogar,
+    DocumentoMiembroHogar,
+    DocumentoProcesoInterno,
+    DocumentoVisitaEtapa2,
+)
+from infrastructure.storage.catalogo import registrar_archivo
+
+MODELOS_DOCUMENTO = (
+    DocumentoGestionHogar,
+    DocumentoMiembroHogar,
+    DocumentoVisitaEtapa2,
+    DocumentoProcesoInterno,
+)
+
+
+class Command(BaseCommand):
+    help = 'Registra en el catálogo los metadatos (ruta, tamaño, SHA-256, MIME) de los documentos existentes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reverificar', action='store_true',
+                            help='Vuelve a verificar también los archivos ya catalogados.')
+
+    def handle(self, *args, **options):
+        registrados = faltantes = 0
+        catalogados = set()
+        if not options['reverificar']:
+            # Las entradas registradas desde una petición no tienen hash todavía
+            catalogados = set(
+                ArchivoCatalogo.objects.exclude(existe=True, sha256='').values_list('ruta', flat=True)
+            )
+
+        for modelo in MODELOS_DOCUMENTO:
+            nombres = (
+                modelo.objects.exclude(archivo='')
+                .values_list('archivo', flat=True)
+                .distinct()
+                .iterator()
+            )
+            for name in nombres:
+                if not name or name in catalogados:
+                    continue
+                entrada = registrar_archivo(name)
+                catalogados.add(name)
+                registrados += 1
+                if not entrada.existe:
+                    faltantes += 1
+                    self.stdout.write(self.style.WARNING(f'No existe en el storage: {name}'))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{registrados} archivo(s) catalogado(s), {faltantes} sin archivo en el storage.'
+        ))
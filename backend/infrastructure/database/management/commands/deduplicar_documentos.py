@@ -0,0 +1,97 @@
+"""
+Migra los documentos existentes al storage deduplicado por contenido.
+
+Requiere DOCUMENTOS_DEDUPLICADOS=True. Cada archivo se copia (una sola vez
+por contenido) a documentos/blobs/ y el FileField del documento se actualiza
+para apuntar al blob compartido.
+
+Uso:
+    python manage.py deduplicar_documentos --dry-run
+    python manage.py deduplicar_documentos
+    python manage.py deduplicar_documentos --eliminar-originales
+"""
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from infrastructure.database.models import (
+    ArchivoCatalogo,
+    DocumentoGestionHogar,
+    DocumentoMiembroHogar,
+    DocumentoProcesoInterno,
+    DocumentoVisitaEtapa2,
+)
+from infrastructure.storage.catalogo import registrar_archivo, resolver_ruta_storage
+from infrastructure.storage.dedup_storage import PREFIJO_BLOBS, ruta_blob, sha256_de
+
+MODELOS_DOCUMENTO = (
+    DocumentoGestionHogar,
+    DocumentoMiembroHogar,
+    DocumentoVisitaEtapa2,
+    DocumentoProcesoInterno,
+)
+
+
+class Command(BaseCommand):
+    help = 'Mueve los documentos existentes al storage deduplicado por SHA-256.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Solo informa lo que haría.')
+        parser.add_argument('--eliminar-originales', action='store_true',
+                            help='Borra los archivos originales una vez migrados.')
+
+    def handle(self, *args, **options):
+        if not settings.DOCUMENTOS_DEDUPLICADOS:
+            raise CommandError('Active DOCUMENTOS_DEDUPLICADOS=True antes de migrar los documentos.')
+
+        storage = default_storage
+        dry_run = options['dry_run']
+        migrados = reutilizados = bytes_ahorrados = 0
+        originales = set()
+        vistos = set()
+
+        for modelo in MODELOS_DOCUMENTO:
+            pendientes = (
+                modelo.objects.exclude(archivo='')
+                .exclude(archivo__startswith=f'{PREFIJO_BLOBS}/')
+                .only('id', 'archivo')
+                .iterator()
+            )
+            for doc in pendientes:
+                original = resolver_ruta_storage(doc.archivo.name)
+                if not original:
+                    self.stdout.write(self.style.WARNING(
+                        f'{modelo.__name__} #{doc.id}: no existe {doc.archivo.name}'
+                    ))
+                    continue
+
+                with storage.open(original, 'rb') as f:
+                    sha, tamano = sha256_de(f)
+                    destino = ruta_blob(sha, original)
+                    ya_existia = destino in vistos or storage.exists(destino)
+                    vistos.add(destino)
+                    if not dry_run and not ya_existia:
+                        storage._save(destino, f)
+
+                if ya_existia:
+                    reutilizados += 1
+                    bytes_ahorrados += tamano
+                migrados += 1
+                if dry_run:
+                    continue
+
+                storage.agregar_referencia(destino, sha, tamano)
+                modelo.objects.filter(pk=doc.pk).update(archivo=destino, ruta_archivo=destino)
+                if not ArchivoCatalogo.objects.filter(ruta=destino).exists():
+                    registrar_archivo(destino)
+                originales.add(original)
+
+        if options['eliminar_originales'] and not dry_run:
+            for original in originales:
+                storage.delete(original)
+
+        prefijo = '[dry-run] ' if dry_run else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefijo}{migrados} documento(s) migrado(s); {reutilizados} reutilizaron un blob existente '
+            f'({bytes_ahorrados / (1024 * 1024):.1f} MB sin duplicar).'
+        ))
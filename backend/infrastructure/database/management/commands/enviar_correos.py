@@ -0,0 +1,55 @@
+"""
+Worker que entrega los correos de la bandeja de salida (correos_salientes).
+
+Uso:
+    python manage.py enviar_correos               # bucle continuo
+    python manage.py enviar_correos --workers 2
+    python manage.py enviar_correos --once        # envía lo pendiente y termina
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from infrastructure.correo import enviar_lote
+
+
+def _drenar(lote):
+    # Cada hilo usa su propia conexión a la BD; se cierra al vaciar la bandeja.
+    procesados = 0
+    try:
+        while True:
+            n = enviar_lote(lote)
+            if not n:
+                break
+            procesados += n
+    finally:
+        connection.close()
+    return procesados
+
+
+class Command(BaseCommand):
+    help = 'Envía por lotes los correos pendientes de la bandeja de salida, con reintentos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1, help='Hilos simultáneos (default 1).')
+        parser.add_argument('--lote', type=int, default=None,
+                            help='Correos por conexión SMTP (default CORREOS_LOTE).')
+        parser.add_argument('--intervalo', type=float, default=10.0,
+                            help='Segundos de espera cuando no hay correos pendientes (default 10).')
+        parser.add_argument('--once', action='store_true', help='Envía lo pendiente y termina.')
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                procesados = sum(pool.map(_drenar, [options['lote']] * workers))
+                if procesados:
+                    self.stdout.write(f'{procesados} correo(s) procesado(s).')
+                if options['once']:
+                    break
+                time.sleep(options['intervalo'])
+
+        self.stdout.write(self.style.SUCCESS('Sin correos pendientes.'))
@@ -0,0 +1,27 @@
+"""
+Descarta las cargas fragmentadas vencidas y sus fragmentos en disco.
+
+Uso (p. ej. desde cron cada hora):
+    python manage.py limpiar_cargas_fragmentadas
+"""
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from infrastructure.database.models import CargaFragmentada
+from infrastructure.storage.cargas_fragmentadas import limpiar
+
+
+class Command(BaseCommand):
+    help = 'Cancela las cargas fragmentadas vencidas y elimina sus fragmentos.'
+
+    def handle(self, *args, **options):
+        vencidas = list(
+            CargaFragmentada.objects
+            .filter(estado='EN_CURSO', fecha_expiracion__lte=timezone.now())
+            .values_list('pk', flat=True)
+        )
+        for carga_id in vencidas:
+            limpiar(carga_id)
+        CargaFragmentada.objects.filter(pk__in=vencidas).update(estado='CANCELADA', fecha_actualizacion=timezone.now())
+
+        self.stdout.write(self.style.SUCCESS(f'{len(vencidas)} carga(s) vencida(s) descartada(s).'))
@@ -0,0 +1,17 @@
+"""
+Borra las respuestas guardadas por clave de idempotencia ya vencidas.
+
+Uso (p. ej. desde cron cada hora):
+    python manage.py limpiar_respuestas_idempotentes
+"""
+from django.core.management.base import BaseCommand
+
+from infrastructure.database.idempotencia import limpiar_vencidas
+
+
+class Command(BaseCommand):
+    help = 'Borra las respuestas idempotentes vencidas de los envíos públicos.'
+
+    def handle(self, *args, **options):
+        borradas = limpiar_vencidas()
+        self.stdout.write(self.style.SUCCESS(f'{borradas} respuesta(s) vencida(s) borrada(s).'))
@@ -0,0 +1,53 @@
+"""
+Worker que notifica por correo el resultado de los sorteos.
+
+Encola los avisos en la bandeja de salida a un ritmo limitado; el comando
+`enviar_correos` los entrega.
+
+Uso:
+    python manage.py notificar_sorteos                     # bucle continuo
+    python manage.py notificar_sorteos --por-minuto 300
+    python manage.py notificar_sorteos --once              # procesa lo pendiente y termina
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from infrastructure.correo.notificaciones_sorteo import pendientes, procesar_lote
+
+
+class Command(BaseCommand):
+    help = 'Encola por lotes, con ritmo limitado, los avisos del resultado de los sorteos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=None,
+                            help='Hogares por lote (default NOTIFICACIONES_LOTE).')
+        parser.add_argument('--por-minuto', type=int, default=None,
+                            help='Máximo de hogares por minuto, 0 = sin límite (default NOTIFICACIONES_POR_MINUTO).')
+        parser.add_argument('--intervalo', type=float, default=30.0,
+                            help='Segundos de espera cuando no hay notificaciones (default 30).')
+        parser.add_argument('--once', action='store_true', help='Procesa lo pendiente y termina.')
+
+    def handle(self, *args, **options):
+        por_minuto = options['por_minuto']
+        if por_minuto is None:
+            por_minuto = getattr(settings, 'NOTIFICACIONES_POR_MINUTO', 600)
+
+        while True:
+            for notificacion_id in pendientes():
+                total = 0
+                while True:
+                    n = procesar_lote(notificacion_id, options['lote'])
+                    if not n:
+                        break
+                    total += n
+                    if por_minuto > 0:
+                        time.sleep(n * 60 / por_minuto)
+                if total:
+                    self.stdout.write(f'Notificación #{notificacion_id}: {total} hogar(es) procesado(s).')
+            if options['once']:
+                break
+            time.sleep(options['intervalo'])
+
+        self.stdout.write(self.style.SUCCESS('Sin notificaciones pendientes.'))
@@ -0,0 +1,60 @@
+"""
+Worker local de exportaciones masivas de documentos.
+
+Uso:
+    python manage.py procesar_exportaciones                 # bucle continuo
+    python manage.py procesar_exportaciones --workers 4
+    python manage.py procesar_exportaciones --once          # procesa lo pendiente y termina
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from infrastructure.exports.exportacion_jobs import (
+    procesar_exportacion,
+    reclamar_pendientes,
+    reencolar_abandonadas,
+)
+
+
+def _ejecutar(exportacion_id):
+    # Cada hilo usa su propia conexión; se cierra al terminar el trabajo.
+    try:
+        procesar_exportacion(exportacion_id)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = 'Procesa las exportaciones masivas de documentos pendientes en un pool local de workers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Trabajos simultáneos (default 2).')
+        parser.add_argument('--intervalo', type=float, default=5.0,
+                            help='Segundos de espera cuando no hay trabajos (default 5).')
+        parser.add_argument('--reencolar-minutos', type=int, default=30,
+                            help='Reencola trabajos EN_PROCESO sin actividad en este lapso (default 30).')
+        parser.add_argument('--once', action='store_true', help='Procesa lo pendiente y termina.')
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        reencolados = reencolar_abandonadas(options['reencolar_minutos'])
+        if reencolados:
+            self.stdout.write(f'{reencolados} exportación(es) abandonada(s) reencolada(s).')
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                ids = reclamar_pendientes(workers)
+                if ids:
+                    for exportacion_id in ids:
+                        self.stdout.write(f'Procesando exportación #{exportacion_id}')
+                    # Se espera el lote completo antes de reclamar más trabajos
+                    list(pool.map(_ejecutar, ids))
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['intervalo'])
+
+        self.stdout.write(self.style.SUCCESS('Sin exportaciones pendientes.'))
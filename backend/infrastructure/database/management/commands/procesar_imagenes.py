@@ -0,0 +1,50 @@
+"""
+Worker local que genera la versión reducida y la miniatura de las fotos subidas.
+
+Uso:
+    python manage.py procesar_imagenes               # bucle continuo
+    python manage.py procesar_imagenes --workers 4
+    python manage.py procesar_imagenes --once        # procesa lo pendiente y termina
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from infrastructure.storage.imagenes import procesar_siguiente
+
+
+def _drenar(_):
+    # Cada hilo usa su propia conexión; se cierra al vaciar la cola.
+    procesadas = 0
+    try:
+        while procesar_siguiente():
+            procesadas += 1
+    finally:
+        connection.close()
+    return procesadas
+
+
+class Command(BaseCommand):
+    help = 'Genera versiones reducidas y miniaturas de las imágenes pendientes en un pool local de workers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Hilos simultáneos (default 2).')
+        parser.add_argument('--intervalo', type=float, default=5.0,
+                            help='Segundos de espera cuando no hay imágenes pendientes (default 5).')
+        parser.add_argument('--once', action='store_true', help='Procesa lo pendiente y termina.')
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                procesadas = sum(pool.map(_drenar, range(workers)))
+                if procesadas:
+                    self.stdout.write(f'{procesadas} imagen(es) procesada(s).')
+                if options['once']:
+                    break
+                time.sleep(options['intervalo'])
+
+        self.stdout.write(self.style.SUCCESS('Sin imágenes pendientes.'))
@@ -0,0 +1,62 @@
+"""
+Worker que escribe por lotes los registros del hogar de la cola de ingesta
+diferida (INGESTA_DIFERIDA).
+
+Uso:
+    python manage.py procesar_registros               # bucle continuo
+    python manage.py procesar_registros --workers 4
+    python manage.py procesar_registros --once        # procesa lo pendiente y termina
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from infrastructure.ingesta import procesar_lote
+from infrastructure.ingesta.cola import reencolar_abandonados
+
+
+def _drenar(lote):
+    # Cada hilo usa su propia conexión a la BD; se cierra al vaciar la cola.
+    procesados = 0
+    try:
+        while True:
+            n = procesar_lote(lote)
+            if not n:
+                break
+            procesados += n
+    finally:
+        connection.close()
+    return procesados
+
+
+class Command(BaseCommand):
+    help = 'Escribe por lotes los registros del hogar recibidos en modo de ingesta diferida.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Hilos simultáneos (default 2).')
+        parser.add_argument('--lote', type=int, default=None,
+                            help='Registros por transacción (default INGESTA_LOTE).')
+        parser.add_argument('--intervalo', type=float, default=1.0,
+                            help='Segundos de espera cuando la cola está vacía (default 1).')
+        parser.add_argument('--reencolar-minutos', type=int, default=10,
+                            help='Reencola registros reclamados sin terminar en este lapso (default 10).')
+        parser.add_argument('--once', action='store_true', help='Procesa lo pendiente y termina.')
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        reencolados = reencolar_abandonados(options['reencolar_minutos'])
+        if reencolados:
+            self.stdout.write(f'{reencolados} registro(s) abandonado(s) reencolado(s).')
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                procesados = sum(pool.map(_drenar, [options['lote']] * workers))
+                if procesados:
+                    self.stdout.write(f'{procesados} registro(s) procesado(s).')
+                if options['once']:
+                    break
+                time.sleep(options['intervalo'])
+
+        self.stdout.write(self.style.SUCCESS('Sin registros pendientes.'))
@@ -0,0 +1,34 @@
+"""
+Reconstruye los contadores del dashboard desde las tablas fuente y reporta
+la deriva encontrada.
+
+Uso:
+    python manage.py reconciliar_contadores                # corrige
+    python manage.py reconciliar_contadores --solo-reportar
+"""
+from django.core.management.base import BaseCommand
+
+from infrastructure.database.contadores import instalar_contadores, recalcular_contadores
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los contadores del dashboard y reporta las diferencias.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--solo-reportar', action='store_true',
+                            help='Reporta la deriva sin modificar los contadores.')
+
+    def handle(self, *args, **options):
+        aplicar = not options['solo_reportar']
+        if aplicar:
+            instalar_contadores()
+        deriva = recalcular_contadores(aplicar=aplicar)
+
+        for clave, (actual, real) in sorted(deriva.items()):
+            self.stdout.write(f'{clave}: {actual} → {real} ({real - actual:+d})')
+        if not deriva:
+            self.stdout.write(self.style.SUCCESS('Contadores sin deriva.'))
+        elif aplicar:
+            self.stdout.write(self.style.WARNING(f'{len(deriva)} contador(es) corregido(s).'))
+        else:
+            self.stdout.write(self.style.WARNING(f'{len(deriva)} contador(es) con deriva.'))
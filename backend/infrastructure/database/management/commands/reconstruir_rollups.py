@@ -0,0 +1,36 @@
+"""
+Recalcula las series diarias (rollups_diarios) desde las tablas fuente.
+
+Uso:
+    python manage.py reconstruir_rollups                         # todo el histórico
+    python manage.py reconstruir_rollups --programa 6
+    python manage.py reconstruir_rollups --desde 2026-01-01 --hasta 2026-03-31
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from infrastructure.database.rollups import METRICAS_RECONSTRUIBLES, instalar_rollups, reconstruir_rollups
+
+
+def _fecha(valor):
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise CommandError(f'Fecha inválida: {valor} (formato YYYY-MM-DD).')
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye las series diarias de registros, visitas y documentos por programa.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--programa', type=int, default=None, help='Solo este programa.')
+        parser.add_argument('--desde', type=_fecha, default=None, help='Fecha inicial (YYYY-MM-DD).')
+        parser.add_argument('--hasta', type=_fecha, default=None, help='Fecha final (YYYY-MM-DD).')
+
+    def handle(self, *args, **options):
+        instalar_rollups()
+        filas = reconstruir_rollups(options['programa'], options['desde'], options['hasta'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{filas} fila(s) reconstruida(s) ({", ".join(METRICAS_RECONSTRUIBLES)}).'
+        ))
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('database', '0042_gestionhogaretapa1_documentos_incorrectos'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='gestionhogaretapa1',
+            index=models.Index(fields=['-fecha_radicado', '-id'], name='idx_gestion_hogar_radicado'),
+        ),
+        migrations.AddIndex(
+            model_name='visita',
+            index=models.Index(fields=['postulacion', '-fecha_registro'], name='idx_visita_post_fecha'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 6.0.2 on 2026-10-18 11:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('database', '0043_registro_hogar_listado_indices'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportacionDocumentos',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('postulacion_ids', models.JSONField(default=list)),
+                ('tipos_documento', models.JSONField(default=dict)),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('EN_PROCESO', 'En proceso'), ('COMPLETADA', 'Completada'), ('FALLIDA', 'Fallida')], default='PENDIENTE', max_length=20)),
+                ('total_postulaciones', models.PositiveIntegerField(default=0)),
+                ('postulaciones_procesadas', models.PositiveIntegerField(default=0)),
+                ('nombre_archivo', models.CharField(blank=True, default='', max_length=255)),
+                ('ruta_archivo', models.CharField(blank=True, default='', max_length=500)),
+                ('tamano_bytes', models.BigIntegerField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_inicio', models.DateTimeField(blank=True, null=True)),
+                ('fecha_fin', models.DateTimeField(blank=True, null=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('usuario_solicitante', models.ForeignKey(blank=True, db_column='usuario_solicitante', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='exportaciones_documentos', to='database.usuariosistema')),
+            ],
+            options={
+                'verbose_name': 'Exportación de Documentos',
+                'verbose_name_plural': 'Exportaciones de Documentos',
+                'db_table': 'exportaciones_documentos',
+                'ordering': ['-fecha_creacion'],
+                'indexes': [models.Index(fields=['estado', 'fecha_creacion'], name='idx_export_estado')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-18 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('database', '0044_exportaciones_documentos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivoCatalogo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ruta', models.CharField(max_length=500, unique=True)),
+                ('ruta_canonica', models.CharField(blank=True, default='', max_length=500)),
+                ('existe', models.BooleanField(default=True)),
+                ('tamano_bytes', models.BigIntegerField(blank=True, null=True)),
+                ('sha256', models.CharField(blank=True, default='', max_length=64)),
+                ('mime_type', models.CharField(blank=True, default='', max_length=100)),
+                ('fecha_registro', models.DateTimeField(auto_now_add=True)),
+                ('fecha_verificacion', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Archivo catalogado',
+                'verbose_name_plural': 'Archivos catalogados',
+                'db_table': 'catalogo_archivos',
+                'indexes': [models.Index(fields=['sha256'], name='idx_catalogo_sha256')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('database', '0045_catalogo_archivos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlobContenido',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ruta', models.CharField(max_length=500, unique=True)),
+                ('sha256', models.CharField(max_length=64)),
+                ('tamano_bytes', models.BigIntegerField(default=0)),
+                ('referencias', models.PositiveIntegerField(default=0)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Blob de contenido',
+                'verbose_name_plural': 'Blobs de contenido',
+                'db_table': 'blobs_contenido',
+                'indexes': [models.Index(fields=['sha256'], name='idx_blob_sha256')],
+            },
+        ),
+    ]
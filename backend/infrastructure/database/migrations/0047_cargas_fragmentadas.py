@@ -0,0 +1,44 @@
+# Generated by Django 6.0.2 on 2026-10-18 15:05
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('database', '0046_blobs_contenido'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CargaFragmentada',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('destino', models.CharField(choices=[('HOGAR', 'Documento del hogar'), ('MIEMBRO', 'Documento de miembro del hogar'), ('VISITA', 'Documento de visita Etapa 2'), ('PROCESO', 'Documento de proceso interno')], max_length=10)),
+                ('objeto_id', models.PositiveIntegerField()),
+                ('tipo_documento', models.CharField(max_length=50)),
+                ('observaciones', models.TextField(blank=True, default='')),
+                ('metadatos', models.JSONField(blank=True, default=dict)),
+                ('nombre_archivo', models.CharField(max_length=300)),
+                ('tamano_total', models.BigIntegerField()),
+                ('tamano_fragmento', models.PositiveIntegerField()),
+                ('total_fragmentos', models.PositiveIntegerField()),
+                ('sha256', models.CharField(blank=True, default='', max_length=64)),
+                ('fragmentos_recibidos', models.JSONField(blank=True, default=list)),
+                ('estado', models.CharField(choices=[('EN_CURSO', 'En curso'), ('COMPLETADA', 'Completada'), ('CANCELADA', 'Cancelada')], default='EN_CURSO', max_length=20)),
+                ('documento_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('fecha_expiracion', models.DateTimeField()),
+                ('usuario', models.ForeignKey(blank=True, db_column='usuario_carga', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='cargas_fragmentadas', to='database.usuariosistema')),
+            ],
+            options={
+                'verbose_name': 'Carga fragmentada',
+                'verbose_name_plural': 'Cargas fragmentadas',
+                'db_table': 'cargas_fragmentadas',
+                'indexes': [models.Index(fields=['estado', 'fecha_expiracion'], name='idx_carga_estado_exp')],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 6.0.2 on 2026-10-18 15:40
+
+from django.db import migrations, models
+
+
+def encolar_imagenes_existentes(apps, schema_editor):
+    ArchivoCatalogo = apps.get_model('database', 'ArchivoCatalogo')
+    ArchivoCatalogo.objects.filter(
+        existe=True, mime_type__in=['image/jpeg', 'image/png'],
+    ).update(estado_imagen='PENDIENTE')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('database', '0047_cargas_fragmentadas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivocatalogo',
+            name='estado_imagen',
+            field=models.CharField(choices=[('NO_APLICA', 'No aplica'), ('PENDIENTE', 'Pendiente'), ('PROCESADA', 'Procesada'), ('FALLIDA', 'Fallida')], default='NO_APLICA', max_length=12),
+        ),
+        migrations.AddField(
+            model_name='archivocatalogo',
+            name='miniatura',
+            field=models.CharField(blank=True, default='', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='archivocatalogo',
+            name='version_reducida',
+            field=models.CharField(blank=True, default='', max_length=500),
+        ),
+        migrations.AddIndex(
+            model_name='archivocatalogo',
+            index=models.Index(condition=models.Q(('estado_imagen', 'PENDIENTE')), fields=['fecha_registro'], name='idx_catalogo_img_pendiente'),
+        ),
+        migrations.RunPython(
+            encolar_imagenes_existentes,
+            migrations.RunPython.noop,
+        ),
+    ]
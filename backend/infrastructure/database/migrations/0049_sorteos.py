@@ -0,0 +1,48 @@
+# Generated by Django 6.0.2 on 2026-10-18 16:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('database', '0048_catalogo_derivados_imagen'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Sorteo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('semilla', models.CharField(max_length=64)),
+                ('algoritmo', models.CharField(default='sha256(semilla:id)', max_length=50)),
+                ('cantidad_beneficiarios', models.PositiveIntegerField()),
+                ('total_elegibles', models.PositiveIntegerField()),
+                ('fecha_ejecucion', models.DateTimeField(auto_now_add=True)),
+                ('programa', models.OneToOneField(on_delete=django.db.models.deletion.PROTECT, related_name='sorteo', to='database.programa')),
+                ('usuario', models.ForeignKey(blank=True, db_column='usuario_ejecucion', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sorteos_ejecutados', to='database.usuariosistema')),
+            ],
+            options={
+                'verbose_name': 'Sorteo',
+                'verbose_name_plural': 'Sorteos',
+                'db_table': 'sorteos',
+            },
+        ),
+        migrations.CreateModel(
+            name='ResultadoSorteo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('orden', models.PositiveIntegerField()),
+                ('beneficiado', models.BooleanField()),
+                ('postulacion', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='resultado_sorteo', to='database.postulacion')),
+                ('sorteo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resultados', to='database.sorteo')),
+            ],
+            options={
+                'verbose_name': 'Resultado de sorteo',
+                'verbose_name_plural': 'Resultados de sorteo',
+                'db_table': 'sorteo_resultados',
+                'constraints': [models.UniqueConstraint(fields=('sorteo', 'orden'), name='uq_sorteo_orden')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 6.0.2 on 2026-10-18 16:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('database', '0049_sorteos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CorreoSaliente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asunto', models.CharField(max_length=255)),
+                ('mensaje', models.TextField()),
+                ('mensaje_html', models.TextField(blank=True, default='')),
+                ('remitente', models.CharField(max_length=255)),
+                ('destinatarios', models.JSONField(default=list)),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('ENVIADO', 'Enviado'), ('FALLIDO', 'Fallido')], default='PENDIENTE', max_length=20)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('ultimo_error', models.TextField(blank=True, default='')),
+                ('proximo_intento', models.DateTimeField(default=django.utils.timezone.now)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_envio', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Correo saliente',
+                'verbose_name_plural': 'Correos salientes',
+                'db_table': 'correos_salientes',
+                'ordering': ['-fecha_creacion'],
+                'indexes': [models.Index(condition=models.Q(('estado', 'PENDIENTE')), fields=['proximo_intento'], name='idx_correo_pendiente')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('database', '0050_correos_salientes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificacionSorteo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('EN_PROCESO', 'En proceso'), ('COMPLETADA', 'Completada')], default='PENDIENTE', max_length=20)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('ultimo_orden', models.PositiveIntegerField(default=0)),
+                ('encolados', models.PositiveIntegerField(default=0)),
+                ('sin_correo', models.PositiveIntegerField(default=0)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_inicio', models.DateTimeField(blank=True, null=True)),
+                ('fecha_fin', models.DateTimeField(blank=True, null=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('sorteo', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='notificacion', to='database.sorteo')),
+                ('usuario_solicitante', models.ForeignKey(blank=True, db_column='usuario_solicitante', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='notificaciones_sorteo', to='database.usuariosistema')),
+            ],
+            options={
+                'verbose_name': 'Notificación de sorteo',
+                'verbose_name_plural': 'Notificaciones de sorteo',
+                'db_table': 'notificaciones_sorteo',
+            },
+        ),
+    ]
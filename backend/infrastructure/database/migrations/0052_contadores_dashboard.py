@@ -0,0 +1,42 @@
+# Generated by Django 6.0.2 on 2026-10-18 17:30
+
+from django.db import migrations, models
+
+
+def instalar_y_contar(apps, schema_editor):
+    from infrastructure.database.contadores import instalar_contadores, recalcular_contadores
+
+    instalar_contadores(schema_editor.connection.alias)
+    recalcular_contadores(using=schema_editor.connection.alias)
+
+
+def desinstalar(apps, schema_editor):
+    from infrastructure.database.contadores import eliminar_contadores
+
+    eliminar_contadores(schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('database', '0051_notificaciones_sorteo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorDashboard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(max_length=150)),
+                ('slot', models.PositiveSmallIntegerField(default=0)),
+                ('valor', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Contador del dashboard',
+                'verbose_name_plural': 'Contadores del dashboard',
+                'db_table': 'contadores_dashboard',
+                'constraints': [models.UniqueConstraint(fields=('clave', 'slot'), name='uq_contador_clave_slot')],
+            },
+        ),
+        migrations.RunPython(instalar_y_contar, desinstalar),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def instalar_y_reconstruir(apps, schema_editor):
+    from infrastructure.database.rollups import instalar_rollups, reconstruir_rollups
+
+    instalar_rollups(schema_editor.connection.alias)
+    reconstruir_rollups(using=schema_editor.connection.alias)
+
+
+def desinstalar(apps, schema_editor):
+    from infrastructure.database.rollups import eliminar_rollups
+
+    eliminar_rollups(schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('database', '0052_contadores_dashboard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('metrica', models.CharField(max_length=30)),
+                ('estado', models.CharField(blank=True, default='', max_length=50)),
+                ('slot', models.PositiveSmallIntegerField(default=0)),
+                ('cantidad', models.BigIntegerField(default=0)),
+                ('programa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups_diarios', to='database.programa')),
+            ],
+            options={
+                'verbose_name': 'Rollup diario',
+                'verbose_name_plural': 'Rollups diarios',
+                'db_table': 'rollups_diarios',
+                'constraints': [models.UniqueConstraint(fields=('programa', 'fecha', 'metrica', 'estado', 'slot'), name='uq_rollup_diario')],
+            },
+        ),
+        migrations.RunPython(instalar_y_reconstruir, desinstalar),
+    ]
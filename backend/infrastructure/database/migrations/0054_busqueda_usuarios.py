@@ -0,0 +1,30 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:20
+
+from django.db import migrations, models
+
+
+def instalar_indices(apps, schema_editor):
+    from infrastructure.database.busqueda_usuarios import instalar_indices_busqueda
+
+    instalar_indices_busqueda(schema_editor.connection.alias)
+
+
+def eliminar_indices(apps, schema_editor):
+    from infrastructure.database.busqueda_usuarios import eliminar_indices_busqueda
+
+    eliminar_indices_busqueda(schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('database', '0053_rollups_diarios'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usuariosistema',
+            index=models.Index(fields=['-fecha_creacion', '-id_usuario'], name='idx_usuarios_fecha_id'),
+        ),
+        migrations.RunPython(instalar_indices, eliminar_indices),
+    ]
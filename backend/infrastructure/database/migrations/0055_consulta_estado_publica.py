@@ -0,0 +1,49 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:30
+
+from django.db import migrations, models
+
+
+def instalar_y_reconstruir(apps, schema_editor):
+    from infrastructure.database.consulta_estado import instalar_consulta_estado, reconstruir_consulta_estado
+
+    instalar_consulta_estado(schema_editor.connection.alias)
+    reconstruir_consulta_estado()
+
+
+def desinstalar(apps, schema_editor):
+    from infrastructure.database.consulta_estado import eliminar_consulta_estado
+
+    eliminar_consulta_estado(schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('database', '0054_busqueda_usuarios'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsultaEstadoPublica',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('miembro_id', models.BigIntegerField(unique=True)),
+                ('gestion_id', models.BigIntegerField(db_index=True)),
+                ('postulacion_id', models.BigIntegerField(db_index=True)),
+                ('programa_id', models.BigIntegerField(db_index=True, null=True)),
+                ('numero_documento', models.CharField(db_index=True, max_length=30)),
+                ('numero_radicado', models.CharField(max_length=40)),
+                ('nombre_postulante', models.CharField(max_length=201)),
+                ('programa_nombre', models.CharField(blank=True, default='', max_length=255)),
+                ('programa_estado', models.CharField(blank=True, default='', max_length=20)),
+                ('estado', models.CharField(max_length=25)),
+                ('fecha_postulacion', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Consulta pública de estado',
+                'verbose_name_plural': 'Consultas públicas de estado',
+                'db_table': 'consulta_estado_publica',
+            },
+        ),
+        migrations.RunPython(instalar_y_reconstruir, desinstalar),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:40
+
+from django.db import migrations
+
+
+def crear_secuencia(apps, schema_editor):
+    from infrastructure.database.registro_hogar import SECUENCIA_RADICADO, instalar_secuencia_radicado
+
+    instalar_secuencia_radicado(schema_editor.connection.alias)
+    # Los radicados anteriores usaban el id de la postulación: se continúa desde ahí
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT setval(%s, GREATEST((SELECT max(id) FROM postulaciones), 0) + 1, false)",
+            [SECUENCIA_RADICADO],
+        )
+
+
+def eliminar_secuencia(apps, schema_editor):
+    from infrastructure.database.registro_hogar import SECUENCIA_RADICADO
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'DROP SEQUENCE IF EXISTS {SECUENCIA_RADICADO}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('database', '0055_consulta_estado_publica'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_secuencia, eliminar_secuencia),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:50
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('database', '0056_secuencia_radicado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroEncolado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ticket', models.CharField(max_length=40, unique=True)),
+                ('etapa_id', models.BigIntegerField(null=True)),
+                ('estado', models.CharField(choices=[('REGISTRADO', 'Registrado'), ('RECHAZADO', 'Rechazado'), ('FALLIDO', 'Fallido')], max_length=20)),
+                ('respuesta', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('fecha_recepcion', models.DateTimeField()),
+                ('fecha_proceso', models.DateTimeField(auto_now_add=True)),
+                ('postulacion', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='registros_encolados', to='database.postulacion')),
+            ],
+            options={
+                'verbose_name': 'Registro encolado',
+                'verbose_name_plural': 'Registros encolados',
+                'db_table': 'registros_encolados',
+                'ordering': ['-fecha_recepcion'],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.2 on 2026-10-18 19:00
+
+import django.core.serializers.json
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('database', '0057_registros_encolados'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RespuestaIdempotente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(max_length=255, unique=True)),
+                ('huella', models.CharField(max_length=64)),
+                ('estado_http', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('cuerpo', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('cabeceras', models.JSONField(default=dict)),
+                ('fecha_creacion', models.DateTimeField(default=django.utils.timezone.now)),
+                ('fecha_expiracion', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Respuesta idempotente',
+                'verbose_name_plural': 'Respuestas idempotentes',
+                'db_table': 'respuestas_idempotentes',
+            },
+        ),
+    ]
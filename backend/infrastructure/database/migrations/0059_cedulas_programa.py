@@ -0,0 +1,43 @@
+# Generated by Django 6.0.2 on 2026-10-18 19:10
+
+from django.db import migrations, models
+
+
+def instalar_y_reconstruir(apps, schema_editor):
+    from infrastructure.database.cedulas_programa import instalar_cedulas_programa, reconstruir_cedulas_programa
+
+    instalar_cedulas_programa(schema_editor.connection.alias)
+    reconstruir_cedulas_programa()
+
+
+def desinstalar(apps, schema_editor):
+    from infrastructure.database.cedulas_programa import eliminar_cedulas_programa
+
+    eliminar_cedulas_programa(schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('database', '0058_respuestas_idempotentes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CedulaPrograma',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('programa_id', models.BigIntegerField()),
+                ('tipo_documento', models.CharField(max_length=30)),
+                ('numero_documento', models.CharField(max_length=30)),
+                ('miembro_id', models.BigIntegerField(unique=True)),
+            ],
+            options={
+                'verbose_name': 'Cédula por programa',
+                'verbose_name_plural': 'Cédulas por programa',
+                'db_table': 'cedulas_programa',
+                'constraints': [models.UniqueConstraint(fields=('programa_id', 'tipo_documento', 'numero_documento'), name='uq_cedula_programa')],
+            },
+        ),
+        migrations.RunPython(instalar_y_reconstruir, desinstalar),
+    ]
@@ -3,7 +3,9 @@ Modelos de base de datos para la capa de infraestructura.
 
 Estos modelos Django mapean directamente a las entidades de dominio.
 """
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
 import uuid
 
 
@@ -309,6 +311,10 @@ class GestionHogarEtapa1(models.Model):
         ordering = ['-fecha_radicado']
         verbose_name = 'Gestión Hogar Etapa 1'
         verbose_name_plural = 'Gestiones Hogar Etapa 1'
+        indexes = [
+            # Orden del listado y paginación por cursor (fecha_radicado, id)
+            models.Index(fields=['-fecha_radicado', '-id'], name='idx_gestion_hogar_radicado'),
+        ]
 
     def __str__(self):
         return f'Postulación {self.numero_radicado} – {self.ciudadano}'
@@ -873,6 +879,7 @@ class Visita(models.Model):
         verbose_name_plural = 'Visitas'
         indexes = [
             models.Index(fields=['postulacion'], name='idx_visita_postulacion'),
+            models.Index(fields=['postulacion', '-fecha_registro'], name='idx_visita_post_fecha'),
         ]
 
     def __str__(self):
@@ -1161,3 +1168,605 @@ class DocumentoProcesoInterno(models.Model):
         if self.archivo:
             self.ruta_archivo = self.archivo.name
         super().save(*args, **kwargs)
+
+
+# ─────────────────────────────────────────────────────────────────────────── #
+# Exportaciones – descargas masivas procesadas en segundo plano               #
+# ─────────────────────────────────────────────────────────────────────────── #
+
+class ExportacionDocumentos(models.Model):
+    """
+    Trabajo de descarga masiva de documentos (ZIP) procesado por el comando
+    `procesar_exportaciones`. El archivo terminado queda en disco para
+    descargarlo (y reanudarlo) después.
+    """
+
+    ESTADOS = [
+        ('PENDIENTE',  'Pendiente'),
+        ('EN_PROCESO', 'En proceso'),
+        ('COMPLETADA', 'Completada'),
+        ('FALLIDA',    'Fallida'),
+    ]
+
+    usuario_solicitante = models.ForeignKey(
+        'database.UsuarioSistema',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='exportaciones_documentos',
+        db_column='usuario_solicitante',
+    )
+    postulacion_ids = models.JSONField(default=list)
+    tipos_documento = models.JSONField(default=dict)
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='PENDIENTE')
+
+    # Progreso
+    total_postulaciones      = models.PositiveIntegerField(default=0)
+    postulaciones_procesadas = models.PositiveIntegerField(default=0)
+
+    # Resultado
+    nombre_archivo = models.CharField(max_length=255, blank=True, default='')
+    ruta_archivo   = models.CharField(max_length=500, blank=True, default='')
+    tamano_bytes   = models.BigIntegerField(null=True, blank=True)
+    error          = models.TextField(blank=True, default='')
+
+    fecha_creacion      = models.DateTimeField(auto_now_add=True)
+    fecha_inicio        = models.DateTimeField(null=True, blank=True)
+    fecha_fin           = models.DateTimeField(null=True, blank=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'exportaciones_documentos'
+        ordering = ['-fecha_creacion']
+        verbose_name = 'Exportación de Documentos'
+        verbose_name_plural = 'Exportaciones de Documentos'
+        indexes = [
+            models.Index(fields=['estado', 'fecha_creacion'], name='idx_export_estado'),
+        ]
+
+    def __str__(self):
+        return f'Exportación #{self.pk} ({self.estado})'
+
+    @property
+    def progreso(self) -> int:
+        """Porcentaje de postulaciones procesadas (0-100)."""
+        if not self.total_postulaciones:
+            return 100 if self.estado == 'COMPLETADA' else 0
+        return int(self.postulaciones_procesadas * 100 / self.total_postulaciones)
+
+
+# ─────────────────────────────────────────────────────────────────────────── #
+# Catálogo de archivos – metadatos de los documentos almacenados              #
+# ─────────────────────────────────────────────────────────────────────────── #
+
+class ArchivoCatalogo(models.Model):
+    """
+    Metadatos de un archivo del storage, indexados por el nombre guardado en
+    el FileField. Permite resolver URLs y entradas de ZIP sin consultar el
+    storage en cada petición.
+    """
+
+    ESTADOS_IMAGEN = [
+        ('NO_APLICA', 'No aplica'),
+        ('PENDIENTE', 'Pendiente'),
+        ('PROCESADA', 'Procesada'),
+        ('FALLIDA',   'Fallida'),
+    ]
+
+    ruta           = models.CharField(max_length=500, unique=True)
+    ruta_canonica  = models.CharField(max_length=500, blank=True, default='')
+    existe         = models.BooleanField(default=True)
+    tamano_bytes   = models.BigIntegerField(null=True, blank=True)
+    sha256         = models.CharField(max_length=64, blank=True, default='')
+    mime_type      = models.CharField(max_length=100, blank=True, default='')
+    fecha_registro     = models.DateTimeField(auto_now_add=True)
+    fecha_verificacion = models.DateTimeField(null=True, blank=True)
+
+    # Derivados de imágenes (JPEG/PNG), generados por `procesar_imagenes`
+    estado_imagen    = models.CharField(max_length=12, choices=ESTADOS_IMAGEN, default='NO_APLICA')
+    version_reducida = models.CharField(max_length=500, blank=True, default='')
+    miniatura        = models.CharField(max_length=500, blank=True, default='')
+
+    class Meta:
+        db_table = 'catalogo_archivos'
+        verbose_name = 'Archivo catalogado'
+        verbose_name_plural = 'Archivos catalogados'
+        indexes = [
+            models.Index(fields=['sha256'], name='idx_catalogo_sha256'),
+            models.Index(
+                fields=['fecha_registro'],
+                condition=models.Q(estado_imagen='PENDIENTE'),
+                name='idx_catalogo_img_pendiente',
+            ),
+        ]
+
+    def __str__(self):
+        return self.ruta
+
+
+class BlobContenido(models.Model):
+    """
+    Archivo guardado por su contenido (SHA-256) en el storage deduplicado.
+    `referencias` cuenta cuántas subidas apuntan al mismo archivo; al llegar
+    a cero el archivo se elimina del disco.
+    """
+
+    ruta         = models.CharField(max_length=500, unique=True)
+    sha256       = models.CharField(max_length=64)
+    tamano_bytes = models.BigIntegerField(default=0)
+    referencias  = models.PositiveIntegerField(default=0)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'blobs_contenido'
+        verbose_name = 'Blob de contenido'
+        verbose_name_plural = 'Blobs de contenido'
+        indexes = [
+            models.Index(fields=['sha256'], name='idx_blob_sha256'),
+        ]
+
+    def __str__(self):
+        return f'{self.ruta} ({self.referencias} ref.)'
+
+
+# ─────────────────────────────────────────────────────────────────────────── #
+# Cargas fragmentadas – subida reanudable de documentos grandes               #
+# ─────────────────────────────────────────────────────────────────────────── #
+
+class CargaFragmentada(models.Model):
+    """
+    Subida de un documento en fragmentos. Los fragmentos se guardan en disco
+    (CARGAS_FRAGMENTADAS_ROOT) a medida que llegan; al completarse se ensamblan
+    y el archivo se adjunta al modelo de documento que indica `destino`.
+
+    `objeto_id` según el destino:
+      HOGAR   → Postulacion (documentos del registro del hogar)
+      MIEMBRO → MiembroHogar
+      VISITA  → Visita (Etapa 2)
+      PROCESO → Postulacion (proceso interno, Etapa 3)
+    """
+
+    DESTINOS = [
+        ('HOGAR',   'Documento del hogar'),
+        ('MIEMBRO', 'Documento de miembro del hogar'),
+        ('VISITA',  'Documento de visita Etapa 2'),
+        ('PROCESO', 'Documento de proceso interno'),
+    ]
+
+    ESTADOS = [
+        ('EN_CURSO',   'En curso'),
+        ('COMPLETADA', 'Completada'),
+        ('CANCELADA',  'Cancelada'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    usuario = models.ForeignKey(
+        'database.UsuarioSistema',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='cargas_fragmentadas',
+        db_column='usuario_carga',
+    )
+    destino        = models.CharField(max_length=10, choices=DESTINOS)
+    objeto_id      = models.PositiveIntegerField()
+    tipo_documento = models.CharField(max_length=50)
+    observaciones  = models.TextField(blank=True, default='')
+    # Campos adicionales del documento destino (p. ej. radicados Orfeo)
+    metadatos      = models.JSONField(default=dict, blank=True)
+
+    nombre_archivo   = models.CharField(max_length=300)
+    tamano_total     = models.BigIntegerField()
+    tamano_fragmento = models.PositiveIntegerField()
+    total_fragmentos = models.PositiveIntegerField()
+    sha256           = models.CharField(max_length=64, blank=True, default='')
+    fragmentos_recibidos = models.JSONField(default=list, blank=True)
+
+    estado       = models.CharField(max_length=20, choices=ESTADOS, default='EN_CURSO')
+    documento_id = models.PositiveIntegerField(null=True, blank=True)
+
+    fecha_creacion      = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    fecha_expiracion    = models.DateTimeField()
+
+    class Meta:
+        db_table = 'cargas_fragmentadas'
+        verbose_name = 'Carga fragmentada'
+        verbose_name_plural = 'Cargas fragmentadas'
+        indexes = [
+            models.Index(fields=['estado', 'fecha_expiracion'], name='idx_carga_estado_exp'),
+        ]
+
+    def __str__(self):
+        return f'Carga {self.pk} ({self.estado})'
+
+    @property
+    def fragmentos_faltantes(self) -> list[int]:
+        recibidos = set(self.fragmentos_recibidos)
+        return [i for i in range(self.total_fragmentos) if i not in recibidos]
+
+    def tamano_esperado(self, indice: int) -> int:
+        """Tamaño que debe tener el fragmento `indice` (el último puede ser menor)."""
+        if indice < self.total_fragmentos - 1:
+            return self.tamano_fragmento
+        return self.tamano_total - self.tamano_fragmento * (self.total_fragmentos - 1)
+
+
+# ─────────────────────────────────────────────────────────────────────────── #
+# Sorteo de beneficiarios                                                     #
+# ─────────────────────────────────────────────────────────────────────────── #
+
+class Sorteo(models.Model):
+    """
+    Sorteo de beneficiarios de un programa (uno por programa).
+
+    El orden del sorteo se obtiene ordenando las postulaciones elegibles por
+    sha256(semilla || ':' || id); con la semilla registrada cualquiera puede
+    reproducirlo y auditarlo.
+    """
+
+    ALGORITMO = 'sha256(semilla:id)'
+
+    programa = models.OneToOneField(
+        Programa,
+        on_delete=models.PROTECT,
+        related_name='sorteo',
+    )
+    semilla                = models.CharField(max_length=64)
+    algoritmo              = models.CharField(max_length=50, default=ALGORITMO)
+    cantidad_beneficiarios = models.PositiveIntegerField()
+    total_elegibles        = models.PositiveIntegerField()
+    usuario = models.ForeignKey(
+        'database.UsuarioSistema',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='sorteos_ejecutados',
+        db_column='usuario_ejecucion',
+    )
+    fecha_ejecucion = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'sorteos'
+        verbose_name = 'Sorteo'
+        verbose_name_plural = 'Sorteos'
+
+    def __str__(self):
+        return f'Sorteo programa #{self.programa_id} ({self.cantidad_beneficiarios}/{self.total_elegibles})'
+
+
+class ResultadoSorteo(models.Model):
+    """Posición de una postulación en el orden del sorteo."""
+
+    sorteo = models.ForeignKey(
+        Sorteo,
+        on_delete=models.CASCADE,
+        related_name='resultados',
+    )
+    postulacion = models.OneToOneField(
+        Postulacion,
+        on_delete=models.CASCADE,
+        related_name='resultado_sorteo',
+    )
+    orden       = models.PositiveIntegerField()
+    beneficiado = models.BooleanField()
+
+    class Meta:
+        db_table = 'sorteo_resultados'
+        verbose_name = 'Resultado de sorteo'
+        verbose_name_plural = 'Resultados de sorteo'
+        constraints = [
+            models.UniqueConstraint(fields=['sorteo', 'orden'], name='uq_sorteo_orden'),
+        ]
+
+    def __str__(self):
+        return f'{self.orden}. Postulación #{self.postulacion_id}'
+
+
+class NotificacionSorteo(models.Model):
+    """
+    Envío masivo del resultado del sorteo a los hogares. El comando
+    `notificar_sorteos` lo procesa por lotes en el orden del sorteo;
+    `ultimo_orden` es el punto de control: cada lote encola sus correos y
+    avanza el punto de control en la misma transacción.
+    """
+
+    ESTADOS = [
+        ('PENDIENTE',  'Pendiente'),
+        ('EN_PROCESO', 'En proceso'),
+        ('COMPLETADA', 'Completada'),
+    ]
+
+    sorteo = models.OneToOneField(
+        Sorteo,
+        on_delete=models.CASCADE,
+        related_name='notificacion',
+    )
+    usuario_solicitante = models.ForeignKey(
+        'database.UsuarioSistema',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='notificaciones_sorteo',
+        db_column='usuario_solicitante',
+    )
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='PENDIENTE')
+
+    # Progreso
+    total        = models.PositiveIntegerField(default=0)
+    ultimo_orden = models.PositiveIntegerField(default=0)
+    encolados    = models.PositiveIntegerField(default=0)
+    sin_correo   = models.PositiveIntegerField(default=0)
+
+    fecha_creacion      = models.DateTimeField(auto_now_add=True)
+    fecha_inicio        = models.DateTimeField(null=True, blank=True)
+    fecha_fin           = models.DateTimeField(null=True, blank=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'notificaciones_sorteo'
+        verbose_name = 'Notificación de sorteo'
+        verbose_name_plural = 'Notificaciones de sorteo'
+
+    def __str__(self):
+        return f'Notificación sorteo #{self.sorteo_id} ({self.estado})'
+
+    @property
+    def progreso(self) -> int:
+        """Porcentaje de hogares procesados (0-100)."""
+        if not self.total:
+            return 100 if self.estado == 'COMPLETADA' else 0
+        return int((self.encolados + self.sin_correo) * 100 / self.total)
+
+
+# ─────────────────────────────────────────────────────────────────────────── #
+# Bandeja de salida de correos                                                #
+# ─────────────────────────────────────────────────────────────────────────── #
+
+class CorreoSaliente(models.Model):
+    """
+    Correo pendiente de envío. Las vistas solo lo registran; el comando
+    `enviar_correos` los entrega por lotes sobre una sola conexión SMTP y
+    reintenta los fallidos con espera exponencial.
+    """
+
+    ESTADOS = [
+        ('PENDIENTE', 'Pendiente'),
+        ('ENVIADO',   'Enviado'),
+        ('FALLIDO',   'Fallido'),
+    ]
+
+    asunto        = models.CharField(max_length=255)
+    mensaje       = models.TextField()
+    mensaje_html  = models.TextField(blank=True, default='')
+    remitente     = models.CharField(max_length=255)
+    destinatarios = models.JSONField(default=list)
+    estado        = models.CharField(max_length=20, choices=ESTADOS, default='PENDIENTE')
+
+    intentos        = models.PositiveSmallIntegerField(default=0)
+    ultimo_error    = models.TextField(blank=True, default='')
+    proximo_intento = models.DateTimeField(default=timezone.now)
+
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_envio    = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'correos_salientes'
+        ordering = ['-fecha_creacion']
+        verbose_name = 'Correo saliente'
+        verbose_name_plural = 'Correos salientes'
+        indexes = [
+            models.Index(
+                fields=['proximo_intento'],
+                name='idx_correo_pendiente',
+                condition=models.Q(estado='PENDIENTE'),
+            ),
+        ]
+
+    def __str__(self):
+        return f'Correo #{self.pk} a {", ".join(self.destinatarios)} ({self.estado})'
+
+
+# ─────────────────────────────────────────────────────────────────────────── #
+# Contadores del dashboard                                                    #
+# ─────────────────────────────────────────────────────────────────────────── #
+
+class ContadorDashboard(models.Model):
+    """
+    Contador del dashboard (p. ej. 'postulaciones.estado.APROBADA').
+
+    Lo mantienen triggers de la base de datos (ver
+    infrastructure/database/contadores.py); el valor de una clave es la suma
+    de sus slots.
+    """
+
+    clave = models.CharField(max_length=150)
+    slot  = models.PositiveSmallIntegerField(default=0)
+    valor = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'contadores_dashboard'
+        verbose_name = 'Contador del dashboard'
+        verbose_name_plural = 'Contadores del dashboard'
+        constraints = [
+            models.UniqueConstraint(fields=['clave', 'slot'], name='uq_contador_clave_slot'),
+        ]
+
+    def __str__(self):
+        return f'{self.clave}[{self.slot}] = {self.valor}'
+
+
+class RollupDiario(models.Model):
+    """
+    Eventos de un día para un programa (registros, visitas, documentos,
+    cambios de estado). Lo mantienen triggers de la base de datos (ver
+    infrastructure/database/rollups.py); el valor es la suma de los slots.
+    """
+
+    programa = models.ForeignKey(
+        Programa,
+        on_delete=models.CASCADE,
+        related_name='rollups_diarios',
+    )
+    fecha    = models.DateField()
+    metrica  = models.CharField(max_length=30)
+    estado   = models.CharField(max_length=50, blank=True, default='')
+    slot     = models.PositiveSmallIntegerField(default=0)
+    cantidad = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'rollups_diarios'
+        verbose_name = 'Rollup diario'
+        verbose_name_plural = 'Rollups diarios'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['programa', 'fecha', 'metrica', 'estado', 'slot'],
+                name='uq_rollup_diario',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.fecha} programa #{self.programa_id} {self.metrica}/{self.estado}: {self.cantidad}'
+
+
+# ─────────────────────────────────────────────────────────────────────────── #
+# Consulta pública de estado                                                  #
+# ─────────────────────────────────────────────────────────────────────────── #
+
+class ConsultaEstadoPublica(models.Model):
+    """
+    Proyección para la consulta pública de estado: una fila por cabeza de
+    hogar con postulación, con los datos que muestra la página pública.
+
+    La mantienen triggers de la base de datos (ver
+    infrastructure/database/consulta_estado.py); no se escribe desde Django.
+    """
+
+    miembro_id        = models.BigIntegerField(unique=True)
+    gestion_id        = models.BigIntegerField(db_index=True)
+    postulacion_id    = models.BigIntegerField(db_index=True)
+    programa_id       = models.BigIntegerField(null=True, db_index=True)
+    numero_documento  = models.CharField(max_length=30, db_index=True)
+    numero_radicado   = models.CharField(max_length=40)
+    nombre_postulante = models.CharField(max_length=201)
+    programa_nombre   = models.CharField(max_length=255, blank=True, default='')
+    programa_estado   = models.CharField(max_length=20, blank=True, default='')
+    estado            = models.CharField(max_length=25)
+    fecha_postulacion = models.DateTimeField()
+
+    class Meta:
+        db_table = 'consulta_estado_publica'
+        verbose_name = 'Consulta pública de estado'
+        verbose_name_plural = 'Consultas públicas de estado'
+
+    def __str__(self):
+        return f'{self.numero_documento} – {self.numero_radicado} ({self.estado})'
+
+
+# ─────────────────────────────────────────────────────────────────────────── #
+# Ingesta diferida del registro del hogar                                     #
+# ─────────────────────────────────────────────────────────────────────────── #
+
+class RegistroEncolado(models.Model):
+    """
+    Resultado de un registro del hogar recibido en modo de ingesta diferida
+    (INGESTA_DIFERIDA). El envío se guarda en la cola local con un radicado
+    provisional (`ticket`) y el comando `procesar_registros` lo escribe por
+    lotes; esta fila se crea en la misma transacción que el hogar, así que
+    un envío nunca se registra dos veces aunque el worker se interrumpa.
+    """
+
+    ESTADOS = [
+        ('REGISTRADO', 'Registrado'),
+        ('RECHAZADO',  'Rechazado'),
+        ('FALLIDO',    'Fallido'),
+    ]
+
+    ticket      = models.CharField(max_length=40, unique=True)
+    etapa_id    = models.BigIntegerField(null=True)
+    estado      = models.CharField(max_length=20, choices=ESTADOS)
+    postulacion = models.ForeignKey(
+        'database.Postulacion',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='registros_encolados',
+    )
+    # Cuerpo que habría devuelto el registro síncrono (o {'detail': ...})
+    respuesta = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+
+    fecha_recepcion = models.DateTimeField()
+    fecha_proceso   = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'registros_encolados'
+        ordering = ['-fecha_recepcion']
+        verbose_name = 'Registro encolado'
+        verbose_name_plural = 'Registros encolados'
+
+    def __str__(self):
+        return f'{self.ticket} ({self.estado})'
+
+
+# ─────────────────────────────────────────────────────────────────────────── #
+# Idempotencia de los envíos públicos                                         #
+# ─────────────────────────────────────────────────────────────────────────── #
+
+class RespuestaIdempotente(models.Model):
+    """
+    Primera respuesta de un envío público con encabezado Idempotency-Key.
+    Los reintentos con la misma clave reciben esta respuesta sin volver a
+    validar ni escribir. Mientras la petición original está en curso
+    `estado_http` es nulo.
+    """
+
+    clave       = models.CharField(max_length=255, unique=True)
+    huella      = models.CharField(max_length=64)
+    estado_http = models.PositiveSmallIntegerField(null=True, blank=True)
+    cuerpo      = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    cabeceras   = models.JSONField(default=dict)
+
+    fecha_creacion   = models.DateTimeField(default=timezone.now)
+    fecha_expiracion = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = 'respuestas_idempotentes'
+        verbose_name = 'Respuesta idempotente'
+        verbose_name_plural = 'Respuestas idempotentes'
+
+    def __str__(self):
+        return f'{self.clave} ({self.estado_http or "en curso"})'
+
+
+# ─────────────────────────────────────────────────────────────────────────── #
+# Registro de cédulas por programa                                            #
+# ─────────────────────────────────────────────────────────────────────────── #
+
+class CedulaPrograma(models.Model):
+    """
+    Documento de cada miembro de hogar en el programa de su postulación.
+    La restricción única impide registrar la misma cédula dos veces en un
+    programa, también entre envíos simultáneos.
+
+    La mantiene un trigger sobre miembros_hogar (ver
+    infrastructure/database/cedulas_programa.py); no se escribe desde Django.
+    """
+
+    programa_id      = models.BigIntegerField()
+    tipo_documento   = models.CharField(max_length=30)
+    numero_documento = models.CharField(max_length=30)
+    miembro_id       = models.BigIntegerField(unique=True)
+
+    class Meta:
+        db_table = 'cedulas_programa'
+        verbose_name = 'Cédula por programa'
+        verbose_name_plural = 'Cédulas por programa'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['programa_id', 'tipo_documento', 'numero_documento'],
+                name='uq_cedula_programa',
+            ),
+        ]
+
+    def __str__(self):
+        return f'Programa #{self.programa_id}: {self.tipo_documento} {self.numero_documento}'
@@ -0,0 +1,141 @@
+"""
+Carga en bloque de los documentos de varias postulaciones.
+
+Un "paquete" reúne, para una postulación, su registro del hogar (con el
+ciudadano), los documentos del hogar, los miembros con sus documentos, los
+documentos de visita (Etapa 2) y los de proceso interno (Etapa 3).
+
+Todos los paquetes se resuelven con un número fijo de consultas sin importar
+cuántas postulaciones, miembros o visitas haya: una por tabla.
+
+Uso:
+    paquetes = cargar_paquetes_documentos(postulacion_ids=[1, 2, 3])
+    por_postulacion = {p.postulacion_id: p for p in paquetes}
+"""
+from dataclasses import dataclass, field
+
+from django.db.models import Prefetch
+
+from infrastructure.database.models import (
+    DocumentoGestionHogar,
+    DocumentoMiembroHogar,
+    DocumentoProcesoInterno,
+    DocumentoVisitaEtapa2,
+    GestionHogarEtapa1,
+    MiembroHogar,
+)
+
+
+CATEGORIAS = ('hogar', 'miembro', 'visita', 'proceso')
+
+
+@dataclass
+class PaqueteDocumentos:
+    """
+    Documentos de una postulación.
+
+    Cada miembro trae sus documentos en `miembro.documentos_activos`.
+    """
+    postulacion_id: int | None
+    gestion: GestionHogarEtapa1 | None = None
+    documentos_hogar: list = field(default_factory=list)
+    miembros: list = field(default_factory=list)
+    documentos_visita: list = field(default_factory=list)
+    documentos_proceso: list = field(default_factory=list)
+
+
+def _filtro_tipos(qs, tipos, categoria):
+    """Aplica el filtro de tipos de la categoría (None = todos los tipos)."""
+    seleccion = tipos.get(categoria)
+    if seleccion is None:
+        return qs
+    return qs.filter(tipo_documento__in=seleccion)
+
+
+def cargar_paquetes_documentos(*, postulacion_ids=None, gestion_ids=None, tipos=None) -> list[PaqueteDocumentos]:
+    """
+    Carga los paquetes de documentos activos de las postulaciones indicadas
+    (por ID de Postulacion o de GestionHogarEtapa1).
+
+    tipos: {'hogar': [...], 'miembro': [...], 'visita': [...], 'proceso': [...]}
+        Una categoría ausente o con lista vacía no se consulta; con valor None
+        se incluyen todos sus tipos. Sin `tipos` se cargan todas las categorías.
+
+    Consultas: 1 (registros del hogar) + 1 por categoría incluida
+    (+1 para los miembros si se piden sus documentos).
+    """
+    if tipos is None:
+        tipos = {c: None for c in CATEGORIAS}
+    incluidas = {c for c in CATEGORIAS if c in tipos and tipos[c] != []}
+
+    gestiones_qs = GestionHogarEtapa1.objects.select_related(
+        'ciudadano', 'postulacion__programa', 'etapa__programa',
+    )
+    if postulacion_ids is not None:
+        gestiones_qs = gestiones_qs.filter(postulacion_id__in=postulacion_ids)
+    else:
+        gestiones_qs = gestiones_qs.filter(id__in=gestion_ids)
+
+    prefetches = []
+    if 'hogar' in incluidas:
+        prefetches.append(Prefetch(
+            'documentos',
+            queryset=_filtro_tipos(
+                DocumentoGestionHogar.objects.filter(activo_logico=True), tipos, 'hogar',
+            ).order_by('-fecha_carga', '-id'),
+            to_attr='documentos_activos',
+        ))
+    if 'miembro' in incluidas:
+        prefetches.append(Prefetch(
+            'miembros',
+            queryset=MiembroHogar.objects.order_by('id').prefetch_related(Prefetch(
+                'documentos',
+                queryset=_filtro_tipos(
+                    DocumentoMiembroHogar.objects.filter(activo_logico=True), tipos, 'miembro',
+                ).order_by('-fecha_carga', '-id'),
+                to_attr='documentos_activos',
+            )),
+            to_attr='miembros_cargados',
+        ))
+    gestiones = list(gestiones_qs.prefetch_related(*prefetches))
+
+    paquetes: dict = {}
+    for g in gestiones:
+        clave = g.postulacion_id if g.postulacion_id else f'gestion-{g.id}'
+        paquetes[clave] = PaqueteDocumentos(
+            postulacion_id=g.postulacion_id,
+            gestion=g,
+            documentos_hogar=getattr(g, 'documentos_activos', []),
+            miembros=getattr(g, 'miembros_cargados', []),
+        )
+
+    if postulacion_ids is not None:
+        ids_postulacion = list(postulacion_ids)
+        for pid in ids_postulacion:
+            paquetes.setdefault(pid, PaqueteDocumentos(postulacion_id=pid))
+    else:
+        ids_postulacion = [g.postulacion_id for g in gestiones if g.postulacion_id]
+
+    if 'visita' in incluidas and ids_postulacion:
+        docs_visita = _filtro_tipos(
+            DocumentoVisitaEtapa2.objects.filter(
+                visita__postulacion_id__in=ids_postulacion,
+                visita__activo_logico=True,
+                activo_logico=True,
+            ),
+            tipos, 'visita',
+        ).select_related('visita').order_by('visita_id', 'id')
+        for doc in docs_visita:
+            paquetes[doc.visita.postulacion_id].documentos_visita.append(doc)
+
+    if 'proceso' in incluidas and ids_postulacion:
+        docs_proceso = _filtro_tipos(
+            DocumentoProcesoInterno.objects.filter(
+                postulacion_id__in=ids_postulacion, activo_logico=True,
+            ),
+            tipos, 'proceso',
+        ).order_by('id')
+        for doc in docs_proceso:
+            paquetes[doc.postulacion_id].documentos_proceso.append(doc)
+
+    return list(paquetes.values())
@@ -0,0 +1,182 @@
+"""
+Escritura de un hogar registrado desde el formulario público.
+
+Cada hogar se escribe con un número fijo de sentencias, sin importar
+cuántos miembros tenga:
+
+  0. verificación de cédulas en el registro por programa (cedulas_programa)
+  1. nextval de la secuencia de radicados
+  2. Ciudadano del cabeza de hogar (INSERT ... ON CONFLICT, devuelve el id)
+  3. Postulacion
+  4. GestionHogarEtapa1, ya con radicado y ciudadano
+  5. MiembroHogar[] en un solo bulk_create
+
+El radicado sale de la secuencia `radicado_hogar_seq`, así que no hace
+falta crear la postulación primero para obtener un id. La secuencia se
+crea en la migración y en post_migrate (las BD de pruebas se crean sin
+migraciones).
+
+Si otro envío simultáneo registra una de las cédulas después de la
+verificación, el trigger de cedulas_programa hace fallar el paso 5 y la
+transacción completa se revierte con CedulasYaRegistradas.
+"""
+import uuid
+from dataclasses import dataclass
+
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from infrastructure.database.cedulas_programa import es_cedula_duplicada
+from infrastructure.database.models import (
+    CedulaPrograma,
+    Ciudadano,
+    GestionHogarEtapa1,
+    MiembroHogar,
+    Postulacion,
+)
+
+SECUENCIA_RADICADO = 'radicado_hogar_seq'
+
+
+class CedulasYaRegistradas(Exception):
+    """Alguna cédula del hogar ya es miembro de otro hogar del programa."""
+
+    def __init__(self, cedulas):
+        self.cedulas = cedulas
+        super().__init__(mensaje_cedulas_registradas(cedulas))
+
+
+@dataclass
+class HogarRegistrado:
+    postulacion: Postulacion
+    gestion: GestionHogarEtapa1
+    miembros_ids: dict
+
+    def respuesta(self) -> dict:
+        """Cuerpo de la respuesta del registro público."""
+        return {
+            'id_postulacion': self.postulacion.id,
+            'numero_radicado': self.gestion.numero_radicado,
+            'fecha_radicado': self.gestion.fecha_radicado,
+            'miembros_ids': self.miembros_ids,
+        }
+
+
+def instalar_secuencia_radicado(using='default'):
+    """Crea la secuencia de radicados si no existe."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'CREATE SEQUENCE IF NOT EXISTS {SECUENCIA_RADICADO}')
+
+
+def siguiente_radicado(ahora=None) -> str:
+    """RAD-AAAAMM-<consecutivo>-<sufijo aleatorio>."""
+    ahora = ahora or timezone.now()
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT nextval(%s)', [SECUENCIA_RADICADO])
+        consecutivo = cursor.fetchone()[0]
+    return f"RAD-{ahora.strftime('%Y%m')}-{consecutivo:06d}-{uuid.uuid4().hex[:4].upper()}"
+
+
+def _ciudadano_cabeza(cabeza) -> Ciudadano:
+    """
+    Ciudadano del cabeza de hogar en una sentencia. Si ya existe no se
+    modifican sus datos (el UPDATE del conflicto solo reescribe la clave).
+    """
+    ciudadano = Ciudadano(
+        tipo_documento=cabeza['tipo_documento'],
+        numero_documento=cabeza['numero_documento'],
+        primer_nombre=cabeza['primer_nombre'],
+        segundo_nombre=cabeza.get('segundo_nombre') or '',
+        primer_apellido=cabeza['primer_apellido'],
+        segundo_apellido=cabeza.get('segundo_apellido') or '',
+        fecha_nacimiento=cabeza['fecha_nacimiento'],
+        sexo=cabeza.get('sexo') or '',
+        nacionalidad='',
+        telefono=cabeza.get('telefono') or '',
+        correo_electronico=cabeza.get('correo_electronico') or '',
+    )
+    Ciudadano.objects.bulk_create(
+        [ciudadano],
+        update_conflicts=True,
+        unique_fields=['tipo_documento', 'numero_documento'],
+        update_fields=['tipo_documento'],
+    )
+    return ciudadano
+
+
+def cedulas_registradas(programa_id, miembros) -> list[str]:
+    """
+    Números de documento de `miembros` (dicts con tipo_documento y
+    numero_documento) ya registrados en el programa. Una sola consulta
+    sobre el índice único de cedulas_programa.
+    """
+    documentos = Q(pk__in=[])
+    for m in miembros:
+        documentos |= Q(tipo_documento=m['tipo_documento'], numero_documento=m['numero_documento'])
+    return sorted(set(
+        CedulaPrograma.objects
+        .filter(documentos, programa_id=programa_id)
+        .values_list('numero_documento', flat=True)
+    ))
+
+
+def mensaje_cedulas_registradas(cedulas) -> str:
+    return f"Las siguientes cédulas ya están registradas en este programa: {', '.join(cedulas)}."
+
+
+def registrar_hogar(etapa, info_hogar: dict, miembros: list[dict]) -> HogarRegistrado:
+    """
+    Crea postulación, gestión del hogar, miembros y ciudadano del cabeza de
+    hogar en una transacción. `miembros` trae el `_localId` de cada miembro;
+    `miembros_ids` lo relaciona con el id creado.
+
+    Lanza CedulasYaRegistradas si alguna cédula ya está en el programa.
+    """
+    locales = [m['_localId'] for m in miembros]
+    campos_miembros = [{k: v for k, v in m.items() if k != '_localId'} for m in miembros]
+    cabeza = next((m for m in campos_miembros if m.get('es_cabeza_hogar')), None)
+
+    registradas = cedulas_registradas(etapa.programa_id, campos_miembros)
+    if registradas:
+        raise CedulasYaRegistradas(registradas)
+
+    try:
+        postulacion, gestion, creados = _escribir_hogar(etapa, info_hogar, campos_miembros, cabeza)
+    except IntegrityError as exc:
+        if not es_cedula_duplicada(exc):
+            raise
+        # Otro envío las registró después de la verificación
+        registradas = cedulas_registradas(etapa.programa_id, campos_miembros)
+        raise CedulasYaRegistradas(
+            registradas or [m['numero_documento'] for m in campos_miembros]
+        ) from exc
+
+    return HogarRegistrado(
+        postulacion=postulacion,
+        gestion=gestion,
+        miembros_ids={local: miembro.id for local, miembro in zip(locales, creados)},
+    )
+
+
+def _escribir_hogar(etapa, info_hogar, campos_miembros, cabeza):
+    with transaction.atomic():
+        numero_radicado = siguiente_radicado()
+        ciudadano = _ciudadano_cabeza(cabeza) if cabeza else None
+
+        postulacion = Postulacion.objects.create(
+            programa_id=etapa.programa_id,
+            etapa_actual=etapa,
+            estado='REGISTRADA',
+        )
+        gestion = GestionHogarEtapa1.objects.create(
+            postulacion=postulacion,
+            etapa=etapa,
+            ciudadano=ciudadano,
+            numero_radicado=numero_radicado,
+            **info_hogar,
+        )
+        creados = MiembroHogar.objects.bulk_create(
+            MiembroHogar(postulacion=gestion, **campos) for campos in campos_miembros
+        )
+    return postulacion, gestion, creados
@@ -10,8 +10,15 @@ from typing import Any, Dict, List, Optional
 
 from django.db.models import Count
 
-from domain.programas import Programa, EstadoPrograma, ProgramaRepositoryInterface
+from domain.programas import (
+    Programa,
+    EstadoPrograma,
+    ProgramaPorEstadoSpecification,
+    ProgramaRepositoryInterface,
+)
+from shared.base_specification import AndSpecification, BaseSpecification, OrSpecification
 from ..models import Programa as ProgramaORM
+from ..specifications import programa_a_q
 
 
 class DjangoProgramaRepository(ProgramaRepositoryInterface):
@@ -51,6 +58,19 @@ class DjangoProgramaRepository(ProgramaRepositoryInterface):
             data["codigo_programa"] = programa.codigo_programa
         return data
 
+    @staticmethod
+    def _especificacion_filtros(filtros: Optional[Dict[str, Any]]) -> BaseSpecification:
+        """Convierte el dict de filtros de listar/contar en una especificación."""
+        especificacion = AndSpecification()
+        if filtros and filtros.get("estado"):
+            try:
+                por_estado = ProgramaPorEstadoSpecification(filtros["estado"])
+            except ValueError:
+                # Estado desconocido: ningún programa (OR sin términos)
+                return OrSpecification()
+            especificacion = especificacion & por_estado
+        return especificacion
+
     # ---------- CRUD ----------
 
     def crear(self, programa: Programa) -> Programa:
@@ -92,11 +112,15 @@ class DjangoProgramaRepository(ProgramaRepositoryInterface):
         pagina: int = 1,
         tamaño_pagina: int = 10,
     ) -> Dict[str, Any]:
-        qs = ProgramaORM.objects.all()
+        return self.filtrar(self._especificacion_filtros(filtros), pagina, tamaño_pagina)
 
-        if filtros:
-            if "estado" in filtros:
-                qs = qs.filter(estado__iexact=filtros["estado"])
+    def filtrar(
+        self,
+        especificacion: BaseSpecification,
+        pagina: int = 1,
+        tamaño_pagina: int = 10,
+    ) -> Dict[str, Any]:
+        qs = ProgramaORM.objects.filter(programa_a_q(especificacion))
 
         total = qs.count()
         total_paginas = max(1, math.ceil(total / tamaño_pagina))
@@ -122,10 +146,7 @@ class DjangoProgramaRepository(ProgramaRepositoryInterface):
             return False
 
     def contar(self, filtros: Optional[Dict[str, Any]] = None) -> int:
-        qs = ProgramaORM.objects.all()
-        if filtros and "estado" in filtros:
-            qs = qs.filter(estado__iexact=filtros["estado"])
-        return qs.count()
+        return ProgramaORM.objects.filter(programa_a_q(self._especificacion_filtros(filtros))).count()
 
     def obtener_estadisticas(self) -> Dict[str, Any]:
         por_estado = dict(
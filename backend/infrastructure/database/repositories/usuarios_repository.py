@@ -13,7 +13,17 @@ from datetime import datetime
 from django.db.models import Q, QuerySet, Count
 from django.utils.timezone import now
 
-from domain.usuarios import Usuario, UsuarioRepository, UsuarioNoEncontradoException
+from domain.usuarios import (
+    EspecificacionAnd,
+    Usuario,
+    UsuarioActivoSpecification,
+    UsuarioNoEncontradoException,
+    UsuarioPorRolSpecification,
+    UsuarioRepository,
+    UsuarioSpecification,
+)
+from infrastructure.database.estadisticas_usuarios import estadisticas_usuarios
+from infrastructure.database.specifications import usuario_a_q
 from infrastructure.database.usuarios_models import UsuarioSistema
 
 logger = logging.getLogger(__name__)
@@ -117,20 +127,41 @@ class DjangoUsuarioRepository(UsuarioRepository):
         Returns:
             Diccionario con resultados paginados
         """
-        try:
-            # Comienza con usuarios no eliminados
-            queryset = UsuarioSistema.obtener_no_eliminados()
-            
-            # Aplicar filtros
-            if filtros:
-                if "rol" in filtros and filtros["rol"]:
-                    queryset = queryset.filter(rol=filtros["rol"].upper())
-                
-                if "activo" in filtros and filtros["activo"] is not None:
-                    queryset = queryset.filter(activo=filtros["activo"])
+        especificacion = EspecificacionAnd()
+        if filtros:
+            if filtros.get("rol"):
+                especificacion = especificacion & UsuarioPorRolSpecification(filtros["rol"])
+            if filtros.get("activo") is not None:
+                especificacion = especificacion & UsuarioActivoSpecification(filtros["activo"])
+
+        return self.filtrar(especificacion, pagina, tamaño_pagina)
+
+    def filtrar(
+        self,
+        especificacion: UsuarioSpecification,
+        pagina: int = 1,
+        tamaño_pagina: int = 10,
+    ) -> Dict[str, Any]:
+        """
+        Obtiene los usuarios que satisfacen la especificación
+        
+        La especificación se traduce a un Q y se resuelve en el WHERE.
+        
+        Args:
+            especificacion: Especificación simple o compuesta
+            pagina: Número de página
+            tamaño_pagina: Cantidad de registros por página
             
-            # Ordenar  más recientemente primero
-            queryset = queryset.order_by("-fecha_creacion")
+        Returns:
+            Diccionario con resultados paginados
+        """
+        try:
+            queryset = (
+                UsuarioSistema.obtener_no_eliminados()
+                .filter(usuario_a_q(especificacion))
+                .select_related("id_rol")
+                .order_by("-fecha_creacion", "-id_usuario")
+            )
             
             # Contar total
             total = queryset.count()
@@ -174,8 +205,10 @@ class DjangoUsuarioRepository(UsuarioRepository):
         Returns:
             Lista de usuarios activos con el rol
         """
-        usuarios_modelo = UsuarioSistema.obtener_no_eliminados().filter(
-            rol=rol.upper()
+        usuarios_modelo = (
+            UsuarioSistema.obtener_no_eliminados()
+            .filter(usuario_a_q(UsuarioPorRolSpecification(rol)))
+            .select_related("id_rol")
         )
         return [modelo.to_domain() for modelo in usuarios_modelo]
 
@@ -300,30 +333,14 @@ class DjangoUsuarioRepository(UsuarioRepository):
 
     # ============ Operaciones Avanzadas ============
 
-    async def obtener_estadisticas(self) -> Dict[str, Any]:
+    def obtener_estadisticas(self) -> Dict[str, Any]:
         """
         Obtiene estadísticas generales de usuarios
         
         Returns:
-            Diccionario con estadísticas
+            Diccionario con total, activos, inactivos y por_rol
         """
-        queryset_base = UsuarioSistema.obtener_no_eliminados()
-        
-        total = queryset_base.count()
-        activos = queryset_base.filter(activo=True).count()
-        inactivos = total - activos
-        
-        # Contar por rol
-        por_rol = {}
-        for rol_code, rol_name in UsuarioSistema.ROLES:
-            por_rol[rol_code] = queryset_base.filter(rol=rol_code).count()
-        
-        return {
-            "total": total,
-            "activos": activos,
-            "inactivos": inactivos,
-            "por_rol": por_rol,
-        }
+        return estadisticas_usuarios()
 
     async def buscar(
         self,
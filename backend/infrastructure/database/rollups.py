@@ -0,0 +1,192 @@
+"""
+Series diarias por programa para los dashboards operativos.
+
+`rollups_diarios` guarda, por (programa, fecha, métrica, estado), cuántos
+eventos ocurrieron ese día:
+
+  postulaciones          registros nuevos (sin estado)
+  visitas                visitas creadas (sin estado)
+  documentos             documentos cargados (estado = tipo de documento)
+  cambios_estado         postulaciones que pasaron a `estado`
+  cambios_estado_visita  visitas que pasaron a `estado`
+
+Igual que los contadores del dashboard, los llenan triggers por sentencia
+dentro de la misma transacción del cambio, repartidos en SLOTS filas.
+La fecha es la del día en TIME_ZONE.
+
+`reconstruir_rollups` recalcula las métricas de creación desde las tablas
+fuente (para el histórico o si hubo deriva). Los cambios de estado no
+tienen historial del cual reconstruirse y se conservan. Por eso las
+altas de postulaciones y visitas no se desglosan por estado: el trigger
+solo ve el estado inicial y la reconstrucción solo el actual, y con
+claves distintas reconciliar una tabla sin deriva reescribiría la serie.
+"""
+from dataclasses import dataclass
+from datetime import date
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from infrastructure.database.contadores import SLOTS
+from infrastructure.database.models import (
+    DocumentoGestionHogar,
+    DocumentoMiembroHogar,
+    DocumentoProcesoInterno,
+    DocumentoVisitaEtapa2,
+    Etapa,
+    GestionHogarEtapa1,
+    MiembroHogar,
+    Postulacion,
+    RollupDiario,
+    Visita,
+)
+
+_T_POSTULACIONES = Postulacion._meta.db_table
+_T_VISITAS = Visita._meta.db_table
+_T_GESTION = GestionHogarEtapa1._meta.db_table
+_T_ETAPAS = Etapa._meta.db_table
+_T_MIEMBROS = MiembroHogar._meta.db_table
+
+
+@dataclass(frozen=True)
+class Evento:
+    """Fila creada en `modelo` que cuenta como un evento de `metrica`."""
+    modelo: type
+    metrica: str
+    estado: str       # expresión sobre `r` ('' si no se desglosa)
+    fecha: str        # columna timestamp de `r` (para reconstruir)
+    programa: str     # expresión del programa
+    joins: str = ''   # JOINs desde `r` hasta el programa
+
+
+EVENTOS = [
+    Evento(Postulacion, 'postulaciones', "''", 'r.fecha_postulacion', 'r.programa_id'),
+    Evento(Visita, 'visitas', "''", 'r.fecha_registro', 'p.programa_id',
+           f'JOIN {_T_POSTULACIONES} p ON p.id = r.postulacion_id'),
+    Evento(DocumentoGestionHogar, 'documentos', 'r.tipo_documento', 'r.fecha_carga', 'e.programa_id',
+           f'JOIN {_T_GESTION} g ON g.id = r.postulacion_id JOIN {_T_ETAPAS} e ON e.id = g.etapa_id'),
+    Evento(DocumentoMiembroHogar, 'documentos', 'r.tipo_documento', 'r.fecha_carga', 'e.programa_id',
+           f'JOIN {_T_MIEMBROS} m ON m.id = r.miembro_id JOIN {_T_GESTION} g ON g.id = m.postulacion_id '
+           f'JOIN {_T_ETAPAS} e ON e.id = g.etapa_id'),
+    Evento(DocumentoVisitaEtapa2, 'documentos', 'r.tipo_documento', 'r.fecha_creacion_reg', 'p.programa_id',
+           f'JOIN {_T_VISITAS} v ON v.id = r.visita_id JOIN {_T_POSTULACIONES} p ON p.id = v.postulacion_id'),
+    Evento(DocumentoProcesoInterno, 'documentos', 'r.tipo_documento', 'r.fecha_creacion_reg', 'p.programa_id',
+           f'JOIN {_T_POSTULACIONES} p ON p.id = r.postulacion_id'),
+]
+
+# Cambios de estado: (modelo, métrica, columna de estado, expresión del programa, JOINs desde `n`)
+CAMBIOS = [
+    (Postulacion, 'cambios_estado', 'estado', 'n.programa_id', ''),
+    (Visita, 'cambios_estado_visita', 'estado_visita', 'p.programa_id',
+     f'JOIN {_T_POSTULACIONES} p ON p.id = n.postulacion_id'),
+]
+
+METRICAS_RECONSTRUIBLES = sorted({e.metrica for e in EVENTOS})
+METRICAS = METRICAS_RECONSTRUIBLES + [m for _, m, _, _, _ in CAMBIOS]
+
+
+def _hoy_sql():
+    return f"(now() AT TIME ZONE '{settings.TIME_ZONE}')::date"
+
+
+def _acumular(seleccion):
+    """INSERT que suma las filas (programa, fecha, metrica, estado, n) de `seleccion`."""
+    tabla = RollupDiario._meta.db_table
+    return (
+        f'INSERT INTO {tabla} (programa_id, fecha, metrica, estado, slot, cantidad) '
+        f'SELECT programa_id, fecha, metrica, estado, mod(pg_backend_pid(), {SLOTS}), sum(n) '
+        f'FROM ({seleccion}) s WHERE programa_id IS NOT NULL '
+        'GROUP BY programa_id, fecha, metrica, estado ORDER BY 1, 2, 3, 4 '
+        'ON CONFLICT (programa_id, fecha, metrica, estado, slot) '
+        f'DO UPDATE SET cantidad = {tabla}.cantidad + EXCLUDED.cantidad'
+    )
+
+
+def _sql_instalacion():
+    hoy = _hoy_sql()
+    por_tabla = {}
+    for evento in EVENTOS:
+        por_tabla.setdefault(evento.modelo._meta.db_table, {})['INSERT'] = _acumular(
+            f"SELECT {evento.programa} AS programa_id, {hoy} AS fecha, '{evento.metrica}' AS metrica, "
+            f"{evento.estado} AS estado, 1 AS n FROM nuevas r {evento.joins}"
+        )
+    for modelo, metrica, columna, programa, joins in CAMBIOS:
+        por_tabla[modelo._meta.db_table]['UPDATE'] = _acumular(
+            f"SELECT {programa} AS programa_id, {hoy} AS fecha, '{metrica}' AS metrica, "
+            f"n.{columna} AS estado, 1 AS n FROM viejas o JOIN nuevas n ON n.id = o.id {joins} "
+            f"WHERE n.{columna} IS DISTINCT FROM o.{columna}"
+        )
+
+    sentencias = []
+    for tabla, por_evento in por_tabla.items():
+        for evento, sql in por_evento.items():
+            funcion = f'rollups_{evento.lower()}_{tabla}'
+            referencias = 'NEW TABLE AS nuevas' if evento == 'INSERT' else 'OLD TABLE AS viejas NEW TABLE AS nuevas'
+            sentencias += [
+                f'CREATE OR REPLACE FUNCTION {funcion}() RETURNS trigger LANGUAGE plpgsql AS $$ '
+                f'BEGIN {sql}; RETURN NULL; END $$',
+                f'DROP TRIGGER IF EXISTS {funcion} ON {tabla}',
+                f'CREATE TRIGGER {funcion} AFTER {evento} ON {tabla} REFERENCING {referencias} '
+                f'FOR EACH STATEMENT EXECUTE FUNCTION {funcion}()',
+            ]
+    return sentencias
+
+
+def instalar_rollups(using='default'):
+    """Crea o actualiza las funciones y triggers de las series diarias."""
+    with connections[using].cursor() as cursor:
+        for sentencia in _sql_instalacion():
+            cursor.execute(sentencia)
+
+
+def eliminar_rollups(using='default'):
+    """Quita los triggers y funciones (al revertir la migración)."""
+    with connections[using].cursor() as cursor:
+        for tabla in {evento.modelo._meta.db_table for evento in EVENTOS}:
+            cursor.execute(f'DROP FUNCTION IF EXISTS rollups_insert_{tabla}() CASCADE')
+        for modelo, *_ in CAMBIOS:
+            cursor.execute(f'DROP FUNCTION IF EXISTS rollups_update_{modelo._meta.db_table}() CASCADE')
+
+
+def reconstruir_rollups(programa_id=None, desde: date = None, hasta: date = None, using='default') -> int:
+    """
+    Recalcula las métricas de creación (opcionalmente de un programa y un
+    rango de fechas) desde las tablas fuente. Retorna las filas escritas.
+    """
+    tabla = RollupDiario._meta.db_table
+    fecha_local = "({col} AT TIME ZONE '" + settings.TIME_ZONE + "')::date"
+
+    selecciones, params = [], []
+    for evento in EVENTOS:
+        fecha = fecha_local.format(col=evento.fecha)
+        condiciones = []
+        if programa_id is not None:
+            condiciones.append(f'{evento.programa} = %s')
+            params.append(programa_id)
+        if desde:
+            condiciones.append(f'{fecha} >= %s')
+            params.append(desde)
+        if hasta:
+            condiciones.append(f'{fecha} <= %s')
+            params.append(hasta)
+        where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ''
+        selecciones.append(
+            f"SELECT {evento.programa} AS programa_id, {fecha} AS fecha, '{evento.metrica}' AS metrica, "
+            f"{evento.estado} AS estado, 1 AS n FROM {evento.modelo._meta.db_table} r {evento.joins} {where}"
+        )
+
+    borrar = RollupDiario.objects.using(using).filter(metrica__in=METRICAS_RECONSTRUIBLES)
+    if programa_id is not None:
+        borrar = borrar.filter(programa_id=programa_id)
+    if desde:
+        borrar = borrar.filter(fecha__gte=desde)
+    if hasta:
+        borrar = borrar.filter(fecha__lte=hasta)
+
+    with transaction.atomic(using=using):
+        with connections[using].cursor() as cursor:
+            # Los triggers concurrentes esperan a que termine la reconstrucción
+            cursor.execute(f'LOCK TABLE {tabla} IN EXCLUSIVE MODE')
+            borrar.delete()
+            cursor.execute(_acumular(' UNION ALL '.join(selecciones)), params)
+            return cursor.rowcount
@@ -0,0 +1,136 @@
+"""
+Señales del app database.
+
+Registra en el catálogo de archivos cada documento subido, para que las
+URLs y las descargas no tengan que consultar el storage, e invalida las
+estadísticas de usuarios y los formularios públicos en cache. Con el storage
+deduplicado, borrar un documento o reemplazar su archivo descuenta la
+referencia del blob.
+
+Después de migrar reinstala los triggers de los contadores, de las series
+diarias, de la consulta pública de estado y del registro de cédulas por
+programa, los índices de búsqueda de usuarios y la secuencia de radicados.
+"""
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
+from django.dispatch import receiver
+
+from infrastructure.database.models import (
+    ArchivoCatalogo,
+    CedulaPrograma,
+    ConfigRegistroHogar,
+    ConsultaEstadoPublica,
+    ContadorDashboard,
+    DocumentoGestionHogar,
+    DocumentoMiembroHogar,
+    DocumentoProcesoInterno,
+    DocumentoVisitaEtapa2,
+    Etapa,
+    FormularioEtapa,
+    Programa,
+    RollupDiario,
+)
+from infrastructure.database.usuarios_models import UsuarioSistema
+from infrastructure.database.estadisticas_usuarios import invalidar_estadisticas_usuarios
+from infrastructure.database.formularios_publicos import invalidar_etapas
+from infrastructure.storage.catalogo import registrar_archivo
+from infrastructure.storage.dedup_storage import ContenidoDireccionadoStorage
+from infrastructure.database.contadores import instalar_contadores
+from infrastructure.database.rollups import instalar_rollups
+from infrastructure.database.busqueda_usuarios import instalar_indices_busqueda
+from infrastructure.database.consulta_estado import instalar_consulta_estado
+from infrastructure.database.cedulas_programa import instalar_cedulas_programa
+from infrastructure.database.registro_hogar import instalar_secuencia_radicado
+
+
+@receiver(post_save, sender=DocumentoGestionHogar)
+@receiver(post_save, sender=DocumentoMiembroHogar)
+@receiver(post_save, sender=DocumentoVisitaEtapa2)
+@receiver(post_save, sender=DocumentoProcesoInterno)
+def catalogar_documento(sender, instance, created, **kwargs):
+    """Cataloga el archivo al crear el documento o si su archivo aún no está catalogado."""
+    name = instance.archivo.name if instance.archivo else ''
+    if not name:
+        return
+    if created or not ArchivoCatalogo.objects.filter(ruta=name).exists():
+        registrar_archivo(name)
+
+
+def _liberar_blob(archivo, name):
+    """Descuenta la referencia al confirmar la transacción (un rollback la conserva)."""
+    storage = archivo.storage
+    if name and isinstance(storage, ContenidoDireccionadoStorage):
+        transaction.on_commit(lambda: storage.delete(name))
+
+
+@receiver(post_delete, sender=DocumentoGestionHogar)
+@receiver(post_delete, sender=DocumentoMiembroHogar)
+@receiver(post_delete, sender=DocumentoVisitaEtapa2)
+@receiver(post_delete, sender=DocumentoProcesoInterno)
+def liberar_archivo_eliminado(sender, instance, **kwargs):
+    """
+    Solo el borrado físico libera el blob: el soft-delete conserva la fila,
+    que sigue apuntando al archivo y puede consultarse o restaurarse.
+    """
+    _liberar_blob(instance.archivo, instance.archivo.name)
+
+
+@receiver(pre_save, sender=DocumentoGestionHogar)
+@receiver(pre_save, sender=DocumentoMiembroHogar)
+@receiver(pre_save, sender=DocumentoVisitaEtapa2)
+@receiver(pre_save, sender=DocumentoProcesoInterno)
+def liberar_archivo_reemplazado(sender, instance, update_fields=None, **kwargs):
+    if instance._state.adding or (update_fields is not None and 'archivo' not in update_fields):
+        return
+    anterior = sender.objects.filter(pk=instance.pk).values_list('archivo', flat=True).first()
+    if anterior and anterior != instance.archivo.name:
+        _liberar_blob(instance.archivo, anterior)
+
+
+@receiver(post_save, sender=UsuarioSistema)
+@receiver(post_delete, sender=UsuarioSistema)
+def invalidar_estadisticas(sender, **kwargs):
+    invalidar_estadisticas_usuarios()
+
+
+@receiver(post_save, sender=Etapa)
+@receiver(post_delete, sender=Etapa)
+def invalidar_formularios_etapa(sender, instance, **kwargs):
+    invalidar_etapas(instance.pk)
+
+
+@receiver(post_save, sender=FormularioEtapa)
+@receiver(post_delete, sender=FormularioEtapa)
+@receiver(post_save, sender=ConfigRegistroHogar)
+@receiver(post_delete, sender=ConfigRegistroHogar)
+def invalidar_formularios_config(sender, instance, **kwargs):
+    invalidar_etapas(instance.etapa_id)
+
+
+@receiver(post_save, sender=Programa)
+def invalidar_formularios_programa(sender, instance, created, **kwargs):
+    """El nombre del programa va en las respuestas públicas de sus etapas."""
+    if not created:
+        invalidar_etapas(*instance.etapas.values_list('id', flat=True))
+
+
+@receiver(post_migrate)
+def instalar_triggers_agregados(sender, using='default', **kwargs):
+    """
+    Las BD creadas sin migraciones (pruebas) también necesitan los triggers.
+    Solo se instalan los de tablas existentes: tras revertir una migración
+    no deben volver triggers que escriban en su tabla eliminada.
+    """
+    if sender.name != 'infrastructure.database':
+        return
+    tablas = set(connections[using].introspection.table_names())
+    for modelo, instalar in (
+        (ContadorDashboard, instalar_contadores),
+        (RollupDiario, instalar_rollups),
+        (ConsultaEstadoPublica, instalar_consulta_estado),
+        (CedulaPrograma, instalar_cedulas_programa),
+    ):
+        if modelo._meta.db_table in tablas:
+            instalar(using)
+    instalar_indices_busqueda(using)
+    instalar_secuencia_radicado(using)
@@ -0,0 +1,111 @@
+"""
+Ejecución del sorteo de beneficiarios en la base de datos.
+
+El sorteo se resuelve con sentencias sobre conjuntos, sin traer las
+postulaciones a Python:
+
+  1. pg_advisory_xact_lock por programa: dos ejecuciones simultáneas del
+     mismo programa se serializan sin bloquear filas de postulaciones.
+  2. INSERT ... SELECT en sorteo_resultados con el orden del sorteo:
+     row_number() sobre sha256(semilla || ':' || id). Los primeros
+     `cantidad` quedan como beneficiados.
+  3. Dos UPDATE con JOIN a sorteo_resultados para cambiar los estados.
+
+La semilla se genera con `secrets` y queda registrada en la tabla sorteos;
+`verificar_sorteo` recalcula el orden en Python para auditarlo.
+"""
+import hashlib
+import secrets
+
+from django.db import connection, transaction
+
+from infrastructure.database.models import Etapa, Postulacion, ResultadoSorteo, Sorteo
+
+# Primer entero de la llave del advisory lock (el segundo es el programa)
+CLAVE_LOCK_SORTEO = 7301
+
+
+class SorteoError(Exception):
+    """El sorteo no se puede ejecutar (mensaje apto para el usuario)."""
+
+
+class SorteoYaRealizado(SorteoError):
+    pass
+
+
+def clave_orden(semilla: str, postulacion_id: int) -> str:
+    """Clave de ordenamiento de una postulación (la misma que calcula la BD)."""
+    return hashlib.sha256(f'{semilla}:{postulacion_id}'.encode()).hexdigest()
+
+
+def ejecutar_sorteo(programa_id: int, cantidad: int, usuario=None) -> Sorteo:
+    """
+    Sortea `cantidad` beneficiarios entre las postulaciones APROBADA del
+    programa y registra el orden completo. Lanza SorteoError si no procede.
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s, %s)', [CLAVE_LOCK_SORTEO, int(programa_id)])
+
+        etapa1 = Etapa.objects.filter(programa_id=programa_id, numero_etapa=1).first()
+        if not etapa1 or not etapa1.finalizada:
+            raise SorteoError('No se puede ejecutar el sorteo: la Etapa 1 debe estar finalizada.')
+
+        ya_sorteado = (
+            Sorteo.objects.filter(programa_id=programa_id).exists()
+            or Postulacion.objects.filter(
+                programa_id=programa_id, estado__in=['BENEFICIADO', 'NO_BENEFICIARIO'],
+            ).exists()
+        )
+        if ya_sorteado:
+            raise SorteoYaRealizado('Ya se realizó un sorteo para este programa. No se puede repetir.')
+
+        elegibles = Postulacion.objects.filter(programa_id=programa_id, estado='APROBADA').count()
+        if not elegibles:
+            raise SorteoError('No hay postulaciones aprobadas para sortear.')
+        if cantidad > elegibles:
+            raise SorteoError(
+                f'La cantidad de beneficiarios ({cantidad}) supera el total de elegibles ({elegibles}).'
+            )
+
+        sorteo = Sorteo.objects.create(
+            programa_id=programa_id,
+            semilla=secrets.token_hex(32),
+            cantidad_beneficiarios=cantidad,
+            total_elegibles=elegibles,
+            usuario=usuario,
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'''
+                INSERT INTO {ResultadoSorteo._meta.db_table} (sorteo_id, postulacion_id, orden, beneficiado)
+                SELECT %(sorteo)s, id, orden, orden <= %(cantidad)s
+                FROM (
+                    SELECT id, row_number() OVER (
+                        ORDER BY sha256(convert_to(%(semilla)s || ':' || id::text, 'UTF8'))
+                    ) AS orden
+                    FROM {Postulacion._meta.db_table}
+                    WHERE programa_id = %(programa)s AND estado = 'APROBADA'
+                ) AS sorteadas
+                ''',
+                {'sorteo': sorteo.pk, 'cantidad': cantidad, 'semilla': sorteo.semilla, 'programa': programa_id},
+            )
+
+        sorteadas = Postulacion.objects.filter(resultado_sorteo__sorteo=sorteo, estado='APROBADA')
+        sorteadas.filter(resultado_sorteo__beneficiado=True).update(estado='BENEFICIADO')
+        sorteadas.filter(resultado_sorteo__beneficiado=False).update(estado='NO_BENEFICIARIO')
+
+    return sorteo
+
+
+def verificar_sorteo(sorteo: Sorteo) -> bool:
+    """Recalcula el orden a partir de la semilla y lo compara con el registrado."""
+    registrados = list(
+        sorteo.resultados.order_by('orden').values_list('postulacion_id', 'beneficiado')
+    )
+    esperado = sorted((pid for pid, _ in registrados), key=lambda pid: clave_orden(sorteo.semilla, pid))
+    return (
+        [pid for pid, _ in registrados] == esperado
+        and [b for _, b in registrados] == [i < sorteo.cantidad_beneficiarios for i in range(len(registrados))]
+    )
@@ -0,0 +1,122 @@
+"""
+Traducción de especificaciones de dominio a expresiones Q de Django.
+
+El dominio define las especificaciones sin depender del ORM; aquí cada
+repositorio registra cómo se traduce cada especificación hoja a un Q y
+las composiciones (AND / OR / NOT, tanto las de shared como las de
+usuarios) se traducen recursivamente. Así un filtro compuesto se resuelve
+en un solo WHERE en lugar de cargar filas y evaluarlas en Python.
+"""
+from typing import Callable
+
+from django.db.models import Q
+
+from domain.programas import (
+    ProgramaCreadoDesdeSpecification,
+    ProgramaCreadoHastaSpecification,
+    ProgramaPorEntidadSpecification,
+    ProgramaPorEstadoSpecification,
+)
+from domain.usuarios.usuario_specification import (
+    EspecificacionAnd,
+    EspecificacionNot,
+    EspecificacionOr,
+    UsuarioActivoSpecification,
+    UsuarioAdminSpecification,
+    UsuarioCreadoDesdeSpecification,
+    UsuarioCreadoHastaSpecification,
+    UsuarioFuncionarioSpecification,
+    UsuarioModificadoDesdeSpecification,
+    UsuarioPorCorreoSpecification,
+    UsuarioPorIdSpecification,
+    UsuarioPorRolSpecification,
+    UsuarioVisitadorSpecification,
+)
+from shared.base_specification import AndSpecification, NotSpecification, OrSpecification
+
+
+class EspecificacionNoTraducible(TypeError):
+    """La especificación no tiene traducción a Q registrada."""
+
+
+# Ninguna fila: traducción de un OR sin términos
+_NINGUNO = Q(pk__in=[])
+
+
+class TraductorQ:
+    """Traduce especificaciones a Q según las reglas {clase: función(spec) -> Q}."""
+
+    def __init__(self, reglas: dict[type, Callable[..., Q]]):
+        self._reglas = reglas
+
+    def __call__(self, especificacion) -> Q:
+        if isinstance(especificacion, (AndSpecification, EspecificacionAnd)):
+            q = Q()
+            for hija in self._hijas(especificacion):
+                q &= self(hija)
+            return q
+        if isinstance(especificacion, (OrSpecification, EspecificacionOr)):
+            hijas = [self(hija) for hija in self._hijas(especificacion)]
+            if not hijas:
+                return _NINGUNO
+            q = hijas[0]
+            for hija in hijas[1:]:
+                q |= hija
+            return q
+        if isinstance(especificacion, NotSpecification):
+            return ~self(especificacion._spec)
+        if isinstance(especificacion, EspecificacionNot):
+            return ~self(especificacion.especificacion)
+
+        for clase in type(especificacion).__mro__:
+            if clase in self._reglas:
+                return self._reglas[clase](especificacion)
+        raise EspecificacionNoTraducible(
+            f'No hay traducción a consulta para {type(especificacion).__name__}'
+        )
+
+    @staticmethod
+    def _hijas(especificacion):
+        if isinstance(especificacion, (EspecificacionAnd, EspecificacionOr)):
+            return especificacion.especificaciones
+        return especificacion._specs
+
+
+# ── Usuarios ── #
+
+# El rol del dominio VISITADOR_TECNICO se guarda como TECNICO_VISITANTE
+_NOMBRES_ROL = {'VISITADOR_TECNICO': ('VISITADOR_TECNICO', 'TECNICO_VISITANTE')}
+
+
+def _por_rol(rol: str) -> Q:
+    return Q(id_rol__nombre_rol__in=_NOMBRES_ROL.get(rol, (rol,)))
+
+
+def _activo(spec) -> Q:
+    # esta_activo() == activo AND activo_logico
+    activo = Q(activo=True, activo_logico=True)
+    return activo if spec.activo else ~activo
+
+
+usuario_a_q = TraductorQ({
+    UsuarioPorIdSpecification: lambda s: Q(id_usuario=s.id_usuario),
+    UsuarioPorCorreoSpecification: lambda s: Q(correo__iexact=s.correo),
+    UsuarioPorRolSpecification: lambda s: _por_rol(s.rol),
+    UsuarioActivoSpecification: _activo,
+    UsuarioAdminSpecification: lambda s: _por_rol('ADMIN'),
+    UsuarioFuncionarioSpecification: lambda s: _por_rol('FUNCIONARIO'),
+    UsuarioVisitadorSpecification: lambda s: _por_rol('VISITADOR_TECNICO'),
+    UsuarioCreadoDesdeSpecification: lambda s: Q(fecha_creacion__gte=s.fecha_desde),
+    UsuarioCreadoHastaSpecification: lambda s: Q(fecha_creacion__lte=s.fecha_hasta),
+    UsuarioModificadoDesdeSpecification: lambda s: Q(fecha_modificacion__gte=s.fecha_desde),
+})
+
+
+# ── Programas ── #
+
+programa_a_q = TraductorQ({
+    ProgramaPorEstadoSpecification: lambda s: Q(estado=s.estado.value),
+    ProgramaPorEntidadSpecification: lambda s: Q(entidad_responsable__icontains=s.entidad),
+    ProgramaCreadoDesdeSpecification: lambda s: Q(fecha_creacion__gte=s.fecha_desde),
+    ProgramaCreadoHastaSpecification: lambda s: Q(fecha_creacion__lte=s.fecha_hasta),
+})
@@ -141,6 +141,11 @@ class UsuarioSistema(models.Model):
                 fields=["id_rol", "activo"],
                 name="idx_usuarios_id_rol_activo"
             ),
+            # Orden del listado y paginación por cursor
+            models.Index(
+                fields=["-fecha_creacion", "-id_usuario"],
+                name="idx_usuarios_fecha_id",
+            ),
         ]
 
     def __str__(self):
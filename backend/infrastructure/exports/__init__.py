@@ -0,0 +1,12 @@
+"""
+Exportaciones de archivos (ZIP de documentos de postulaciones).
+"""
+from .zip_stream import EntradaZip, iter_zip
+from .documentos_postulacion import iter_entradas_documentos, nombre_zip
+
+__all__ = [
+    "EntradaZip",
+    "iter_zip",
+    "iter_entradas_documentos",
+    "nombre_zip",
+]
@@ -0,0 +1,140 @@
+"""
+Exportación de documentos de postulaciones a ZIP.
+
+Arma la estructura de carpetas de la descarga masiva:
+
+  {Programa} - {fecha}/{Persona}_{id} ({fecha postulación})/{TIPO}[_n].ext
+  {Programa} - {fecha}/{Persona}_{id} (...)/miembros/{Nombre miembro}/{TIPO}[_n].ext
+
+y la entrega como una secuencia de EntradaZip para el motor de streaming.
+"""
+import os
+import re
+import unicodedata
+
+from infrastructure.database.paquetes_documentos import CATEGORIAS, cargar_paquetes_documentos
+from infrastructure.exports.zip_stream import EntradaZip
+from infrastructure.storage.catalogo import rutas_canonicas
+
+
+# Postulaciones cuyos documentos se cargan juntos
+TAMANO_LOTE = 200
+
+
+def safe_filename(name):
+    """Elimina caracteres no válidos para nombres de carpeta."""
+    name = unicodedata.normalize('NFKD', name)
+    name = re.sub(r'[^\w\s\-.]', '', name)
+    return name.strip()[:100]
+
+
+def nombre_zip(postulaciones, fecha_descarga):
+    """Nombre descriptivo para el ZIP según los programas incluidos."""
+    programas = {safe_filename(p.programa.nombre) for p in postulaciones if p.programa}
+    if len(programas) == 1:
+        return f'{programas.pop()} - {fecha_descarga}.zip'
+    return f'Documentos_postulaciones - {fecha_descarga}.zip'
+
+
+def _entrada_documento(archivo_field, rutas, carpeta, tipo_doc, counter=None):
+    """EntradaZip para un documento, o None si el archivo no existe en el storage."""
+    if not archivo_field or not archivo_field.name:
+        return None
+    resolved = rutas.get(archivo_field.name)
+    if not resolved:
+        return None
+    ext = os.path.splitext(archivo_field.name)[1]
+    # Usar sufijo numérico si hay duplicados del mismo tipo
+    suffix = f'_{counter}' if counter and counter > 1 else ''
+    return EntradaZip(f'{carpeta}/{tipo_doc}{suffix}{ext}', resolved)
+
+
+def _entradas_por_tipo(docs, rutas, carpeta):
+    tipo_count: dict[str, int] = {}
+    for doc in docs:
+        tipo_count[doc.tipo_documento] = tipo_count.get(doc.tipo_documento, 0) + 1
+        entrada = _entrada_documento(doc.archivo, rutas, carpeta, doc.tipo_documento, tipo_count[doc.tipo_documento])
+        if entrada:
+            yield entrada
+
+
+def _documentos_del_paquete(paquete):
+    yield from paquete.documentos_hogar
+    for miembro in paquete.miembros:
+        yield from miembro.documentos_activos
+    yield from paquete.documentos_visita
+    yield from paquete.documentos_proceso
+
+
+def iter_entradas_documentos(postulaciones, tipos, fecha_descarga, al_procesar=None):
+    """
+    Genera las entradas del ZIP para las postulaciones dadas.
+
+    tipos: {'hogar': [...], 'miembro': [...], 'visita': [...], 'proceso': [...]}
+    Los documentos se cargan por lotes de TAMANO_LOTE postulaciones con
+    cargar_paquetes_documentos (número fijo de consultas por lote).
+    al_procesar(n): callback opcional tras escribir la n-ésima postulación.
+    """
+    tipos = {c: tipos.get(c, []) for c in CATEGORIAS}
+    procesadas = 0
+
+    for inicio in range(0, len(postulaciones), TAMANO_LOTE):
+        lote = postulaciones[inicio:inicio + TAMANO_LOTE]
+        paquetes = {
+            p.postulacion_id: p
+            for p in cargar_paquetes_documentos(postulacion_ids=[x.id for x in lote], tipos=tipos)
+        }
+        # Rutas reales de todos los archivos del lote, resueltas en el catálogo
+        rutas = rutas_canonicas(
+            doc.archivo.name
+            for paquete in paquetes.values()
+            for doc in _documentos_del_paquete(paquete)
+        )
+
+        for postulacion in lote:
+            paquete = paquetes[postulacion.id]
+            gestion = paquete.gestion
+
+            # Datos para la carpeta
+            programa_nombre = safe_filename(
+                postulacion.programa.nombre if postulacion.programa else 'Sin_programa'
+            )
+
+            # Nombre de la persona (cabeza de hogar)
+            if gestion and gestion.ciudadano:
+                c = gestion.ciudadano
+                partes = [c.primer_nombre, c.segundo_nombre, c.primer_apellido, c.segundo_apellido]
+                persona = safe_filename(' '.join(p for p in partes if p))
+            else:
+                persona = 'Sin_nombre'
+
+            fecha_post = ''
+            if postulacion.fecha_postulacion:
+                fecha_post = f' ({postulacion.fecha_postulacion.strftime("%Y-%m-%d")})'
+
+            carpeta_base = f'{programa_nombre} - {fecha_descarga}/{persona}_{postulacion.id}{fecha_post}'
+
+            # Siempre crear la carpeta de la postulación (aunque no tenga documentos)
+            yield EntradaZip(f'{carpeta_base}/')
+
+            # 1) Documentos del hogar (Etapa 1)
+            yield from _entradas_por_tipo(paquete.documentos_hogar, rutas, carpeta_base)
+
+            # 2) Documentos de miembros
+            for miembro in paquete.miembros:
+                nombre_miembro = safe_filename(
+                    f'{miembro.primer_nombre} {miembro.primer_apellido}'
+                )
+                yield from _entradas_por_tipo(
+                    miembro.documentos_activos, rutas, f'{carpeta_base}/miembros/{nombre_miembro}',
+                )
+
+            # 3) Documentos de visita (Etapa 2)
+            yield from _entradas_por_tipo(paquete.documentos_visita, rutas, carpeta_base)
+
+            # 4) Documentos proceso interno (Etapa 3)
+            yield from _entradas_por_tipo(paquete.documentos_proceso, rutas, carpeta_base)
+
+            procesadas += 1
+            if al_procesar:
+                al_procesar(procesadas)
@@ -0,0 +1,147 @@
+"""
+Procesamiento en segundo plano de las exportaciones masivas de documentos.
+
+Los trabajos viven en la tabla exportaciones_documentos; el comando
+`procesar_exportaciones` los reclama con SELECT ... FOR UPDATE SKIP LOCKED y
+los arma en un pool de hilos local, sin broker externo. Cada trabajo escribe
+el ZIP en streaming a un archivo temporal propio que se renombra al terminar.
+
+Mientras arma el ZIP, el trabajo renueva fecha_actualizacion al menos cada
+LATIDO_SEGUNDOS; `reencolar_abandonadas` solo devuelve a la cola los que
+dejaron de latir, no los que otro worker vivo sigue procesando.
+"""
+import logging
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from infrastructure.database.models import ExportacionDocumentos, Postulacion
+from infrastructure.exports.documentos_postulacion import iter_entradas_documentos, nombre_zip
+from infrastructure.exports.zip_stream import iter_zip
+
+logger = logging.getLogger(__name__)
+
+# Cada cuántas postulaciones se guarda el progreso en la BD
+INTERVALO_PROGRESO = 10
+
+# Cada cuántos segundos un trabajo en curso renueva fecha_actualizacion
+LATIDO_SEGUNDOS = 60
+
+
+def directorio_exportaciones() -> str:
+    ruta = str(settings.EXPORTACIONES_ROOT)
+    os.makedirs(ruta, exist_ok=True)
+    return ruta
+
+
+def ruta_archivo_exportacion(exportacion) -> str | None:
+    """Ruta en disco del ZIP terminado, o None si no existe."""
+    if not exportacion.ruta_archivo:
+        return None
+    ruta = os.path.join(str(settings.EXPORTACIONES_ROOT), os.path.basename(exportacion.ruta_archivo))
+    return ruta if os.path.isfile(ruta) else None
+
+
+def reclamar_pendientes(limite: int) -> list[int]:
+    """Marca como EN_PROCESO hasta `limite` trabajos pendientes y devuelve sus IDs."""
+    with transaction.atomic():
+        ids = list(
+            ExportacionDocumentos.objects
+            .select_for_update(skip_locked=True)
+            .filter(estado='PENDIENTE')
+            .order_by('fecha_creacion')
+            .values_list('id', flat=True)[:limite]
+        )
+        if ids:
+            ExportacionDocumentos.objects.filter(id__in=ids).update(
+                estado='EN_PROCESO',
+                fecha_inicio=timezone.now(),
+                fecha_actualizacion=timezone.now(),
+            )
+    return ids
+
+
+def reencolar_abandonadas(minutos: int) -> int:
+    """
+    Devuelve a PENDIENTE los trabajos EN_PROCESO sin latido en `minutos`
+    (p. ej. el proceso que los tenía se detuvo). `minutos` debe superar
+    holgadamente LATIDO_SEGUNDOS.
+    """
+    limite = timezone.now() - timedelta(minutes=minutos)
+    return ExportacionDocumentos.objects.filter(
+        estado='EN_PROCESO', fecha_actualizacion__lt=limite,
+    ).update(estado='PENDIENTE', postulaciones_procesadas=0)
+
+
+def _registrar_progreso(exportacion):
+    """Callback que guarda el avance cada INTERVALO_PROGRESO postulaciones."""
+    def registrar(procesadas):
+        if procesadas % INTERVALO_PROGRESO == 0:
+            ExportacionDocumentos.objects.filter(pk=exportacion.pk).update(
+                postulaciones_procesadas=procesadas, fecha_actualizacion=timezone.now(),
+            )
+    return registrar
+
+
+def _latido(exportacion):
+    """Callback que renueva fecha_actualizacion como máximo cada LATIDO_SEGUNDOS."""
+    ultimo = time.monotonic()
+
+    def latir():
+        nonlocal ultimo
+        if time.monotonic() - ultimo >= LATIDO_SEGUNDOS:
+            ExportacionDocumentos.objects.filter(pk=exportacion.pk).update(fecha_actualizacion=timezone.now())
+            ultimo = time.monotonic()
+    return latir
+
+
+def procesar_exportacion(exportacion_id: int) -> None:
+    """Arma el ZIP de un trabajo y lo deja en disco."""
+    exportacion = ExportacionDocumentos.objects.get(pk=exportacion_id)
+    nombre_en_disco = f'exportacion_{exportacion.pk}.zip'
+    destino = os.path.join(directorio_exportaciones(), nombre_en_disco)
+    # Propio de este intento: si el trabajo se reencoló, otro worker no lo pisa
+    fd, temporal = tempfile.mkstemp(
+        dir=directorio_exportaciones(), prefix=f'{nombre_en_disco}.', suffix='.part',
+    )
+    archivo = os.fdopen(fd, 'wb')
+    try:
+        postulaciones = list(Postulacion.objects.filter(
+            id__in=exportacion.postulacion_ids, activo_logico=True,
+        ).select_related('programa').order_by('id'))
+        fecha_descarga = date.today().strftime('%Y-%m-%d')
+        exportacion.total_postulaciones = len(postulaciones)
+        exportacion.save(update_fields=['total_postulaciones', 'fecha_actualizacion'])
+
+        entradas = iter_entradas_documentos(
+            postulaciones, exportacion.tipos_documento, fecha_descarga,
+            al_procesar=_registrar_progreso(exportacion),
+        )
+        latir = _latido(exportacion)
+        with archivo as f:
+            for chunk in iter_zip(entradas):
+                f.write(chunk)
+                latir()
+        os.replace(temporal, destino)
+
+        exportacion.estado = 'COMPLETADA'
+        exportacion.postulaciones_procesadas = len(postulaciones)
+        exportacion.nombre_archivo = nombre_zip(postulaciones, fecha_descarga)
+        exportacion.ruta_archivo = nombre_en_disco
+        exportacion.tamano_bytes = os.path.getsize(destino)
+        exportacion.error = ''
+    except Exception as e:
+        logger.exception('Error procesando la exportación %s', exportacion_id)
+        archivo.close()
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        exportacion.estado = 'FALLIDA'
+        exportacion.error = str(e)
+    finally:
+        exportacion.fecha_fin = timezone.now()
+        exportacion.save()
@@ -0,0 +1,124 @@
+"""
+Motor de escritura de archivos ZIP en streaming.
+
+El archivo se genera entrada por entrada y se entrega en fragmentos a medida
+que se escribe, sin mantener el ZIP completo ni un archivo completo en
+memoria: el consumo por descarga queda acotado por CHUNK_SIZE sin importar
+el tamaño total del archivo.
+
+Los formatos que ya vienen comprimidos (PDF, JPEG, PNG) se guardan con
+ZIP_STORED; volver a comprimirlos solo gasta CPU sin reducir el tamaño.
+"""
+import io
+import os
+import time
+import zipfile
+from dataclasses import dataclass
+
+from django.core.files.storage import default_storage
+
+
+CHUNK_SIZE = 64 * 1024
+
+EXTENSIONES_SIN_COMPRESION = {'.pdf', '.jpg', '.jpeg', '.png'}
+
+
+@dataclass(frozen=True)
+class EntradaZip:
+    """
+    Entrada a escribir en el ZIP.
+
+    nombre: ruta dentro del archivo ZIP.
+    ruta:   ruta del archivo en el storage; None indica una carpeta vacía.
+    """
+    nombre: str
+    ruta: str | None = None
+
+
+class _BufferSalida(io.RawIOBase):
+    """
+    Destino no posicionable para zipfile que acumula los bytes escritos
+    hasta que el generador los entrega.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._partes: list[bytes] = []
+        self._posicion = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._partes.append(bytes(data))
+        self._posicion += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._posicion
+
+    def flush(self):
+        pass
+
+    def vaciar(self) -> bytes:
+        data = b''.join(self._partes)
+        self._partes.clear()
+        return data
+
+
+def compresion_para(nombre: str) -> int:
+    """Método de compresión según la extensión del archivo."""
+    ext = os.path.splitext(nombre)[1].lower()
+    return zipfile.ZIP_STORED if ext in EXTENSIONES_SIN_COMPRESION else zipfile.ZIP_DEFLATED
+
+
+def iter_zip(entradas, chunk_size: int = CHUNK_SIZE):
+    """
+    Genera los bytes de un ZIP con las entradas dadas.
+
+    Los archivos que no se pueden abrir en el storage se omiten, igual que
+    hacía la descarga en memoria.
+    """
+    salida = _BufferSalida()
+    with zipfile.ZipFile(salida, 'w') as zf:
+        for entrada in entradas:
+            if entrada.ruta is None:
+                zf.writestr(entrada.nombre.rstrip('/') + '/', b'')
+            else:
+                yield from _copiar_archivo(zf, salida, entrada, chunk_size)
+            data = salida.vaciar()
+            if data:
+                yield data
+    # Directorio central
+    data = salida.vaciar()
+    if data:
+        yield data
+
+
+def _copiar_archivo(zf, salida, entrada, chunk_size):
+    try:
+        origen = default_storage.open(entrada.ruta, 'rb')
+    except (FileNotFoundError, OSError):
+        return
+
+    with origen:
+        info = zipfile.ZipInfo(entrada.nombre, date_time=time.localtime()[:6])
+        info.compress_type = compresion_para(entrada.nombre)
+        try:
+            # Con el tamaño conocido zipfile decide si la entrada requiere ZIP64
+            info.file_size = origen.size
+        except (AttributeError, OSError):
+            pass
+
+        with zf.open(info, 'w') as destino:
+            while True:
+                try:
+                    chunk = origen.read(chunk_size)
+                except OSError:
+                    break
+                if not chunk:
+                    break
+                destino.write(chunk)
+                data = salida.vaciar()
+                if data:
+                    yield data
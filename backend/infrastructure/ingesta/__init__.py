@@ -0,0 +1,12 @@
+"""
+Ingesta diferida del registro público del hogar: cola local durable y
+escritura por lotes.
+"""
+from .cola import encolar
+from .procesamiento import estado_registro, procesar_lote
+
+__all__ = [
+    "encolar",
+    "estado_registro",
+    "procesar_lote",
+]
@@ -0,0 +1,156 @@
+"""
+Cola local y durable de registros del hogar recibidos en modo diferido.
+
+Cada envío es un archivo JSON en INGESTA_ROOT que pasa por tres carpetas:
+
+    pendientes/{ticket}.json    recibido, esperando un worker
+    procesando/{ticket}.json    reclamado por un worker
+    resultados/{ticket}.json    escrito en la BD (o rechazado)
+
+Los archivos se escriben en tmp/ con fsync y se mueven con un rename
+atómico, así que un envío aceptado sobrevive a un reinicio y nunca queda
+a medio escribir. Reclamar también es un rename: si dos workers intentan
+el mismo archivo solo uno lo consigue.
+
+El ticket es el radicado provisional que recibe el ciudadano. Empieza por
+la fecha de recepción, de modo que el orden de los nombres es el orden de
+llegada.
+"""
+import json
+import os
+import re
+import tempfile
+import time
+import uuid
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+PENDIENTES = 'pendientes'
+PROCESANDO = 'procesando'
+RESULTADOS = 'resultados'
+
+PATRON_TICKET = re.compile(r'^PRV-\d{8}-\d{12}-[0-9A-F]{8}$')
+
+
+def _directorio(nombre) -> str:
+    directorio = os.path.join(settings.INGESTA_ROOT, nombre)
+    os.makedirs(directorio, exist_ok=True)
+    return directorio
+
+
+def _ruta(carpeta, ticket) -> str:
+    return os.path.join(_directorio(carpeta), f'{ticket}.json')
+
+
+def _escribir(carpeta, ticket, contenido: dict) -> None:
+    fd, tmp = tempfile.mkstemp(dir=_directorio('tmp'), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as destino:
+            json.dump(contenido, destino, cls=DjangoJSONEncoder)
+            destino.flush()
+            os.fsync(destino.fileno())
+        os.replace(tmp, _ruta(carpeta, ticket))
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _leer(ruta) -> dict:
+    with open(ruta, encoding='utf-8') as origen:
+        return json.load(origen)
+
+
+def nuevo_ticket(ahora=None) -> str:
+    """PRV-AAAAMMDD-<hora con microsegundos>-<sufijo aleatorio>."""
+    ahora = timezone.localtime(ahora or timezone.now())
+    return f"PRV-{ahora:%Y%m%d}-{ahora:%H%M%S%f}-{uuid.uuid4().hex[:8].upper()}"
+
+
+def encolar(etapa_id: int, payload: dict) -> dict:
+    """Guarda el envío validado en la cola. Retorna la entrada con su ticket."""
+    entrada = {
+        'ticket': nuevo_ticket(),
+        'etapa_id': etapa_id,
+        'payload': payload,
+        'fecha_recepcion': timezone.now(),
+        'intentos': 0,
+    }
+    _escribir(PENDIENTES, entrada['ticket'], entrada)
+    return entrada
+
+
+def reclamar(lote: int) -> list[dict]:
+    """Mueve a procesando/ hasta `lote` envíos pendientes, en orden de llegada."""
+    pendientes = _directorio(PENDIENTES)
+    entradas = []
+    for nombre in sorted(os.listdir(pendientes)):
+        if len(entradas) >= lote:
+            break
+        if not nombre.endswith('.json'):
+            continue
+        origen = os.path.join(pendientes, nombre)
+        destino = os.path.join(_directorio(PROCESANDO), nombre)
+        try:
+            # El rename conserva el mtime de la recepción; se renueva antes
+            # para que reencolar_abandonados mida desde el reclamo
+            os.utime(origen)
+            os.rename(origen, destino)
+        except FileNotFoundError:
+            continue  # lo reclamó otro worker
+        entradas.append(_leer(destino))
+    return entradas
+
+
+def completar(ticket: str, resultado: dict) -> None:
+    """Publica el resultado del envío y lo retira de procesando/."""
+    _escribir(RESULTADOS, ticket, resultado)
+    try:
+        os.remove(_ruta(PROCESANDO, ticket))
+    except FileNotFoundError:
+        pass
+
+
+def devolver(entrada: dict) -> None:
+    """Regresa un envío reclamado a pendientes/ contando el intento fallido."""
+    entrada = {**entrada, 'intentos': entrada.get('intentos', 0) + 1}
+    _escribir(PENDIENTES, entrada['ticket'], entrada)
+    try:
+        os.remove(_ruta(PROCESANDO, entrada['ticket']))
+    except FileNotFoundError:
+        pass
+
+
+def reencolar_abandonados(minutos: int) -> int:
+    """Devuelve a pendientes/ los envíos reclamados hace más de `minutos` (según su mtime)."""
+    procesando = _directorio(PROCESANDO)
+    limite = time.time() - minutos * 60
+    reencolados = 0
+    for nombre in os.listdir(procesando):
+        ruta = os.path.join(procesando, nombre)
+        try:
+            if os.path.getmtime(ruta) < limite:
+                os.rename(ruta, os.path.join(_directorio(PENDIENTES), nombre))
+                reencolados += 1
+        except FileNotFoundError:
+            continue
+    return reencolados
+
+
+def consultar(ticket: str) -> dict | None:
+    """
+    {'estado': ...} del envío según la cola: PENDIENTE, EN_PROCESO o el
+    resultado publicado. None si la cola no lo conoce.
+    """
+    if not PATRON_TICKET.match(ticket):
+        return None
+    if os.path.exists(_ruta(PENDIENTES, ticket)):
+        return {'estado': 'PENDIENTE'}
+    if os.path.exists(_ruta(PROCESANDO, ticket)):
+        return {'estado': 'EN_PROCESO'}
+    try:
+        return _leer(_ruta(RESULTADOS, ticket))
+    except FileNotFoundError:
+        return None
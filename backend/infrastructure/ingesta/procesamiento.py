@@ -0,0 +1,118 @@
+"""
+Escritura por lotes de los registros del hogar encolados.
+
+Cada lote se confirma en una sola transacción: un savepoint por hogar
+aísla los fallos, y la fila de RegistroEncolado de cada envío se crea en
+la misma transacción que el hogar. Si el worker se interrumpe antes de
+publicar los resultados, al reprocesar el lote los tickets que ya tienen
+fila no se vuelven a registrar.
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from infrastructure.database.models import Etapa, RegistroEncolado
+from infrastructure.database.registro_hogar import CedulasYaRegistradas, registrar_hogar
+
+from . import cola
+
+logger = logging.getLogger(__name__)
+
+
+def _resultado(registro: RegistroEncolado) -> dict:
+    return {'estado': registro.estado, **registro.respuesta}
+
+
+def _procesar(entrada: dict, etapas: dict) -> RegistroEncolado:
+    registro = RegistroEncolado(
+        ticket=entrada['ticket'],
+        etapa_id=entrada['etapa_id'],
+        fecha_recepcion=parse_datetime(entrada['fecha_recepcion']),
+    )
+    etapa = etapas.get(entrada['etapa_id'])
+    if etapa is None:
+        registro.estado = 'RECHAZADO'
+        registro.respuesta = {'detail': 'La etapa ya no existe.'}
+        return registro
+
+    payload = entrada['payload']
+    try:
+        hogar = registrar_hogar(etapa, payload['info_hogar'], payload['miembros'])
+    except CedulasYaRegistradas as exc:
+        registro.estado = 'RECHAZADO'
+        registro.respuesta = {'detail': str(exc)}
+        return registro
+
+    registro.estado = 'REGISTRADO'
+    registro.postulacion = hogar.postulacion
+    registro.respuesta = hogar.respuesta()
+    return registro
+
+
+def procesar_lote(lote: int | None = None) -> int:
+    """
+    Reclama y escribe hasta `lote` envíos (INGESTA_LOTE por defecto).
+    Retorna cuántos se reclamaron.
+    """
+    entradas = cola.reclamar(lote or getattr(settings, 'INGESTA_LOTE', 50))
+    if not entradas:
+        return 0
+
+    max_intentos = getattr(settings, 'INGESTA_MAX_INTENTOS', 5)
+    previos = {
+        r.ticket: r
+        for r in RegistroEncolado.objects.filter(ticket__in=[e['ticket'] for e in entradas])
+    }
+    etapas = Etapa.objects.filter(activo_logico=True).in_bulk(
+        {e['etapa_id'] for e in entradas}
+    )
+
+    registros, reintentar = [], []
+    try:
+        with transaction.atomic():
+            for entrada in entradas:
+                if entrada['ticket'] in previos:
+                    continue
+                if entrada.get('intentos', 0) >= max_intentos:
+                    registros.append(RegistroEncolado(
+                        ticket=entrada['ticket'],
+                        etapa_id=entrada['etapa_id'],
+                        estado='FALLIDO',
+                        respuesta={'detail': 'No fue posible procesar el registro. Intente enviarlo de nuevo.'},
+                        fecha_recepcion=parse_datetime(entrada['fecha_recepcion']),
+                    ))
+                    continue
+                try:
+                    with transaction.atomic():
+                        registros.append(_procesar(entrada, etapas))
+                except Exception:
+                    logger.exception('Error procesando el registro encolado %s', entrada['ticket'])
+                    reintentar.append(entrada)
+            RegistroEncolado.objects.bulk_create(registros)
+    except Exception:
+        # P. ej. otro worker confirmó uno de estos tickets: no quedó nada del
+        # lote, así que todos vuelven a la cola en vez de quedar en procesando/
+        logger.exception('Error confirmando un lote de registros encolados')
+        registros = []
+        reintentar = [e for e in entradas if e['ticket'] not in previos]
+
+    for registro in [*previos.values(), *registros]:
+        cola.completar(registro.ticket, _resultado(registro))
+    for entrada in reintentar:
+        cola.devolver(entrada)
+    return len(entradas)
+
+
+def estado_registro(ticket: str) -> dict | None:
+    """
+    Estado del envío con ese radicado provisional: primero según la cola
+    (sin tocar la BD) y, si ya no está en ella, desde RegistroEncolado.
+    """
+    resultado = cola.consultar(ticket)
+    if resultado is None and cola.PATRON_TICKET.match(ticket):
+        registro = RegistroEncolado.objects.filter(ticket=ticket).first()
+        if registro is not None:
+            resultado = _resultado(registro)
+    return resultado
@@ -0,0 +1,11 @@
+"""
+Almacenamiento de documentos: catálogo de metadatos de archivos.
+"""
+from .catalogo import entradas_catalogo, registrar_archivo, resolver_ruta_storage, rutas_canonicas
+
+__all__ = [
+    "entradas_catalogo",
+    "registrar_archivo",
+    "resolver_ruta_storage",
+    "rutas_canonicas",
+]
@@ -0,0 +1,125 @@
+"""
+Área de preparación de las cargas fragmentadas (subidas reanudables).
+
+Cada carga tiene su carpeta en CARGAS_FRAGMENTADAS_ROOT con un archivo por
+fragmento:
+
+    {CARGAS_FRAGMENTADAS_ROOT}/{carga_id}/{indice:06d}.part
+
+Los fragmentos se escriben en un archivo temporal y se renombran solo cuando
+su SHA-256 coincide con el enviado por el cliente, así un fragmento cortado a
+la mitad nunca queda como recibido. El ensamblado concatena los fragmentos
+por bloques en un archivo temporal, sin copiar el archivo completo en memoria.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+
+CHUNK_SIZE = 64 * 1024
+
+
+class FragmentoInvalido(ValueError):
+    """El fragmento recibido no coincide con el tamaño o el checksum esperado."""
+
+
+class FragmentosFaltantes(Exception):
+    """Fragmentos registrados como recibidos que ya no están en el área de preparación."""
+
+    def __init__(self, indices: list[int]):
+        super().__init__(f'Faltan los fragmentos {indices}; deben enviarse de nuevo.')
+        self.indices = indices
+
+
+def directorio_carga(carga_id) -> str:
+    return os.path.join(settings.CARGAS_FRAGMENTADAS_ROOT, str(carga_id))
+
+
+def ruta_fragmento(carga_id, indice: int) -> str:
+    return os.path.join(directorio_carga(carga_id), f'{indice:06d}.part')
+
+
+def guardar_fragmento(carga_id, indice: int, stream, tamano_esperado: int, sha256_esperado: str) -> None:
+    """
+    Copia el cuerpo de la petición (`stream`) al fragmento `indice`.
+
+    Lanza FragmentoInvalido si el tamaño o el SHA-256 no coinciden; en ese
+    caso no queda nada escrito. Reenviar un fragmento ya recibido lo reemplaza.
+    """
+    directorio = directorio_carga(carga_id)
+    os.makedirs(directorio, exist_ok=True)
+
+    digest = hashlib.sha256()
+    tamano = 0
+    fd, tmp = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as destino:
+            while stream is not None:
+                # Se lee un byte más de lo esperado para detectar cuerpos sobrantes
+                chunk = stream.read(min(CHUNK_SIZE, tamano_esperado + 1 - tamano))
+                if not chunk:
+                    break
+                digest.update(chunk)
+                tamano += len(chunk)
+                destino.write(chunk)
+                if tamano > tamano_esperado:
+                    break
+
+        if tamano != tamano_esperado:
+            raise FragmentoInvalido(
+                f'El fragmento {indice} debe medir {tamano_esperado} bytes.'
+            )
+        if digest.hexdigest() != sha256_esperado.lower():
+            raise FragmentoInvalido(f'El checksum del fragmento {indice} no coincide.')
+
+        os.replace(tmp, ruta_fragmento(carga_id, indice))
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def ensamblar(carga_id, total_fragmentos: int, tamano_total: int, sha256_esperado: str = '') -> str:
+    """
+    Concatena los fragmentos en un archivo temporal dentro de la carpeta de la
+    carga y devuelve su ruta. Verifica el tamaño total y, si se conoce, el
+    SHA-256 del archivo completo (FragmentoInvalido si no coinciden).
+    Lanza FragmentosFaltantes si algún fragmento ya no está en disco.
+    """
+    faltantes = [i for i in range(total_fragmentos) if not os.path.exists(ruta_fragmento(carga_id, i))]
+    if faltantes:
+        raise FragmentosFaltantes(faltantes)
+
+    directorio = directorio_carga(carga_id)
+    digest = hashlib.sha256()
+    tamano = 0
+    fd, ruta = tempfile.mkstemp(dir=directorio, suffix='.ensamblado')
+    try:
+        with os.fdopen(fd, 'wb') as destino:
+            for indice in range(total_fragmentos):
+                try:
+                    fragmento = open(ruta_fragmento(carga_id, indice), 'rb')
+                except FileNotFoundError:
+                    # Se borró mientras se ensamblaba (p. ej. una limpieza)
+                    raise FragmentosFaltantes([indice]) from None
+                with fragmento:
+                    for chunk in iter(lambda: fragmento.read(CHUNK_SIZE), b''):
+                        digest.update(chunk)
+                        tamano += len(chunk)
+                        destino.write(chunk)
+
+        if tamano != tamano_total:
+            raise FragmentoInvalido('El tamaño del archivo ensamblado no coincide con el declarado.')
+        if sha256_esperado and digest.hexdigest() != sha256_esperado.lower():
+            raise FragmentoInvalido('El checksum del archivo ensamblado no coincide.')
+    except BaseException:
+        os.remove(ruta)
+        raise
+    return ruta
+
+
+def limpiar(carga_id) -> None:
+    """Elimina la carpeta de preparación de la carga."""
+    shutil.rmtree(directorio_carga(carga_id), ignore_errors=True)
@@ -0,0 +1,148 @@
+"""
+Catálogo de metadatos de archivos (tabla catalogo_archivos).
+
+Por cada nombre guardado en un FileField de documentos se registra la ruta
+canónica en el storage (resolviendo el prefijo 'documentos/' duplicado de
+registros antiguos), el tamaño, el SHA-256, el tipo MIME y la fecha de la
+última verificación. Se llena al subir el archivo (señales en
+infrastructure.database.signals) y con el comando `catalogar_archivos` para
+los existentes.
+
+Con el catálogo, las URLs del detalle y las entradas del ZIP se resuelven con
+una consulta a la BD en lugar de llamadas a storage.exists(). Si una petición
+encuentra un nombre sin catalogar solo registra existencia y tamaño; el
+SHA-256 (y con él la cola de imágenes) lo completa `catalogar_archivos`.
+"""
+import hashlib
+import logging
+import mimetypes
+
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from infrastructure.database.models import ArchivoCatalogo
+from shared.imagenes import es_imagen
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+
+def resolver_ruta_storage(name):
+    """Resuelve la ruta real en el storage, manejando el prefijo documentos/ duplicado."""
+    candidate = name.lstrip('/')
+    if default_storage.exists(candidate):
+        return candidate
+    # Quitar o agregar prefijo 'documentos/' si está desalineado con MEDIA_ROOT
+    if candidate.startswith('documentos/'):
+        alt = candidate.replace('documentos/', '', 1)
+    else:
+        alt = f'documentos/{candidate}'
+    if default_storage.exists(alt):
+        return alt
+    return None
+
+
+def calcular_metadatos(ruta_canonica: str) -> dict:
+    """Tamaño, SHA-256 y tipo MIME de un archivo del storage (lectura por bloques)."""
+    digest = hashlib.sha256()
+    tamano = 0
+    with default_storage.open(ruta_canonica, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+            tamano += len(chunk)
+    return {
+        'tamano_bytes': tamano,
+        'sha256': digest.hexdigest(),
+        'mime_type': mimetypes.guess_type(ruta_canonica)[0] or 'application/octet-stream',
+    }
+
+
+def registrar_archivo(name: str, calcular_hash: bool = True) -> ArchivoCatalogo | None:
+    """
+    Verifica el archivo en el storage y guarda (o actualiza) su entrada en el
+    catálogo. Si el archivo no existe queda registrado con existe=False.
+
+    Con calcular_hash=False no se lee el contenido: se guardan tamaño y MIME
+    con sha256 vacío, y la imagen no entra en cola hasta que se calcule.
+    """
+    if not name:
+        return None
+    ruta_canonica = resolver_ruta_storage(name)
+    datos = {
+        'ruta_canonica': ruta_canonica or '',
+        'existe': ruta_canonica is not None,
+        'fecha_verificacion': timezone.now(),
+    }
+    if ruta_canonica:
+        try:
+            if calcular_hash:
+                datos.update(calcular_metadatos(ruta_canonica))
+            else:
+                datos.update(
+                    tamano_bytes=default_storage.size(ruta_canonica),
+                    sha256='',
+                    mime_type=mimetypes.guess_type(ruta_canonica)[0] or 'application/octet-stream',
+                )
+        except OSError:
+            logger.warning('No se pudo leer %s para el catálogo', ruta_canonica)
+            datos['existe'] = False
+            datos['ruta_canonica'] = ''
+
+    # Las fotos quedan en cola para generar su versión reducida y miniatura,
+    # salvo que ya se hayan procesado con el mismo contenido.
+    previa = ArchivoCatalogo.objects.filter(ruta=name).values('sha256', 'estado_imagen').first()
+    ya_procesada = (
+        previa is not None
+        and previa['estado_imagen'] == 'PROCESADA'
+        and previa['sha256'] == datos.get('sha256')
+    )
+    if not ya_procesada:
+        # Los derivados se nombran por SHA-256: sin él aún no se pueden generar
+        pendiente = datos['existe'] and bool(datos.get('sha256')) and es_imagen(name)
+        datos.update(
+            estado_imagen='PENDIENTE' if pendiente else 'NO_APLICA',
+            version_reducida='',
+            miniatura='',
+        )
+
+    entrada, _ = ArchivoCatalogo.objects.update_or_create(ruta=name, defaults=datos)
+    return entrada
+
+
+def entradas_catalogo(names) -> dict:
+    """
+    Devuelve {nombre: ArchivoCatalogo} con una sola consulta, registrando
+    (sin calcular el hash) los nombres que aún no están en el catálogo.
+    """
+    names = {n for n in names if n}
+    if not names:
+        return {}
+    resultado = {e.ruta: e for e in ArchivoCatalogo.objects.filter(ruta__in=names)}
+    for name in names - resultado.keys():
+        resultado[name] = registrar_archivo(name, calcular_hash=False)
+    return resultado
+
+
+def rutas_canonicas(names, registrar_faltantes: bool = True) -> dict:
+    """
+    Devuelve {nombre: ruta_canonica o None} con una sola consulta.
+
+    Los nombres que aún no están en el catálogo (p. ej. antes de correr el
+    backfill) se verifican en el storage y se registran sin calcular el hash,
+    de modo que cada archivo se consulta en disco una sola vez.
+    """
+    names = {n for n in names if n}
+    if not names:
+        return {}
+    resultado = {
+        e.ruta: (e.ruta_canonica if e.existe else None)
+        for e in ArchivoCatalogo.objects.filter(ruta__in=names).only('ruta', 'ruta_canonica', 'existe')
+    }
+    for name in names - resultado.keys():
+        if registrar_faltantes:
+            entrada = registrar_archivo(name, calcular_hash=False)
+            resultado[name] = entrada.ruta_canonica if entrada and entrada.existe else None
+        else:
+            resultado[name] = resolver_ruta_storage(name)
+    return resultado
@@ -0,0 +1,89 @@
+"""
+Storage de documentos direccionado por contenido (opcional).
+
+Se activa con DOCUMENTOS_DEDUPLICADOS=True. Cada subida se guarda en
+
+    documentos/blobs/{sha[:2]}/{sha[2:4]}/{sha256}{ext}
+
+sin importar el upload_to del FileField; si ese contenido ya existe no se
+vuelve a escribir y el FileField apunta al archivo compartido. La tabla
+blobs_contenido lleva la cuenta de referencias: delete() la descuenta y solo
+borra el archivo cuando llega a cero. Las señales de los documentos llaman a
+delete() al borrarlos físicamente o al reemplazar su archivo; el soft-delete
+no descuenta, porque la fila sigue apuntando al archivo.
+"""
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+
+PREFIJO_BLOBS = 'documentos/blobs'
+
+
+def ruta_blob(sha256: str, nombre_original: str) -> str:
+    ext = os.path.splitext(nombre_original)[1].lower()
+    return f'{PREFIJO_BLOBS}/{sha256[:2]}/{sha256[2:4]}/{sha256}{ext}'
+
+
+def sha256_de(content) -> tuple[str, int]:
+    """SHA-256 y tamaño de un File de Django, leyéndolo por bloques."""
+    digest = hashlib.sha256()
+    tamano = 0
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+        tamano += len(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return digest.hexdigest(), tamano
+
+
+class ContenidoDireccionadoStorage(FileSystemStorage):
+    """FileSystemStorage que deduplica por SHA-256 con conteo de referencias."""
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            from django.core.files import File
+            content = File(content, name)
+
+        sha, tamano = sha256_de(content)
+        destino = ruta_blob(sha, name)
+
+        if not self.exists(destino):
+            guardado = super()._save(destino, content)
+            if guardado != destino:
+                # Otra subida escribió el mismo contenido al mismo tiempo
+                super().delete(guardado)
+
+        self.agregar_referencia(destino, sha, tamano)
+        return destino
+
+    @staticmethod
+    def agregar_referencia(ruta: str, sha: str, tamano: int) -> None:
+        from infrastructure.database.models import BlobContenido
+
+        with transaction.atomic():
+            blob, _ = BlobContenido.objects.select_for_update().get_or_create(
+                ruta=ruta, defaults={'sha256': sha, 'tamano_bytes': tamano},
+            )
+            BlobContenido.objects.filter(pk=blob.pk).update(referencias=F('referencias') + 1)
+
+    def delete(self, name):
+        from infrastructure.database.models import BlobContenido
+
+        if not name or not name.startswith(f'{PREFIJO_BLOBS}/'):
+            return super().delete(name)
+
+        with transaction.atomic():
+            blob = BlobContenido.objects.select_for_update().filter(ruta=name).first()
+            if blob and blob.referencias > 1:
+                BlobContenido.objects.filter(pk=blob.pk).update(referencias=F('referencias') - 1)
+                return
+            if blob:
+                blob.delete()
+        super().delete(name)
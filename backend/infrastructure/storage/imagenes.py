@@ -0,0 +1,92 @@
+"""
+Derivados de las fotos subidas (cédulas, fachadas, etc.).
+
+Por cada imagen JPEG/PNG del catálogo se genera, fuera de la petición de
+subida:
+
+  * una versión reducida (lado mayor MAX_LADO_IMAGEN) si la original excede
+    la resolución o el tamaño permitido, para revisarla sin descargar la foto
+    completa del celular;
+  * una miniatura JPEG para los listados y el detalle.
+
+El original no se modifica. Los derivados se guardan por contenido:
+
+    documentos/derivados/{sha[:2]}/{sha256}_{variante}{ext}
+
+de modo que un mismo archivo subido varias veces se procesa una sola vez.
+El catálogo actúa como cola (estado_imagen='PENDIENTE'); el comando
+`procesar_imagenes` la consume con un pool de hilos.
+"""
+import logging
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from infrastructure.database.models import ArchivoCatalogo
+from shared.imagenes import generar_miniatura, normalizar_imagen
+
+logger = logging.getLogger(__name__)
+
+PREFIJO_DERIVADOS = 'documentos/derivados'
+
+
+def ruta_derivado(sha256: str, variante: str, ext: str) -> str:
+    return f'{PREFIJO_DERIVADOS}/{sha256[:2]}/{sha256}_{variante}{ext}'
+
+
+def _guardar(ruta: str, contenido: bytes) -> str:
+    if default_storage.exists(ruta):
+        return ruta
+    return default_storage.save(ruta, ContentFile(contenido))
+
+
+def generar_derivados(entrada: ArchivoCatalogo) -> tuple[str, str]:
+    """Devuelve (version_reducida, miniatura); la primera vacía si no hace falta."""
+    previa = (
+        ArchivoCatalogo.objects
+        .filter(sha256=entrada.sha256, estado_imagen='PROCESADA')
+        .exclude(pk=entrada.pk)
+        .values('version_reducida', 'miniatura')
+        .first()
+    )
+    if previa:
+        return previa['version_reducida'], previa['miniatura']
+
+    with default_storage.open(entrada.ruta_canonica, 'rb') as f:
+        reducida = normalizar_imagen(f, entrada.tamano_bytes or 0)
+        f.seek(0)
+        miniatura = generar_miniatura(f)
+
+    ruta_reducida = ''
+    if reducida:
+        contenido, ext = reducida
+        ruta_reducida = _guardar(ruta_derivado(entrada.sha256, 'reducida', ext), contenido)
+    ruta_miniatura = _guardar(ruta_derivado(entrada.sha256, 'miniatura', '.jpg'), miniatura)
+    return ruta_reducida, ruta_miniatura
+
+
+def procesar_siguiente() -> bool:
+    """
+    Procesa la imagen pendiente más antigua. La fila queda bloqueada
+    (SKIP LOCKED) mientras se procesa, así varios hilos o procesos pueden
+    consumir la cola a la vez. Retorna False si no había pendientes.
+    """
+    with transaction.atomic():
+        entrada = (
+            ArchivoCatalogo.objects
+            .select_for_update(skip_locked=True)
+            .filter(estado_imagen='PENDIENTE')
+            .order_by('fecha_registro')
+            .first()
+        )
+        if entrada is None:
+            return False
+        try:
+            entrada.version_reducida, entrada.miniatura = generar_derivados(entrada)
+            entrada.estado_imagen = 'PROCESADA'
+        except Exception:
+            logger.exception('No se pudo procesar la imagen %s', entrada.ruta)
+            entrada.estado_imagen = 'FALLIDA'
+        entrada.save(update_fields=['version_reducida', 'miniatura', 'estado_imagen'])
+    return True
@@ -0,0 +1,92 @@
+"""
+Respuestas de descarga de archivos en disco con soporte de HTTP Range.
+
+Permite que un cliente reanude una descarga interrumpida pidiendo solo el
+tramo faltante (Range: bytes=N-). Se admite un único rango por petición; si
+el encabezado If-Range no coincide con el ETag actual se envía el archivo
+completo.
+"""
+import os
+import re
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+
+CHUNK_SIZE = 64 * 1024
+
+_RANGO_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _etag(ruta: str) -> str:
+    st = os.stat(ruta)
+    return f'"{st.st_size:x}-{int(st.st_mtime):x}"'
+
+
+def _parse_rango(encabezado: str, tamano: int):
+    """
+    Devuelve (inicio, fin) inclusivos, None si el encabezado no aplica
+    (se responde completo) o 'invalido' si el rango no es satisfacible.
+    """
+    m = _RANGO_RE.match(encabezado.strip())
+    if not m or (not m.group(1) and not m.group(2)):
+        return None
+    if m.group(1):
+        inicio = int(m.group(1))
+        fin = int(m.group(2)) if m.group(2) else tamano - 1
+    else:
+        # Sufijo: los últimos N bytes
+        sufijo = int(m.group(2))
+        if sufijo == 0:
+            return 'invalido'
+        inicio = max(tamano - sufijo, 0)
+        fin = tamano - 1
+    fin = min(fin, tamano - 1)
+    if inicio > fin or inicio >= tamano:
+        return 'invalido'
+    return inicio, fin
+
+
+def _iter_tramo(ruta, inicio, longitud):
+    with open(ruta, 'rb') as f:
+        f.seek(inicio)
+        restante = longitud
+        while restante > 0:
+            chunk = f.read(min(CHUNK_SIZE, restante))
+            if not chunk:
+                break
+            restante -= len(chunk)
+            yield chunk
+
+
+def respuesta_archivo(request, ruta: str, nombre: str, content_type: str = 'application/octet-stream'):
+    """Sirve `ruta` como adjunto, respondiendo 206/416 si la petición trae Range."""
+    tamano = os.path.getsize(ruta)
+    etag = _etag(ruta)
+    disposition = f'attachment; filename="{nombre}"'
+
+    rango = None
+    encabezado = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if encabezado and (not if_range or if_range == etag):
+        rango = _parse_rango(encabezado, tamano)
+
+    if rango == 'invalido':
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{tamano}'
+        response['Accept-Ranges'] = 'bytes'
+        return response
+
+    if rango is None:
+        response = FileResponse(open(ruta, 'rb'), content_type=content_type)
+        response['Content-Length'] = str(tamano)
+    else:
+        inicio, fin = rango
+        longitud = fin - inicio + 1
+        response = StreamingHttpResponse(_iter_tramo(ruta, inicio, longitud),
+                                         status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {inicio}-{fin}/{tamano}'
+        response['Content-Length'] = str(longitud)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Content-Disposition'] = disposition
+    return response
@@ -0,0 +1,92 @@
+"""
+Soporte del encabezado Idempotency-Key en los envíos públicos.
+
+Un cliente que reintenta un envío (p. ej. tras un timeout) con la misma
+clave recibe la primera respuesta tal cual, con `Idempotent-Replayed:
+true`, sin que la vista vuelva a validar ni escribir. Solo se guardan las
+respuestas 2xx; un error libera la clave para poder reintentar con ella.
+Sin el encabezado la vista se comporta como siempre.
+"""
+import functools
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from infrastructure.database.idempotencia import (
+    ClaveEnUso,
+    ClaveReutilizada,
+    guardar,
+    liberar,
+    reclamar,
+)
+
+CABECERA = 'Idempotency-Key'
+MAX_LONGITUD_CLAVE = 200
+
+# Encabezados de la respuesta original que se repiten en los reintentos
+CABECERAS_GUARDADAS = ('Location',)
+
+
+def _huella(data) -> str:
+    contenido = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+    return hashlib.sha256(contenido.encode()).hexdigest()
+
+
+def idempotente(accion: str):
+    """Decora una acción de detalle (`pk`) para aceptar Idempotency-Key."""
+    def decorador(metodo):
+        @functools.wraps(metodo)
+        def envoltura(self, request, pk=None, **kwargs):
+            clave_cliente = request.headers.get(CABECERA, '').strip()
+            if not clave_cliente:
+                return metodo(self, request, pk=pk, **kwargs)
+            if len(clave_cliente) > MAX_LONGITUD_CLAVE:
+                return Response(
+                    {'detail': f'{CABECERA} no puede superar {MAX_LONGITUD_CLAVE} caracteres.'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            clave = f'{accion}:{pk}:{clave_cliente}'
+            try:
+                guardada = reclamar(clave, _huella(request.data))
+            except ClaveReutilizada:
+                return Response(
+                    {'detail': f'{CABECERA} ya se usó con un contenido distinto.'},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            except ClaveEnUso:
+                respuesta = Response(
+                    {'detail': f'Hay una petición en curso con el mismo {CABECERA}.'},
+                    status=status.HTTP_409_CONFLICT,
+                )
+                respuesta['Retry-After'] = '1'
+                return respuesta
+
+            if guardada is not None:
+                respuesta = Response(guardada.cuerpo, status=guardada.estado_http)
+                for nombre, valor in guardada.cabeceras.items():
+                    respuesta[nombre] = valor
+                respuesta['Idempotent-Replayed'] = 'true'
+                return respuesta
+
+            try:
+                respuesta = metodo(self, request, pk=pk, **kwargs)
+            except BaseException:
+                liberar(clave)
+                raise
+            if status.is_success(respuesta.status_code):
+                # Se guarda ya codificado como lo envía DRF (fechas con microsegundos)
+                cuerpo = json.loads(json.dumps(respuesta.data, cls=JSONEncoder))
+                guardar(clave, respuesta.status_code, cuerpo, {
+                    nombre: respuesta[nombre]
+                    for nombre in CABECERAS_GUARDADAS if respuesta.has_header(nombre)
+                })
+            else:
+                liberar(clave)
+            return respuesta
+        return envoltura
+    return decorador
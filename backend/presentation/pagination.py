@@ -0,0 +1,90 @@
+"""
+Paginación por cursor (keyset) para listados extensos.
+
+A diferencia de LIMIT/OFFSET, el cursor guarda los valores de la última fila
+entregada y la siguiente página se obtiene con un WHERE sobre esos valores,
+de modo que el costo de cada página no crece con la profundidad del listado
+y el índice sobre las columnas de orden se aprovecha directamente.
+
+El cursor viaja firmado (django.core.signing) para que el cliente no pueda
+alterarlo.
+"""
+from django.core import signing
+from django.db.models import Q
+
+
+CURSOR_SALT = 'keyset-cursor'
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class CursorInvalido(ValueError):
+    """El cursor recibido no es válido o fue manipulado."""
+
+
+def encode_cursor(valores) -> str:
+    """Serializa y firma los valores de la última fila de la página."""
+    serializables = [v.isoformat() if hasattr(v, 'isoformat') else v for v in valores]
+    return signing.dumps(serializables, salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(cursor: str, n_campos: int) -> list:
+    """Verifica y decodifica un cursor generado por encode_cursor."""
+    try:
+        valores = signing.loads(cursor, salt=CURSOR_SALT)
+    except signing.BadSignature:
+        raise CursorInvalido('Cursor inválido.')
+    if not isinstance(valores, list) or len(valores) != n_campos:
+        raise CursorInvalido('Cursor inválido.')
+    return valores
+
+
+def parse_page_size(valor, default: int = DEFAULT_PAGE_SIZE) -> int:
+    """Convierte el query param page_size a entero acotado en [1, MAX_PAGE_SIZE]."""
+    try:
+        size = int(valor)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def filtro_posterior(campos, valores, descendente: bool = True) -> Q:
+    """
+    Construye el predicado "fila posterior al cursor" para un orden compuesto.
+
+    Para (a, b) descendente equivale a  a <= va AND (a < va OR (a = va AND b < vb)).
+    La cota sobre la primera columna permite al planificador usar un rango
+    sobre el índice en lugar de evaluar el OR fila por fila.
+    """
+    op = 'lt' if descendente else 'gt'
+    alternativas = Q()
+    for i, campo in enumerate(campos):
+        condicion = Q(**{f'{campo}__{op}': valores[i]})
+        for previo, valor_previo in zip(campos[:i], valores[:i]):
+            condicion &= Q(**{previo: valor_previo})
+        alternativas |= condicion
+    cota = Q(**{f'{campos[0]}__{op}e': valores[0]})
+    return cota & alternativas
+
+
+def paginar_keyset(qs, campos, cursor: str | None = None,
+                   page_size: int = DEFAULT_PAGE_SIZE, descendente: bool = True):
+    """
+    Devuelve (filas, next_cursor) para el queryset ordenado por `campos`.
+
+    `campos` debe terminar en una columna única (normalmente la PK) para que el
+    orden sea total. next_cursor es None cuando no hay más filas.
+    """
+    orden = [f'-{c}' if descendente else c for c in campos]
+    qs = qs.order_by(*orden)
+    if cursor:
+        valores = decode_cursor(cursor, len(campos))
+        qs = qs.filter(filtro_posterior(campos, valores, descendente))
+
+    filas = list(qs[:page_size + 1])
+    next_cursor = None
+    if len(filas) > page_size:
+        filas = filas[:page_size]
+        ultima = filas[-1]
+        next_cursor = encode_cursor([getattr(ultima, c) for c in campos])
+    return filas, next_cursor
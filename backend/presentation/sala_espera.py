@@ -0,0 +1,205 @@
+"""
+Sala de espera (control de admisión) para los endpoints públicos.
+
+El throttle anónimo limita a cada IP, pero no a miles de ciudadanos
+distintos llegando a la vez. Aquí se limita la concurrencia global de las
+peticiones públicas anónimas a SALA_ESPERA_CAPACIDAD menos
+SALA_ESPERA_RESERVA_PERSONAL: esa reserva queda siempre libre para los
+funcionarios autenticados, que no pasan por la sala de espera.
+
+Cuando no hay cupo la petición recibe 503 con Retry-After, su posición y
+un turno firmado. Al reintentar con el turno en el encabezado
+X-Sala-Espera-Turno se atiende en orden de llegada: cada cupo que se
+libera llama al siguiente turno, y mientras haya turnos sin llamar las
+peticiones nuevas pasan a la fila aunque haya un cupo libre.
+
+Cada turno admitido se marca como usado: un turno llamado entra una sola
+vez, así que no sirve para repetir la entrada ni para repartirlo.
+
+El estado vive en el cache de Django, que debe ser compartido entre
+procesos (Redis, ver REDIS_URL en settings) para que el límite sea global.
+Los contadores de la fila (siguiente, llamado) no vencen. Los cupos en uso
+son claves separadas con vigencia SALA_ESPERA_CUPO_VIGENCIA: si un proceso
+muere con peticiones en curso, solo sus cupos se liberan al vencer, sin
+reiniciar la fila ni el resto de cupos. Con capacidad 0 la sala de espera
+está desactivada.
+"""
+import math
+import random
+import secrets
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+CABECERA_TURNO = 'X-Sala-Espera-Turno'
+SALT_TURNO = 'sala-espera-turno'
+
+_CUPO = 'sala_espera:cupo:{}'
+_USADO = 'sala_espera:usado:{}'
+_SIGUIENTE = 'sala_espera:siguiente'
+_LLAMADO = 'sala_espera:llamado'
+_LLAMADO_EN = 'sala_espera:llamado_en'
+
+
+class SalaEsperaLlena(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_code = 'sala_espera'
+
+    def __init__(self, turno: int, posicion: int, espera: int):
+        super().__init__('Hay muchas personas usando el servicio en este momento. '
+                         'Conserve su turno; la página reintentará automáticamente.')
+        # Cuerpo con los números tal cual (APIException convierte todo a texto)
+        self.detail = {
+            'detail': self.detail,
+            'turno': signing.dumps(turno, salt=SALT_TURNO),
+            'posicion': posicion,
+            'reintentar_en': espera,
+        }
+        # DRF envía `wait` como Retry-After
+        self.wait = espera
+
+
+def _limite() -> int:
+    capacidad = getattr(settings, 'SALA_ESPERA_CAPACIDAD', 0)
+    reserva = getattr(settings, 'SALA_ESPERA_RESERVA_PERSONAL', 0)
+    return max(capacidad - reserva, 1) if capacidad else 0
+
+
+def _contador(clave) -> int:
+    return cache.get(clave) or 0
+
+
+def _incr(clave, delta=1) -> int:
+    # Sin vencimiento: reiniciar la fila dejaría pasar a los recién llegados
+    cache.add(clave, 0, None)
+    try:
+        return cache.incr(clave, delta)
+    except ValueError:
+        # Desalojado entre add e incr
+        cache.set(clave, delta, None)
+        return delta
+
+
+def _claves_cupos(limite) -> list[str]:
+    return [_CUPO.format(i) for i in range(limite)]
+
+
+def _ocupar_cupo(limite) -> tuple[str, str] | None:
+    """Toma un cupo libre. Retorna (clave, ficha) o None si no hay."""
+    claves = _claves_cupos(limite)
+    ocupados = cache.get_many(claves)
+    libres = [clave for clave in claves if clave not in ocupados]
+    random.shuffle(libres)
+    ficha = secrets.token_hex(8)
+    vigencia = getattr(settings, 'SALA_ESPERA_CUPO_VIGENCIA', 120)
+    for clave in libres:
+        if cache.add(clave, ficha, vigencia):
+            return clave, ficha
+    return None
+
+
+def _llamar(cantidad) -> int:
+    """Llama hasta `cantidad` turnos en espera. Retorna el último turno llamado."""
+    llamado, siguiente = _contador(_LLAMADO), _contador(_SIGUIENTE)
+    if cantidad > 0 and llamado < siguiente:
+        llamado = _incr(_LLAMADO, min(cantidad, siguiente - llamado))
+        cache.set(_LLAMADO_EN, time.time(), None)
+    return llamado
+
+
+def _llamar_si_inactiva(limite) -> int:
+    """
+    Cada cupo liberado llama un turno. Si los turnos llamados no vuelven
+    (el ciudadano cerró la página) y hay cupos libres, tras unos
+    reintentos se llaman los siguientes para no dejar la fila detenida.
+    """
+    paciencia = 3 * getattr(settings, 'SALA_ESPERA_REINTENTO_SEGUNDOS', 2)
+    if time.time() - (cache.get(_LLAMADO_EN) or 0) < paciencia:
+        return _contador(_LLAMADO)
+    return _llamar(limite - len(cache.get_many(_claves_cupos(limite))))
+
+
+def _leer_turno(valor) -> int | None:
+    if not valor:
+        return None
+    try:
+        return signing.loads(
+            valor, salt=SALT_TURNO, max_age=getattr(settings, 'SALA_ESPERA_TURNO_VIGENCIA', 600),
+        )
+    except signing.BadSignature:
+        return None
+
+
+def _esperar(turno, llamado, limite):
+    posicion = max(turno - llamado, 1)
+    paso = getattr(settings, 'SALA_ESPERA_REINTENTO_SEGUNDOS', 2)
+    espera = min(max(math.ceil(posicion / limite) * paso, 1), 30)
+    raise SalaEsperaLlena(turno, posicion, espera)
+
+
+def admitir(turno_firmado: str | None = None) -> tuple[str, str] | None:
+    """
+    Ocupa un cupo para la petición o lanza SalaEsperaLlena con su turno.
+    Retorna el cupo para `liberar`, o None si la sala está desactivada.
+    """
+    limite = _limite()
+    if not limite:
+        return None
+
+    turno = _leer_turno(turno_firmado)
+    llamado = _llamar_si_inactiva(limite)
+    if turno is None:
+        if llamado < _contador(_SIGUIENTE):
+            _esperar(_incr(_SIGUIENTE), llamado, limite)
+    elif turno > llamado:
+        _esperar(turno, llamado, limite)
+
+    usado = _USADO.format(turno)
+    vigencia = getattr(settings, 'SALA_ESPERA_TURNO_VIGENCIA', 600)
+    if turno is not None and not cache.add(usado, 1, vigencia):
+        # El turno ya entró una vez: se atiende como una llegada nueva
+        _esperar(_incr(_SIGUIENTE), llamado, limite)
+
+    cupo = _ocupar_cupo(limite)
+    if cupo is None:
+        if turno is not None:
+            cache.delete(usado)
+        _esperar(turno if turno is not None else _incr(_SIGUIENTE), llamado, limite)
+    return cupo
+
+
+def liberar(cupo: tuple[str, str]) -> None:
+    """Devuelve el cupo de una petición admitida y llama al siguiente turno."""
+    clave, ficha = cupo
+    # Si el cupo venció y lo tomó otra petición, no se le quita
+    if cache.get(clave) == ficha:
+        cache.delete(clave)
+    _llamar(1)
+
+
+class SalaEsperaMixin:
+    """
+    Aplica la sala de espera a las acciones de ACCIONES_SALA_ESPERA cuando
+    el usuario no está autenticado. Se evalúa después de autenticar y de
+    los throttles, y el cupo se libera al terminar la respuesta (también si
+    la vista falla).
+    """
+
+    ACCIONES_SALA_ESPERA: set = set()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.action in self.ACCIONES_SALA_ESPERA and not request.user.is_authenticated:
+            self._cupo_sala_espera = admitir(request.headers.get(CABECERA_TURNO))
+
+    def dispatch(self, request, *args, **kwargs):
+        self._cupo_sala_espera = None
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            if self._cupo_sala_espera:
+                liberar(self._cupo_sala_espera)
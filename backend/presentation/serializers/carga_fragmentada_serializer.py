@@ -0,0 +1,41 @@
+"""
+Serializers para las cargas fragmentadas (subida reanudable de documentos).
+"""
+
+from rest_framework import serializers
+from infrastructure.database.models import CargaFragmentada
+
+# Tamaño de fragmento: por debajo de DATA_UPLOAD_MAX_MEMORY_SIZE (5 MB)
+TAMANO_FRAGMENTO_DEFECTO = 1024 * 1024
+TAMANO_FRAGMENTO_MIN = 64 * 1024
+TAMANO_FRAGMENTO_MAX = 4 * 1024 * 1024
+
+
+class CargaFragmentadaInitSerializer(serializers.Serializer):
+    destino = serializers.ChoiceField(choices=CargaFragmentada.DESTINOS)
+    objeto_id = serializers.IntegerField(min_value=1)
+    tipo_documento = serializers.CharField(max_length=50)
+    nombre_archivo = serializers.CharField(max_length=300)
+    tamano_total = serializers.IntegerField(min_value=1)
+    tamano_fragmento = serializers.IntegerField(
+        required=False, default=TAMANO_FRAGMENTO_DEFECTO,
+        min_value=TAMANO_FRAGMENTO_MIN, max_value=TAMANO_FRAGMENTO_MAX,
+    )
+    sha256 = serializers.RegexField(r'^[0-9a-fA-F]{64}$', required=False, default='')
+    observaciones = serializers.CharField(required=False, default='', allow_blank=True)
+    numero_radicado_orfeo_solicitud = serializers.CharField(required=False, default='', allow_blank=True)
+    numero_radicado_orfeo_respuesta = serializers.CharField(required=False, default='', allow_blank=True)
+
+
+class CargaFragmentadaSerializer(serializers.ModelSerializer):
+    fragmentos_faltantes = serializers.ListField(child=serializers.IntegerField(), read_only=True)
+
+    class Meta:
+        model = CargaFragmentada
+        fields = [
+            'id', 'destino', 'objeto_id', 'tipo_documento', 'nombre_archivo',
+            'tamano_total', 'tamano_fragmento', 'total_fragmentos',
+            'fragmentos_recibidos', 'fragmentos_faltantes',
+            'estado', 'documento_id', 'fecha_creacion', 'fecha_expiracion',
+        ]
+        read_only_fields = fields
@@ -0,0 +1,315 @@
+"""
+ViewSet para cargas fragmentadas (subida reanudable de documentos grandes).
+
+Alternativa a las subidas multipart de una sola petición para conexiones
+inestables: el archivo se envía en fragmentos que pueden reintentarse uno a
+uno, y al completar se adjunta al mismo modelo de documento que usan los
+endpoints tradicionales.
+
+Endpoints:
+  POST   /api/cargas-fragmentadas/                               → iniciar carga
+  GET    /api/cargas-fragmentadas/{id}/                          → estado (fragmentos recibidos/faltantes)
+  PUT    /api/cargas-fragmentadas/{id}/fragmentos/{indice}/      → enviar fragmento (cuerpo binario,
+                                                                   encabezado X-Fragmento-Sha256)
+  POST   /api/cargas-fragmentadas/{id}/completar/                → ensamblar y crear el documento
+  DELETE /api/cargas-fragmentadas/{id}/                          → cancelar carga
+
+Los destinos HOGAR y MIEMBRO son públicos (igual que sus endpoints multipart);
+VISITA y PROCESO requieren autenticación. Una carga iniciada con sesión solo
+la puede consultar, continuar o cancelar el mismo usuario; las anónimas se
+identifican únicamente por su UUID.
+"""
+
+import math
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
+
+from infrastructure.database.models import (
+    CargaFragmentada,
+    DocumentoGestionHogar,
+    DocumentoMiembroHogar,
+    DocumentoProcesoInterno,
+    DocumentoVisitaEtapa2,
+    GestionHogarEtapa1,
+    MiembroHogar,
+    Postulacion,
+    Visita,
+)
+from infrastructure.storage import cargas_fragmentadas as staging
+from shared.file_validators import MAX_CHUNKED_FILE_SIZE, validate_file_metadata
+from presentation.serializers.carga_fragmentada_serializer import (
+    CargaFragmentadaInitSerializer,
+    CargaFragmentadaSerializer,
+)
+from presentation.views.documento_proceso_interno_viewset import actualizar_estado_por_documentos
+from presentation.views.visita_etapa2_viewset import VisitaEtapa2ViewSet
+
+DESTINOS_AUTENTICADOS = {'VISITA', 'PROCESO'}
+
+TIPOS_POR_DESTINO = {
+    'HOGAR':   {c[0] for c in DocumentoGestionHogar.TIPO_CHOICES},
+    'MIEMBRO': {c[0] for c in DocumentoMiembroHogar.TIPO_CHOICES},
+    'VISITA':  {c[0] for c in DocumentoVisitaEtapa2.TIPO_DOCUMENTO_CHOICES},
+    'PROCESO': {c[0] for c in DocumentoProcesoInterno.TIPO_DOCUMENTO_CHOICES},
+}
+
+
+def _objeto_destino_existe(destino, objeto_id):
+    if destino == 'HOGAR':
+        return GestionHogarEtapa1.objects.filter(postulacion_id=objeto_id).exists()
+    if destino == 'MIEMBRO':
+        return MiembroHogar.objects.filter(pk=objeto_id).exists()
+    if destino == 'VISITA':
+        return Visita.objects.filter(pk=objeto_id, activo_logico=True).exists()
+    return Postulacion.objects.filter(pk=objeto_id).exists()
+
+
+def _crear_documento(carga, archivo):
+    """Crea el documento del destino con el archivo ensamblado y aplica sus reglas de estado."""
+    if carga.destino == 'HOGAR':
+        gestion = GestionHogarEtapa1.objects.get(postulacion_id=carga.objeto_id)
+        return DocumentoGestionHogar.objects.create(
+            postulacion=gestion,
+            tipo_documento=carga.tipo_documento,
+            archivo=archivo,
+            observaciones=carga.observaciones,
+        )
+
+    if carga.destino == 'MIEMBRO':
+        return DocumentoMiembroHogar.objects.create(
+            miembro_id=carga.objeto_id,
+            tipo_documento=carga.tipo_documento,
+            archivo=archivo,
+            observaciones=carga.observaciones,
+        )
+
+    if carga.destino == 'VISITA':
+        visita = Visita.objects.select_related('postulacion').get(pk=carga.objeto_id)
+        doc = DocumentoVisitaEtapa2.objects.create(
+            visita=visita,
+            tipo_documento=carga.tipo_documento,
+            archivo=archivo,
+            nombre_archivo=carga.nombre_archivo,
+            observaciones=carga.observaciones,
+        )
+        VisitaEtapa2ViewSet._check_docs_y_actualizar_estado(visita)
+        return doc
+
+    doc = DocumentoProcesoInterno.objects.create(
+        postulacion_id=carga.objeto_id,
+        tipo_documento=carga.tipo_documento,
+        archivo=archivo,
+        nombre_archivo=carga.nombre_archivo,
+        numero_radicado_orfeo_solicitud=carga.metadatos.get('numero_radicado_orfeo_solicitud', ''),
+        numero_radicado_orfeo_respuesta=carga.metadatos.get('numero_radicado_orfeo_respuesta', ''),
+        observaciones=carga.observaciones,
+    )
+    actualizar_estado_por_documentos(carga.objeto_id)
+    return doc
+
+
+class CargaFragmentadaViewSet(viewsets.GenericViewSet):
+    """Subida reanudable de documentos por fragmentos."""
+
+    queryset = CargaFragmentada.objects.all()
+    serializer_class = CargaFragmentadaSerializer
+    permission_classes = [AllowAny]
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'cargas_fragmentadas'
+
+    def get_queryset(self):
+        # Las cargas de otro usuario responden 404, como si no existieran
+        propias = Q(usuario__isnull=True)
+        if self.request.user.is_authenticated:
+            propias |= Q(usuario_id=self.request.user.pk)
+        return CargaFragmentada.objects.filter(propias)
+
+    def _verificar_acceso(self, request, destino):
+        if destino in DESTINOS_AUTENTICADOS and not request.user.is_authenticated:
+            self.permission_denied(request, message='Este destino requiere autenticación.')
+
+    def _carga_en_curso(self, request):
+        carga = self.get_object()
+        self._verificar_acceso(request, carga.destino)
+        if carga.estado != 'EN_CURSO':
+            return carga, Response(
+                {'detail': f'La carga está {carga.get_estado_display().lower()}.'},
+                status=status.HTTP_409_CONFLICT,
+            )
+        if carga.fecha_expiracion <= timezone.now():
+            return carga, Response(
+                {'detail': 'La carga expiró; inicie una nueva.'},
+                status=status.HTTP_410_GONE,
+            )
+        return carga, None
+
+    def create(self, request):
+        """Inicia una carga y devuelve el tamaño y el número de fragmentos esperados."""
+        init = CargaFragmentadaInitSerializer(data=request.data)
+        init.is_valid(raise_exception=True)
+        d = init.validated_data
+
+        self._verificar_acceso(request, d['destino'])
+
+        if d['tipo_documento'] not in TIPOS_POR_DESTINO[d['destino']]:
+            return Response(
+                {'detail': f'tipo_documento inválido. Valores permitidos: {sorted(TIPOS_POR_DESTINO[d["destino"]])}'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        file_error = validate_file_metadata(d['nombre_archivo'], d['tamano_total'], MAX_CHUNKED_FILE_SIZE)
+        if file_error:
+            return Response({'detail': file_error}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not _objeto_destino_existe(d['destino'], d['objeto_id']):
+            return Response(
+                {'detail': 'No se encontró el registro al que se adjuntaría el documento.'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        carga = CargaFragmentada.objects.create(
+            usuario=request.user if request.user.is_authenticated else None,
+            destino=d['destino'],
+            objeto_id=d['objeto_id'],
+            tipo_documento=d['tipo_documento'],
+            observaciones=d['observaciones'],
+            metadatos={
+                k: d[k] for k in ('numero_radicado_orfeo_solicitud', 'numero_radicado_orfeo_respuesta')
+                if d['destino'] == 'PROCESO' and d[k]
+            },
+            nombre_archivo=os.path.basename(d['nombre_archivo']),
+            tamano_total=d['tamano_total'],
+            tamano_fragmento=d['tamano_fragmento'],
+            total_fragmentos=math.ceil(d['tamano_total'] / d['tamano_fragmento']),
+            sha256=d['sha256'].lower(),
+            fecha_expiracion=timezone.now() + timedelta(hours=settings.CARGAS_FRAGMENTADAS_HORAS),
+        )
+        return Response(CargaFragmentadaSerializer(carga).data, status=status.HTTP_201_CREATED)
+
+    def retrieve(self, request, pk=None):
+        carga = self.get_object()
+        self._verificar_acceso(request, carga.destino)
+        return Response(CargaFragmentadaSerializer(carga).data)
+
+    def destroy(self, request, pk=None):
+        carga = self.get_object()
+        self._verificar_acceso(request, carga.destino)
+        if carga.estado != 'EN_CURSO':
+            return Response(
+                {'detail': f'La carga está {carga.get_estado_display().lower()}.'},
+                status=status.HTTP_409_CONFLICT,
+            )
+        carga.estado = 'CANCELADA'
+        carga.save(update_fields=['estado', 'fecha_actualizacion'])
+        staging.limpiar(carga.pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=True, methods=['put'], url_path=r'fragmentos/(?P<indice>\d+)')
+    def fragmento(self, request, pk=None, indice=None):
+        """Recibe un fragmento en el cuerpo de la petición (application/octet-stream)."""
+        carga, error = self._carga_en_curso(request)
+        if error:
+            return error
+
+        indice = int(indice)
+        if indice >= carga.total_fragmentos:
+            return Response(
+                {'detail': f'Índice fuera de rango (0-{carga.total_fragmentos - 1}).'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        sha_fragmento = request.headers.get('X-Fragmento-Sha256', '').strip()
+        if len(sha_fragmento) != 64:
+            return Response(
+                {'detail': 'El encabezado X-Fragmento-Sha256 es requerido.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            staging.guardar_fragmento(
+                carga.pk, indice, request.stream, carga.tamano_esperado(indice), sha_fragmento,
+            )
+        except staging.FragmentoInvalido as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            carga = CargaFragmentada.objects.select_for_update().get(pk=carga.pk)
+            if indice not in carga.fragmentos_recibidos:
+                carga.fragmentos_recibidos = sorted([*carga.fragmentos_recibidos, indice])
+                carga.save(update_fields=['fragmentos_recibidos', 'fecha_actualizacion'])
+
+        return Response({
+            'indice': indice,
+            'fragmentos_recibidos': len(carga.fragmentos_recibidos),
+            'fragmentos_faltantes': carga.fragmentos_faltantes,
+        })
+
+    @action(detail=True, methods=['post'], url_path='completar')
+    def completar(self, request, pk=None):
+        """Ensambla los fragmentos y adjunta el archivo al documento del destino."""
+        carga = self.get_object()
+        self._verificar_acceso(request, carga.destino)
+        if carga.estado == 'COMPLETADA':
+            # Reintento de un cliente que no alcanzó a recibir la respuesta
+            return Response(CargaFragmentadaSerializer(carga).data)
+
+        carga, error = self._carga_en_curso(request)
+        if error:
+            return error
+
+        if carga.fragmentos_faltantes:
+            return Response(
+                {
+                    'detail': 'Faltan fragmentos por recibir.',
+                    'fragmentos_faltantes': carga.fragmentos_faltantes,
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        try:
+            ruta = staging.ensamblar(carga.pk, carga.total_fragmentos, carga.tamano_total, carga.sha256)
+        except staging.FragmentosFaltantes as exc:
+            # Se marcan como no recibidos para que el cliente los reenvíe
+            with transaction.atomic():
+                carga = CargaFragmentada.objects.select_for_update().get(pk=carga.pk)
+                carga.fragmentos_recibidos = [
+                    i for i in carga.fragmentos_recibidos if i not in exc.indices
+                ]
+                carga.save(update_fields=['fragmentos_recibidos', 'fecha_actualizacion'])
+            return Response(
+                {'detail': str(exc), 'fragmentos_faltantes': carga.fragmentos_faltantes},
+                status=status.HTTP_409_CONFLICT,
+            )
+        except staging.FragmentoInvalido as exc:
+            # Los fragmentos no forman el archivo declarado: se descartan para reenviarlos
+            carga.fragmentos_recibidos = []
+            carga.save(update_fields=['fragmentos_recibidos', 'fecha_actualizacion'])
+            staging.limpiar(carga.pk)
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                carga = CargaFragmentada.objects.select_for_update().get(pk=carga.pk)
+                if carga.estado != 'EN_CURSO':
+                    return Response(CargaFragmentadaSerializer(carga).data)
+                with open(ruta, 'rb') as f:
+                    doc = _crear_documento(carga, File(f, name=carga.nombre_archivo))
+                carga.estado = 'COMPLETADA'
+                carga.documento_id = doc.pk
+                carga.save(update_fields=['estado', 'documento_id', 'fecha_actualizacion'])
+        finally:
+            os.remove(ruta)
+
+        staging.limpiar(carga.pk)
+        return Response(CargaFragmentadaSerializer(carga).data, status=status.HTTP_201_CREATED)
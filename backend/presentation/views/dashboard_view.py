@@ -1,112 +1,79 @@
 """
-Vista de estadísticas globales para el Dashboard.
-GET /api/dashboard/estadisticas/
+Vistas del Dashboard.
+GET /api/dashboard/estadisticas/  → estadísticas globales
+GET /api/dashboard/series/        → series diarias de un programa
 """
 import logging
+from datetime import date, timedelta
+
+from django.db.models import Sum
+from django.utils import timezone
 
-from django.db.models import Count, Q, Case, When, IntegerField
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from infrastructure.database.models import (
-    Programa,
-    Etapa,
-    Postulacion,
-    GestionHogarEtapa1,
-    MiembroHogar,
-    Visita,
-    DocumentoProcesoInterno,
-)
-from infrastructure.database.usuarios_models import UsuarioSistema
+from infrastructure.database.contadores import leer_contadores
+from infrastructure.database.models import RollupDiario
+from infrastructure.database.rollups import METRICAS
 
 logger = logging.getLogger(__name__)
 
+DIAS_SERIE_DEFECTO = 30
+DIAS_SERIE_MAX = 366
+
+
+def _por_prefijo(contadores, prefijo):
+    """{sufijo: valor} de las claves `prefijo.*` con valor distinto de cero."""
+    return {
+        clave[len(prefijo) + 1:]: valor
+        for clave, valor in contadores.items()
+        if clave.startswith(prefijo + '.') and valor
+    }
+
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def dashboard_estadisticas(request):
-    """Retorna estadísticas globales del sistema."""
-    try:
-        # ── Programas (1 query) ──
-        programas_por_estado = dict(
-            Programa.objects.values_list('estado')
-            .annotate(c=Count('id'))
-            .values_list('estado', 'c')
-        )
-        programas_total = sum(programas_por_estado.values())
+    """
+    Retorna estadísticas globales del sistema.
 
-        # ── Etapas (1 query) ──
-        etapas_qs = Etapa.objects.filter(activo_logico=True)
-        etapas_agg = etapas_qs.aggregate(
-            total=Count('id'),
-            activas=Count(Case(When(finalizada=False, then=1), output_field=IntegerField())),
-            finalizadas=Count(Case(When(finalizada=True, then=1), output_field=IntegerField())),
-        )
+    Los valores salen de contadores_dashboard (una consulta), que mantienen
+    los triggers de infrastructure/database/contadores.py.
+    """
+    try:
+        c = leer_contadores()
 
-        # ── Postulaciones (1 query) ──
-        postulaciones_por_estado = dict(
-            Postulacion.objects.filter(activo_logico=True)
-            .values_list('estado')
-            .annotate(c=Count('id'))
-            .values_list('estado', 'c')
-        )
+        programas_por_estado = _por_prefijo(c, 'programas.estado')
+        postulaciones_por_estado = _por_prefijo(c, 'postulaciones.estado')
+        visitas_por_estado = _por_prefijo(c, 'visitas.estado')
+        etapas_agg = {
+            'activas': c.get('etapas.activas', 0),
+            'finalizadas': c.get('etapas.finalizadas', 0),
+        }
+        etapas_agg['total'] = etapas_agg['activas'] + etapas_agg['finalizadas']
+        visitas_agg = {
+            'total': sum(visitas_por_estado.values()),
+            'efectivas': c.get('visitas.efectivas', 0),
+            'no_efectivas': c.get('visitas.no_efectivas', 0),
+        }
+        usuarios_agg = {
+            'total': c.get('usuarios.total', 0),
+            'activos': c.get('usuarios.activos', 0),
+        }
+        usuarios_por_rol = _por_prefijo(c, 'usuarios.rol')
+        hogares_total = c.get('hogares.total', 0)
+        hogares_por_estrato = _por_prefijo(c, 'hogares.estrato')
+        hogares_por_zona = _por_prefijo(c, 'hogares.zona')
+        miembros_agg = {
+            clave: c.get(f'miembros.{clave}', 0)
+            for clave in ('total', 'discapacidad', 'victima', 'desplazado', 'firmante_paz')
+        }
+        documentos_internos = c.get('documentos_internos.total', 0)
+        programas_total = sum(programas_por_estado.values())
         postulaciones_total = sum(postulaciones_por_estado.values())
 
-        # ── Visitas (1 query) ──
-        visitas_qs = Visita.objects.filter(activo_logico=True)
-        visitas_agg = visitas_qs.aggregate(
-            total=Count('id'),
-            efectivas=Count(Case(When(visita_efectiva=True, then=1), output_field=IntegerField())),
-            no_efectivas=Count(Case(When(visita_efectiva=False, then=1), output_field=IntegerField())),
-        )
-        visitas_por_estado = dict(
-            visitas_qs.values_list('estado_visita')
-            .annotate(c=Count('id'))
-            .values_list('estado_visita', 'c')
-        )
-
-        # ── Usuarios (1 query) ──
-        usuarios_agg = UsuarioSistema.objects.aggregate(
-            total=Count('id_usuario'),
-            activos=Count(Case(When(activo=True, then=1), output_field=IntegerField())),
-        )
-        usuarios_por_rol = dict(
-            UsuarioSistema.objects.values_list('id_rol')
-            .annotate(c=Count('id_usuario'))
-            .values_list('id_rol', 'c')
-        )
-
-        # ── Hogares (3 queries) ──
-        hogares_total = GestionHogarEtapa1.objects.count()
-        hogares_por_estrato = dict(
-            GestionHogarEtapa1.objects
-            .exclude(estrato__isnull=True)
-            .values_list('estrato')
-            .annotate(c=Count('id'))
-            .values_list('estrato', 'c')
-        )
-        hogares_por_zona = dict(
-            GestionHogarEtapa1.objects
-            .exclude(zona='')
-            .values_list('zona')
-            .annotate(c=Count('id'))
-            .values_list('zona', 'c')
-        )
-
-        # ── Miembros vulnerables (1 query) ──
-        miembros_agg = MiembroHogar.objects.aggregate(
-            total=Count('id'),
-            discapacidad=Count(Case(When(tiene_discapacidad=True, then=1), output_field=IntegerField())),
-            victima=Count(Case(When(es_victima_conflicto=True, then=1), output_field=IntegerField())),
-            desplazado=Count(Case(When(es_desplazado=True, then=1), output_field=IntegerField())),
-            firmante_paz=Count(Case(When(es_firmante_paz=True, then=1), output_field=IntegerField())),
-        )
-
-        # ── Documentos internos (1 query) ──
-        documentos_internos = DocumentoProcesoInterno.objects.filter(activo_logico=True).count()
-
         return Response({
             'programas': {
                 'total': programas_total,
@@ -154,3 +121,69 @@ def dashboard_estadisticas(request):
             {'error': 'Error al obtener estadísticas'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def dashboard_series(request):
+    """
+    Series diarias de un programa, leídas de rollups_diarios (el tiempo de
+    respuesta depende del rango pedido, no del tamaño del histórico).
+
+    Query params:
+      programa_id  (requerido)
+      desde, hasta YYYY-MM-DD (por defecto, los últimos 30 días)
+      metrica      opcional, una de METRICAS
+    """
+    try:
+        programa_id = int(request.query_params.get('programa_id', ''))
+    except ValueError:
+        return Response({'detail': 'Se requiere programa_id.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        hasta = date.fromisoformat(request.query_params['hasta']) if request.query_params.get('hasta') else timezone.localdate()
+        desde = (
+            date.fromisoformat(request.query_params['desde']) if request.query_params.get('desde')
+            else hasta - timedelta(days=DIAS_SERIE_DEFECTO - 1)
+        )
+    except ValueError:
+        return Response({'detail': 'Las fechas deben tener formato YYYY-MM-DD.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if desde > hasta:
+        return Response({'detail': '"desde" no puede ser posterior a "hasta".'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if (hasta - desde).days >= DIAS_SERIE_MAX:
+        return Response({'detail': f'El rango no puede superar {DIAS_SERIE_MAX} días.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    metricas = METRICAS
+    if request.query_params.get('metrica'):
+        if request.query_params['metrica'] not in METRICAS:
+            return Response({'detail': f'Métrica inválida. Opciones: {", ".join(METRICAS)}.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        metricas = [request.query_params['metrica']]
+
+    filas = (
+        RollupDiario.objects
+        .filter(programa_id=programa_id, fecha__range=(desde, hasta), metrica__in=metricas)
+        .values('metrica', 'fecha', 'estado')
+        .annotate(cantidad=Sum('cantidad'))
+        .order_by('metrica', 'fecha', 'estado')
+    )
+
+    series = {metrica: [] for metrica in metricas}
+    for fila in filas:
+        serie = series[fila['metrica']]
+        if not serie or serie[-1]['fecha'] != fila['fecha']:
+            serie.append({'fecha': fila['fecha'], 'total': 0, 'por_estado': {}})
+        if fila['cantidad']:
+            if fila['estado']:
+                serie[-1]['por_estado'][fila['estado']] = fila['cantidad']
+            serie[-1]['total'] += fila['cantidad']
+
+    return Response({
+        'programa_id': programa_id,
+        'desde': desde,
+        'hasta': hasta,
+        'series': series,
+    })
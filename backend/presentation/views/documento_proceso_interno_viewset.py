@@ -21,6 +21,23 @@ from presentation.serializers.documento_proceso_interno_serializer import (
 TIPOS_REQUERIDOS = {choice[0] for choice in DocumentoProcesoInterno.TIPO_DOCUMENTO_CHOICES}
 
 
+def actualizar_estado_por_documentos(postulacion_id):
+    """Auto-transición de estado de la postulación según los documentos cargados."""
+    postulacion = Postulacion.objects.get(pk=postulacion_id)
+    if postulacion.estado in ('VISITA_REALIZADA', 'DOCUMENTOS_INCOMPLETOS'):
+        tipos_cargados = set(
+            DocumentoProcesoInterno.objects
+            .filter(postulacion_id=postulacion_id, activo_logico=True)
+            .values_list('tipo_documento', flat=True)
+        )
+        if TIPOS_REQUERIDOS.issubset(tipos_cargados):
+            postulacion.estado = 'DOCUMENTOS_CARGADOS'
+            postulacion.save(update_fields=['estado'])
+        elif tipos_cargados and postulacion.estado != 'DOCUMENTOS_INCOMPLETOS':
+            postulacion.estado = 'DOCUMENTOS_INCOMPLETOS'
+            postulacion.save(update_fields=['estado'])
+
+
 class DocumentoProcesoInternoViewSet(viewsets.ModelViewSet):
     """
     CRUD de documentos del proceso interno (Etapa 3).
@@ -68,19 +85,7 @@ class DocumentoProcesoInternoViewSet(viewsets.ModelViewSet):
         )
 
         # ── Auto-transición de estado según documentos cargados ─────── #
-        postulacion = Postulacion.objects.get(pk=d['postulacion'])
-        if postulacion.estado in ('VISITA_REALIZADA', 'DOCUMENTOS_INCOMPLETOS'):
-            tipos_cargados = set(
-                DocumentoProcesoInterno.objects
-                .filter(postulacion_id=d['postulacion'], activo_logico=True)
-                .values_list('tipo_documento', flat=True)
-            )
-            if TIPOS_REQUERIDOS.issubset(tipos_cargados):
-                postulacion.estado = 'DOCUMENTOS_CARGADOS'
-                postulacion.save(update_fields=['estado'])
-            elif tipos_cargados and postulacion.estado != 'DOCUMENTOS_INCOMPLETOS':
-                postulacion.estado = 'DOCUMENTOS_INCOMPLETOS'
-                postulacion.save(update_fields=['estado'])
+        actualizar_estado_por_documentos(d['postulacion'])
 
         return Response(
             DocumentoProcesoInternoSerializer(doc).data,
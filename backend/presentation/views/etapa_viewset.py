@@ -3,8 +3,10 @@ ViewSet para la entidad Etapa
 
 Proporciona endpoints REST para CRUD de etapas del proceso
 """
+from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
+from django.utils.http import parse_etags
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
@@ -13,8 +15,13 @@ from rest_framework.throttling import AnonRateThrottle
 from infrastructure.database.models import (
     Etapa, FormularioEtapa, CampoFormulario, Ciudadano,
     ConfigRegistroHogar, ConfigVisitaTecnica, ConfigGestionDocumental,
-    Postulacion, GestionHogarEtapa1, MiembroHogar,
+    Postulacion,
 )
+from infrastructure.database.formularios_publicos import NO_ENCONTRADA, respuesta_compilada
+from infrastructure.database.registro_hogar import CedulasYaRegistradas, registrar_hogar
+from infrastructure.ingesta import encolar, estado_registro
+from presentation.idempotencia import idempotente
+from presentation.sala_espera import SalaEsperaMixin
 from presentation.serializers.etapa_serializer import EtapaSerializer
 from presentation.serializers.registro_hogar_serializer import RegistroHogarSubmitSerializer
 
@@ -31,7 +38,32 @@ def _validar_campos_config(campos_data):
     return None
 
 
-class EtapaViewSet(viewsets.ModelViewSet):
+def _cache_control_publico():
+    return f"public, max-age={getattr(settings, 'FORMULARIOS_PUBLICOS_MAX_AGE', 60)}"
+
+
+def _respuesta_compilada(request, vista, pk, cache_control):
+    """
+    Responde con la versión compilada de la vista para la etapa. Si el
+    cliente envía If-None-Match con el ETag vigente responde 304 sin cuerpo.
+    """
+    if not str(pk).isdigit():
+        return Response(NO_ENCONTRADA, status=status.HTTP_404_NOT_FOUND)
+    entrada = respuesta_compilada(vista, int(pk))
+    if entrada['status'] != status.HTTP_200_OK:
+        return Response(entrada['data'], status=entrada['status'])
+
+    etags = parse_etags(request.headers.get('If-None-Match', ''))
+    if '*' in etags or entrada['etag'] in etags:
+        respuesta = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        respuesta = Response(entrada['data'])
+    respuesta['ETag'] = entrada['etag']
+    respuesta['Cache-Control'] = cache_control
+    return respuesta
+
+
+class EtapaViewSet(SalaEsperaMixin, viewsets.ModelViewSet):
     """ViewSet para gestionar Etapas de proceso"""
 
     serializer_class = EtapaSerializer
@@ -39,6 +71,15 @@ class EtapaViewSet(viewsets.ModelViewSet):
     # list y retrieve son públicos (HomePage ciudadano consulta etapas).
     PUBLIC_ACTIONS = {'list', 'retrieve'}
 
+    # Acciones públicas sujetas a la sala de espera (ver presentation/sala_espera.py)
+    ACCIONES_SALA_ESPERA = PUBLIC_ACTIONS | {
+        'enviar_formulario',
+        'info_publica',
+        'formulario_publico',
+        'registro_hogar',
+        'registro_hogar_estado',
+    }
+
     def get_permissions(self):
         if self.action in self.PUBLIC_ACTIONS:
             return [AllowAny()]
@@ -226,12 +267,14 @@ class EtapaViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'], url_path='enviar-formulario',
             permission_classes=[AllowAny],
             throttle_classes=[AnonRateThrottle])
+    @idempotente('enviar_formulario')
     def enviar_formulario(self, request, pk=None):
         """
         Endpoint público para registrar los datos de un ciudadano.
         POST /api/etapas/{id}/enviar-formulario/
         Body: { "respuestas": { "tipo_documento": "CEDULA_CIUDADANIA", ... } }
         Crea o actualiza el registro en la tabla `ciudadanos`.
+        Acepta Idempotency-Key (ver presentation/idempotencia.py).
         """
         etapa = self.get_object()
 
@@ -319,18 +362,9 @@ class EtapaViewSet(viewsets.ModelViewSet):
         Devuelve información básica pública de la etapa (nombre del programa,
         número de etapa) sin requerir autenticación ni FormularioEtapa.
         GET /api/etapas/{id}/info-publica/
+        Se sirve desde el cache con ETag (ver formularios_publicos).
         """
-        etapa = self.get_object()
-        try:
-            registro_hogar_publicado = etapa.config_registro_hogar.publicado
-        except ConfigRegistroHogar.DoesNotExist:
-            registro_hogar_publicado = False
-        return Response({
-            'etapa_id':       etapa.id,
-            'numero_etapa':   etapa.numero_etapa,
-            'programa_nombre': etapa.programa.nombre,
-            'registro_hogar_publicado': registro_hogar_publicado,
-        })
+        return _respuesta_compilada(request, 'info_publica', pk, _cache_control_publico())
 
     @action(detail=True, methods=['get'], url_path='formulario-publico',
             permission_classes=[AllowAny])
@@ -338,37 +372,9 @@ class EtapaViewSet(viewsets.ModelViewSet):
         """
         Endpoint público (sin autenticación) que devuelve el formulario
         publicado de una etapa para que el ciudadano lo pueda completar.
+        Se sirve desde el cache con ETag (ver formularios_publicos).
         """
-        etapa = self.get_object()
-
-        try:
-            formulario = etapa.formulario
-        except FormularioEtapa.DoesNotExist:
-            return Response(
-                {'detail': 'Esta etapa aún no tiene formulario configurado.'},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        if formulario.estado != 'PUBLICADO':
-            return Response(
-                {'detail': 'El formulario de esta etapa aún no ha sido publicado.'},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        campos = list(
-            formulario.campos.order_by('orden').values(
-                'campo_catalogo', 'orden', 'obligatorio', 'texto_ayuda'
-            )
-        )
-        return Response({
-            'etapa_id': etapa.id,
-            'numero_etapa': etapa.numero_etapa,
-            'modulo_principal': etapa.modulo_principal,
-            'programa_nombre': etapa.programa.nombre,
-            'estado': formulario.estado,
-            'fecha_publicacion': formulario.fecha_publicacion,
-            'campos': campos,
-        })
+        return _respuesta_compilada(request, 'formulario_publico', pk, _cache_control_publico())
 
     @action(detail=True, methods=['get', 'post'], url_path='registro-hogar-config')
     def registro_hogar_config(self, request, pk=None):
@@ -377,19 +383,11 @@ class EtapaViewSet(viewsets.ModelViewSet):
         POST – Guarda (crea o actualiza) la configuración de campos.
                Body: { "campos": { "campo_id": { "requerido": bool, "habilitado": bool } } }
         """
-        etapa = self.get_object()
-
         if request.method == 'GET':
-            try:
-                config = etapa.config_registro_hogar
-                return Response({
-                    'campos': config.campos,
-                    'fecha_modificacion': config.fecha_modificacion,
-                })
-            except ConfigRegistroHogar.DoesNotExist:
-                return Response({'campos': {}, 'fecha_modificacion': None})
+            return _respuesta_compilada(request, 'registro_hogar_config', pk, 'private, no-cache')
 
         # POST
+        etapa = self.get_object()
         campos_data = request.data.get('campos', {})
         error = _validar_campos_config(campos_data)
         if error:
@@ -408,14 +406,21 @@ class EtapaViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'], url_path='registro-hogar',
             permission_classes=[AllowAny],
             throttle_classes=[AnonRateThrottle])
+    @idempotente('registro_hogar')
     def registro_hogar(self, request, pk=None):
         """
         Endpoint público para registrar un hogar completo con sus miembros.
         POST /api/etapas/{id}/registro-hogar/
         Body: { "info_hogar": {...}, "miembros": [...] }
         Devuelve: { id_postulacion, numero_radicado, fecha_radicado, miembros_ids }
+
+        Acepta Idempotency-Key (ver presentation/idempotencia.py).
+        Con INGESTA_DIFERIDA el envío se encola y se responde 202 con un
+        radicado provisional (ver _registro_hogar_diferido).
         """
-        import uuid
+        if getattr(settings, 'INGESTA_DIFERIDA', False):
+            return self._registro_hogar_diferido(request, pk)
+
         etapa = self.get_object()
 
         # Verificar que el formulario esté publicado.
@@ -435,90 +440,65 @@ class EtapaViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
 
-        # Verificar cédulas duplicadas en otras postulaciones del mismo programa.
-        numeros_enviados = [m['numero_documento'] for m in data['miembros']]
-        cedulas_ya_registradas = list(
-            MiembroHogar.objects.filter(
-                postulacion__etapa__programa=etapa.programa,
-                numero_documento__in=numeros_enviados,
-            ).values_list('numero_documento', flat=True).distinct()
-        )
-        if cedulas_ya_registradas:
-            cedulas_str = ', '.join(cedulas_ya_registradas)
+        # Postulación, gestión, ciudadano y miembros en sentencias fijas; las
+        # cédulas ya registradas en el programa se rechazan (cedulas_programa)
+        try:
+            hogar = registrar_hogar(etapa, dict(data['info_hogar']), data['miembros'])
+        except CedulasYaRegistradas as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(hogar.respuesta(), status=status.HTTP_201_CREATED)
+
+    def _registro_hogar_diferido(self, request, pk):
+        """
+        Valida el envío sin consultar la BD (la publicación sale del cache de
+        info-publica), lo guarda en la cola local y responde 202 con el
+        radicado provisional. Las cédulas duplicadas se verifican al
+        escribirlo; el resultado se consulta en registro-hogar/{ticket}/.
+        """
+        if not str(pk).isdigit():
+            return Response(NO_ENCONTRADA, status=status.HTTP_404_NOT_FOUND)
+        info = respuesta_compilada('info_publica', int(pk))
+        if info['status'] != status.HTTP_200_OK:
+            return Response(info['data'], status=info['status'])
+        if not info['data']['registro_hogar_publicado']:
             return Response(
-                {'detail': f'Las siguientes cédulas ya están registradas en este programa: {cedulas_str}.'},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        # ── 1. Crear Postulacion ──────────────────────────────────────── #
-        with transaction.atomic():
-            postulacion = Postulacion.objects.create(
-                programa=etapa.programa,
-                etapa_actual=etapa,
-                estado='REGISTRADA',
-            )
-
-            # ── 2. Generar numero_radicado único ──────────────────────────── #
-            ahora = timezone.now()
-            numero_radicado = (
-                f"RAD-{ahora.strftime('%Y%m')}-"
-                f"{postulacion.id:06d}-{uuid.uuid4().hex[:4].upper()}"
-            )
-
-            # ── 3. Crear GestionHogarEtapa1 ──────────────────────────────── #
-            info_data = dict(data['info_hogar'])
-            gestion = GestionHogarEtapa1.objects.create(
-                postulacion=postulacion,
-                etapa=etapa,
-                numero_radicado=numero_radicado,
-                **info_data,
+                {'detail': 'El formulario de registro del hogar no está disponible actualmente.'},
+                status=status.HTTP_403_FORBIDDEN,
             )
 
-            # ── 4. Crear MiembroHogar[] ──────────────────────────────────── #
-            miembros_ids: dict = {}
-            cabeza_data = None
-            for miembro_data in data['miembros']:
-                local_id = miembro_data['_localId']
-                campos_miembro = {
-                    k: v for k, v in miembro_data.items() if k != '_localId'
-                }
-                miembro = MiembroHogar.objects.create(
-                    postulacion=gestion,
-                    **campos_miembro,
-                )
-                miembros_ids[local_id] = miembro.id
-                if campos_miembro.get('es_cabeza_hogar'):
-                    cabeza_data = campos_miembro
-
-            # ── 5. Crear o recuperar Ciudadano desde el cabeza de hogar ──── #
-            if cabeza_data:
-                ciudadano, _ = Ciudadano.objects.get_or_create(
-                    tipo_documento=cabeza_data['tipo_documento'],
-                    numero_documento=cabeza_data['numero_documento'],
-                    defaults={
-                        'primer_nombre':    cabeza_data['primer_nombre'],
-                        'segundo_nombre':   cabeza_data.get('segundo_nombre') or '',
-                        'primer_apellido':  cabeza_data['primer_apellido'],
-                        'segundo_apellido': cabeza_data.get('segundo_apellido') or '',
-                        'fecha_nacimiento': cabeza_data['fecha_nacimiento'],
-                        'sexo':             cabeza_data.get('sexo') or '',
-                        'nacionalidad':     '',
-                        'telefono':         cabeza_data.get('telefono') or '',
-                        'correo_electronico': cabeza_data.get('correo_electronico') or '',
-                    },
-                )
-                gestion.ciudadano = ciudadano
-                gestion.save(update_fields=['ciudadano'])
+        serializer = RegistroHogarSubmitSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
 
-        return Response(
+        entrada = encolar(int(pk), serializer.validated_data)
+        respuesta = Response(
             {
-                'id_postulacion': postulacion.id,
-                'numero_radicado': gestion.numero_radicado,
-                'fecha_radicado': gestion.fecha_radicado,
-                'miembros_ids': miembros_ids,
+                'radicado_provisional': entrada['ticket'],
+                'estado': 'PENDIENTE',
+                'fecha_recepcion': entrada['fecha_recepcion'],
             },
-            status=status.HTTP_201_CREATED,
+            status=status.HTTP_202_ACCEPTED,
         )
+        respuesta['Location'] = f"/api/etapas/registro-hogar/{entrada['ticket']}/"
+        return respuesta
+
+    @action(detail=False, methods=['get'], url_path=r'registro-hogar/(?P<ticket>[^/.]+)',
+            permission_classes=[AllowAny],
+            throttle_classes=[AnonRateThrottle])
+    def registro_hogar_estado(self, request, ticket=None):
+        """
+        Estado de un registro del hogar enviado en modo diferido.
+        GET /api/etapas/registro-hogar/{radicado_provisional}/
+        estado: PENDIENTE | EN_PROCESO | REGISTRADO | RECHAZADO | FALLIDO.
+        REGISTRADO incluye id_postulacion, numero_radicado, fecha_radicado y
+        miembros_ids; RECHAZADO y FALLIDO incluyen detail.
+        """
+        resultado = estado_registro(ticket)
+        if resultado is None:
+            return Response(
+                {'detail': 'No se encontró un registro con ese radicado provisional.'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response({'radicado_provisional': ticket, **resultado})
 
     @action(detail=True, methods=['post'], url_path='publicar-registro-hogar')
     def publicar_registro_hogar(self, request, pk=None):
@@ -7,13 +7,14 @@ Endpoints disponibles:
   PATCH /api/postulaciones/registro-hogar/{pk}/      → actualiza datos del hogar y estado
   POST  /api/postulaciones/{id}/documentos-hogar/    → sube un documento adjunto
 """
+import csv
+
 from django.conf import settings
-from django.core.files.storage import default_storage
 from django.db import transaction
 
 from shared.file_validators import validate_uploaded_file
-from django.db.models import Count, Q
-from django.http import FileResponse
+from django.db.models import Count, F, Prefetch, Q
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
@@ -23,18 +24,26 @@ from rest_framework.throttling import AnonRateThrottle
 
 from infrastructure.database.models import (
     Programa,
-    Etapa,
     Postulacion,
     DocumentoGestionHogar,
-    DocumentoMiembroHogar,
-    DocumentoVisitaEtapa2,
-    DocumentoProcesoInterno,
+    ExportacionDocumentos,
     GestionHogarEtapa1,
     MiembroHogar,
+    Sorteo,
     Visita,
 )
 from infrastructure.database.usuarios_models import UsuarioSistema
+from infrastructure.database.paquetes_documentos import cargar_paquetes_documentos
+from infrastructure.database.consulta_estado import consultar_estado_publico
+from infrastructure.database.sorteo import SorteoError, SorteoYaRealizado, ejecutar_sorteo
+from infrastructure.correo.notificaciones_sorteo import crear_notificacion
 from domain.postulantes.postulacion import EstadoPostulacion
+from infrastructure.exports import iter_entradas_documentos, iter_zip, nombre_zip
+from infrastructure.exports.exportacion_jobs import ruta_archivo_exportacion
+from infrastructure.storage.catalogo import entradas_catalogo
+from presentation.descargas import respuesta_archivo
+from presentation.pagination import CursorInvalido, paginar_keyset, parse_page_size
+from presentation.sala_espera import SalaEsperaMixin
 
 
 class ConsultaPublicaThrottle(AnonRateThrottle):
@@ -98,32 +107,124 @@ TIPO_DOC_MIEMBRO_LABELS = {
 }
 
 
-def _build_media_url(request, path_from_db: str | None):
-    """Construye una URL absoluta verificando la existencia del archivo."""
-    if not path_from_db:
-        return ''
+def _nombre_archivo(documento) -> str | None:
+    """Nombre del archivo de un documento tal como quedó guardado en la BD."""
+    return getattr(documento.archivo, 'name', None) or documento.ruta_archivo
+
 
-    candidate = path_from_db.lstrip('/')
+def _build_media_url(request, ruta_canonica: str | None):
+    """Construye la URL absoluta de un archivo ya resuelto en el catálogo."""
+    if not ruta_canonica:
+        return ''
+    return request.build_absolute_uri(f"{settings.MEDIA_URL}{ruta_canonica}")
+
+
+def _urls_documento(request, entrada) -> dict:
+    """
+    URLs de un documento a partir de su entrada en el catálogo:
+    archivo original, miniatura y versión para revisión (la reducida si se
+    generó, si no la original).
+    """
+    if entrada is None or not entrada.existe:
+        return {'archivo_url': '', 'miniatura_url': '', 'vista_url': ''}
+    archivo_url = _build_media_url(request, entrada.ruta_canonica)
+    return {
+        'archivo_url': archivo_url,
+        'miniatura_url': _build_media_url(request, entrada.miniatura),
+        'vista_url': _build_media_url(request, entrada.version_reducida) or archivo_url,
+    }
+
+
+def _visitas_vigentes(postulacion_ids) -> dict:
+    """
+    Devuelve {postulacion_id: Visita} con la visita activa más reciente
+    (no cancelada) de cada postulación, resuelto en una sola consulta
+    con DISTINCT ON (PostgreSQL).
+    """
+    if not postulacion_ids:
+        return {}
+    visitas = (
+        Visita.objects
+        .filter(postulacion_id__in=postulacion_ids, activo_logico=True)
+        .exclude(estado_visita='CANCELADA')
+        .select_related('encuestador')
+        .order_by('postulacion_id', '-fecha_registro')
+        .distinct('postulacion_id')
+    )
+    return {v.postulacion_id: v for v in visitas}
+
+
+# Datos del titular para los listados del sorteo, tomados con un solo JOIN
+# (postulación → registro del hogar → ciudadano).
+CAMPOS_TITULAR_SORTEO = {
+    'radicado': F('gestion_hogar__numero_radicado'),
+    'primer_nombre': F('gestion_hogar__ciudadano__primer_nombre'),
+    'primer_apellido': F('gestion_hogar__ciudadano__primer_apellido'),
+    'numero_documento': F('gestion_hogar__ciudadano__numero_documento'),
+}
 
-    # Ruta tal cual está guardada
-    if default_storage.exists(candidate):
-        return request.build_absolute_uri(f"{settings.MEDIA_URL}{candidate}")
 
-    # Alternativa: quitar/agregar prefijo 'documentos/' si está desalineado
-    if candidate.startswith('documentos/'):
-        alt = candidate.replace('documentos/', '', 1)
+def _filas_sorteo(programa_id, estados):
+    """
+    Postulaciones del programa en `estados` con radicado y titular, en el
+    orden del sorteo (las no sorteadas, por id).
+    """
+    return (
+        Postulacion.objects
+        .filter(programa_id=programa_id, estado__in=estados)
+        .order_by(F('resultado_sorteo__orden').asc(nulls_last=True), 'id')
+        .values('id', 'estado', 'fecha_postulacion', orden=F('resultado_sorteo__orden'), **CAMPOS_TITULAR_SORTEO)
+    )
+
+
+def _titular_sorteo(fila):
+    """(numero_radicado, nombre) de una fila de _filas_sorteo, con los valores por defecto."""
+    radicado = fila['radicado'] or f'POST-{fila["id"]}'
+    if fila['primer_nombre'] is not None:
+        nombre = f'{fila["primer_nombre"]} {fila["primer_apellido"]}'
     else:
-        alt = f"documentos/{candidate}"
+        nombre = f'Postulación #{fila["id"]}'
+    return radicado, nombre
+
+
+def _resultado_sorteo(fila):
+    radicado, nombre = _titular_sorteo(fila)
+    return {
+        'id': fila['id'],
+        'orden': fila['orden'],
+        'numero_radicado': radicado,
+        'nombre': nombre,
+        'estado': fila['estado'],
+    }
+
+
+def _datos_sorteo(sorteo):
+    """Datos de auditoría del sorteo (None para sorteos anteriores a su registro)."""
+    if sorteo is None:
+        return None
+    return {
+        'id': sorteo.id,
+        'semilla': sorteo.semilla,
+        'algoritmo': sorteo.algoritmo,
+        'cantidad_beneficiarios': sorteo.cantidad_beneficiarios,
+        'total_elegibles': sorteo.total_elegibles,
+        'fecha_ejecucion': sorteo.fecha_ejecucion,
+    }
 
-    if default_storage.exists(alt):
-        return request.build_absolute_uri(f"{settings.MEDIA_URL}{alt}")
 
-    return ''
+class _Eco:
+    """Pseudo-buffer para csv.writer: devuelve la línea en lugar de guardarla."""
 
+    def write(self, value):
+        return value
 
-class PostulacionViewSet(viewsets.GenericViewSet):
+
+class PostulacionViewSet(SalaEsperaMixin, viewsets.GenericViewSet):
     """ViewSet para gestionar Postulaciones."""
 
+    # Consulta pública sujeta a la sala de espera (ver presentation/sala_espera.py)
+    ACCIONES_SALA_ESPERA = {'consultar_estado'}
+
     queryset = Postulacion.objects.all()
 
     @action(detail=False, methods=['get'], url_path='registro-hogar')
@@ -134,15 +235,24 @@ class PostulacionViewSet(viewsets.GenericViewSet):
         Soporta filtros opcionales por query params:
           ?estado=REGISTRADA
           ?programa_id=6
-        
+
+        Paginación por cursor (opcional): si se envía ?page_size=N o ?cursor=...
+        la respuesta pasa a ser {results, next_cursor, page_size}, ordenada por
+        (fecha_radicado, id) descendente. Sin esos parámetros se devuelve la
+        lista completa como antes.
+
         NOTA: Los funcionarios solo ven postulaciones en estado EN_REVISION o SUBSANACION
         """
         qs = (
             GestionHogarEtapa1.objects
             .select_related('ciudadano', 'postulacion__programa', 'postulacion__funcionario_asignado', 'etapa__programa')
-            .prefetch_related('miembros')
+            .prefetch_related(Prefetch(
+                'miembros',
+                queryset=MiembroHogar.objects.filter(es_cabeza_hogar=True),
+                to_attr='cabezas',
+            ))
             .annotate(total_miembros=Count('miembros'))
-            .order_by('-fecha_radicado')
+            .order_by('-fecha_radicado', '-id')
         )
 
         # Si el usuario es FUNCIONARIO (id_rol_id = 2), filtrar automáticamente
@@ -171,8 +281,25 @@ class PostulacionViewSet(viewsets.GenericViewSet):
                 Q(postulacion__isnull=True, etapa__programa_id=programa_id)
             )
 
+        cursor = request.query_params.get('cursor')
+        paginado = cursor is not None or 'page_size' in request.query_params
+        next_cursor = None
+        if paginado:
+            page_size = parse_page_size(request.query_params.get('page_size'))
+            try:
+                gestiones, next_cursor = paginar_keyset(
+                    qs, ('fecha_radicado', 'id'), cursor=cursor, page_size=page_size,
+                )
+            except CursorInvalido as exc:
+                return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            gestiones = list(qs)
+
+        # Una sola consulta para la visita vigente de todas las postulaciones
+        visitas = _visitas_vigentes([g.postulacion_id for g in gestiones if g.postulacion_id])
+
         results = []
-        for g in qs:
+        for g in gestiones:
             c = g.ciudadano
             p = g.postulacion
 
@@ -189,7 +316,7 @@ class PostulacionViewSet(viewsets.GenericViewSet):
                 }
             else:
                 # Fallback: usar el miembro cabeza de hogar
-                cabeza = next((m for m in g.miembros.all() if m.es_cabeza_hogar), None)
+                cabeza = g.cabezas[0] if g.cabezas else None
                 if cabeza:
                     ciudadano_data = {
                         'tipo_documento':       cabeza.tipo_documento,
@@ -208,17 +335,8 @@ class PostulacionViewSet(viewsets.GenericViewSet):
             elif g.etapa_id and g.etapa.programa_id:
                 programa_nom = g.etapa.programa.nombre
 
-            # Buscar visita asociada a la postulación
-            visita_obj = None
-            visita_id = None
-            if p:
-                visita_obj = Visita.objects.filter(
-                    postulacion_id=p.id, activo_logico=True,
-                ).exclude(estado_visita='CANCELADA').select_related('encuestador').order_by('-fecha_registro').first()
-                if visita_obj:
-                    visita_id = visita_obj.id
-
-            # Visitante asignado (encuestador de la visita)
+            # Visita asociada a la postulación y su visitante (encuestador)
+            visita_obj = visitas.get(p.id) if p else None
             visitante_data = None
             if visita_obj and visita_obj.encuestador_id:
                 enc = visita_obj.encuestador
@@ -244,7 +362,7 @@ class PostulacionViewSet(viewsets.GenericViewSet):
                 'tipo_predio':     g.tipo_predio,
                 'direccion':       g.direccion,
                 'total_miembros':  g.total_miembros,
-                'visita_id':       visita_id,
+                'visita_id':       visita_obj.id if visita_obj else None,
                 'visitante_asignado': visitante_data,
                 'funcionario_asignado': {
                     'id': p.funcionario_asignado.id_usuario,
@@ -252,6 +370,12 @@ class PostulacionViewSet(viewsets.GenericViewSet):
                 } if (p and p.funcionario_asignado_id) else None,
             })
 
+        if paginado:
+            return Response({
+                'results':     results,
+                'next_cursor': next_cursor,
+                'page_size':   page_size,
+            })
         return Response(results)
 
 
@@ -264,15 +388,13 @@ class PostulacionViewSet(viewsets.GenericViewSet):
         
         NOTA: Los funcionarios solo pueden ver postulaciones en estado EN_REVISION o SUBSANACION
         """
-        try:
-            g = (
-                GestionHogarEtapa1.objects
-                .select_related('ciudadano', 'postulacion__programa', 'etapa__programa')
-                .prefetch_related('miembros__documentos', 'documentos')
-                .get(pk=pk)
-            )
-        except GestionHogarEtapa1.DoesNotExist:
+        paquetes = cargar_paquetes_documentos(
+            gestion_ids=[pk], tipos={'hogar': None, 'miembro': None},
+        )
+        if not paquetes:
             return Response({'detail': 'No encontrado.'}, status=status.HTTP_404_NOT_FOUND)
+        paquete = paquetes[0]
+        g = paquete.gestion
 
         # Validar permisos: FUNCIONARIO solo puede ver postulaciones EN_REVISION o SUBSANACION
         if request.user and request.user.id_rol_id == 2:
@@ -307,7 +429,7 @@ class PostulacionViewSet(viewsets.GenericViewSet):
             }
         else:
             # Fallback: usar el miembro marcado como cabeza de hogar
-            cabeza = next((m for m in g.miembros.all() if m.es_cabeza_hogar), None)
+            cabeza = next((m for m in paquete.miembros if m.es_cabeza_hogar), None)
             if cabeza:
                 ciudadano_data = {
                     'id_persona':            None,
@@ -327,17 +449,22 @@ class PostulacionViewSet(viewsets.GenericViewSet):
                     'municipio_nacimiento':    '',
                 }
 
+        # Rutas reales y derivados de todos los documentos en una sola consulta al catálogo
+        catalogo = entradas_catalogo(
+            [_nombre_archivo(d) for d in paquete.documentos_hogar]
+            + [_nombre_archivo(d) for m in paquete.miembros for d in m.documentos_activos]
+        )
+
         miembros_data = []
-        for m in g.miembros.all():
+        for m in paquete.miembros:
             docs_miembro = []
-            for d in m.documentos.filter(activo_logico=True).order_by('-fecha_carga'):
-                url = _build_media_url(request, getattr(d.archivo, 'name', None) or d.ruta_archivo)
+            for d in m.documentos_activos:
                 docs_miembro.append({
                     'id': d.id,
                     'tipo_documento': d.tipo_documento,
                     'tipo_documento_label': TIPO_DOC_MIEMBRO_LABELS.get(d.tipo_documento, d.tipo_documento),
                     'ruta_archivo': d.ruta_archivo,
-                    'archivo_url': url,
+                    **_urls_documento(request, catalogo.get(_nombre_archivo(d))),
                     'observaciones': d.observaciones or '',
                     'fecha_carga': d.fecha_carga,
                 })
@@ -393,14 +520,13 @@ class PostulacionViewSet(viewsets.GenericViewSet):
             programa_nom = g.etapa.programa.nombre
 
         documentos_hogar = []
-        for d in g.documentos.filter(activo_logico=True).order_by('-fecha_carga'):
-            url = _build_media_url(request, getattr(d.archivo, 'name', None) or d.ruta_archivo)
+        for d in paquete.documentos_hogar:
             documentos_hogar.append({
                 'id': d.id,
                 'tipo_documento': d.tipo_documento,
                 'tipo_documento_label': TIPO_DOC_GESTION_LABELS.get(d.tipo_documento, d.tipo_documento),
                 'ruta_archivo': d.ruta_archivo,
-                'archivo_url': url,
+                **_urls_documento(request, catalogo.get(_nombre_archivo(d))),
                 'observaciones': d.observaciones or '',
                 'fecha_carga': d.fecha_carga,
             })
@@ -812,28 +938,68 @@ class PostulacionViewSet(viewsets.GenericViewSet):
             }
         }
         """
-        import io
-        import os
-        import zipfile
-        import unicodedata
-        import re
+        postulacion_ids, tipos_seleccionados, error = self._validar_payload_descarga(request.data)
+        if error:
+            return error
 
-        postulacion_ids = request.data.get('postulacion_ids', [])
-        tipos = request.data.get('tipos_documento', {})
+        # Obtener postulaciones con sus relaciones
+        postulaciones = list(Postulacion.objects.filter(
+            id__in=postulacion_ids, activo_logico=True,
+        ).select_related('programa'))
 
-        if not postulacion_ids:
+        if not postulaciones:
             return Response(
+                {'detail': 'No se encontraron postulaciones válidas.'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        from datetime import date as date_cls
+
+        fecha_descarga = date_cls.today().strftime('%Y-%m-%d')
+
+        # El ZIP se escribe y se envía por fragmentos a medida que se arma
+        response = StreamingHttpResponse(
+            iter_zip(iter_entradas_documentos(postulaciones, tipos_seleccionados, fecha_descarga)),
+            content_type='application/zip',
+        )
+        zip_name = nombre_zip(postulaciones, fecha_descarga)
+        response['Content-Disposition'] = f'attachment; filename="{zip_name}"'
+        return response
+
+    @staticmethod
+    def _validar_payload_descarga(data):
+        """
+        Valida el body de descargar-documentos (y de las exportaciones).
+        Retorna (postulacion_ids, tipos_documento, None) o (None, None, Response de error).
+        """
+        postulacion_ids = data.get('postulacion_ids', [])
+        tipos = data.get('tipos_documento', {}) or {}
+
+        if not postulacion_ids:
+            return None, None, Response(
                 {'detail': 'Debe seleccionar al menos una postulación.'},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        tipos_hogar   = tipos.get('hogar', [])
-        tipos_miembro = tipos.get('miembro', [])
-        tipos_visita  = tipos.get('visita', [])
-        tipos_proceso = tipos.get('proceso', [])
+        if not isinstance(tipos, dict):
+            return None, None, Response(
+                {'detail': 'tipos_documento debe ser un objeto.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        # Una categoría en null no selecciona nada, igual que una lista vacía:
+        # cargar_paquetes_documentos interpreta None como "todos los tipos".
+        tipos_seleccionados = {
+            categoria: tipos.get(categoria) or []
+            for categoria in ('hogar', 'miembro', 'visita', 'proceso')
+        }
+        if not all(isinstance(v, list) for v in tipos_seleccionados.values()):
+            return None, None, Response(
+                {'detail': 'Cada categoría de tipos_documento debe ser una lista.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        if not any([tipos_hogar, tipos_miembro, tipos_visita, tipos_proceso]):
-            return Response(
+        if not any(tipos_seleccionados.values()):
+            return None, None, Response(
                 {'detail': 'Debe seleccionar al menos un tipo de documento.'},
                 status=status.HTTP_400_BAD_REQUEST,
             )
@@ -842,165 +1008,97 @@ class PostulacionViewSet(viewsets.GenericViewSet):
         try:
             postulacion_ids = [int(pid) for pid in postulacion_ids]
         except (ValueError, TypeError):
-            return Response(
+            return None, None, Response(
                 {'detail': 'IDs de postulación inválidos.'},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Obtener postulaciones con sus relaciones
-        postulaciones = Postulacion.objects.filter(
-            id__in=postulacion_ids, activo_logico=True,
-        ).select_related('programa')
-
-        if not postulaciones.exists():
-            return Response(
-                {'detail': 'No se encontraron postulaciones válidas.'},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+        return postulacion_ids, tipos_seleccionados, None
 
-        from datetime import date as date_cls
+    # ── Exportaciones en segundo plano ──────────────────────────────────── #
 
-        def safe_filename(name):
-            """Elimina caracteres no válidos para nombres de carpeta."""
-            name = unicodedata.normalize('NFKD', name)
-            name = re.sub(r'[^\w\s\-.]', '', name)
-            return name.strip()[:100]
+    @staticmethod
+    def _exportacion_data(exportacion):
+        return {
+            'id':                       exportacion.id,
+            'estado':                   exportacion.estado,
+            'estado_label':             exportacion.get_estado_display(),
+            'progreso':                 exportacion.progreso,
+            'total_postulaciones':      exportacion.total_postulaciones,
+            'postulaciones_procesadas': exportacion.postulaciones_procesadas,
+            'nombre_archivo':           exportacion.nombre_archivo,
+            'tamano_bytes':             exportacion.tamano_bytes,
+            'error':                    exportacion.error,
+            'fecha_creacion':           exportacion.fecha_creacion,
+            'fecha_fin':                exportacion.fecha_fin,
+        }
 
-        fecha_descarga = date_cls.today().strftime('%Y-%m-%d')
+    def _exportaciones_visibles(self, request):
+        """Los administradores ven todas las exportaciones; el resto, solo las propias."""
+        qs = ExportacionDocumentos.objects.all()
+        if request.user.id_rol_id != 1:
+            qs = qs.filter(usuario_solicitante_id=request.user.id_usuario)
+        return qs
 
-        buf = io.BytesIO()
-        with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zf:
-            for postulacion in postulaciones:
-                # Datos para la carpeta
-                programa_nombre = safe_filename(
-                    postulacion.programa.nombre if postulacion.programa else 'Sin_programa'
-                )
+    @action(detail=False, methods=['get', 'post'], url_path='exportaciones')
+    def exportaciones(self, request):
+        """
+        GET  /api/postulaciones/exportaciones/  → exportaciones del usuario
+        POST /api/postulaciones/exportaciones/  → encola una descarga masiva
+        Body igual a descargar-documentos. El ZIP lo arma el comando
+        `procesar_exportaciones`; el progreso se consulta en
+        /exportaciones/{id}/ y el archivo en /exportaciones/{id}/archivo/.
+        """
+        if request.method == 'GET':
+            return Response([
+                self._exportacion_data(e) for e in self._exportaciones_visibles(request)[:50]
+            ])
 
-                # Nombre de la persona (cabeza de hogar)
-                gestion = GestionHogarEtapa1.objects.filter(
-                    postulacion=postulacion,
-                ).select_related('ciudadano').first()
-
-                if gestion and gestion.ciudadano:
-                    c = gestion.ciudadano
-                    partes = [c.primer_nombre, c.segundo_nombre, c.primer_apellido, c.segundo_apellido]
-                    persona = safe_filename(' '.join(p for p in partes if p))
-                else:
-                    persona = 'Sin_nombre'
-
-                fecha_post = ''
-                if postulacion.fecha_postulacion:
-                    fecha_post = f' ({postulacion.fecha_postulacion.strftime("%Y-%m-%d")})'
-
-                carpeta_base = f'{programa_nombre} - {fecha_descarga}/{persona}_{postulacion.id}{fecha_post}'
-
-                # Siempre crear la carpeta de la postulación (aunque no tenga documentos)
-                zf.writestr(f'{carpeta_base}/', '')
-
-                # 1) Documentos del hogar (Etapa 1)
-                if tipos_hogar and gestion:
-                    docs_hogar = DocumentoGestionHogar.objects.filter(
-                        postulacion=gestion,
-                        tipo_documento__in=tipos_hogar,
-                        activo_logico=True,
-                    )
-                    tipo_count: dict[str, int] = {}
-                    for doc in docs_hogar:
-                        tipo_count[doc.tipo_documento] = tipo_count.get(doc.tipo_documento, 0) + 1
-                        self._add_doc_to_zip(zf, doc.archivo, carpeta_base, doc.tipo_documento, tipo_count[doc.tipo_documento])
-
-                # 2) Documentos de miembros
-                if tipos_miembro and gestion:
-                    miembros = MiembroHogar.objects.filter(postulacion=gestion)
-                    for miembro in miembros:
-                        nombre_miembro = safe_filename(
-                            f'{miembro.primer_nombre} {miembro.primer_apellido}'
-                        )
-                        docs_miembro = DocumentoMiembroHogar.objects.filter(
-                            miembro=miembro,
-                            tipo_documento__in=tipos_miembro,
-                            activo_logico=True,
-                        )
-                        tipo_count_m: dict[str, int] = {}
-                        for doc in docs_miembro:
-                            tipo_count_m[doc.tipo_documento] = tipo_count_m.get(doc.tipo_documento, 0) + 1
-                            subcarpeta = f'{carpeta_base}/miembros/{nombre_miembro}'
-                            self._add_doc_to_zip(zf, doc.archivo, subcarpeta, doc.tipo_documento, tipo_count_m[doc.tipo_documento])
-
-                # 3) Documentos de visita (Etapa 2)
-                if tipos_visita:
-                    visitas = Visita.objects.filter(
-                        postulacion=postulacion, activo_logico=True,
-                    )
-                    tipo_count_v: dict[str, int] = {}
-                    for visita in visitas:
-                        docs_visita = DocumentoVisitaEtapa2.objects.filter(
-                            visita=visita,
-                            tipo_documento__in=tipos_visita,
-                            activo_logico=True,
-                        )
-                        for doc in docs_visita:
-                            tipo_count_v[doc.tipo_documento] = tipo_count_v.get(doc.tipo_documento, 0) + 1
-                            self._add_doc_to_zip(zf, doc.archivo, carpeta_base, doc.tipo_documento, tipo_count_v[doc.tipo_documento])
-
-                # 4) Documentos proceso interno (Etapa 3)
-                if tipos_proceso:
-                    docs_proceso = DocumentoProcesoInterno.objects.filter(
-                        postulacion=postulacion,
-                        tipo_documento__in=tipos_proceso,
-                        activo_logico=True,
-                    )
-                    tipo_count_p: dict[str, int] = {}
-                    for doc in docs_proceso:
-                        tipo_count_p[doc.tipo_documento] = tipo_count_p.get(doc.tipo_documento, 0) + 1
-                        self._add_doc_to_zip(zf, doc.archivo, carpeta_base, doc.tipo_documento, tipo_count_p[doc.tipo_documento])
-
-        buf.seek(0)
-        # Nombre descriptivo para el ZIP
-        programas_en_descarga = set(
-            safe_filename(p.programa.nombre) for p in postulaciones if p.programa
-        )
-        if len(programas_en_descarga) == 1:
-            zip_name = f'{programas_en_descarga.pop()} - {fecha_descarga}.zip'
-        else:
-            zip_name = f'Documentos_postulaciones - {fecha_descarga}.zip'
-        response = FileResponse(buf, content_type='application/zip')
-        response['Content-Disposition'] = f'attachment; filename="{zip_name}"'
-        return response
+        postulacion_ids, tipos_seleccionados, error = self._validar_payload_descarga(request.data)
+        if error:
+            return error
 
-    @staticmethod
-    def _resolve_storage_path(name):
-        """Resuelve la ruta real en el storage, manejando el prefijo documentos/ duplicado."""
-        candidate = name.lstrip('/')
-        if default_storage.exists(candidate):
-            return candidate
-        # Quitar o agregar prefijo 'documentos/' si está desalineado con MEDIA_ROOT
-        if candidate.startswith('documentos/'):
-            alt = candidate.replace('documentos/', '', 1)
-        else:
-            alt = f'documentos/{candidate}'
-        if default_storage.exists(alt):
-            return alt
-        return None
+        if not Postulacion.objects.filter(id__in=postulacion_ids, activo_logico=True).exists():
+            return Response(
+                {'detail': 'No se encontraron postulaciones válidas.'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
 
-    @staticmethod
-    def _add_doc_to_zip(zf, archivo_field, carpeta, tipo_doc, counter=None):
-        """Agrega un archivo al ZIP si existe en el storage."""
-        import os
-        if not archivo_field or not archivo_field.name:
-            return
-        resolved = PostulacionViewSet._resolve_storage_path(archivo_field.name)
-        if not resolved:
-            return
-        try:
-            with default_storage.open(resolved, 'rb') as f:
-                ext = os.path.splitext(archivo_field.name)[1]
-                # Usar sufijo numérico si hay duplicados del mismo tipo
-                suffix = f'_{counter}' if counter and counter > 1 else ''
-                nombre_en_zip = f'{carpeta}/{tipo_doc}{suffix}{ext}'
-                zf.writestr(nombre_en_zip, f.read())
-        except (FileNotFoundError, OSError):
-            pass
+        exportacion = ExportacionDocumentos.objects.create(
+            usuario_solicitante_id=request.user.id_usuario,
+            postulacion_ids=postulacion_ids,
+            tipos_documento=tipos_seleccionados,
+            total_postulaciones=len(set(postulacion_ids)),
+        )
+        return Response(self._exportacion_data(exportacion), status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['get'], url_path=r'exportaciones/(?P<pk>\d+)')
+    def exportacion_estado(self, request, pk=None):
+        """GET /api/postulaciones/exportaciones/{id}/ → estado y progreso."""
+        exportacion = self._exportaciones_visibles(request).filter(pk=pk).first()
+        if not exportacion:
+            return Response({'detail': 'Exportación no encontrada.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(self._exportacion_data(exportacion))
+
+    @action(detail=False, methods=['get'], url_path=r'exportaciones/(?P<pk>\d+)/archivo')
+    def exportacion_archivo(self, request, pk=None):
+        """
+        GET /api/postulaciones/exportaciones/{id}/archivo/
+        Descarga el ZIP terminado; admite Range para reanudar descargas.
+        """
+        exportacion = self._exportaciones_visibles(request).filter(pk=pk).first()
+        if not exportacion:
+            return Response({'detail': 'Exportación no encontrada.'}, status=status.HTTP_404_NOT_FOUND)
+        if exportacion.estado != 'COMPLETADA':
+            return Response(
+                {'detail': 'La exportación aún no está lista.', 'estado': exportacion.estado},
+                status=status.HTTP_409_CONFLICT,
+            )
+        ruta = ruta_archivo_exportacion(exportacion)
+        if not ruta:
+            return Response({'detail': 'El archivo de la exportación ya no está disponible.'},
+                            status=status.HTTP_410_GONE)
+        return respuesta_archivo(request, ruta, exportacion.nombre_archivo, 'application/zip')
 
     @action(detail=False, methods=['get'], url_path='consultar-estado',
             permission_classes=[AllowAny],
@@ -1009,6 +1107,8 @@ class PostulacionViewSet(viewsets.GenericViewSet):
         """
         Consulta pública del estado de postulación por número de documento.
         Solo devuelve información si el ciudadano es cabeza de hogar.
+        Lee la tabla consulta_estado_publica (no las tablas principales) y
+        las respuestas quedan en cache CONSULTA_ESTADO_TTL segundos.
         GET /api/postulaciones/consultar-estado/?numero_documento=123456
         """
         numero_documento = request.query_params.get('numero_documento', '').strip()
@@ -1018,42 +1118,8 @@ class PostulacionViewSet(viewsets.GenericViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Buscar miembros del hogar que sean cabeza de hogar con ese documento
-        miembros = MiembroHogar.objects.filter(
-            numero_documento=numero_documento,
-            es_cabeza_hogar=True,
-        ).select_related(
-            'postulacion',
-            'postulacion__postulacion',
-            'postulacion__postulacion__programa',
-        )
-
-        if not miembros.exists():
-            return Response(
-                {'detail': 'No se encontró una postulación asociada a este número de documento.'},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-
-        resultados = []
-        for miembro in miembros:
-            gestion = miembro.postulacion
-            postulacion = gestion.postulacion if gestion else None
-            if not postulacion:
-                continue
-            # Ocultar resultado si el programa culminó y no es beneficiario
-            programa = postulacion.programa
-            if (programa and programa.estado == 'CULMINADO'
-                    and postulacion.estado == 'NO_BENEFICIARIO'):
-                continue
-            resultados.append({
-                'numero_radicado': gestion.numero_radicado,
-                'programa': programa.nombre if programa else '',
-                'estado': postulacion.estado,
-                'estado_label': dict(Postulacion.ESTADOS).get(postulacion.estado, postulacion.estado),
-                'fecha_postulacion': postulacion.fecha_postulacion,
-                'nombre_postulante': f'{miembro.primer_nombre} {miembro.primer_apellido}',
-            })
-
+        # Tabla de consulta mantenida por triggers + cache de respuestas
+        resultados = consultar_estado_publico(numero_documento)
         if not resultados:
             return Response(
                 {'detail': 'No se encontró una postulación asociada a este número de documento.'},
@@ -1092,6 +1158,7 @@ class PostulacionViewSet(viewsets.GenericViewSet):
             'elegibles': elegibles,
             'ya_sorteadas': ya_sorteadas,
             'sorteo_realizado': ya_sorteadas > 0,
+            'sorteo': _datos_sorteo(Sorteo.objects.filter(programa_id=programa_id).first()),
         })
 
     @action(detail=False, methods=['get'], url_path='sorteo/elegibles')
@@ -1104,35 +1171,15 @@ class PostulacionViewSet(viewsets.GenericViewSet):
         if not programa_id:
             return Response({'detail': 'Se requiere programa_id.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        postulaciones = (
-            Postulacion.objects
-            .filter(programa_id=programa_id, estado='APROBADA')
-            .select_related('programa')
-            .order_by('id')
-        )
-
-        # Obtener datos del ciudadano asociado a cada postulación
         resultados = []
-        for p in postulaciones:
-            hogar = (
-                GestionHogarEtapa1.objects
-                .filter(postulacion=p)
-                .select_related('ciudadano')
-                .first()
-            )
-            ciudadano = hogar.ciudadano if hogar else None
+        for fila in _filas_sorteo(programa_id, ['APROBADA']):
+            radicado, nombre = _titular_sorteo(fila)
             resultados.append({
-                'id': p.id,
-                'numero_radicado': hogar.numero_radicado if hogar else f'POST-{p.id}',
-                'nombre': (
-                    f'{ciudadano.primer_nombre} {ciudadano.primer_apellido}'
-                    if ciudadano else f'Postulación #{p.id}'
-                ),
-                'documento': (
-                    f'{ciudadano.numero_documento}'
-                    if ciudadano else ''
-                ),
-                'fecha_postulacion': str(p.fecha_postulacion) if p.fecha_postulacion else '',
+                'id': fila['id'],
+                'numero_radicado': radicado,
+                'nombre': nombre,
+                'documento': fila['numero_documento'] or '',
+                'fecha_postulacion': str(fila['fecha_postulacion']) if fila['fecha_postulacion'] else '',
             })
 
         return Response(resultados)
@@ -1147,43 +1194,21 @@ class PostulacionViewSet(viewsets.GenericViewSet):
         if not programa_id:
             return Response({'detail': 'Se requiere programa_id.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        beneficiados = list(
-            Postulacion.objects.filter(programa_id=programa_id, estado='BENEFICIADO').order_by('id')
-        )
-        no_beneficiarios = list(
-            Postulacion.objects.filter(programa_id=programa_id, estado='NO_BENEFICIARIO').order_by('id')
-        )
+        beneficiados, no_beneficiarios = [], []
+        for fila in _filas_sorteo(programa_id, ['BENEFICIADO', 'NO_BENEFICIARIO']):
+            destino = beneficiados if fila['estado'] == 'BENEFICIADO' else no_beneficiarios
+            destino.append(_resultado_sorteo(fila))
 
         if not beneficiados and not no_beneficiarios:
             return Response({'detail': 'No se ha realizado un sorteo para este programa.'}, status=status.HTTP_404_NOT_FOUND)
 
-        def _build(postulaciones, estado_label):
-            result = []
-            for p in postulaciones:
-                hogar = (
-                    GestionHogarEtapa1.objects
-                    .filter(postulacion=p)
-                    .select_related('ciudadano')
-                    .first()
-                )
-                ciudadano = hogar.ciudadano if hogar else None
-                result.append({
-                    'id': p.id,
-                    'numero_radicado': hogar.numero_radicado if hogar else f'POST-{p.id}',
-                    'nombre': (
-                        f'{ciudadano.primer_nombre} {ciudadano.primer_apellido}'
-                        if ciudadano else f'Postulación #{p.id}'
-                    ),
-                    'estado': estado_label,
-                })
-            return result
-
         return Response({
+            'sorteo': _datos_sorteo(Sorteo.objects.filter(programa_id=programa_id).first()),
             'total_elegibles': len(beneficiados) + len(no_beneficiarios),
             'total_beneficiados': len(beneficiados),
             'total_no_beneficiarios': len(no_beneficiarios),
-            'beneficiados': _build(beneficiados, 'BENEFICIADO'),
-            'no_beneficiarios': _build(no_beneficiarios, 'NO_BENEFICIARIO'),
+            'beneficiados': beneficiados,
+            'no_beneficiarios': no_beneficiarios,
         })
 
     @action(detail=False, methods=['get'], url_path='sorteo/descargar')
@@ -1192,9 +1217,6 @@ class PostulacionViewSet(viewsets.GenericViewSet):
         Descarga los resultados del sorteo como archivo CSV.
         GET /api/postulaciones/sorteo/descargar/?programa_id=6
         """
-        import csv
-        from django.http import HttpResponse
-
         programa_id = request.query_params.get('programa_id')
         if not programa_id:
             return Response({'detail': 'Se requiere programa_id.'}, status=status.HTTP_400_BAD_REQUEST)
@@ -1204,46 +1226,27 @@ class PostulacionViewSet(viewsets.GenericViewSet):
         except Programa.DoesNotExist:
             return Response({'detail': 'Programa no encontrado.'}, status=status.HTTP_404_NOT_FOUND)
 
-        beneficiados = list(
-            Postulacion.objects.filter(programa_id=programa_id, estado='BENEFICIADO').order_by('id')
-        )
-        no_beneficiarios = list(
-            Postulacion.objects.filter(programa_id=programa_id, estado='NO_BENEFICIARIO').order_by('id')
-        )
-
-        if not beneficiados and not no_beneficiarios:
+        if not Postulacion.objects.filter(
+            programa_id=programa_id, estado__in=['BENEFICIADO', 'NO_BENEFICIARIO'],
+        ).exists():
             return Response({'detail': 'No se ha realizado un sorteo para este programa.'}, status=status.HTTP_404_NOT_FOUND)
 
         # Sanitize program name for filename
         nombre_seguro = programa_obj.nombre.replace(' ', '_').replace('/', '-')[:50]
         filename = f"Resultados_Sorteo_{nombre_seguro}.csv"
 
-        response = HttpResponse(content_type='text/csv; charset=utf-8')
+        def _filas_csv():
+            writer = csv.writer(_Eco())
+            yield '\ufeff'  # BOM for Excel UTF-8
+            yield writer.writerow(['#', 'Nombre', 'Número de radicado', 'Estado', 'Orden del sorteo'])
+            for estado, estado_label in (('BENEFICIADO', 'Beneficiado'), ('NO_BENEFICIARIO', 'No beneficiario')):
+                filas = _filas_sorteo(programa_id, [estado]).iterator(chunk_size=2000)
+                for i, fila in enumerate(filas, 1):
+                    radicado, nombre = _titular_sorteo(fila)
+                    yield writer.writerow([i, nombre, radicado, estado_label, fila['orden'] or ''])
+
+        response = StreamingHttpResponse(_filas_csv(), content_type='text/csv; charset=utf-8')
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        response.write('\ufeff')  # BOM for Excel UTF-8
-
-        writer = csv.writer(response)
-        writer.writerow(['#', 'Nombre', 'Número de radicado', 'Estado'])
-
-        def _write_rows(postulaciones, estado_label):
-            for i, p in enumerate(postulaciones, 1):
-                hogar = (
-                    GestionHogarEtapa1.objects
-                    .filter(postulacion=p)
-                    .select_related('ciudadano')
-                    .first()
-                )
-                ciudadano = hogar.ciudadano if hogar else None
-                nombre = (
-                    f'{ciudadano.primer_nombre} {ciudadano.primer_apellido}'
-                    if ciudadano else f'Postulación #{p.id}'
-                )
-                radicado = hogar.numero_radicado if hogar else f'POST-{p.id}'
-                writer.writerow([i, nombre, radicado, estado_label])
-
-        _write_rows(beneficiados, 'Beneficiado')
-        _write_rows(no_beneficiarios, 'No beneficiario')
-
         return response
 
     @action(detail=False, methods=['post'], url_path='sorteo/ejecutar')
@@ -1253,9 +1256,6 @@ class PostulacionViewSet(viewsets.GenericViewSet):
         POST /api/postulaciones/sorteo/ejecutar/
         Body: { "programa_id": 6, "cantidad_beneficiarios": 10 }
         """
-        import random as _random_mod
-        rng = _random_mod.SystemRandom()
-
         programa_id = request.data.get('programa_id')
         cantidad = request.data.get('cantidad_beneficiarios')
 
@@ -1266,10 +1266,11 @@ class PostulacionViewSet(viewsets.GenericViewSet):
             )
 
         try:
+            programa_id = int(programa_id)
             cantidad = int(cantidad)
         except (TypeError, ValueError):
             return Response(
-                {'detail': 'cantidad_beneficiarios debe ser un número entero.'},
+                {'detail': 'programa_id y cantidad_beneficiarios deben ser números enteros.'},
                 status=status.HTTP_400_BAD_REQUEST,
             )
         if cantidad < 1:
@@ -1278,85 +1279,70 @@ class PostulacionViewSet(viewsets.GenericViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        with transaction.atomic():
-            # Verificar que la etapa 1 esté finalizada
-            etapa1 = Etapa.objects.filter(programa_id=programa_id, numero_etapa=1).first()
-            if not etapa1 or not etapa1.finalizada:
-                return Response(
-                    {'detail': 'No se puede ejecutar el sorteo: la Etapa 1 debe estar finalizada.'},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-
-            # Verificar que no se haya hecho sorteo antes (lock rows)
-            ya_sorteadas = (
-                Postulacion.objects
-                .select_for_update()
-                .filter(programa_id=programa_id, estado__in=['BENEFICIADO', 'NO_BENEFICIARIO'])
-                .exists()
-            )
-            if ya_sorteadas:
-                return Response(
-                    {'detail': 'Ya se realizó un sorteo para este programa. No se puede repetir.'},
-                    status=status.HTTP_409_CONFLICT,
-                )
-
-            # Obtener elegibles con lock (postulaciones APROBADA)
-            elegibles = list(
-                Postulacion.objects
-                .select_for_update()
-                .filter(programa_id=programa_id, estado='APROBADA')
-                .order_by('id')
-            )
-
-            if not elegibles:
-                return Response(
-                    {'detail': 'No hay postulaciones aprobadas para sortear.'},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-
-            if cantidad > len(elegibles):
-                return Response(
-                    {'detail': f'La cantidad de beneficiarios ({cantidad}) supera el total de elegibles ({len(elegibles)}).'},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-
-            # Sorteo aleatorio con CSPRNG
-            rng.shuffle(elegibles)
-            beneficiados = elegibles[:cantidad]
-            no_beneficiados = elegibles[cantidad:]
-
-            ids_beneficiados = [p.id for p in beneficiados]
-            ids_no_beneficiados = [p.id for p in no_beneficiados]
-
-            Postulacion.objects.filter(id__in=ids_beneficiados).update(estado='BENEFICIADO')
-            Postulacion.objects.filter(id__in=ids_no_beneficiados).update(estado='NO_BENEFICIARIO')
-
-        # Construir resultado con nombres
-        def _build_result(postulaciones, estado_label):
-            result = []
-            for p in postulaciones:
-                hogar = (
-                    GestionHogarEtapa1.objects
-                    .filter(postulacion=p)
-                    .select_related('ciudadano')
-                    .first()
-                )
-                ciudadano = hogar.ciudadano if hogar else None
-                result.append({
-                    'id': p.id,
-                    'numero_radicado': hogar.numero_radicado if hogar else f'POST-{p.id}',
-                    'nombre': (
-                        f'{ciudadano.primer_nombre} {ciudadano.primer_apellido}'
-                        if ciudadano else f'Postulación #{p.id}'
-                    ),
-                    'estado': estado_label,
-                })
-            return result
+        try:
+            sorteo = ejecutar_sorteo(programa_id, cantidad, usuario=request.user)
+        except SorteoYaRealizado as e:
+            return Response({'detail': str(e)}, status=status.HTTP_409_CONFLICT)
+        except SorteoError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Resultado con nombres (una sola consulta), en el orden del sorteo
+        beneficiados, no_beneficiados = [], []
+        for fila in _filas_sorteo(programa_id, ['BENEFICIADO', 'NO_BENEFICIARIO']):
+            destino = beneficiados if fila['estado'] == 'BENEFICIADO' else no_beneficiados
+            destino.append(_resultado_sorteo(fila))
 
         return Response({
-            'total_elegibles': len(elegibles),
+            'sorteo': _datos_sorteo(sorteo),
+            'total_elegibles': sorteo.total_elegibles,
             'total_beneficiados': len(beneficiados),
             'total_no_beneficiarios': len(no_beneficiados),
-            'beneficiados': _build_result(beneficiados, 'BENEFICIADO'),
-            'no_beneficiarios': _build_result(no_beneficiados, 'NO_BENEFICIARIO'),
+            'beneficiados': beneficiados,
+            'no_beneficiarios': no_beneficiados,
         })
+
+    @staticmethod
+    def _notificacion_data(notificacion):
+        if notificacion is None:
+            return None
+        return {
+            'id':           notificacion.id,
+            'estado':       notificacion.estado,
+            'estado_label': notificacion.get_estado_display(),
+            'progreso':     notificacion.progreso,
+            'total':        notificacion.total,
+            'encolados':    notificacion.encolados,
+            'sin_correo':   notificacion.sin_correo,
+            'fecha_creacion': notificacion.fecha_creacion,
+            'fecha_fin':    notificacion.fecha_fin,
+        }
+
+    @action(detail=False, methods=['get', 'post'], url_path='sorteo/notificacion')
+    def sorteo_notificacion(self, request):
+        """
+        GET  /api/postulaciones/sorteo/notificacion/?programa_id=6 → progreso del aviso
+        POST /api/postulaciones/sorteo/notificacion/  Body: { "programa_id": 6 }
+        Encola el aviso del resultado a todos los hogares sorteados; lo procesa
+        el comando `notificar_sorteos`. Solo se notifica una vez por sorteo.
+        """
+        datos = request.query_params if request.method == 'GET' else request.data
+        try:
+            programa_id = int(datos.get('programa_id'))
+        except (TypeError, ValueError):
+            return Response({'detail': 'Se requiere programa_id.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        sorteo = Sorteo.objects.filter(programa_id=programa_id).select_related('notificacion').first()
+        if request.method == 'GET':
+            notificacion = getattr(sorteo, 'notificacion', None) if sorteo else None
+            return Response({'notificacion': self._notificacion_data(notificacion)})
+
+        if sorteo is None:
+            return Response(
+                {'detail': 'El programa no tiene un sorteo registrado.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        notificacion, creada = crear_notificacion(sorteo, usuario=request.user)
+        return Response(
+            {'notificacion': self._notificacion_data(notificacion)},
+            status=status.HTTP_202_ACCEPTED if creada else status.HTTP_200_OK,
+        )
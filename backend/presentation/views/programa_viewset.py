@@ -10,6 +10,7 @@ from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 
 from infrastructure.database.models import Programa, FormularioEtapa, ConfigRegistroHogar
+from infrastructure.database.formularios_publicos import invalidar_etapas
 from infrastructure.database.repositories.programa_repository import DjangoProgramaRepository
 from application.programas import ProgramaApplicationService
 from presentation.serializers.programa_serializer import ProgramaSerializer
@@ -23,13 +24,15 @@ def _despublicar_etapas_programa(id_programa: int):
         programa_orm = Programa.objects.get(id=id_programa)
     except Programa.DoesNotExist:
         return
-    etapa_ids = programa_orm.etapas.values_list('id', flat=True)
+    etapa_ids = list(programa_orm.etapas.values_list('id', flat=True))
     FormularioEtapa.objects.filter(
         etapa_id__in=etapa_ids, estado='PUBLICADO'
     ).update(estado='BORRADOR', fecha_publicacion=None)
     ConfigRegistroHogar.objects.filter(
         etapa_id__in=etapa_ids, publicado=True
     ).update(publicado=False)
+    # .update() no dispara las señales que descartan los formularios en cache
+    invalidar_etapas(*etapa_ids)
 
 
 class ProgramaViewSet(viewsets.ModelViewSet):
@@ -8,7 +8,6 @@ Implementación síncrona compatible con Django sync context.
 import logging
 from django.conf import settings
 from django.core import signing
-from django.core.mail import send_mail
 from django.contrib.auth.hashers import check_password, make_password
 from django.utils.timezone import now
 from django.views.decorators.csrf import csrf_exempt
@@ -19,12 +18,17 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework.throttling import AnonRateThrottle
 
+from infrastructure.authentication import invalidar_usuario
+from infrastructure.correo import send_mail
+from infrastructure.database.busqueda_usuarios import filtro_busqueda
+from infrastructure.database.estadisticas_usuarios import estadisticas_usuarios
 from infrastructure.database.usuarios_models import UsuarioSistema
 from infrastructure.database.roles_models import Rol
 from presentation.serializers.usuario_serializers import (
     UsuarioSerializer,
     CambiarRolSerializer,
 )
+from presentation.pagination import CursorInvalido, paginar_keyset, parse_page_size
 
 logger = logging.getLogger(__name__)
 
@@ -57,19 +61,24 @@ class UsuarioViewSet(viewsets.ModelViewSet):
             return None
 
     def list(self, request) -> Response:
-        """Listar usuarios con filtros y paginación"""
+        """Listar usuarios con filtros y paginación
+
+        `search` busca por subcadena en documento, correo y nombre. Con el
+        parámetro `cursor` (vacío para la primera página) se pagina por
+        cursor sobre (fecha_creacion, id_usuario) y la respuesta trae
+        `next_cursor` en lugar de count/page/totalPages.
+        """
         try:
-            page = int(request.query_params.get("page", 1))
-            page_size = int(request.query_params.get("page_size", 10))
+            cursor = request.query_params.get("cursor")
             search = request.query_params.get("search", "").strip()
             id_rol = request.query_params.get("id_rol")
             activo = request.query_params.get("activo")
 
-            queryset = UsuarioSistema.obtener_no_eliminados().order_by("-fecha_creacion")
+            queryset = UsuarioSistema.obtener_no_eliminados().order_by("-fecha_creacion", "-id_usuario")
             
-            # Búsqueda solo por número de documento (cédula)
+            # Búsqueda por documento, correo o nombre (índices de trigramas)
             if search:
-                queryset = queryset.filter(numero_documento__icontains=search)
+                queryset = queryset.filter(filtro_busqueda(search))
             
             # Filtros
             if id_rol:
@@ -78,36 +87,49 @@ class UsuarioViewSet(viewsets.ModelViewSet):
                 activo_bool = activo.lower() in ["true", "1", "yes"]
                 queryset = queryset.filter(activo=activo_bool)
             
-            total = queryset.count()
-            start = (page - 1) * page_size
-            usuarios = queryset[start:start + page_size]
+            if cursor is not None:
+                page_size = parse_page_size(request.query_params.get("page_size"), default=10)
+                try:
+                    usuarios, next_cursor = paginar_keyset(
+                        queryset, ("fecha_creacion", "id_usuario"), cursor=cursor, page_size=page_size,
+                    )
+                except CursorInvalido as exc:
+                    return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+                paginacion = {"next_cursor": next_cursor, "pageSize": page_size}
+            else:
+                page = int(request.query_params.get("page", 1))
+                page_size = int(request.query_params.get("page_size", 10))
+                total = queryset.count()
+                start = (page - 1) * page_size
+                usuarios = queryset[start:start + page_size]
+                paginacion = {
+                    "count": total,
+                    "page": page,
+                    "pageSize": page_size,
+                    "totalPages": (total + page_size - 1) // page_size,
+                }
             
             user_serializer = UsuarioSerializer(usuarios, many=True)
-            total_pages = (total + page_size - 1) // page_size
 
-            # Stats solo si el frontend las pide (evita 6 queries extra por defecto)
+            # Stats solo si el frontend las pide (una consulta, cacheada)
             include_stats = request.query_params.get("include_stats", "true").lower() == "true"
             stats = None
             if include_stats:
-                all_qs = UsuarioSistema.obtener_no_eliminados()
-                total_all = all_qs.count()
-                activos_count = all_qs.filter(activo=True).count()
+                estadisticas = estadisticas_usuarios()
+                por_rol = estadisticas["por_rol"]
                 stats = {
-                    "total": total_all,
-                    "activos": activos_count,
-                    "inactivos": total_all - activos_count,
-                    "admins": all_qs.filter(id_rol__nombre_rol="ADMIN").count(),
-                    "funcionarios": all_qs.filter(id_rol__nombre_rol="FUNCIONARIO").count(),
-                    "tecnicos": all_qs.filter(id_rol__nombre_rol="TECNICO_VISITANTE").count(),
+                    "total": estadisticas["total"],
+                    "activos": estadisticas["activos"],
+                    "inactivos": estadisticas["inactivos"],
+                    "admins": por_rol.get("ADMIN", 0),
+                    "funcionarios": por_rol.get("FUNCIONARIO", 0),
+                    "tecnicos": por_rol.get("TECNICO_VISITANTE", 0),
                 }
             
             return Response(
                 {
                     "results": user_serializer.data,
-                    "count": total,
-                    "page": page,
-                    "pageSize": page_size,
-                    "totalPages": total_pages,
+                    **paginacion,
                     "stats": stats,
                 },
                 status=status.HTTP_200_OK,
@@ -293,6 +315,7 @@ class UsuarioViewSet(viewsets.ModelViewSet):
 
             usuario.fecha_modificacion = now()
             usuario.save()
+            invalidar_usuario(usuario.id_usuario)
             logger.info(f"Usuario actualizado: {pk} - {usuario.nombre_completo}")
 
             user_serializer = UsuarioSerializer(usuario)
@@ -326,6 +349,7 @@ class UsuarioViewSet(viewsets.ModelViewSet):
             usuario.activo = False
             usuario.fecha_eliminacion = now()
             usuario.save()
+            invalidar_usuario(usuario.id_usuario)
             logger.info(f"Usuario eliminado (soft): {pk}")
             
             return Response(status=status.HTTP_204_NO_CONTENT)
@@ -359,6 +383,7 @@ class UsuarioViewSet(viewsets.ModelViewSet):
 
             usuario.password_hash = make_password(password)
             usuario.save()
+            invalidar_usuario(usuario.id_usuario)
             logger.info(f"Contraseña cambiada: {pk}")
 
             user_serializer = UsuarioSerializer(usuario)
@@ -391,6 +416,7 @@ class UsuarioViewSet(viewsets.ModelViewSet):
             rol_obj = serializer.validated_data["rol"]
             usuario.id_rol = rol_obj
             usuario.save()
+            invalidar_usuario(usuario.id_usuario)
             logger.info(f"Rol cambiado: {pk} -> {rol_obj.nombre_rol}")
 
             user_serializer = UsuarioSerializer(usuario)
@@ -420,6 +446,7 @@ class UsuarioViewSet(viewsets.ModelViewSet):
             usuario.activo = True
             usuario.fecha_modificacion = now()
             usuario.save()
+            invalidar_usuario(usuario.id_usuario)
             logger.info(f"Usuario activado: {pk}")
 
             user_serializer = UsuarioSerializer(usuario)
@@ -449,6 +476,7 @@ class UsuarioViewSet(viewsets.ModelViewSet):
             usuario.activo = False
             usuario.fecha_modificacion = now()
             usuario.save()
+            invalidar_usuario(usuario.id_usuario)
             logger.info(f"Usuario desactivado: {pk}")
 
             user_serializer = UsuarioSerializer(usuario)
@@ -595,7 +623,7 @@ class UsuarioViewSet(viewsets.ModelViewSet):
                     [correo],
                     fail_silently=False,
                 )
-                logger.info(f"Solicitud de recuperación de contraseña enviada exitosamente: {correo}")
+                logger.info(f"Correo de recuperación de contraseña encolado: {correo}")
                 email_sent = True
             except Exception as email_error:
                 logger.error(f"Error enviando correo: {str(email_error)}")
@@ -687,6 +715,7 @@ class UsuarioViewSet(viewsets.ModelViewSet):
 
             usuario.password_hash = make_password(password)
             usuario.save()
+            invalidar_usuario(usuario.id_usuario)
             logger.info(f"Contraseña restablecida para usuario: {usuario.id_usuario}")
 
             return Response(
@@ -705,28 +734,14 @@ class UsuarioViewSet(viewsets.ModelViewSet):
     def estadisticas(self, request) -> Response:
         """Obtener estadísticas de usuarios"""
         try:
-            queryset = UsuarioSistema.obtener_no_eliminados()
-            
-            total = queryset.count()
-            activos = queryset.filter(activo=True).count()
-            inactivos = total - activos
-
-            por_rol = {}
-            for rol in Rol.objects.all():
-                count = queryset.filter(id_rol=rol).count()
-                por_rol[rol.nombre_rol] = count
+            estadisticas = estadisticas_usuarios()
 
             logger.info("Estadísticas generadas")
 
             return Response(
                 {
                     "success": True,
-                    "data": {
-                        "total": total,
-                        "activos": activos,
-                        "inactivos": inactivos,
-                        "por_rol": por_rol,
-                    },
+                    "data": estadisticas,
                 },
                 status=status.HTTP_200_OK,
             )
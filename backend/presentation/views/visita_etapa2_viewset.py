@@ -107,7 +107,8 @@ class VisitaEtapa2ViewSet(viewsets.ModelViewSet):
                 postulacion.estado = 'VISITA_PENDIENTE'
                 postulacion.save(update_fields=['estado'])
 
-    def _check_docs_y_actualizar_estado(self, visita):
+    @staticmethod
+    def _check_docs_y_actualizar_estado(visita):
         """
         Regla automática de estado:
           • Si la visita tiene al menos un documento activo  →  COMPLETADA / VISITA_REALIZADA.
@@ -3,21 +3,31 @@ import os
 
 ALLOWED_EXTENSIONS = {'.pdf', '.jpg', '.jpeg', '.png'}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5 MB
+# Límite para archivos subidos por fragmentos (escaneos grandes)
+MAX_CHUNKED_FILE_SIZE = 50 * 1024 * 1024  # 50 MB
 
 
-def validate_uploaded_file(archivo):
+def validate_file_metadata(nombre, tamano, max_size=MAX_FILE_SIZE):
     """
-    Valida extensión y tamaño del archivo subido.
+    Valida extensión y tamaño a partir del nombre y el tamaño declarados.
     Retorna None si es válido, o un string con el error.
     """
-    if not archivo:
-        return 'archivo es requerido.'
-
-    ext = os.path.splitext(archivo.name)[1].lower()
+    ext = os.path.splitext(nombre or '')[1].lower()
     if ext not in ALLOWED_EXTENSIONS:
         return f'Tipo de archivo no permitido ({ext}). Solo se aceptan: {", ".join(sorted(ALLOWED_EXTENSIONS))}'
 
-    if archivo.size > MAX_FILE_SIZE:
-        return f'El archivo excede el tamaño máximo permitido ({MAX_FILE_SIZE // (1024 * 1024)} MB).'
+    if tamano > max_size:
+        return f'El archivo excede el tamaño máximo permitido ({max_size // (1024 * 1024)} MB).'
 
     return None
+
+
+def validate_uploaded_file(archivo):
+    """
+    Valida extensión y tamaño del archivo subido.
+    Retorna None si es válido, o un string con el error.
+    """
+    if not archivo:
+        return 'archivo es requerido.'
+
+    return validate_file_metadata(archivo.name, archivo.size)
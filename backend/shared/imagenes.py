@@ -0,0 +1,64 @@
+"""Normalización de imágenes subidas y generación de miniaturas."""
+import io
+import os
+
+from PIL import Image, ImageOps
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
+MAX_LADO_IMAGEN = 2048      # px, lado mayor de la versión para revisión
+MAX_BYTES_IMAGEN = 1536 * 1024
+LADO_MINIATURA = 320        # px
+CALIDAD_JPEG = 85
+
+
+def es_imagen(nombre):
+    return os.path.splitext(nombre or '')[1].lower() in IMAGE_EXTENSIONS
+
+
+def _abrir(origen, lado_objetivo):
+    """Abre la imagen ya orientada. Retorna (imagen, formato original)."""
+    img = Image.open(origen)
+    formato = img.format
+    # JPEG: decodificar directamente a una escala reducida cuando es posible
+    img.draft('RGB', (lado_objetivo, lado_objetivo))
+    # Respetar la orientación EXIF de las fotos tomadas con el celular
+    return ImageOps.exif_transpose(img), formato
+
+
+def _a_rgb(img):
+    if img.mode in ('RGB', 'L'):
+        return img
+    fondo = Image.new('RGB', img.size, 'white')
+    if img.mode in ('RGBA', 'LA', 'P'):
+        img = img.convert('RGBA')
+        fondo.paste(img, mask=img.getchannel('A'))
+        return fondo
+    return img.convert('RGB')
+
+
+def normalizar_imagen(origen, tamano_bytes=0, max_lado=MAX_LADO_IMAGEN, max_bytes=MAX_BYTES_IMAGEN):
+    """
+    Re-codifica la imagen para que su lado mayor no supere `max_lado`.
+    Retorna (bytes, extensión) o None si la imagen ya está dentro de los
+    límites de resolución y de tamaño.
+    """
+    img, formato = _abrir(origen, max_lado)
+    if max(img.size) <= max_lado and tamano_bytes <= max_bytes:
+        return None
+    img.thumbnail((max_lado, max_lado), Image.LANCZOS)
+
+    salida = io.BytesIO()
+    if formato == 'PNG':
+        img.save(salida, 'PNG', optimize=True)
+        return salida.getvalue(), '.png'
+    _a_rgb(img).save(salida, 'JPEG', quality=CALIDAD_JPEG, optimize=True, progressive=True)
+    return salida.getvalue(), '.jpg'
+
+
+def generar_miniatura(origen, lado=LADO_MINIATURA):
+    """Miniatura JPEG con lado mayor `lado`. Retorna los bytes."""
+    img = _a_rgb(_abrir(origen, lado)[0])
+    img.thumbnail((lado, lado), Image.LANCZOS)
+    salida = io.BytesIO()
+    img.save(salida, 'JPEG', quality=CALIDAD_JPEG, optimize=True)
+    return salida.getvalue()
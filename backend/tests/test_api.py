@@ -188,6 +188,125 @@ class TestPasswordRecoveryEndpoint:
         )
         assert resp.status_code == 400
 
+    def test_solicitar_recuperacion_encola_correo(self, anon_client, admin_user):
+        from infrastructure.database.models import CorreoSaliente
+
+        resp = anon_client.post(
+            "/api/usuarios/solicitar_recuperacion/",
+            {"correo": "admin_test@test.com"},
+            format="json",
+        )
+        assert resp.status_code == 200
+        correo = CorreoSaliente.objects.get()
+        assert correo.estado == "PENDIENTE"
+        assert correo.destinatarios == ["admin_test@test.com"]
+        assert "Recuperación de contraseña" in correo.asunto
+
+
+# ──────── Bandeja de salida de correos ────────
+
+
+class TestBandejaCorreos:
+    @pytest.fixture
+    def enviar(self, django_capture_on_commit_callbacks):
+        # El envío corre en on_commit; en pruebas no hay commit real
+        from infrastructure.correo import enviar_lote
+
+        def enviar():
+            with django_capture_on_commit_callbacks(execute=True):
+                return enviar_lote()
+        return enviar
+
+    def test_lote_usa_una_sola_conexion(self, settings, tmp_path, enviar):
+        from infrastructure.correo import encolar_correo
+        from infrastructure.database.models import CorreoSaliente
+
+        settings.EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
+        settings.EMAIL_FILE_PATH = str(tmp_path)
+        for i in range(3):
+            encolar_correo(f"Aviso {i}", "Cuerpo", [f"p{i}@test.com"])
+
+        assert enviar() == 3
+        assert enviar() == 0
+        # El backend filebased escribe un archivo por conexión
+        archivos = list(tmp_path.iterdir())
+        assert len(archivos) == 1
+        contenido = archivos[0].read_text()
+        assert all(f"Subject: Aviso {i}" in contenido for i in range(3))
+        assert set(CorreoSaliente.objects.values_list("estado", flat=True)) == {"ENVIADO"}
+
+    def test_fallo_reprograma_con_espera_exponencial(self, settings, monkeypatch, enviar):
+        from django.core.mail.backends.locmem import EmailBackend
+        from django.utils import timezone
+        from infrastructure.correo import encolar_correo
+
+        settings.CORREOS_MAX_INTENTOS = 3
+        settings.CORREOS_REINTENTO_SEGUNDOS = 60
+
+        def falla(self, mensajes):
+            raise ConnectionError("SMTP caído")
+
+        monkeypatch.setattr(EmailBackend, "send_messages", falla)
+        correo = encolar_correo("Aviso", "Cuerpo", ["p@test.com"])
+
+        assert enviar() == 1
+        correo.refresh_from_db()
+        assert correo.estado == "PENDIENTE"
+        assert correo.intentos == 1
+        assert "SMTP caído" in correo.ultimo_error
+        assert correo.proximo_intento > timezone.now() + timezone.timedelta(seconds=50)
+        # No se reintenta antes de tiempo
+        assert enviar() == 0
+
+        for esperado in (2, 3):
+            correo.proximo_intento = timezone.now()
+            correo.save(update_fields=["proximo_intento"])
+            enviar()
+            correo.refresh_from_db()
+            assert correo.intentos == esperado
+        assert correo.estado == "FALLIDO"
+
+    def test_envio_fuera_de_la_transaccion(self, settings, enviar):
+        from django.core import mail
+        from django.db import transaction
+        from infrastructure.correo import encolar_correo, enviar_lote
+        from infrastructure.database.models import CorreoSaliente
+
+        settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+        correo = encolar_correo("Aviso", "Cuerpo", ["p@test.com"])
+
+        # Nada sale si la transacción que tomó el lote se revierte
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                assert enviar_lote() == 1
+                assert mail.outbox == []
+                raise RuntimeError
+        assert mail.outbox == []
+        correo.refresh_from_db()
+        assert correo.estado == "PENDIENTE"
+
+        assert enviar() == 1
+        assert len(mail.outbox) == 1
+        assert CorreoSaliente.objects.get().estado == "ENVIADO"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_comando_enviar_correos():
+    import io
+    from django.core import mail
+    from django.core.management import call_command
+    from infrastructure.correo import send_mail
+
+    send_mail("Aviso", "Cuerpo", None, ["p@test.com"], html_message="<p>Cuerpo</p>")
+    assert len(mail.outbox) == 0
+
+    salida = io.StringIO()
+    call_command("enviar_correos", "--once", "--workers", "2", stdout=salida)
+    assert "1 correo(s) procesado(s)" in salida.getvalue()
+    assert len(mail.outbox) == 1
+    assert mail.outbox[0].to == ["p@test.com"]
+    assert mail.outbox[0].alternatives[0][1] == "text/html"
+
 
 # ──────── Usuarios CRUD ────────
 
@@ -204,6 +323,82 @@ class TestUsuariosEndpoint:
         data = resp.json()
         assert "results" in data or isinstance(data, list)
 
+    def test_estadisticas_en_una_consulta_y_cacheadas(self, auth_client, admin_user, roles,
+                                                      django_capture_on_commit_callbacks):
+        from django.core.cache import cache
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from infrastructure.database.estadisticas_usuarios import CLAVE_CACHE
+
+        cache.delete(CLAVE_CACHE)
+        UsuarioSistema.objects.create(
+            nombre_completo="Tec Inactivo", correo="tec@test.com", numero_documento="9999999902",
+            password_hash=make_password("Tec12345*"), id_rol=roles[2], activo=False,
+        )
+
+        with CaptureQueriesContext(connection) as ctx:
+            data = auth_client.get("/api/usuarios/estadisticas/").json()["data"]
+        assert data == {
+            "total": 2, "activos": 1, "inactivos": 1,
+            "por_rol": {"ADMIN": 1, "FUNCIONARIO": 0, "TECNICO_VISITANTE": 1},
+        }
+        assert sum("COUNT(" in q["sql"] for q in ctx.captured_queries) == 1
+
+        with CaptureQueriesContext(connection) as ctx:
+            stats = auth_client.get("/api/usuarios/", {"page_size": 1}).json()["stats"]
+        assert stats == {"total": 2, "activos": 1, "inactivos": 1, "admins": 1, "funcionarios": 0, "tecnicos": 1}
+        # Desde el cache: solo el conteo y la página del listado
+        assert sum("COUNT(" in q["sql"] for q in ctx.captured_queries) == 1
+
+        # Cambiar el estado de un usuario invalida el cache al confirmar
+        with django_capture_on_commit_callbacks(execute=True):
+            tecnico = UsuarioSistema.objects.get(correo="tec@test.com")
+            tecnico.activo = True
+            tecnico.save()
+        data = auth_client.get("/api/usuarios/estadisticas/").json()["data"]
+        assert (data["activos"], data["inactivos"]) == (2, 0)
+
+    def test_busqueda_por_documento_correo_y_nombre(self, auth_client, admin_user, roles):
+        UsuarioSistema.objects.create(
+            nombre_completo="María Fernanda Gómez", correo="mfgomez@alcaldia.gov.co",
+            numero_documento="5550001", password_hash=make_password("Func1234*"), id_rol=roles[1],
+        )
+
+        def buscar(texto):
+            resp = auth_client.get("/api/usuarios/", {"search": texto, "include_stats": "false"})
+            assert resp.status_code == 200
+            return [u["numero_documento"] for u in resp.json()["results"]]
+
+        assert buscar("5550") == ["5550001"]
+        assert buscar("MFGOMEZ@alcaldia") == ["5550001"]
+        assert buscar("fernanda gó") == ["5550001"]
+        assert buscar("no-existe") == []
+
+    def test_paginacion_por_cursor(self, auth_client, admin_user, roles):
+        for i in range(4):
+            UsuarioSistema.objects.create(
+                nombre_completo=f"Tecnico {i}", correo=f"tecnico{i}@test.com",
+                numero_documento=f"770000{i}", password_hash=make_password("Tec12345*"), id_rol=roles[2],
+            )
+        esperados = list(
+            UsuarioSistema.obtener_no_eliminados()
+            .order_by("-fecha_creacion", "-id_usuario")
+            .values_list("numero_documento", flat=True)
+        )
+
+        vistos, cursor = [], ""
+        while cursor is not None:
+            data = auth_client.get(
+                "/api/usuarios/", {"cursor": cursor, "page_size": 2, "include_stats": "false"}
+            ).json()
+            assert "count" not in data
+            vistos += [u["numero_documento"] for u in data["results"]]
+            cursor = data["next_cursor"]
+        assert vistos == esperados
+
+        resp = auth_client.get("/api/usuarios/", {"cursor": "manipulado"})
+        assert resp.status_code == 400
+
 
 # ──────── Programas ────────
 
@@ -261,6 +456,88 @@ class TestEtapasEndpoint:
         assert resp.status_code == 200
 
 
+class TestFormulariosPublicos:
+    @pytest.fixture
+    def etapa(self, db):
+        from django.core.cache import cache
+        from infrastructure.database.models import CampoFormulario, Etapa, FormularioEtapa, Programa
+
+        cache.clear()
+        programa = Programa.objects.create(
+            nombre="Programa Público", descripcion="Desc", entidad_responsable="Ent", estado="ACTIVO",
+        )
+        etapa = Etapa.objects.create(programa=programa, numero_etapa=1, modulo_principal="REGISTRO_HOGAR")
+        formulario = FormularioEtapa.objects.create(etapa=etapa)
+        CampoFormulario.objects.create(formulario=formulario, campo_catalogo="primer_nombre", orden=1)
+        return etapa
+
+    def test_formulario_publico_desde_cache_con_etag(self, anon_client, auth_client, etapa,
+                                                     django_capture_on_commit_callbacks):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        url = f"/api/etapas/{etapa.id}/formulario-publico/"
+        assert anon_client.get(url).status_code == 404
+
+        with django_capture_on_commit_callbacks(execute=True):
+            assert auth_client.post(f"/api/etapas/{etapa.id}/publicar-formulario/").status_code == 200
+
+        resp = anon_client.get(url)
+        assert resp.status_code == 200
+        assert resp.json()["campos"][0]["campo_catalogo"] == "primer_nombre"
+        assert resp["Cache-Control"].startswith("public, max-age=")
+        etag = resp["ETag"]
+
+        with CaptureQueriesContext(connection) as ctx:
+            assert anon_client.get(url).json() == resp.json()
+            no_modificado = anon_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert len(ctx.captured_queries) == 0
+        assert no_modificado.status_code == 304
+        assert no_modificado["ETag"] == etag
+
+        with django_capture_on_commit_callbacks(execute=True):
+            assert auth_client.post(f"/api/etapas/{etapa.id}/inhabilitar-formulario/").status_code == 200
+        assert anon_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 404
+
+    def test_config_e_info_publica_se_invalidan_al_guardar(self, anon_client, auth_client, etapa,
+                                                          django_capture_on_commit_callbacks):
+        info = anon_client.get(f"/api/etapas/{etapa.id}/info-publica/")
+        assert info.json()["registro_hogar_publicado"] is False
+        config_url = f"/api/etapas/{etapa.id}/registro-hogar-config/"
+        assert anon_client.get(config_url).status_code == 401
+        assert auth_client.get(config_url).json()["campos"] == {}
+
+        campos = {"direccion": {"requerido": True, "habilitado": True}}
+        with django_capture_on_commit_callbacks(execute=True):
+            assert auth_client.post(config_url, {"campos": campos}, format="json").status_code == 200
+            assert auth_client.post(f"/api/etapas/{etapa.id}/publicar-registro-hogar/").status_code == 200
+
+        resp = auth_client.get(config_url)
+        assert resp.json()["campos"] == campos
+        assert resp["Cache-Control"] == "private, no-cache"
+        nueva = anon_client.get(f"/api/etapas/{etapa.id}/info-publica/")
+        assert nueva.json()["registro_hogar_publicado"] is True
+        assert nueva["ETag"] != info["ETag"]
+
+    def test_inhabilitar_programa_invalida_formularios(self, anon_client, auth_client, etapa,
+                                                       django_capture_on_commit_callbacks):
+        from infrastructure.database.models import ConfigRegistroHogar, FormularioEtapa
+
+        FormularioEtapa.objects.filter(etapa=etapa).update(estado="PUBLICADO")
+        ConfigRegistroHogar.objects.create(etapa=etapa, campos={}, publicado=True)
+        url = f"/api/etapas/{etapa.id}/formulario-publico/"
+        assert anon_client.get(url).status_code == 200
+        assert anon_client.get(f"/api/etapas/{etapa.id}/info-publica/").json()["registro_hogar_publicado"] is True
+
+        with django_capture_on_commit_callbacks(execute=True):
+            resp = auth_client.post(
+                f"/api/programas/{etapa.programa_id}/cambiar_estado/", {"nuevo_estado": "INHABILITADO"}, format="json",
+            )
+        assert resp.status_code == 200
+        assert anon_client.get(url).status_code == 404
+        assert anon_client.get(f"/api/etapas/{etapa.id}/info-publica/").json()["registro_hogar_publicado"] is False
+
+
 # ──────── Dashboard ────────
 
 
@@ -276,6 +553,149 @@ class TestDashboardEndpoint:
         assert "programas" in data
         assert "etapas" in data
 
+    def test_dashboard_lee_contadores_en_una_consulta(self, auth_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from infrastructure.database.models import Etapa, Postulacion, Programa
+
+        programa = Programa.objects.create(
+            nombre="P", descripcion="D", entidad_responsable="E", codigo_programa="DASH-1", estado="ACTIVO",
+        )
+        etapa = Etapa.objects.create(programa=programa, numero_etapa=1, modulo_principal="REGISTRO_HOGAR")
+        postulaciones = [Postulacion.objects.create(programa=programa, etapa_actual=etapa) for _ in range(3)]
+        # Cambios masivos y bajas lógicas también mueven los contadores
+        Postulacion.objects.filter(pk=postulaciones[0].pk).update(estado="APROBADA")
+        Postulacion.objects.filter(programa=programa, estado="APROBADA").update(estado="BENEFICIADO")
+        Etapa.objects.filter(pk=etapa.pk).update(finalizada=True)
+
+        with CaptureQueriesContext(connection) as ctx:
+            data = auth_client.get("/api/dashboard/estadisticas/").json()
+        assert len(ctx.captured_queries) <= 2
+
+        estados = data["postulaciones"]["por_estado"]
+        assert data["postulaciones"]["total"] == 3
+        assert estados["BENEFICIADO"] == 1
+        assert "APROBADA" not in estados
+        assert data["programas"]["por_estado"] == {"ACTIVO": 1}
+        assert data["etapas"] == {"total": 1, "activas": 0, "finalizadas": 1}
+        assert data["usuarios"]["activos"] == 1
+
+        Postulacion.objects.filter(programa=programa).update(activo_logico=False)
+        assert auth_client.get("/api/dashboard/estadisticas/").json()["postulaciones"]["total"] == 0
+
+    def test_reconciliar_contadores(self, admin_user):
+        import io
+        from django.core.management import call_command
+        from infrastructure.database.contadores import leer_contadores, recalcular_contadores
+        from infrastructure.database.models import ContadorDashboard
+
+        assert recalcular_contadores(aplicar=False) == {}
+
+        ContadorDashboard.objects.filter(clave="usuarios.total").update(valor=40)
+        salida = io.StringIO()
+        call_command("reconciliar_contadores", "--solo-reportar", stdout=salida)
+        assert "usuarios.total: 40 → 1 (-39)" in salida.getvalue()
+        assert leer_contadores()["usuarios.total"] == 40
+
+        call_command("reconciliar_contadores", stdout=io.StringIO())
+        assert leer_contadores()["usuarios.total"] == 1
+        assert recalcular_contadores(aplicar=False) == {}
+
+    def test_eliminar_contadores_quita_los_triggers(self):
+        from django.db import connection
+        from infrastructure.database.contadores import eliminar_contadores
+        from infrastructure.database.models import Programa
+
+        # Como al revertir la migración: sin triggers, la tabla puede desaparecer
+        eliminar_contadores()
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TABLE contadores_dashboard")
+        Programa.objects.create(nombre="P", descripcion="D", entidad_responsable="E", codigo_programa="REV-1")
+
+
+class TestDashboardSeries:
+    URL = "/api/dashboard/series/"
+
+    @pytest.fixture
+    def programa(self, db, settings, tmp_path):
+        from django.core.files.base import ContentFile
+        from infrastructure.database.models import DocumentoProcesoInterno, Etapa, Postulacion, Programa
+
+        settings.MEDIA_ROOT = tmp_path
+        programa = Programa.objects.create(
+            nombre="P", descripcion="D", entidad_responsable="E", codigo_programa="SER-1", estado="ACTIVO",
+        )
+        etapa = Etapa.objects.create(programa=programa, numero_etapa=1, modulo_principal="REGISTRO_HOGAR")
+        postulaciones = [Postulacion.objects.create(programa=programa, etapa_actual=etapa) for _ in range(2)]
+        Postulacion.objects.filter(pk=postulaciones[0].pk).update(estado="APROBADA")
+        DocumentoProcesoInterno.objects.create(
+            postulacion=postulaciones[1], tipo_documento="ACTA_VISITA_TECNICA",
+            archivo=ContentFile(b"%PDF", name="acta.pdf"),
+        )
+        return programa
+
+    def test_series_del_dia(self, auth_client, programa):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from django.utils import timezone
+
+        hoy = str(timezone.localdate())
+        with CaptureQueriesContext(connection) as ctx:
+            resp = auth_client.get(self.URL, {"programa_id": programa.id})
+        assert resp.status_code == 200
+        assert len(ctx.captured_queries) <= 2
+
+        series = resp.json()["series"]
+        # Las altas no se desglosan por estado (ver infrastructure/database/rollups.py)
+        assert series["postulaciones"] == [{"fecha": hoy, "total": 2, "por_estado": {}}]
+        assert series["cambios_estado"][0]["por_estado"] == {"APROBADA": 1}
+        assert series["documentos"][0]["por_estado"] == {"ACTA_VISITA_TECNICA": 1}
+        assert series["visitas"] == []
+
+        otra = auth_client.get(self.URL, {"programa_id": programa.id, "metrica": "documentos",
+                                          "desde": "2020-01-01", "hasta": "2020-01-31"}).json()
+        assert otra["series"] == {"documentos": []}
+
+    def test_parametros_invalidos(self, auth_client, programa):
+        assert auth_client.get(self.URL).status_code == 400
+        assert auth_client.get(self.URL, {"programa_id": programa.id, "desde": "ayer"}).status_code == 400
+        assert auth_client.get(self.URL, {"programa_id": programa.id, "desde": "2026-02-01",
+                                          "hasta": "2026-01-01"}).status_code == 400
+        assert auth_client.get(self.URL, {"programa_id": programa.id, "desde": "2020-01-01",
+                                          "hasta": "2026-01-01"}).status_code == 400
+        assert auth_client.get(self.URL, {"programa_id": programa.id, "metrica": "x"}).status_code == 400
+
+    def test_reconstruir_rollups(self, auth_client, programa):
+        import io
+        from django.core.management import call_command
+        from infrastructure.database.models import RollupDiario
+
+        # Sin deriva, reconstruir no cambia las series aunque haya cambios de estado
+        antes = auth_client.get(self.URL, {"programa_id": programa.id}).json()["series"]
+        call_command("reconstruir_rollups", "--programa", str(programa.id), stdout=io.StringIO())
+        assert auth_client.get(self.URL, {"programa_id": programa.id}).json()["series"] == antes
+
+        RollupDiario.objects.filter(metrica="postulaciones").update(cantidad=99)
+        call_command("reconstruir_rollups", "--programa", str(programa.id), stdout=io.StringIO())
+
+        series = auth_client.get(self.URL, {"programa_id": programa.id}).json()["series"]
+        assert series["postulaciones"][0]["total"] == 2
+        assert series["documentos"][0]["total"] == 1
+        # Los cambios de estado no se pueden reconstruir: se conservan
+        assert series["cambios_estado"][0]["total"] == 1
+
+    def test_eliminar_rollups_quita_los_triggers(self, programa):
+        from django.db import connection
+        from infrastructure.database.models import Postulacion
+        from infrastructure.database.rollups import eliminar_rollups
+
+        eliminar_rollups()
+        with connection.cursor() as cursor:
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            cursor.execute("DROP TABLE rollups_diarios")
+        postulacion = Postulacion.objects.create(programa=programa, etapa_actual=programa.etapas.get())
+        Postulacion.objects.filter(pk=postulacion.pk).update(estado="APROBADA")
+
 
 # ──────── Token expirado / malformado ────────
 
@@ -8,12 +8,23 @@ from unittest.mock import MagicMock, patch
 from django.core import signing
 from django.test import RequestFactory
 
-from infrastructure.authentication import SignedTokenAuthentication, TOKEN_MAX_AGE
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from infrastructure.authentication import SignedTokenAuthentication, TOKEN_MAX_AGE, cache_usuarios
 
 
 pytestmark = pytest.mark.django_db
 
 
+@pytest.fixture(autouse=True)
+def cache_limpia():
+    cache_usuarios.limpiar()
+    yield
+    cache_usuarios.limpiar()
+
+
 @pytest.fixture
 def auth_backend():
     return SignedTokenAuthentication()
@@ -130,3 +141,88 @@ class TestSignedTokenAuthentication:
     def test_usuario_is_authenticated_property(self, usuario_activo):
         assert usuario_activo.is_authenticated is True
         assert usuario_activo.is_anonymous is False
+
+
+def _request_con_token(rf, usuario):
+    token = signing.dumps(
+        {"uid": usuario.id_usuario, "rol": usuario.id_rol_id},
+        salt="auth-token",
+    )
+    return rf.get("/api/test/", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+
+class TestCacheUsuarios:
+    def test_segunda_autenticacion_sin_consultas(self, auth_backend, rf, usuario_activo):
+        auth_backend.authenticate(_request_con_token(rf, usuario_activo))
+        with CaptureQueriesContext(connection) as ctx:
+            user, _ = auth_backend.authenticate(_request_con_token(rf, usuario_activo))
+        assert len(ctx.captured_queries) == 0
+        assert user.pk == usuario_activo.pk
+
+    def test_cada_peticion_recibe_su_instancia(self, auth_backend, rf, usuario_activo):
+        primero, _ = auth_backend.authenticate(_request_con_token(rf, usuario_activo))
+        primero.nombre_completo = "Modificado"
+        segundo, _ = auth_backend.authenticate(_request_con_token(rf, usuario_activo))
+        assert segundo is not primero
+        assert segundo.nombre_completo == "Test Admin"
+
+    def test_ttl_cero_desactiva_cache(self, auth_backend, rf, usuario_activo, settings):
+        settings.AUTH_USUARIOS_CACHE_TTL = 0
+        auth_backend.authenticate(_request_con_token(rf, usuario_activo))
+        with CaptureQueriesContext(connection) as ctx:
+            auth_backend.authenticate(_request_con_token(rf, usuario_activo))
+        assert len(ctx.captured_queries) == 1
+
+    def test_limite_de_entradas(self, usuario_activo, settings):
+        settings.AUTH_USUARIOS_CACHE_MAX = 2
+        for uid in (1, 2, 3):
+            cache_usuarios.guardar(uid, usuario_activo)
+        cache_usuarios.obtener(2)
+        cache_usuarios.guardar(4, usuario_activo)
+        assert cache_usuarios.obtener(1) is None
+        assert cache_usuarios.obtener(3) is None
+        assert cache_usuarios.obtener(2) is not None
+        assert cache_usuarios.obtener(4) is not None
+
+    def test_desactivar_invalida_la_cache(self, auth_backend, rf, usuario_activo):
+        from django.contrib.auth.hashers import make_password
+        from infrastructure.database.usuarios_models import UsuarioSistema
+
+        admin = UsuarioSistema.objects.create(
+            nombre_completo="Otro Admin",
+            correo="otroadmin@test.com",
+            numero_documento="1234567891",
+            password_hash=make_password("Admin123*"),
+            id_rol=usuario_activo.id_rol,
+            activo=True,
+        )
+        auth_backend.authenticate(_request_con_token(rf, usuario_activo))
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=_request_con_token(rf, admin).META["HTTP_AUTHORIZATION"])
+        resp = client.post(f"/api/usuarios/{usuario_activo.id_usuario}/desactivar/")
+        assert resp.status_code == 200
+
+        from rest_framework.exceptions import AuthenticationFailed
+        with pytest.raises(AuthenticationFailed, match="inactivo"):
+            auth_backend.authenticate(_request_con_token(rf, usuario_activo))
+
+    def test_cambiar_rol_invalida_la_cache(self, auth_backend, rf, usuario_activo):
+        from infrastructure.database.roles_models import Rol
+
+        rol_tecnico, _ = Rol.objects.get_or_create(
+            id_rol=3, defaults={"nombre_rol": "TECNICO_VISITANTE", "descripcion": "Tec"}
+        )
+        auth_backend.authenticate(_request_con_token(rf, usuario_activo))
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=_request_con_token(rf, usuario_activo).META["HTTP_AUTHORIZATION"])
+        resp = client.post(
+            f"/api/usuarios/{usuario_activo.id_usuario}/cambiar_rol/",
+            {"rol": rol_tecnico.id_rol},
+            format="json",
+        )
+        assert resp.status_code == 200
+
+        user, _ = auth_backend.authenticate(_request_con_token(rf, usuario_activo))
+        assert user.id_rol_id == 3
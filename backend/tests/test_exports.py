@@ -0,0 +1,47 @@
+"""
+Tests del motor de ZIP en streaming (infrastructure.exports).
+"""
+import io
+import zipfile
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from infrastructure.exports import EntradaZip, iter_zip
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+class TestIterZip:
+    def test_genera_zip_valido_por_fragmentos(self, media):
+        pdf = default_storage.save('hogar/doc.pdf', ContentFile(b'%PDF-' + b'x' * 300_000))
+        txt = default_storage.save('hogar/notas.txt', ContentFile(b'a' * 10_000))
+
+        fragmentos = list(iter_zip(
+            [
+                EntradaZip('carpeta/'),
+                EntradaZip('carpeta/doc.pdf', pdf),
+                EntradaZip('carpeta/notas.txt', txt),
+            ],
+            chunk_size=16 * 1024,
+        ))
+
+        assert len(fragmentos) > 3
+        assert max(len(f) for f in fragmentos) < 64 * 1024
+        with zipfile.ZipFile(io.BytesIO(b''.join(fragmentos))) as zf:
+            assert zf.testzip() is None
+            assert zf.getinfo('carpeta/').is_dir()
+            assert zf.getinfo('carpeta/doc.pdf').compress_type == zipfile.ZIP_STORED
+            assert zf.getinfo('carpeta/notas.txt').compress_type == zipfile.ZIP_DEFLATED
+            assert zf.read('carpeta/doc.pdf') == b'%PDF-' + b'x' * 300_000
+
+    def test_omite_archivos_inexistentes(self, media):
+        data = b''.join(iter_zip([EntradaZip('falta.pdf', 'no/existe.pdf')]))
+
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            assert zf.namelist() == []
@@ -0,0 +1,1589 @@
+"""
+Tests de integración API — endpoints de postulaciones (registro del hogar).
+
+Requiere Django y la BD de pruebas.
+"""
+import datetime
+import hashlib
+import io
+from unittest.mock import patch
+import zipfile
+
+import pytest
+from PIL import Image
+from django.core import signing
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from infrastructure.database.models import (
+    Programa,
+    Etapa,
+    Postulacion,
+    ResultadoSorteo,
+    Sorteo,
+    ArchivoCatalogo,
+    BlobContenido,
+    CargaFragmentada,
+    Ciudadano,
+    CorreoSaliente,
+    DocumentoGestionHogar,
+    DocumentoMiembroHogar,
+    DocumentoProcesoInterno,
+    ExportacionDocumentos,
+    GestionHogarEtapa1,
+    MiembroHogar,
+    NotificacionSorteo,
+    RegistroEncolado,
+    Visita,
+)
+from infrastructure.database.usuarios_models import UsuarioSistema
+from infrastructure.database.paquetes_documentos import cargar_paquetes_documentos
+from infrastructure.database.sorteo import clave_orden, verificar_sorteo
+from infrastructure.correo.notificaciones_sorteo import procesar_lote
+from infrastructure.exports.exportacion_jobs import procesar_exportacion, reclamar_pendientes
+from infrastructure.storage.imagenes import procesar_siguiente
+from infrastructure.database.roles_models import Rol
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def roles(db):
+    """Crea los 3 roles base."""
+    r1, _ = Rol.objects.get_or_create(id_rol=1, defaults={"nombre_rol": "ADMIN", "descripcion": "Admin"})
+    r2, _ = Rol.objects.get_or_create(id_rol=2, defaults={"nombre_rol": "FUNCIONARIO", "descripcion": "Func"})
+    r3, _ = Rol.objects.get_or_create(id_rol=3, defaults={"nombre_rol": "TECNICO_VISITANTE", "descripcion": "Tec"})
+    return r1, r2, r3
+
+
+@pytest.fixture
+def admin_user(roles):
+    return UsuarioSistema.objects.create(
+        nombre_completo="Admin Test",
+        correo="admin_post@test.com",
+        numero_documento="9999999911",
+        password_hash=make_password("Admin123*"),
+        id_rol=roles[0],
+        activo=True,
+    )
+
+
+@pytest.fixture
+def visitante(roles):
+    return UsuarioSistema.objects.create(
+        nombre_completo="Visitante Test",
+        correo="visitante_post@test.com",
+        numero_documento="9999999912",
+        password_hash=make_password("Visit123*"),
+        id_rol=roles[2],
+        activo=True,
+    )
+
+
+@pytest.fixture
+def auth_client(admin_user):
+    token = signing.dumps(
+        {"uid": admin_user.id_usuario, "rol": admin_user.id_rol_id},
+        salt="auth-token",
+    )
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+@pytest.fixture
+def etapa(db):
+    programa = Programa.objects.create(
+        nombre="Programa Test",
+        descripcion="Desc",
+        entidad_responsable="Entidad",
+        codigo_programa="PT-001",
+        estado="ACTIVO",
+    )
+    return Etapa.objects.create(programa=programa, numero_etapa=1, modulo_principal="REGISTRO_HOGAR")
+
+
+def crear_hogar(etapa, n, documento=None):
+    """Crea Postulacion + GestionHogarEtapa1 + miembro cabeza de hogar."""
+    postulacion = Postulacion.objects.create(programa=etapa.programa, etapa_actual=etapa)
+    gestion = GestionHogarEtapa1.objects.create(
+        postulacion=postulacion,
+        etapa=etapa,
+        departamento="Valle",
+        municipio="Cali",
+        zona="URBANA",
+        direccion=f"Calle {n}",
+        numero_radicado=f"RAD-TEST-{n:04d}",
+    )
+    MiembroHogar.objects.create(
+        postulacion=gestion,
+        tipo_documento="CEDULA_CIUDADANIA",
+        numero_documento=documento or f"10{n:06d}",
+        primer_nombre="Nombre",
+        primer_apellido=f"Apellido{n}",
+        fecha_nacimiento=datetime.date(1990, 1, 1),
+        parentesco="OTRO",
+        es_cabeza_hogar=True,
+    )
+    return gestion
+
+
+# ──────── Listado registro-hogar ────────
+
+
+class TestListaRegistroHogar:
+    URL = "/api/postulaciones/registro-hogar/"
+
+    def test_visitante_asignado_sin_consultas_por_fila(self, auth_client, etapa, visitante):
+        for n in range(3):
+            gestion = crear_hogar(etapa, n)
+            Visita.objects.create(postulacion=gestion.postulacion, encuestador=visitante)
+        auth_client.get(self.URL)  # calienta la autenticación
+
+        with CaptureQueriesContext(connection) as ctx_pocos:
+            resp = auth_client.get(self.URL)
+        for n in range(3, 8):
+            gestion = crear_hogar(etapa, n)
+            Visita.objects.create(postulacion=gestion.postulacion, encuestador=visitante)
+        with CaptureQueriesContext(connection) as ctx_muchos:
+            resp = auth_client.get(self.URL)
+
+        assert resp.status_code == 200
+        data = resp.json()
+        assert len(data) == 8
+        assert all(r["visitante_asignado"]["id"] == visitante.id_usuario for r in data)
+        assert len(ctx_muchos.captured_queries) == len(ctx_pocos.captured_queries)
+
+    def test_ignora_visita_cancelada(self, auth_client, etapa, visitante):
+        gestion = crear_hogar(etapa, 1)
+        vigente = Visita.objects.create(postulacion=gestion.postulacion, encuestador=visitante)
+        Visita.objects.create(
+            postulacion=gestion.postulacion, encuestador=visitante, estado_visita="CANCELADA",
+        )
+
+        data = auth_client.get(self.URL).json()
+
+        assert data[0]["visita_id"] == vigente.id
+        assert data[0]["ciudadano"]["primer_apellido"] == "Apellido1"
+        assert data[0]["total_miembros"] == 1
+
+    def test_paginacion_por_cursor(self, auth_client, etapa):
+        for n in range(5):
+            crear_hogar(etapa, n)
+
+        vistos = []
+        resp = auth_client.get(self.URL, {"page_size": 2})
+        while True:
+            assert resp.status_code == 200
+            body = resp.json()
+            vistos.extend(r["id"] for r in body["results"])
+            if not body["next_cursor"]:
+                break
+            resp = auth_client.get(self.URL, {"page_size": 2, "cursor": body["next_cursor"]})
+
+        esperados = list(
+            GestionHogarEtapa1.objects.order_by("-fecha_radicado", "-id").values_list("id", flat=True)
+        )
+        assert vistos == esperados
+
+    def test_cursor_invalido(self, auth_client, etapa):
+        resp = auth_client.get(self.URL, {"cursor": "manipulado"})
+        assert resp.status_code == 400
+
+
+# ──────── Descarga masiva de documentos ────────
+
+
+class TestDescargarDocumentos:
+    URL = "/api/postulaciones/descargar-documentos/"
+
+    def test_descarga_zip_en_streaming(self, auth_client, etapa, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        gestion = crear_hogar(etapa, 1)
+        DocumentoGestionHogar.objects.create(
+            postulacion=gestion,
+            tipo_documento="RECIBO_PREDIAL",
+            archivo=ContentFile(b"%PDF-1.4 contenido", name="recibo.pdf"),
+        )
+
+        resp = auth_client.post(
+            self.URL,
+            {"postulacion_ids": [gestion.postulacion_id], "tipos_documento": {"hogar": ["RECIBO_PREDIAL"]}},
+            format="json",
+        )
+
+        assert resp.status_code == 200
+        assert resp.streaming
+        assert resp["Content-Type"] == "application/zip"
+        with zipfile.ZipFile(io.BytesIO(b"".join(resp.streaming_content))) as zf:
+            nombres = zf.namelist()
+            pdf = next(n for n in nombres if n.endswith("/RECIBO_PREDIAL.pdf"))
+            assert zf.read(pdf) == b"%PDF-1.4 contenido"
+
+    def test_sin_tipos_de_documento(self, auth_client, etapa):
+        gestion = crear_hogar(etapa, 1)
+        resp = auth_client.post(
+            self.URL, {"postulacion_ids": [gestion.postulacion_id], "tipos_documento": {}}, format="json",
+        )
+        assert resp.status_code == 400
+
+    def test_categoria_null_no_selecciona_tipos(self, auth_client, etapa, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        gestion = crear_hogar(etapa, 1)
+        DocumentoGestionHogar.objects.create(
+            postulacion=gestion,
+            tipo_documento="RECIBO_PREDIAL",
+            archivo=ContentFile(b"%PDF-1.4 contenido", name="recibo.pdf"),
+        )
+        ids = [gestion.postulacion_id]
+
+        resp = auth_client.post(self.URL, {"postulacion_ids": ids, "tipos_documento": {"hogar": None}}, format="json")
+        assert resp.status_code == 400
+
+        resp = auth_client.post(
+            self.URL, {"postulacion_ids": ids, "tipos_documento": {"hogar": None, "visita": ["ACTA"]}}, format="json",
+        )
+        assert resp.status_code == 200
+        with zipfile.ZipFile(io.BytesIO(b"".join(resp.streaming_content))) as zf:
+            assert not any(n.endswith("RECIBO_PREDIAL.pdf") for n in zf.namelist())
+
+        resp = auth_client.post(self.URL, {"postulacion_ids": ids, "tipos_documento": {"hogar": "todos"}}, format="json")
+        assert resp.status_code == 400
+
+
+# ──────── Paquetes de documentos ────────
+
+
+def adjuntar_documentos(gestion):
+    """Un documento de hogar, uno por miembro y uno de proceso interno."""
+    DocumentoGestionHogar.objects.create(
+        postulacion=gestion, tipo_documento="RECIBO_PREDIAL",
+        archivo=ContentFile(b"%PDF-hogar", name="hogar.pdf"),
+    )
+    for miembro in gestion.miembros.all():
+        DocumentoMiembroHogar.objects.create(
+            miembro=miembro, tipo_documento="CEDULA",
+            archivo=ContentFile(b"%PDF-miembro", name="cedula.pdf"),
+        )
+    DocumentoProcesoInterno.objects.create(
+        postulacion=gestion.postulacion, tipo_documento="ACTA_VISITA_TECNICA",
+        archivo=ContentFile(b"%PDF-proceso", name="acta.pdf"),
+    )
+
+
+class TestPaquetesDocumentos:
+    def test_consultas_constantes(self, etapa, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        gestiones = [crear_hogar(etapa, n) for n in range(6)]
+        for g in gestiones:
+            adjuntar_documentos(g)
+        ids = [g.postulacion_id for g in gestiones]
+
+        with CaptureQueriesContext(connection) as ctx_uno:
+            cargar_paquetes_documentos(postulacion_ids=ids[:1])
+        with CaptureQueriesContext(connection) as ctx_todos:
+            paquetes = cargar_paquetes_documentos(postulacion_ids=ids)
+
+        assert len(ctx_todos.captured_queries) == len(ctx_uno.captured_queries) == 6
+        assert {p.postulacion_id for p in paquetes} == set(ids)
+        for p in paquetes:
+            assert len(p.documentos_hogar) == 1
+            assert len(p.miembros[0].documentos_activos) == 1
+            assert len(p.documentos_proceso) == 1
+
+    def test_filtra_por_tipo_y_omite_categorias(self, etapa, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        gestion = crear_hogar(etapa, 1)
+        adjuntar_documentos(gestion)
+
+        with CaptureQueriesContext(connection) as ctx:
+            (paquete,) = cargar_paquetes_documentos(
+                postulacion_ids=[gestion.postulacion_id], tipos={"hogar": ["OTRO"], "proceso": []},
+            )
+
+        assert len(ctx.captured_queries) == 2
+        assert paquete.documentos_hogar == []
+        assert paquete.documentos_proceso == []
+
+    def test_detalle_usa_documentos_cargados(self, auth_client, etapa, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        gestion = crear_hogar(etapa, 1)
+        adjuntar_documentos(gestion)
+
+        data = auth_client.get(f"/api/postulaciones/registro-hogar/{gestion.id}/").json()
+
+        assert [d["tipo_documento"] for d in data["documentos_hogar"]] == ["RECIBO_PREDIAL"]
+        assert [d["tipo_documento"] for d in data["miembros"][0]["documentos"]] == ["CEDULA"]
+
+
+# ──────── Catálogo de archivos ────────
+
+
+class TestCatalogoArchivos:
+    def test_registra_metadatos_al_subir(self, etapa, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        gestion = crear_hogar(etapa, 1)
+        doc = DocumentoGestionHogar.objects.create(
+            postulacion=gestion, tipo_documento="RECIBO_PREDIAL",
+            archivo=ContentFile(b"%PDF-contenido", name="recibo.pdf"),
+        )
+
+        entrada = ArchivoCatalogo.objects.get(ruta=doc.archivo.name)
+        assert entrada.existe
+        assert entrada.ruta_canonica == doc.archivo.name
+        assert entrada.tamano_bytes == len(b"%PDF-contenido")
+        assert entrada.sha256 == hashlib.sha256(b"%PDF-contenido").hexdigest()
+        assert entrada.mime_type == "application/pdf"
+        assert entrada.fecha_verificacion is not None
+
+    def test_detalle_sin_consultar_storage(self, auth_client, etapa, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        gestion = crear_hogar(etapa, 1)
+        adjuntar_documentos(gestion)
+
+        with patch("django.core.files.storage.FileSystemStorage.exists") as exists:
+            data = auth_client.get(f"/api/postulaciones/registro-hogar/{gestion.id}/").json()
+
+        exists.assert_not_called()
+        assert data["documentos_hogar"][0]["archivo_url"].startswith("http://testserver/media/")
+
+    def test_detalle_registra_sin_calcular_hash(self, auth_client, etapa, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        gestion = crear_hogar(etapa, 1)
+        adjuntar_documentos(gestion)
+        ArchivoCatalogo.objects.all().delete()
+
+        with patch("infrastructure.storage.catalogo.calcular_metadatos") as calcular:
+            data = auth_client.get(f"/api/postulaciones/registro-hogar/{gestion.id}/").json()
+        calcular.assert_not_called()
+        assert data["documentos_hogar"][0]["archivo_url"].startswith("http://testserver/media/")
+        entrada = ArchivoCatalogo.objects.get(ruta=gestion.documentos.get().archivo.name)
+        assert entrada.existe and entrada.tamano_bytes == len(b"%PDF-hogar")
+        assert entrada.sha256 == ""
+
+        # El comando completa el hash de las entradas registradas así
+        call_command("catalogar_archivos", stdout=io.StringIO())
+        entrada.refresh_from_db()
+        assert entrada.sha256 == hashlib.sha256(b"%PDF-hogar").hexdigest()
+
+    def test_backfill_catalogo(self, etapa, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        gestion = crear_hogar(etapa, 1)
+        adjuntar_documentos(gestion)
+        ArchivoCatalogo.objects.all().delete()
+        DocumentoGestionHogar.objects.filter(postulacion=gestion).update(archivo="documentos/no/existe.pdf")
+
+        salida = io.StringIO()
+        call_command("catalogar_archivos", stdout=salida)
+
+        assert ArchivoCatalogo.objects.filter(existe=True).count() == 2
+        assert ArchivoCatalogo.objects.get(ruta="documentos/no/existe.pdf").existe is False
+        assert "1 sin archivo" in salida.getvalue()
+
+
+# ──────── Storage deduplicado ────────
+
+
+@pytest.fixture
+def storage_deduplicado(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.DOCUMENTOS_DEDUPLICADOS = True
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "default": {"BACKEND": "infrastructure.storage.dedup_storage.ContenidoDireccionadoStorage"},
+    }
+    return tmp_path
+
+
+class TestStorageDeduplicado:
+    def test_reutiliza_contenido_repetido(self, etapa, storage_deduplicado):
+        gestion = crear_hogar(etapa, 1)
+        docs = [
+            DocumentoGestionHogar.objects.create(
+                postulacion=gestion, tipo_documento="RECIBO_PREDIAL",
+                archivo=ContentFile(b"%PDF-mismo", name=f"recibo_{n}.pdf"),
+            )
+            for n in range(2)
+        ]
+
+        assert docs[0].archivo.name == docs[1].archivo.name
+        assert docs[0].archivo.name.startswith("documentos/blobs/")
+        assert len(list(storage_deduplicado.rglob("*.pdf"))) == 1
+        assert BlobContenido.objects.get(ruta=docs[0].archivo.name).referencias == 2
+
+    def test_elimina_al_quedar_sin_referencias(self, etapa, storage_deduplicado):
+        gestion = crear_hogar(etapa, 1)
+        for n in range(2):
+            DocumentoGestionHogar.objects.create(
+                postulacion=gestion, tipo_documento="OTRO",
+                archivo=ContentFile(b"%PDF-compartido", name="otro.pdf"),
+            )
+        nombre = DocumentoGestionHogar.objects.first().archivo.name
+
+        default_storage.delete(nombre)
+        assert default_storage.exists(nombre)
+        default_storage.delete(nombre)
+        assert not default_storage.exists(nombre)
+        assert not BlobContenido.objects.filter(ruta=nombre).exists()
+
+    def test_borrar_o_reemplazar_documento_descuenta(self, etapa, storage_deduplicado, django_capture_on_commit_callbacks):
+        gestion = crear_hogar(etapa, 1)
+        docs = [
+            DocumentoGestionHogar.objects.create(
+                postulacion=gestion, tipo_documento="OTRO",
+                archivo=ContentFile(b"%PDF-compartido", name="otro.pdf"),
+            )
+            for _ in range(2)
+        ]
+        nombre = docs[0].archivo.name
+
+        # El soft-delete conserva la referencia
+        docs[0].activo_logico = False
+        docs[0].save(update_fields=["activo_logico"])
+        assert BlobContenido.objects.get(ruta=nombre).referencias == 2
+
+        with django_capture_on_commit_callbacks(execute=True):
+            docs[0].delete()
+        assert BlobContenido.objects.get(ruta=nombre).referencias == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            docs[1].archivo = ContentFile(b"%PDF-nuevo", name="otro.pdf")
+            docs[1].save()
+        assert not BlobContenido.objects.filter(ruta=nombre).exists()
+        assert not default_storage.exists(nombre)
+        assert BlobContenido.objects.get(ruta=docs[1].archivo.name).referencias == 1
+
+    def test_migra_documentos_existentes(self, etapa, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        gestion = crear_hogar(etapa, 1)
+        for n in range(3):
+            DocumentoGestionHogar.objects.create(
+                postulacion=gestion, tipo_documento="OTRO",
+                archivo=ContentFile(b"%PDF-repetido", name="otro.pdf"),
+            )
+        settings.DOCUMENTOS_DEDUPLICADOS = True
+        settings.STORAGES = {
+            **settings.STORAGES,
+            "default": {"BACKEND": "infrastructure.storage.dedup_storage.ContenidoDireccionadoStorage"},
+        }
+
+        call_command("deduplicar_documentos", "--eliminar-originales", stdout=io.StringIO())
+
+        nombres = set(DocumentoGestionHogar.objects.values_list("archivo", flat=True))
+        assert len(nombres) == 1
+        assert BlobContenido.objects.get(ruta=nombres.pop()).referencias == 3
+        assert len(list(tmp_path.rglob("*.pdf"))) == 1
+
+
+# ──────── Exportaciones en segundo plano ────────
+
+
+class TestExportaciones:
+    URL = "/api/postulaciones/exportaciones/"
+
+    @pytest.fixture
+    def exportacion_lista(self, auth_client, etapa, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path / "media"
+        settings.EXPORTACIONES_ROOT = tmp_path / "exportaciones"
+        gestion = crear_hogar(etapa, 1)
+        DocumentoGestionHogar.objects.create(
+            postulacion=gestion,
+            tipo_documento="RECIBO_PREDIAL",
+            archivo=ContentFile(b"%PDF-1.4 " + b"z" * 5000, name="recibo.pdf"),
+        )
+        resp = auth_client.post(
+            self.URL,
+            {"postulacion_ids": [gestion.postulacion_id], "tipos_documento": {"hogar": ["RECIBO_PREDIAL"]}},
+            format="json",
+        )
+        assert resp.status_code == 202
+        assert resp.json()["estado"] == "PENDIENTE"
+
+        assert reclamar_pendientes(5) == [resp.json()["id"]]
+        procesar_exportacion(resp.json()["id"])
+        return ExportacionDocumentos.objects.get(pk=resp.json()["id"])
+
+    def test_procesa_y_reporta_progreso(self, auth_client, exportacion_lista):
+        data = auth_client.get(f"{self.URL}{exportacion_lista.id}/").json()
+
+        assert data["estado"] == "COMPLETADA"
+        assert data["progreso"] == 100
+        assert data["nombre_archivo"].endswith(".zip")
+
+    def test_reencola_solo_trabajos_sin_latido(self, etapa, admin_user, settings, tmp_path, monkeypatch):
+        from django.utils import timezone
+        from infrastructure.exports import exportacion_jobs
+
+        settings.EXPORTACIONES_ROOT = tmp_path
+        gestion = crear_hogar(etapa, 1)
+        viva, caida = (
+            ExportacionDocumentos.objects.create(
+                usuario_solicitante=admin_user, postulacion_ids=[gestion.postulacion_id],
+                tipos_documento={"hogar": ["RECIBO_PREDIAL"]}, estado="EN_PROCESO",
+            )
+            for _ in range(2)
+        )
+        hace_una_hora = timezone.now() - timezone.timedelta(hours=1)
+        ExportacionDocumentos.objects.filter(pk=caida.pk).update(fecha_actualizacion=hace_una_hora)
+
+        assert exportacion_jobs.reencolar_abandonadas(30) == 1
+        viva.refresh_from_db()
+        caida.refresh_from_db()
+        assert (viva.estado, caida.estado) == ("EN_PROCESO", "PENDIENTE")
+
+        # Mientras arma el ZIP, el trabajo late aunque no avance de postulación
+        ExportacionDocumentos.objects.filter(pk=viva.pk).update(fecha_actualizacion=hace_una_hora)
+        monkeypatch.setattr(exportacion_jobs, "LATIDO_SEGUNDOS", 0)
+        monkeypatch.setattr(exportacion_jobs, "INTERVALO_PROGRESO", 10 ** 6)
+        latidos = []
+        original = exportacion_jobs._latido
+
+        def espiar(exportacion):
+            latir = original(exportacion)
+
+            def contar():
+                latir()
+                latidos.append(ExportacionDocumentos.objects.get(pk=exportacion.pk).fecha_actualizacion)
+            return contar
+
+        monkeypatch.setattr(exportacion_jobs, "_latido", espiar)
+        exportacion_jobs.procesar_exportacion(viva.pk)
+        assert latidos and latidos[0] > hace_una_hora
+        assert not list(tmp_path.glob("*.part"))
+
+    def test_descarga_completa_y_reanudada(self, auth_client, exportacion_lista):
+        url = f"{self.URL}{exportacion_lista.id}/archivo/"
+        completa = b"".join(auth_client.get(url).streaming_content)
+        assert zipfile.ZipFile(io.BytesIO(completa)).testzip() is None
+
+        parcial = auth_client.get(url, HTTP_RANGE="bytes=100-")
+        assert parcial.status_code == 206
+        assert parcial["Content-Range"] == f"bytes 100-{len(completa) - 1}/{len(completa)}"
+        assert b"".join(parcial.streaming_content) == completa[100:]
+
+        fuera = auth_client.get(url, HTTP_RANGE=f"bytes={len(completa) + 10}-")
+        assert fuera.status_code == 416
+
+    def test_archivo_no_listo(self, auth_client, etapa):
+        gestion = crear_hogar(etapa, 1)
+        resp = auth_client.post(
+            self.URL,
+            {"postulacion_ids": [gestion.postulacion_id], "tipos_documento": {"hogar": ["RECIBO_PREDIAL"]}},
+            format="json",
+        )
+        archivo = auth_client.get(f"{self.URL}{resp.json()['id']}/archivo/")
+        assert archivo.status_code == 409
+
+
+@pytest.mark.django_db(transaction=True)
+def test_comando_procesar_exportaciones(etapa, admin_user, settings, tmp_path):
+    settings.EXPORTACIONES_ROOT = tmp_path
+    gestion = crear_hogar(etapa, 1)
+    exportacion = ExportacionDocumentos.objects.create(
+        usuario_solicitante=admin_user,
+        postulacion_ids=[gestion.postulacion_id],
+        tipos_documento={"hogar": ["RECIBO_PREDIAL"]},
+    )
+
+    call_command("procesar_exportaciones", "--once", "--workers", "2", stdout=io.StringIO())
+
+    exportacion.refresh_from_db()
+    assert exportacion.estado == "COMPLETADA"
+    assert (tmp_path / exportacion.ruta_archivo).is_file()
+
+
+# ──────── Cargas fragmentadas ────────
+
+
+class TestCargasFragmentadas:
+    URL = "/api/cargas-fragmentadas/"
+    FRAGMENTO = 64 * 1024
+
+    @pytest.fixture(autouse=True)
+    def directorios(self, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path / "media"
+        settings.CARGAS_FRAGMENTADAS_ROOT = tmp_path / "cargas"
+
+    def _enviar(self, client, carga_id, indice, datos, sha=None):
+        return client.put(
+            f"{self.URL}{carga_id}/fragmentos/{indice}/",
+            data=datos,
+            content_type="application/octet-stream",
+            HTTP_X_FRAGMENTO_SHA256=sha or hashlib.sha256(datos).hexdigest(),
+        )
+
+    def test_carga_reanudable_hogar(self, etapa, tmp_path):
+        gestion = crear_hogar(etapa, 1)
+        contenido = b"%PDF-1.4 " + bytes(range(256)) * 600
+        client = APIClient()
+
+        resp = client.post(self.URL, {
+            "destino": "HOGAR",
+            "objeto_id": gestion.postulacion_id,
+            "tipo_documento": "RECIBO_PREDIAL",
+            "nombre_archivo": "recibo.pdf",
+            "tamano_total": len(contenido),
+            "tamano_fragmento": self.FRAGMENTO,
+            "sha256": hashlib.sha256(contenido).hexdigest(),
+        }, format="json")
+        assert resp.status_code == 201
+        carga = resp.json()
+        assert carga["total_fragmentos"] == 3
+        partes = [contenido[i:i + self.FRAGMENTO] for i in range(0, len(contenido), self.FRAGMENTO)]
+
+        # Fragmentos fuera de orden; el 1 se "pierde" y se reintenta después
+        assert self._enviar(client, carga["id"], 2, partes[2]).status_code == 200
+        assert self._enviar(client, carga["id"], 0, partes[0]).status_code == 200
+        assert client.get(f"{self.URL}{carga['id']}/").json()["fragmentos_faltantes"] == [1]
+        pendiente = client.post(f"{self.URL}{carga['id']}/completar/")
+        assert pendiente.status_code == 409
+        assert pendiente.json()["fragmentos_faltantes"] == [1]
+
+        assert self._enviar(client, carga["id"], 1, partes[1]).status_code == 200
+        completada = client.post(f"{self.URL}{carga['id']}/completar/")
+
+        assert completada.status_code == 201
+        doc = DocumentoGestionHogar.objects.get(pk=completada.json()["documento_id"])
+        assert doc.postulacion_id == gestion.id
+        with doc.archivo.open("rb") as f:
+            assert f.read() == contenido
+        assert not (tmp_path / "cargas" / carga["id"]).exists()
+        # Reintentar completar no duplica el documento
+        assert client.post(f"{self.URL}{carga['id']}/completar/").status_code == 200
+        assert DocumentoGestionHogar.objects.count() == 1
+
+    def test_rechaza_fragmento_con_checksum_invalido(self, etapa):
+        gestion = crear_hogar(etapa, 1)
+        miembro = gestion.miembros.get()
+        client = APIClient()
+        carga = client.post(self.URL, {
+            "destino": "MIEMBRO",
+            "objeto_id": miembro.id,
+            "tipo_documento": "FOTO_CEDULA_FRENTE",
+            "nombre_archivo": "cedula.jpg",
+            "tamano_total": 1000,
+            "tamano_fragmento": self.FRAGMENTO,
+        }, format="json").json()
+
+        resp = self._enviar(client, carga["id"], 0, b"x" * 1000, sha="0" * 64)
+        assert resp.status_code == 400
+        assert self._enviar(client, carga["id"], 0, b"x" * 999).status_code == 400
+        assert CargaFragmentada.objects.get(pk=carga["id"]).fragmentos_recibidos == []
+
+    def test_valida_archivo_y_destino(self, etapa, auth_client):
+        gestion = crear_hogar(etapa, 1)
+        base = {
+            "destino": "PROCESO",
+            "objeto_id": gestion.postulacion_id,
+            "tipo_documento": "ACTA_VISITA_TECNICA",
+            "nombre_archivo": "acta.pdf",
+            "tamano_total": 1000,
+        }
+
+        assert APIClient().post(self.URL, base, format="json").status_code in (401, 403)
+        assert auth_client.post(self.URL, {**base, "nombre_archivo": "acta.exe"}, format="json").status_code == 400
+        assert auth_client.post(self.URL, {**base, "tamano_total": 60 * 1024 * 1024}, format="json").status_code == 400
+        assert auth_client.post(self.URL, {**base, "objeto_id": 999999}, format="json").status_code == 404
+        assert auth_client.post(self.URL, base, format="json").status_code == 201
+
+    def test_fragmento_perdido_se_pide_de_nuevo(self, etapa, tmp_path):
+        gestion = crear_hogar(etapa, 1)
+        client = APIClient()
+        carga = client.post(self.URL, {
+            "destino": "HOGAR",
+            "objeto_id": gestion.postulacion_id,
+            "tipo_documento": "RECIBO_PREDIAL",
+            "nombre_archivo": "recibo.pdf",
+            "tamano_total": self.FRAGMENTO + 10,
+            "tamano_fragmento": self.FRAGMENTO,
+        }, format="json").json()
+        self._enviar(client, carga["id"], 0, b"x" * self.FRAGMENTO)
+        self._enviar(client, carga["id"], 1, b"0123456789")
+        (tmp_path / "cargas" / carga["id"] / "000001.part").unlink()
+
+        resp = client.post(f"{self.URL}{carga['id']}/completar/")
+        assert resp.status_code == 409
+        assert resp.json()["fragmentos_faltantes"] == [1]
+        assert self._enviar(client, carga["id"], 1, b"0123456789").status_code == 200
+        assert client.post(f"{self.URL}{carga['id']}/completar/").status_code == 201
+
+    def test_carga_solo_de_su_usuario(self, etapa, auth_client, visitante):
+        gestion = crear_hogar(etapa, 1)
+        carga = auth_client.post(self.URL, {
+            "destino": "PROCESO",
+            "objeto_id": gestion.postulacion_id,
+            "tipo_documento": "ACTA_VISITA_TECNICA",
+            "nombre_archivo": "acta.pdf",
+            "tamano_total": 10,
+        }, format="json").json()
+        otro = APIClient()
+        otro.credentials(HTTP_AUTHORIZATION="Bearer " + signing.dumps(
+            {"uid": visitante.id_usuario, "rol": visitante.id_rol_id}, salt="auth-token",
+        ))
+
+        url = f"{self.URL}{carga['id']}/"
+        assert otro.get(url).status_code == 404
+        assert self._enviar(otro, carga["id"], 0, b"0123456789").status_code == 404
+        assert otro.post(f"{url}completar/").status_code == 404
+        assert otro.delete(url).status_code == 404
+        assert APIClient().get(url).status_code == 404
+        assert auth_client.get(url).status_code == 200
+
+    def test_limpia_cargas_vencidas(self, etapa, tmp_path):
+        gestion = crear_hogar(etapa, 1)
+        client = APIClient()
+        carga = client.post(self.URL, {
+            "destino": "HOGAR",
+            "objeto_id": gestion.postulacion_id,
+            "tipo_documento": "RECIBO_PREDIAL",
+            "nombre_archivo": "recibo.pdf",
+            "tamano_total": 10,
+        }, format="json").json()
+        self._enviar(client, carga["id"], 0, b"0123456789")
+        CargaFragmentada.objects.filter(pk=carga["id"]).update(
+            fecha_expiracion=datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc),
+        )
+
+        assert self._enviar(client, carga["id"], 0, b"0123456789").status_code == 410
+        call_command("limpiar_cargas_fragmentadas", stdout=io.StringIO())
+
+        assert CargaFragmentada.objects.get(pk=carga["id"]).estado == "CANCELADA"
+        assert not (tmp_path / "cargas" / carga["id"]).exists()
+
+
+# ──────── Miniaturas de imágenes ────────
+
+
+def foto_jpeg(ancho, alto):
+    buffer = io.BytesIO()
+    Image.new("RGB", (ancho, alto), "blue").save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+class TestImagenesDerivadas:
+    def test_genera_reducida_y_miniatura(self, auth_client, etapa, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        gestion = crear_hogar(etapa, 1)
+        foto = DocumentoGestionHogar.objects.create(
+            postulacion=gestion, tipo_documento="RECIBO_PREDIAL",
+            archivo=ContentFile(foto_jpeg(4000, 3000), name="fachada.jpg"),
+        )
+        DocumentoGestionHogar.objects.create(
+            postulacion=gestion, tipo_documento="OTRO",
+            archivo=ContentFile(b"%PDF-1.4", name="otro.pdf"),
+        )
+        assert ArchivoCatalogo.objects.get(ruta=foto.archivo.name).estado_imagen == "PENDIENTE"
+
+        assert procesar_siguiente() is True
+        assert procesar_siguiente() is False
+
+        entrada = ArchivoCatalogo.objects.get(ruta=foto.archivo.name)
+        assert entrada.estado_imagen == "PROCESADA"
+        assert max(Image.open(tmp_path / entrada.version_reducida).size) == 2048
+        assert max(Image.open(tmp_path / entrada.miniatura).size) == 320
+
+        data = auth_client.get(f"/api/postulaciones/registro-hogar/{gestion.id}/").json()
+        docs = {d["tipo_documento"]: d for d in data["documentos_hogar"]}
+        assert docs["RECIBO_PREDIAL"]["miniatura_url"].endswith(entrada.miniatura)
+        assert docs["RECIBO_PREDIAL"]["vista_url"].endswith(entrada.version_reducida)
+        assert docs["OTRO"]["miniatura_url"] == ""
+        assert docs["OTRO"]["vista_url"] == docs["OTRO"]["archivo_url"]
+
+    def test_reutiliza_derivados_del_mismo_contenido(self, etapa, settings, tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        gestion = crear_hogar(etapa, 1)
+        contenido = foto_jpeg(600, 400)
+        docs = [
+            DocumentoGestionHogar.objects.create(
+                postulacion=gestion, tipo_documento="RECIBO_PREDIAL",
+                archivo=ContentFile(contenido, name="foto.jpg"),
+            )
+            for _ in range(2)
+        ]
+
+        while procesar_siguiente():
+            pass
+
+        entradas = ArchivoCatalogo.objects.filter(ruta__in=[d.archivo.name for d in docs])
+        assert {e.miniatura for e in entradas} == {entradas[0].miniatura}
+        # Dentro del límite: no se genera versión reducida
+        assert {e.version_reducida for e in entradas} == {""}
+        assert len(list((tmp_path / "documentos" / "derivados").rglob("*.jpg"))) == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_comando_procesar_imagenes(etapa, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    gestion = crear_hogar(etapa, 1)
+    foto = DocumentoGestionHogar.objects.create(
+        postulacion=gestion, tipo_documento="RECIBO_PREDIAL",
+        archivo=ContentFile(foto_jpeg(300, 200), name="foto.jpg"),
+    )
+
+    call_command("procesar_imagenes", "--once", "--workers", "2", stdout=io.StringIO())
+
+    assert ArchivoCatalogo.objects.get(ruta=foto.archivo.name).estado_imagen == "PROCESADA"
+
+
+# ──────── Sorteo ────────
+
+
+class TestSorteo:
+    BASE = "/api/postulaciones/sorteo/"
+
+    @pytest.fixture
+    def elegibles(self, etapa):
+        etapa.finalizada = True
+        etapa.save(update_fields=["finalizada"])
+        gestiones = []
+        for n in range(6):
+            gestion = crear_hogar(etapa, n)
+            gestion.ciudadano = Ciudadano.objects.create(
+                tipo_documento="CC", numero_documento=f"50{n:04d}",
+                primer_nombre=f"Nombre{n}", primer_apellido=f"Apellido{n}",
+                fecha_nacimiento=datetime.date(1990, 1, 1), sexo="M", nacionalidad="Colombiana",
+            )
+            gestion.save(update_fields=["ciudadano"])
+            gestiones.append(gestion)
+        # Una postulación aprobada sin registro del hogar
+        sin_hogar = Postulacion.objects.create(programa=etapa.programa, etapa_actual=etapa)
+        Postulacion.objects.filter(programa=etapa.programa).update(estado="APROBADA")
+        return etapa.programa, gestiones, sin_hogar
+
+    def test_elegibles_en_una_consulta(self, auth_client, elegibles):
+        programa, gestiones, sin_hogar = elegibles
+
+        with CaptureQueriesContext(connection) as ctx:
+            data = auth_client.get(f"{self.BASE}elegibles/", {"programa_id": programa.id}).json()
+
+        assert len(data) == 7
+        assert data[0]["nombre"] == "Nombre0 Apellido0"
+        assert data[0]["documento"] == "500000"
+        assert data[-1] == {
+            "id": sin_hogar.id, "numero_radicado": f"POST-{sin_hogar.id}",
+            "nombre": f"Postulación #{sin_hogar.id}", "documento": "",
+            "fecha_postulacion": str(sin_hogar.fecha_postulacion),
+        }
+        # Autenticación + consulta de elegibles
+        assert len(ctx.captured_queries) <= 2
+
+    def test_ejecutar_resultados_y_descarga(self, auth_client, elegibles):
+        programa, gestiones, _ = elegibles
+
+        ejecutado = auth_client.post(
+            f"{self.BASE}ejecutar/", {"programa_id": programa.id, "cantidad_beneficiarios": 3}, format="json",
+        ).json()
+        assert ejecutado["total_beneficiados"] == 3
+        assert ejecutado["total_no_beneficiarios"] == 4
+
+        with CaptureQueriesContext(connection) as ctx:
+            resultados = auth_client.get(f"{self.BASE}resultados/", {"programa_id": programa.id}).json()
+        # Autenticación + resultados + datos del sorteo, sin importar cuántas postulaciones haya
+        assert len(ctx.captured_queries) <= 3
+        assert {r["id"] for r in resultados["beneficiados"]} == {r["id"] for r in ejecutado["beneficiados"]}
+        assert all(r["estado"] == "BENEFICIADO" for r in resultados["beneficiados"])
+
+        resp = auth_client.get(f"{self.BASE}descargar/", {"programa_id": programa.id})
+        assert resp.streaming
+        lineas = b"".join(resp.streaming_content).decode("utf-8").lstrip("\ufeff").splitlines()
+        assert lineas[0] == "#,Nombre,Número de radicado,Estado,Orden del sorteo"
+        assert len(lineas) == 8
+        assert sum(",Beneficiado," in linea for linea in lineas) == 3
+
+    def test_resultados_sin_sorteo(self, auth_client, elegibles):
+        programa, _, _ = elegibles
+        assert auth_client.get(f"{self.BASE}resultados/", {"programa_id": programa.id}).status_code == 404
+        assert auth_client.get(f"{self.BASE}descargar/", {"programa_id": programa.id}).status_code == 404
+
+    def test_sorteo_reproducible_con_la_semilla(self, auth_client, elegibles):
+        programa, _, _ = elegibles
+        ids = set(Postulacion.objects.filter(programa=programa).values_list("id", flat=True))
+
+        data = auth_client.post(
+            f"{self.BASE}ejecutar/", {"programa_id": programa.id, "cantidad_beneficiarios": 2}, format="json",
+        ).json()
+
+        semilla = data["sorteo"]["semilla"]
+        orden_esperado = sorted(ids, key=lambda pid: clave_orden(semilla, pid))
+        obtenido = [r["id"] for r in data["beneficiados"] + data["no_beneficiarios"]]
+        assert obtenido == orden_esperado
+        assert [r["orden"] for r in data["beneficiados"]] == [1, 2]
+        assert ResultadoSorteo.objects.filter(sorteo__programa=programa).count() == 7
+        assert verificar_sorteo(Sorteo.objects.get(programa=programa))
+
+        repetido = auth_client.post(
+            f"{self.BASE}ejecutar/", {"programa_id": programa.id, "cantidad_beneficiarios": 2}, format="json",
+        )
+        assert repetido.status_code == 409
+
+    def test_valida_cantidad_y_etapa(self, auth_client, elegibles, etapa):
+        programa, _, _ = elegibles
+        url = f"{self.BASE}ejecutar/"
+
+        assert auth_client.post(url, {"programa_id": programa.id, "cantidad_beneficiarios": 8}, format="json").status_code == 400
+        etapa.finalizada = False
+        etapa.save(update_fields=["finalizada"])
+        assert auth_client.post(url, {"programa_id": programa.id, "cantidad_beneficiarios": 1}, format="json").status_code == 400
+        assert not Sorteo.objects.exists()
+
+    def test_notificacion_por_lotes_retoma_sin_duplicar(self, auth_client, elegibles, monkeypatch):
+        programa, gestiones, _ = elegibles
+        for gestion in gestiones[:4]:
+            Ciudadano.objects.filter(pk=gestion.ciudadano_id).update(
+                correo_electronico=f"{gestion.numero_radicado}@test.com",
+            )
+        # Sin correo del titular: se usa el del cabeza de hogar
+        gestiones[4].miembros.update(correo_electronico="cabeza4@test.com")
+        auth_client.post(
+            f"{self.BASE}ejecutar/", {"programa_id": programa.id, "cantidad_beneficiarios": 3}, format="json",
+        )
+
+        url = f"{self.BASE}notificacion/"
+        resp = auth_client.post(url, {"programa_id": programa.id}, format="json")
+        assert resp.status_code == 202
+        notificacion_id = resp.json()["notificacion"]["id"]
+        assert resp.json()["notificacion"]["total"] == 7
+        assert auth_client.post(url, {"programa_id": programa.id}, format="json").status_code == 200
+
+        assert procesar_lote(notificacion_id, 3) == 3
+
+        # Un fallo a mitad del lote no deja correos encolados ni mueve el punto de control
+        original = CorreoSaliente.objects.bulk_create
+        monkeypatch.setattr(CorreoSaliente.objects, "bulk_create", lambda *a, **k: 1 / 0)
+        with pytest.raises(ZeroDivisionError):
+            procesar_lote(notificacion_id, 3)
+        monkeypatch.setattr(CorreoSaliente.objects, "bulk_create", original)
+        assert NotificacionSorteo.objects.get(pk=notificacion_id).ultimo_orden == 3
+
+        while procesar_lote(notificacion_id, 3):
+            pass
+
+        data = auth_client.get(url, {"programa_id": programa.id}).json()["notificacion"]
+        assert data["estado"] == "COMPLETADA"
+        assert (data["encolados"], data["sin_correo"], data["progreso"]) == (5, 2, 100)
+
+        destinatarios = [c.destinatarios[0] for c in CorreoSaliente.objects.all()]
+        assert len(destinatarios) == len(set(destinatarios)) == 5
+        assert "cabeza4@test.com" in destinatarios
+        beneficiados = CorreoSaliente.objects.filter(mensaje__contains="BENEFICIADO")
+        assert beneficiados.count() <= 3
+        assert all(programa.nombre in c.asunto for c in CorreoSaliente.objects.all())
+
+    def test_comando_notificar_sorteos(self, auth_client, elegibles):
+        programa, gestiones, _ = elegibles
+        Ciudadano.objects.filter(pk=gestiones[0].ciudadano_id).update(correo_electronico="n0@test.com")
+        auth_client.post(
+            f"{self.BASE}ejecutar/", {"programa_id": programa.id, "cantidad_beneficiarios": 3}, format="json",
+        )
+        auth_client.post(f"{self.BASE}notificacion/", {"programa_id": programa.id}, format="json")
+
+        salida = io.StringIO()
+        call_command("notificar_sorteos", "--once", "--por-minuto", "0", stdout=salida)
+
+        assert "7 hogar(es) procesado(s)" in salida.getvalue()
+        assert NotificacionSorteo.objects.get().estado == "COMPLETADA"
+        assert CorreoSaliente.objects.get().destinatarios == ["n0@test.com"]
+
+    def test_notificacion_sin_sorteo(self, auth_client, elegibles):
+        programa, _, _ = elegibles
+        url = f"{self.BASE}notificacion/"
+        assert auth_client.post(url, {"programa_id": programa.id}, format="json").status_code == 400
+        assert auth_client.get(url, {"programa_id": programa.id}).json() == {"notificacion": None}
+
+
+# ──────── Consulta pública de estado ────────
+
+
+class TestConsultaEstado:
+    URL = "/api/postulaciones/consultar-estado/"
+
+    @pytest.fixture(autouse=True)
+    def cache_limpia(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        yield
+        cache.clear()
+
+    def test_lee_la_tabla_de_consulta_sincronizada(self, etapa):
+        from infrastructure.database.models import ConsultaEstadoPublica
+
+        gestion = crear_hogar(etapa, 1, documento="55500011")
+        fila = ConsultaEstadoPublica.objects.get(numero_documento="55500011")
+        assert (fila.numero_radicado, fila.estado, fila.programa_nombre) == ("RAD-TEST-0001", "EN_REVISION", "Programa Test")
+
+        # Cambio masivo de estado (como el sorteo): lo copia el trigger
+        Postulacion.objects.filter(pk=gestion.postulacion_id).update(estado="APROBADA")
+        MiembroHogar.objects.filter(postulacion=gestion).update(primer_nombre="Ana")
+
+        with CaptureQueriesContext(connection) as ctx:
+            resp = APIClient().get(self.URL, {"numero_documento": "55500011"})
+        assert resp.status_code == 200
+        assert resp.json()[0]["estado"] == "APROBADA"
+        assert resp.json()[0]["nombre_postulante"] == "Ana Apellido1"
+        assert resp.json()[0]["programa"] == "Programa Test"
+        tablas = {"postulaciones", "miembros_hogar", "gestion_hogar_etapa1", "gestion_programa"}
+        assert not any(f'"{t}"' in q["sql"] for q in ctx.captured_queries for t in tablas)
+
+    def test_respuestas_en_cache(self, etapa):
+        crear_hogar(etapa, 2, documento="55500022")
+        cliente = APIClient()
+        assert cliente.get(self.URL, {"numero_documento": "55500022"}).status_code == 200
+        assert cliente.get(self.URL, {"numero_documento": "00000000"}).status_code == 404
+
+        with CaptureQueriesContext(connection) as ctx:
+            assert cliente.get(self.URL, {"numero_documento": "55500022"}).status_code == 200
+            assert cliente.get(self.URL, {"numero_documento": "00000000"}).status_code == 404
+        assert len(ctx.captured_queries) == 0
+
+    def test_oculta_no_beneficiarios_de_programas_culminados(self, etapa):
+        gestion = crear_hogar(etapa, 3, documento="55500033")
+        Postulacion.objects.filter(pk=gestion.postulacion_id).update(estado="NO_BENEFICIARIO")
+        Programa.objects.filter(pk=etapa.programa_id).update(estado="CULMINADO")
+
+        resp = APIClient().get(self.URL, {"numero_documento": "55500033"})
+        assert resp.status_code == 404
+
+    def test_eliminar_hogar_quita_la_fila(self, etapa):
+        from infrastructure.database.consulta_estado import reconstruir_consulta_estado
+        from infrastructure.database.models import ConsultaEstadoPublica
+
+        gestion = crear_hogar(etapa, 4, documento="55500044")
+        crear_hogar(etapa, 5, documento="55500055")
+        gestion.postulacion.delete()
+
+        assert list(ConsultaEstadoPublica.objects.values_list("numero_documento", flat=True)) == ["55500055"]
+        assert reconstruir_consulta_estado() == 1
+
+
+# ──────── Registro público del hogar ────────
+
+
+def payload_hogar(n_miembros, documento_base):
+    miembros = [
+        {
+            "_localId": f"m{i}",
+            "tipo_documento": "CEDULA_CIUDADANIA",
+            "numero_documento": f"{documento_base}{i}",
+            "primer_nombre": f"Nombre{i}",
+            "primer_apellido": "Apellido",
+            "fecha_nacimiento": "1990-01-01",
+            "parentesco": "JEFE_HOGAR" if i == 0 else "HIJO",
+            "es_cabeza_hogar": i == 0,
+        }
+        for i in range(n_miembros)
+    ]
+    return {
+        "info_hogar": {
+            "departamento": "Valle",
+            "municipio": "Cali",
+            "zona": "URBANA",
+            "direccion": "Calle 1",
+            "acepta_terminos_condiciones": True,
+        },
+        "miembros": miembros,
+    }
+
+
+class TestRegistroHogarPublico:
+    @pytest.fixture
+    def etapa_publicada(self, etapa):
+        from infrastructure.database.models import ConfigRegistroHogar
+
+        ConfigRegistroHogar.objects.create(
+            etapa=etapa, campos={"direccion": {"requerido": True, "habilitado": True}}, publicado=True,
+        )
+        return etapa
+
+    def url(self, etapa):
+        return f"/api/etapas/{etapa.id}/registro-hogar/"
+
+    def test_registra_hogar_completo(self, etapa_publicada):
+        resp = APIClient().post(self.url(etapa_publicada), payload_hogar(3, "7100"), format="json")
+        assert resp.status_code == 201
+        data = resp.json()
+
+        gestion = GestionHogarEtapa1.objects.get(numero_radicado=data["numero_radicado"])
+        assert gestion.postulacion_id == data["id_postulacion"]
+        assert gestion.ciudadano.numero_documento == "71000"
+        assert set(data["miembros_ids"]) == {"m0", "m1", "m2"}
+        assert sorted(data["miembros_ids"].values()) == sorted(gestion.miembros.values_list("id", flat=True))
+        assert data["numero_radicado"].startswith("RAD-")
+
+    def test_reutiliza_ciudadano_existente(self, etapa_publicada):
+        ciudadano = Ciudadano.objects.create(
+            tipo_documento="CEDULA_CIUDADANIA", numero_documento="72000",
+            primer_nombre="Original", primer_apellido="Apellido", fecha_nacimiento="1990-01-01",
+        )
+        otro = payload_hogar(1, "7200")
+        resp = APIClient().post(self.url(etapa_publicada), otro, format="json")
+        assert resp.status_code == 201
+        gestion = GestionHogarEtapa1.objects.get(numero_radicado=resp.json()["numero_radicado"])
+        assert gestion.ciudadano_id == ciudadano.pk
+        assert Ciudadano.objects.get(pk=ciudadano.pk).primer_nombre == "Original"
+
+    def test_radicados_consecutivos(self, etapa_publicada):
+        radicados = [
+            APIClient().post(self.url(etapa_publicada), payload_hogar(1, f"73{i}0"), format="json").json()["numero_radicado"]
+            for i in range(2)
+        ]
+        consecutivos = [int(r.split("-")[2]) for r in radicados]
+        assert consecutivos[1] == consecutivos[0] + 1
+
+    def test_sentencias_por_registro_no_dependen_de_los_miembros(self, etapa_publicada):
+        """Benchmark: sentencias SQL por envío según el tamaño del hogar."""
+        sentencias = {}
+        for n in (1, 4, 10):
+            with CaptureQueriesContext(connection) as ctx:
+                resp = APIClient().post(self.url(etapa_publicada), payload_hogar(n, f"74{n:02d}"), format="json")
+            assert resp.status_code == 201
+            sentencias[n] = len([q for q in ctx.captured_queries if not q["sql"].startswith(("SAVEPOINT", "RELEASE"))])
+
+        assert len(set(sentencias.values())) == 1
+        # etapa + cédulas duplicadas + radicado + ciudadano + postulación + gestión + miembros
+        assert sentencias[1] == 7
+
+
+# ──────── Ingesta diferida del registro del hogar ────────
+
+
+class TestRegistroHogarDiferido:
+    @pytest.fixture
+    def etapa_diferida(self, etapa, settings, tmp_path):
+        from django.core.cache import cache
+        from infrastructure.database.models import ConfigRegistroHogar
+
+        settings.INGESTA_DIFERIDA = True
+        settings.INGESTA_ROOT = str(tmp_path / "ingesta")
+        cache.clear()
+        ConfigRegistroHogar.objects.create(
+            etapa=etapa, campos={"direccion": {"requerido": True, "habilitado": True}}, publicado=True,
+        )
+        yield etapa
+        cache.clear()
+
+    def enviar(self, etapa, payload):
+        return APIClient().post(f"/api/etapas/{etapa.id}/registro-hogar/", payload, format="json")
+
+    def estado(self, ticket):
+        return APIClient().get(f"/api/etapas/registro-hogar/{ticket}/")
+
+    @pytest.mark.django_db(transaction=True)
+    def test_encola_sin_escribir_y_procesa_por_lotes(self, etapa_diferida):
+        # Con la publicación ya en cache, aceptar el envío no consulta la BD
+        self.enviar(etapa_diferida, payload_hogar(1, "7500"))
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.enviar(etapa_diferida, payload_hogar(3, "7510"))
+        assert resp.status_code == 202
+        assert len(ctx.captured_queries) == 0
+        ticket = resp.json()["radicado_provisional"]
+        assert resp["Location"] == f"/api/etapas/registro-hogar/{ticket}/"
+        assert not GestionHogarEtapa1.objects.exists()
+        assert self.estado(ticket).json()["estado"] == "PENDIENTE"
+
+        call_command("procesar_registros", "--once", "--workers", "1", stdout=io.StringIO())
+
+        data = self.estado(ticket).json()
+        assert data["estado"] == "REGISTRADO"
+        assert set(data["miembros_ids"]) == {"m0", "m1", "m2"}
+        gestion = GestionHogarEtapa1.objects.get(numero_radicado=data["numero_radicado"])
+        assert gestion.postulacion_id == data["id_postulacion"]
+        assert gestion.miembros.count() == 3
+        assert RegistroEncolado.objects.filter(estado="REGISTRADO").count() == 2
+
+    def test_rechaza_cedulas_duplicadas_al_procesar(self, etapa_diferida):
+        from infrastructure.ingesta import procesar_lote
+
+        primero = self.enviar(etapa_diferida, payload_hogar(2, "7600")).json()["radicado_provisional"]
+        repetido = self.enviar(etapa_diferida, payload_hogar(2, "7600")).json()["radicado_provisional"]
+        assert procesar_lote(10) == 2
+
+        assert self.estado(primero).json()["estado"] == "REGISTRADO"
+        data = self.estado(repetido).json()
+        assert data["estado"] == "RECHAZADO"
+        assert "76000" in data["detail"]
+        assert GestionHogarEtapa1.objects.count() == 1
+
+    def test_estado_desde_bd_y_sin_reprocesar(self, etapa_diferida, settings):
+        import shutil
+        from infrastructure.ingesta import cola, procesar_lote
+
+        ticket = self.enviar(etapa_diferida, payload_hogar(1, "7700")).json()["radicado_provisional"]
+        entrada = cola.reclamar(1)[0]
+        cola._escribir(cola.PENDIENTES, ticket, entrada)
+        procesar_lote()
+
+        # Worker interrumpido tras confirmar: el envío vuelve a la cola
+        cola._escribir(cola.PENDIENTES, ticket, entrada)
+        assert procesar_lote() == 1
+        assert GestionHogarEtapa1.objects.count() == 1
+
+        shutil.rmtree(settings.INGESTA_ROOT)
+        assert self.estado(ticket).json()["estado"] == "REGISTRADO"
+        assert self.estado("PRV-20260101-000000000000-ABCDEF12").status_code == 404
+        assert self.estado("..").status_code == 404
+
+    def test_reencolar_mide_desde_el_reclamo(self, etapa_diferida):
+        import os
+        import time
+        from infrastructure.ingesta import cola
+
+        ticket = self.enviar(etapa_diferida, payload_hogar(1, "7900")).json()["radicado_provisional"]
+        hace_una_hora = time.time() - 3600
+        os.utime(cola._ruta(cola.PENDIENTES, ticket), (hace_una_hora, hace_una_hora))
+
+        cola.reclamar(1)
+        # Recibido hace una hora pero recién reclamado: un worker vivo lo procesa
+        assert cola.reencolar_abandonados(5) == 0
+        assert self.estado(ticket).json()["estado"] == "EN_PROCESO"
+
+    def test_lote_fallido_vuelve_a_la_cola(self, etapa_diferida, monkeypatch):
+        from django.db import IntegrityError
+        from infrastructure.ingesta import cola, procesar_lote
+
+        ticket = self.enviar(etapa_diferida, payload_hogar(1, "7950")).json()["radicado_provisional"]
+
+        def ticket_repetido(*args, **kwargs):
+            raise IntegrityError("duplicate key value violates unique constraint")
+
+        monkeypatch.setattr(RegistroEncolado.objects, "bulk_create", ticket_repetido)
+        assert procesar_lote() == 1
+        assert not GestionHogarEtapa1.objects.exists()
+        assert self.estado(ticket).json()["estado"] == "PENDIENTE"
+        assert cola.reclamar(1)[0]["intentos"] == 1
+
+    def test_respeta_publicacion(self, etapa_diferida, django_capture_on_commit_callbacks):
+        from infrastructure.database.models import ConfigRegistroHogar
+
+        with django_capture_on_commit_callbacks(execute=True):
+            config = ConfigRegistroHogar.objects.get(etapa=etapa_diferida)
+            config.publicado = False
+            config.save()
+        assert self.enviar(etapa_diferida, payload_hogar(1, "7800")).status_code == 403
+        assert APIClient().post("/api/etapas/999999/registro-hogar/", payload_hogar(1, "7801"), format="json").status_code == 404
+
+
+# ──────── Idempotency-Key en los envíos públicos ────────
+
+
+class TestIdempotencia:
+    @pytest.fixture
+    def etapa_publicada(self, etapa):
+        from infrastructure.database.models import CampoFormulario, ConfigRegistroHogar, FormularioEtapa
+
+        ConfigRegistroHogar.objects.create(
+            etapa=etapa, campos={"direccion": {"requerido": True, "habilitado": True}}, publicado=True,
+        )
+        formulario = FormularioEtapa.objects.create(etapa=etapa, estado="PUBLICADO")
+        CampoFormulario.objects.create(formulario=formulario, campo_catalogo="primer_nombre", orden=1, obligatorio=True)
+        return etapa
+
+    def enviar(self, etapa, payload, clave, accion="registro-hogar"):
+        return APIClient().post(
+            f"/api/etapas/{etapa.id}/{accion}/", payload, format="json", HTTP_IDEMPOTENCY_KEY=clave,
+        )
+
+    def test_reintento_repite_la_respuesta_sin_escribir(self, etapa_publicada):
+        payload = payload_hogar(2, "7900")
+        primera = self.enviar(etapa_publicada, payload, "clave-1")
+        assert primera.status_code == 201
+
+        with CaptureQueriesContext(connection) as ctx:
+            reintento = self.enviar(etapa_publicada, payload, "clave-1")
+        assert reintento.status_code == 201
+        assert reintento.json() == primera.json()
+        assert reintento["Idempotent-Replayed"] == "true"
+        assert not any(
+            q["sql"].startswith(("INSERT", "UPDATE", "DELETE")) for q in ctx.captured_queries
+        )
+        assert len(ctx.captured_queries) == 1
+        assert Postulacion.objects.count() == 1
+
+    def test_clave_con_otro_contenido_o_en_curso(self, etapa_publicada):
+        from datetime import timedelta
+        from django.utils import timezone
+        from infrastructure.database.models import RespuestaIdempotente
+        from presentation.idempotencia import _huella
+
+        assert self.enviar(etapa_publicada, payload_hogar(1, "8000"), "clave-2").status_code == 201
+        resp = self.enviar(etapa_publicada, payload_hogar(1, "8010"), "clave-2")
+        assert resp.status_code == 422
+
+        payload = payload_hogar(1, "8020")
+        RespuestaIdempotente.objects.create(
+            clave=f"registro_hogar:{etapa_publicada.id}:clave-3", huella=_huella(payload),
+            fecha_expiracion=timezone.now() + timedelta(hours=1),
+        )
+        resp = self.enviar(etapa_publicada, payload, "clave-3")
+        assert resp.status_code == 409
+        assert resp["Retry-After"] == "1"
+
+        # Una reserva abandonada la toma el siguiente reintento
+        RespuestaIdempotente.objects.filter(clave__endswith="clave-3").update(
+            fecha_creacion=timezone.now() - timedelta(minutes=5),
+        )
+        assert self.enviar(etapa_publicada, payload, "clave-3").status_code == 201
+
+    def test_errores_liberan_la_clave(self, etapa_publicada):
+        from infrastructure.database.models import RespuestaIdempotente
+
+        payload = payload_hogar(1, "8100")
+        invalido = {**payload, "info_hogar": {**payload["info_hogar"], "zona": "OTRA"}}
+        assert self.enviar(etapa_publicada, invalido, "clave-4").status_code == 400
+        assert not RespuestaIdempotente.objects.exists()
+
+        Etapa.objects.filter(pk=etapa_publicada.pk).update(activo_logico=False)
+        assert self.enviar(etapa_publicada, payload, "clave-5").status_code == 404
+        assert not RespuestaIdempotente.objects.exists()
+
+    def test_enviar_formulario_y_vencimiento(self, etapa_publicada):
+        from datetime import timedelta
+        from django.utils import timezone
+        from infrastructure.database.models import RespuestaIdempotente
+
+        respuestas = {"respuestas": {
+            "tipo_documento": "CEDULA_CIUDADANIA", "numero_documento": "8200", "primer_nombre": "Ana",
+            "primer_apellido": "Ruiz", "fecha_nacimiento": "1990-01-01",
+        }}
+        primera = self.enviar(etapa_publicada, respuestas, "clave-6", accion="enviar-formulario")
+        assert primera.status_code == 201
+        reintento = self.enviar(etapa_publicada, respuestas, "clave-6", accion="enviar-formulario")
+        assert reintento.status_code == 201
+        assert reintento.json()["registrado"] is True
+
+        # Misma clave en otra acción: no se comparte
+        assert self.enviar(etapa_publicada, payload_hogar(1, "8200"), "clave-6").status_code == 201
+
+        RespuestaIdempotente.objects.update(fecha_expiracion=timezone.now() - timedelta(seconds=1))
+        salida = io.StringIO()
+        call_command("limpiar_respuestas_idempotentes", stdout=salida)
+        assert "2 respuesta(s)" in salida.getvalue()
+        assert not RespuestaIdempotente.objects.exists()
+
+
+# ──────── Registro de cédulas por programa ────────
+
+
+class TestCedulasPrograma:
+    def test_se_mantiene_con_los_miembros(self, etapa):
+        from infrastructure.database.models import CedulaPrograma
+
+        gestion = crear_hogar(etapa, 1, documento="8300")
+        miembro = gestion.miembros.get()
+        assert list(CedulaPrograma.objects.values_list("programa_id", "numero_documento", "miembro_id")) == [
+            (etapa.programa_id, "8300", miembro.id),
+        ]
+
+        MiembroHogar.objects.filter(pk=miembro.pk).update(numero_documento="8301")
+        assert CedulaPrograma.objects.get().numero_documento == "8301"
+
+        gestion.postulacion.delete()
+        assert not CedulaPrograma.objects.exists()
+
+    def test_restriccion_por_programa(self, etapa):
+        from django.db import IntegrityError, transaction
+
+        crear_hogar(etapa, 1, documento="8400")
+        with pytest.raises(IntegrityError), transaction.atomic():
+            crear_hogar(etapa, 2, documento="8400")
+
+        # Otro programa y otro tipo de documento sí se admiten
+        otro = Etapa.objects.create(
+            programa=Programa.objects.create(
+                nombre="Otro", descripcion="D", entidad_responsable="E", codigo_programa="PT-002", estado="ACTIVO",
+            ),
+            numero_etapa=1, modulo_principal="REGISTRO_HOGAR",
+        )
+        crear_hogar(otro, 3, documento="8400")
+        MiembroHogar.objects.create(
+            postulacion=crear_hogar(etapa, 4), tipo_documento="TARJETA_IDENTIDAD", numero_documento="8400",
+            primer_nombre="N", primer_apellido="A", fecha_nacimiento=datetime.date(2010, 1, 1), parentesco="HIJO",
+        )
+
+    def test_actualizar_miembro_repetido_anterior_a_la_restriccion(self, etapa):
+        from infrastructure.database.models import CedulaPrograma
+
+        crear_hogar(etapa, 1, documento="8450")
+        otra = Etapa.objects.create(
+            programa=Programa.objects.create(
+                nombre="Otro", descripcion="D", entidad_responsable="E", codigo_programa="PT-003", estado="ACTIVO",
+            ),
+            numero_etapa=1, modulo_principal="REGISTRO_HOGAR",
+        )
+        # Cédula repetida en el programa sin fila en el registro (como las del backfill)
+        repetida = crear_hogar(otra, 2, documento="8450")
+        GestionHogarEtapa1.objects.filter(pk=repetida.pk).update(etapa=etapa)
+        CedulaPrograma.objects.filter(miembro_id=repetida.miembros.get().pk).delete()
+
+        repetida.miembros.update(primer_nombre="Editado")
+        assert CedulaPrograma.objects.filter(numero_documento="8450").count() == 1
+
+        repetida.miembros.update(numero_documento="8451")
+        assert CedulaPrograma.objects.filter(
+            programa_id=etapa.programa_id, numero_documento="8451",
+        ).count() == 1
+
+    def test_envio_simultaneo_rechazado_por_la_restriccion(self, etapa):
+        from infrastructure.database.registro_hogar import CedulasYaRegistradas, registrar_hogar
+
+        crear_hogar(etapa, 1, documento="85000")
+        payload = payload_hogar(2, "8500")
+
+        # La verificación previa no ve la cédula (otro envío aún no confirmaba)
+        with patch("infrastructure.database.registro_hogar.cedulas_registradas", side_effect=[[], ["85000"]]):
+            with pytest.raises(CedulasYaRegistradas) as exc:
+                registrar_hogar(etapa, payload["info_hogar"], payload["miembros"])
+        assert exc.value.cedulas == ["85000"]
+        assert Postulacion.objects.count() == 1
+
+    def test_verificacion_en_una_consulta(self, etapa):
+        from infrastructure.database.registro_hogar import cedulas_registradas
+
+        crear_hogar(etapa, 1, documento="86000")
+        crear_hogar(etapa, 2, documento="86001")
+        miembros = payload_hogar(3, "8600")["miembros"]
+        with CaptureQueriesContext(connection) as ctx:
+            assert cedulas_registradas(etapa.programa_id, miembros) == ["86000", "86001"]
+        assert len(ctx.captured_queries) == 1
+        assert "cedulas_programa" in ctx.captured_queries[0]["sql"]
+
+    def test_endpoint_rechaza_cedula_registrada(self, etapa):
+        from infrastructure.database.models import ConfigRegistroHogar
+
+        ConfigRegistroHogar.objects.create(etapa=etapa, campos={}, publicado=True)
+        url = f"/api/etapas/{etapa.id}/registro-hogar/"
+        assert APIClient().post(url, payload_hogar(2, "8700"), format="json").status_code == 201
+
+        resp = APIClient().post(url, payload_hogar(1, "8700"), format="json")
+        assert resp.status_code == 400
+        assert resp.json()["detail"] == "Las siguientes cédulas ya están registradas en este programa: 87000."
+        assert Postulacion.objects.count() == 1
+
+
+# ──────── Sala de espera de los endpoints públicos ────────
+
+
+class TestSalaEspera:
+    @pytest.fixture(autouse=True)
+    def sala_de_un_cupo(self, settings):
+        from django.core.cache import cache
+
+        settings.SALA_ESPERA_CAPACIDAD = 3
+        settings.SALA_ESPERA_RESERVA_PERSONAL = 2
+        cache.clear()
+        yield
+        cache.clear()
+
+    def info(self, etapa, turno=None, client=None):
+        headers = {"HTTP_X_SALA_ESPERA_TURNO": turno} if turno else {}
+        return (client or APIClient()).get(f"/api/etapas/{etapa.id}/info-publica/", **headers)
+
+    def test_fila_en_orden_de_llegada(self, etapa):
+        from presentation.sala_espera import admitir, liberar
+
+        assert self.info(etapa).status_code == 200
+        cupo = admitir()  # petición en curso que ocupa el único cupo público
+
+        primero = self.info(etapa)
+        assert primero.status_code == 503
+        assert primero["Retry-After"] == "2"
+        assert primero.json()["posicion"] == 1
+        segundo = self.info(etapa).json()
+        assert segundo["posicion"] == 2
+
+        liberar(cupo)
+        # Con turnos en espera, quien llega sin turno pasa a la fila
+        assert self.info(etapa).json()["posicion"] == 2
+        assert self.info(etapa, turno=segundo["turno"]).status_code == 503
+        assert self.info(etapa, turno=primero.json()["turno"]).status_code == 200
+        # Al terminar, su cupo llama al siguiente turno
+        assert self.info(etapa, turno=segundo["turno"]).status_code == 200
+
+    def test_turnos_abandonados_no_detienen_la_fila(self, etapa):
+        import time
+        from presentation.sala_espera import admitir, liberar
+
+        cupo = admitir()
+        self.info(etapa)  # turno 1: no vuelve
+        segundo = self.info(etapa).json()["turno"]
+        liberar(cupo)
+        assert self.info(etapa, turno=segundo).status_code == 503
+
+        with patch("presentation.sala_espera.time.time", return_value=time.time() + 10):
+            assert self.info(etapa, turno=segundo).status_code == 200
+
+    def test_personal_autenticado_usa_la_reserva(self, etapa, auth_client):
+        from presentation.sala_espera import admitir
+
+        admitir()
+        assert self.info(etapa).status_code == 503
+        assert self.info(etapa, client=auth_client).status_code == 200
+        assert auth_client.get("/api/etapas/").status_code == 200
+
+    def test_cupo_se_libera_y_turno_invalido(self, etapa):
+        from django.core.cache import cache
+
+        assert APIClient().get("/api/etapas/999999/info-publica/").status_code == 404
+        resp = APIClient().get("/api/postulaciones/consultar-estado/?numero_documento=1")
+        assert resp.status_code == 404
+        assert cache.get("sala_espera:cupo:0") is None
+
+        # Un turno alterado cuenta como llegada sin turno
+        assert self.info(etapa, turno="123:falso").status_code == 200
+
+    def test_consulta_estado_en_la_sala(self, etapa):
+        from presentation.sala_espera import admitir
+
+        admitir()
+        resp = APIClient().get("/api/postulaciones/consultar-estado/?numero_documento=1")
+        assert resp.status_code == 503
+        assert "turno" in resp.json()
+
+    def test_turno_admitido_no_se_reutiliza(self, etapa):
+        from presentation.sala_espera import admitir, liberar
+
+        cupo = admitir()
+        turno = self.info(etapa).json()["turno"]
+        liberar(cupo)
+        assert self.info(etapa, turno=turno).status_code == 200
+        # Repetirlo (o compartirlo) no da otra entrada: va al final de la fila
+        cupo = admitir()
+        resp = self.info(etapa, turno=turno)
+        assert resp.status_code == 503
+        assert resp.json()["turno"] != turno
+        liberar(cupo)
+
+    def test_fila_sobrevive_a_cupos_vencidos(self, etapa, settings):
+        import time
+        from presentation.sala_espera import admitir
+
+        settings.SALA_ESPERA_CUPO_VIGENCIA = 60
+        settings.SALA_ESPERA_TURNO_VIGENCIA = 7200
+        admitir()  # su proceso muere sin liberar el cupo
+        primero = self.info(etapa).json()["turno"]
+        self.info(etapa)
+
+        with patch("presentation.sala_espera.time.time", return_value=time.time() + 3600):
+            # El cupo vencido se recupera, pero la fila conserva su orden
+            assert self.info(etapa).json()["posicion"] == 2
+            assert self.info(etapa, turno=primero).status_code == 200
+
+    def test_requiere_cache_compartido(self, monkeypatch):
+        import runpy
+        from pathlib import Path
+        from django.core.exceptions import ImproperlyConfigured
+
+        ruta = Path(__file__).resolve().parents[1] / "config" / "settings.py"
+        monkeypatch.delenv("REDIS_URL", raising=False)
+        monkeypatch.setenv("SALA_ESPERA_CAPACIDAD", "100")
+        with pytest.raises(ImproperlyConfigured):
+            runpy.run_path(str(ruta))
+
+        monkeypatch.setenv("REDIS_URL", "redis://localhost:6379/0")
+        assert runpy.run_path(str(ruta))["CACHES"]["default"]["LOCATION"] == "redis://localhost:6379/0"
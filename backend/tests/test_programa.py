@@ -155,4 +155,45 @@ class TestProgramaDomain:
 
         from shared.exceptions import InvalidStateTransitionException
         with pytest.raises(InvalidStateTransitionException):
-            programa.cambiar_estado(EstadoPrograma.BORRADOR)  # No debería permitir volver a BORRADOR
\ No newline at end of file
+            programa.cambiar_estado(EstadoPrograma.BORRADOR)  # No debería permitir volver a BORRADOR
+
+@pytest.mark.django_db
+class TestDjangoProgramaRepositoryEspecificaciones:
+    """Filtros de programas resueltos en SQL a partir de especificaciones."""
+
+    def test_filtrar_con_especificacion_compuesta(self):
+        from domain.programas import (
+            ProgramaPorEntidadSpecification,
+            ProgramaPorEstadoSpecification,
+        )
+        from infrastructure.database.models import Programa as ProgramaORM
+        from infrastructure.database.repositories.programa_repository import DjangoProgramaRepository
+
+        for nombre, entidad, estado in [
+            ("Mi Casa", "Secretaría de Vivienda", "ACTIVO"),
+            ("Techo Digno", "Secretaría de Vivienda", "BORRADOR"),
+            ("Mejoramiento", "Caja de Compensación", "ACTIVO"),
+        ]:
+            ProgramaORM.objects.create(nombre=nombre, descripcion="Desc", entidad_responsable=entidad, estado=estado)
+
+        repo = DjangoProgramaRepository()
+        especificacion = (
+            ProgramaPorEstadoSpecification("activo")
+            & ProgramaPorEntidadSpecification("vivienda")
+        )
+        resultado = repo.filtrar(especificacion)
+        assert [p.nombre for p in resultado["items"]] == ["Mi Casa"]
+        assert especificacion.esta_satisfecha_por(resultado["items"][0])
+
+        assert repo.contar({"estado": "ACTIVO"}) == 2
+        assert {p.nombre for p in repo.filtrar(~ProgramaPorEstadoSpecification("ACTIVO"))["items"]} == {"Techo Digno"}
+
+    def test_estado_desconocido_no_devuelve_programas(self):
+        from infrastructure.database.models import Programa as ProgramaORM
+        from infrastructure.database.repositories.programa_repository import DjangoProgramaRepository
+
+        ProgramaORM.objects.create(nombre="Mi Casa", descripcion="Desc", entidad_responsable="E", estado="ACTIVO")
+
+        repo = DjangoProgramaRepository()
+        assert repo.listar({"estado": "NO_EXISTE"})["items"] == []
+        assert repo.contar({"estado": "NO_EXISTE"}) == 0
@@ -1,5 +1,8 @@
+import io
+
 import pytest
 from unittest.mock import Mock
+from PIL import Image
 from shared.exceptions import (
     DomainException,
     EntityNotFoundException,
@@ -7,6 +10,7 @@ from shared.exceptions import (
     InvalidStateTransitionException,
 )
 from shared.file_validators import validate_uploaded_file, ALLOWED_EXTENSIONS, MAX_FILE_SIZE
+from shared.imagenes import generar_miniatura, normalizar_imagen, MAX_LADO_IMAGEN, LADO_MINIATURA
 
 
 class TestExceptions:
@@ -111,4 +115,35 @@ class TestFileValidators:
         assert ".png" in ALLOWED_EXTENSIONS
         assert len(ALLOWED_EXTENSIONS) == 4
 
-        assert MAX_FILE_SIZE == 5 * 1024 * 1024  # 5 MB
\ No newline at end of file
+        assert MAX_FILE_SIZE == 5 * 1024 * 1024  # 5 MB
+
+def _imagen(formato, tamano, modo="RGB"):
+    buffer = io.BytesIO()
+    Image.new(modo, tamano, "red").save(buffer, formato)
+    buffer.seek(0)
+    return buffer
+
+
+class TestImagenes:
+    """Pruebas unitarias para la normalización de imágenes."""
+
+    def test_imagen_dentro_del_limite_no_se_recodifica(self):
+        assert normalizar_imagen(_imagen("JPEG", (800, 600))) is None
+
+    def test_jpeg_grande_se_reduce(self):
+        contenido, ext = normalizar_imagen(_imagen("JPEG", (4000, 3000)))
+
+        assert ext == ".jpg"
+        assert Image.open(io.BytesIO(contenido)).size == (MAX_LADO_IMAGEN, 1536)
+
+    def test_png_conserva_formato(self):
+        contenido, ext = normalizar_imagen(_imagen("PNG", (3000, 1000), modo="RGBA"))
+
+        assert ext == ".png"
+        assert Image.open(io.BytesIO(contenido)).format == "PNG"
+
+    def test_miniatura_jpeg_desde_png_con_transparencia(self):
+        miniatura = Image.open(io.BytesIO(generar_miniatura(_imagen("PNG", (1000, 500), modo="RGBA"))))
+
+        assert miniatura.format == "JPEG"
+        assert miniatura.size == (LADO_MINIATURA, 160)
@@ -2,7 +2,11 @@ import pytest
 from datetime import datetime
 from unittest.mock import Mock
 from domain.usuarios import Usuario, RolUsuario, UsuarioRepository
-from application.usuarios.usuario_use_cases import CrearUsuarioUseCase, ObtenerUsuarioUseCase
+from application.usuarios.usuario_use_cases import (
+    CrearUsuarioUseCase,
+    ObtenerEstadisticasUsuariosUseCase,
+    ObtenerUsuarioUseCase,
+)
 from application.usuarios.usuario_dto import CrearUsuarioDTO, ObtenerUsuarioDTO
 
 
@@ -219,4 +223,88 @@ class TestObtenerUsuarioUseCase:
         with pytest.raises(ValueError) as exc_info:
             use_case.execute(dto)
 
-        assert "no encontrado" in str(exc_info.value)
\ No newline at end of file
+        assert "no encontrado" in str(exc_info.value)
+
+
+class TestObtenerEstadisticasUsuariosUseCase:
+    """Pruebas unitarias para ObtenerEstadisticasUsuariosUseCase."""
+
+    def test_execute_usa_las_estadisticas_del_repositorio(self):
+        """Prueba que execute delegue en obtener_estadisticas (una sola consulta)."""
+        mock_repo = Mock(spec=UsuarioRepository)
+        mock_repo.obtener_estadisticas.return_value = {
+            "total": 3, "activos": 2, "inactivos": 1, "por_rol": {"ADMIN": 1, "FUNCIONARIO": 2},
+        }
+
+        result = ObtenerEstadisticasUsuariosUseCase(mock_repo).execute()
+
+        assert result.to_dict() == mock_repo.obtener_estadisticas.return_value
+        mock_repo.obtener_estadisticas.assert_called_once_with()
+        mock_repo.obtener_todos.assert_not_called()
+
+
+@pytest.mark.django_db
+class TestDjangoUsuarioRepositoryEspecificaciones:
+    """Las especificaciones se resuelven en SQL en el repositorio Django."""
+
+    @pytest.fixture
+    def usuarios(self):
+        from django.contrib.auth.hashers import make_password
+        from infrastructure.database.roles_models import Rol
+        from infrastructure.database.usuarios_models import UsuarioSistema
+
+        admin, _ = Rol.objects.get_or_create(id_rol=1, defaults={"nombre_rol": "ADMIN", "descripcion": "Admin"})
+        func, _ = Rol.objects.get_or_create(id_rol=2, defaults={"nombre_rol": "FUNCIONARIO", "descripcion": "Func"})
+        datos = [
+            ("Ana Admin", "ana@test.com", admin, True),
+            ("Fabio Func", "fabio@test.com", func, True),
+            ("Fiona Func", "fiona@test.com", func, False),
+        ]
+        return [
+            UsuarioSistema.objects.create(
+                nombre_completo=nombre, correo=correo, numero_documento=f"10{i}",
+                password_hash=make_password("Clave123*"), id_rol=rol, activo=activo,
+            )
+            for i, (nombre, correo, rol, activo) in enumerate(datos)
+        ]
+
+    def test_especificacion_compuesta_en_una_consulta(self, usuarios):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from domain.usuarios import (
+            UsuarioActivoSpecification,
+            UsuarioAdminSpecification,
+            UsuarioFuncionarioSpecification,
+        )
+        from infrastructure.database.repositories.usuarios_repository import DjangoUsuarioRepository
+
+        especificacion = UsuarioFuncionarioSpecification() & ~UsuarioActivoSpecification()
+        with CaptureQueriesContext(connection) as ctx:
+            resultado = DjangoUsuarioRepository().filtrar(especificacion)
+        # conteo + página (con el rol en el mismo JOIN)
+        assert len(ctx.captured_queries) == 2
+        assert [u.correo for u in resultado["items"]] == ["fiona@test.com"]
+        assert all(especificacion.esta_satisfecha_por(u) for u in resultado["items"])
+
+        resultado = DjangoUsuarioRepository().filtrar(
+            UsuarioAdminSpecification() | UsuarioActivoSpecification(False)
+        )
+        assert {u.correo for u in resultado["items"]} == {"ana@test.com", "fiona@test.com"}
+
+    def test_obtener_todos_filtra_por_rol_y_activo(self, usuarios):
+        from infrastructure.database.repositories.usuarios_repository import DjangoUsuarioRepository
+
+        resultado = DjangoUsuarioRepository().obtener_todos(filtros={"rol": "funcionario", "activo": True})
+        assert resultado["total"] == 1
+        assert resultado["items"][0].correo == "fabio@test.com"
+
+    def test_especificacion_sin_traduccion(self):
+        from domain.usuarios import UsuarioSpecification
+        from infrastructure.database.specifications import EspecificacionNoTraducible, usuario_a_q
+
+        class SoloEnMemoria(UsuarioSpecification):
+            def esta_satisfecha_por(self, usuario) -> bool:
+                return True
+
+        with pytest.raises(EspecificacionNoTraducible):
+            usuario_a_q(SoloEnMemoria())
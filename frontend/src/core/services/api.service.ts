@@ -4,8 +4,20 @@
  */
 
 import axios, { AxiosError } from 'axios';
-import type { AxiosInstance } from 'axios';
+import type { AxiosInstance, InternalAxiosRequestConfig } from 'axios';
 import storageService from './storage.service';
+import {
+  CABECERA_TURNO,
+  ESPERA_MAXIMA_MS,
+  esperar,
+  leerSalaEspera,
+  segundosDeEspera,
+} from './sala-espera';
+
+/** Petición que está esperando turno en la sala de espera. */
+interface ConfigSalaEspera extends InternalAxiosRequestConfig {
+  _salaEsperaInicio?: number;
+}
 
 class ApiService {
   private axiosInstance: AxiosInstance;
@@ -33,7 +45,19 @@ class ApiService {
     // Interceptor para manejar errores globales
     this.axiosInstance.interceptors.response.use(
       (response) => response,
-      (error: AxiosError) => {
+      async (error: AxiosError) => {
+        // Sala de espera: reintentar con el mismo turno tras Retry-After
+        const sala = leerSalaEspera(error.response?.status, error.response?.data);
+        const config = error.config as ConfigSalaEspera | undefined;
+        if (sala && config) {
+          config._salaEsperaInicio ??= Date.now();
+          if (Date.now() - config._salaEsperaInicio < ESPERA_MAXIMA_MS) {
+            await esperar(segundosDeEspera(String(error.response?.headers['retry-after'] ?? ''), sala));
+            config.headers.set(CABECERA_TURNO, sala.turno);
+            return this.axiosInstance(config);
+          }
+        }
+
         if (error.response?.status === 401) {
           storageService.clear();
           window.location.href = '/login';
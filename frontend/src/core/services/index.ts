@@ -4,3 +4,4 @@
 
 export { default as apiService } from './api.service';
 export { default as storageService } from './storage.service';
+export { fetchConSalaEspera } from './sala-espera';
@@ -0,0 +1,55 @@
+/**
+ * Sala de espera de los endpoints públicos.
+ *
+ * Cuando el servidor está lleno responde 503 con un turno firmado y
+ * Retry-After. Estas utilidades esperan ese tiempo y reintentan enviando el
+ * turno en X-Sala-Espera-Turno, así la petición conserva su lugar en la fila
+ * en vez de tomar un turno nuevo en cada intento.
+ */
+
+export const CABECERA_TURNO = 'X-Sala-Espera-Turno';
+
+/** Tiempo máximo reintentando antes de mostrar el error (vigencia del turno). */
+export const ESPERA_MAXIMA_MS = 10 * 60 * 1000;
+
+export interface RespuestaSalaEspera {
+  detail: string;
+  turno: string;
+  posicion: number;
+  reintentar_en: number;
+}
+
+/** Devuelve el cuerpo de la sala de espera si la respuesta es un 503 con turno. */
+export function leerSalaEspera(status: number | undefined, body: unknown): RespuestaSalaEspera | null {
+  if (status !== 503 || !body || typeof body !== 'object' || !('turno' in body)) return null;
+  return body as RespuestaSalaEspera;
+}
+
+/** Segundos a esperar: Retry-After si viene, si no `reintentar_en`. */
+export function segundosDeEspera(retryAfter: string | null | undefined, sala: RespuestaSalaEspera): number {
+  const segundos = Number(retryAfter);
+  return Number.isFinite(segundos) && segundos > 0 ? segundos : Math.max(sala.reintentar_en || 1, 1);
+}
+
+export function esperar(segundos: number): Promise<void> {
+  return new Promise((resolve) => setTimeout(resolve, segundos * 1000));
+}
+
+/** `fetch` que espera su turno en la sala de espera antes de devolver la respuesta. */
+export async function fetchConSalaEspera(url: string, init: RequestInit = {}): Promise<Response> {
+  const inicio = Date.now();
+  let turno: string | null = null;
+
+  for (;;) {
+    const headers = new Headers(init.headers);
+    if (turno) headers.set(CABECERA_TURNO, turno);
+
+    const res = await fetch(url, { ...init, headers });
+    if (res.status !== 503 || Date.now() - inicio > ESPERA_MAXIMA_MS) return res;
+
+    const sala = leerSalaEspera(res.status, await res.clone().json().catch(() => null));
+    if (!sala) return res;
+    turno = sala.turno;
+    await esperar(segundosDeEspera(res.headers.get('Retry-After'), sala));
+  }
+}
@@ -258,6 +258,16 @@ export const PostulanteDetalleModal: React.FC<Props> = ({ id, isOpen, onClose, o
                         <div key={doc.id} className="bg-gray-50 rounded-lg p-3">
                           <p className="text-sm font-semibold text-gray-800">{doc.tipo_documento_label}</p>
                           <p className="text-xs text-gray-500 mt-0.5">{fmt(doc.ruta_archivo)}</p>
+                          {doc.miniatura_url ? (
+                            <a href={doc.vista_url || doc.archivo_url} target="_blank" rel="noreferrer">
+                              <img
+                                src={doc.miniatura_url}
+                                alt={doc.tipo_documento_label}
+                                loading="lazy"
+                                className="mt-2 h-24 rounded border border-gray-200 object-cover"
+                              />
+                            </a>
+                          ) : null}
                           {doc.archivo_url ? (
                             <a
                               href={doc.archivo_url}
@@ -76,6 +76,10 @@ export interface DocumentoAdjunto {
   tipo_documento_label: string;
   ruta_archivo: string;
   archivo_url: string;
+  /** Miniatura JPEG (vacía mientras la imagen no se ha procesado o si no es imagen). */
+  miniatura_url: string;
+  /** Versión reducida para revisión; igual a archivo_url si no fue necesaria. */
+  vista_url: string;
   observaciones: string;
   fecha_carga: string;
 }
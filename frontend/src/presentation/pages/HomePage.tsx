@@ -7,6 +7,7 @@
 import React, { useState, useCallback, useEffect, useRef } from 'react';
 import { Link } from 'react-router-dom';
 import { useQuery, useQueries } from '@tanstack/react-query';
+import { fetchConSalaEspera } from '../../core/services/sala-espera';
 
 // ── Tipos mínimos necesarios ──────────────────────────────────────────────── //
 
@@ -172,7 +173,7 @@ export default function HomePage() {
     setConsultaResultados(null);
 
     try {
-      const res = await fetch(
+      const res = await fetchConSalaEspera(
         `${API_BASE}/postulaciones/consultar-estado/?numero_documento=${encodeURIComponent(cedula)}`
       );
       if (!res.ok) {
@@ -0,0 +1,61 @@
+/**
+ * Tests unitarios — reintentos de la sala de espera de los endpoints públicos.
+ * `fetch` se reemplaza por un mock; los tiempos de espera usan timers falsos.
+ */
+import { CABECERA_TURNO, fetchConSalaEspera, leerSalaEspera, segundosDeEspera } from '../core/services/sala-espera';
+
+const sala = { detail: 'Espere', turno: 'turno-firmado', posicion: 3, reintentar_en: 4 };
+
+function respuesta503(retryAfter?: string): Response {
+  const headers: Record<string, string> = { 'Content-Type': 'application/json' };
+  if (retryAfter) headers['Retry-After'] = retryAfter;
+  return new Response(JSON.stringify(sala), { status: 503, headers });
+}
+
+describe('leerSalaEspera()', () => {
+  it('solo reconoce un 503 con turno', () => {
+    expect(leerSalaEspera(503, sala)).toEqual(sala);
+    expect(leerSalaEspera(503, { detail: 'Mantenimiento' })).toBeNull();
+    expect(leerSalaEspera(500, sala)).toBeNull();
+  });
+});
+
+describe('segundosDeEspera()', () => {
+  it('prefiere Retry-After y si falta usa reintentar_en', () => {
+    expect(segundosDeEspera('2', sala)).toBe(2);
+    expect(segundosDeEspera(null, sala)).toBe(4);
+  });
+});
+
+describe('fetchConSalaEspera()', () => {
+  afterEach(() => {
+    vi.useRealTimers();
+    vi.unstubAllGlobals();
+  });
+
+  it('espera Retry-After y reintenta con el mismo turno', async () => {
+    vi.useFakeTimers();
+    const fetchMock = vi.fn()
+      .mockResolvedValueOnce(respuesta503('2'))
+      .mockResolvedValueOnce(new Response('[]', { status: 200 }));
+    vi.stubGlobal('fetch', fetchMock);
+
+    const promesa = fetchConSalaEspera('/api/postulaciones/consultar-estado/');
+    await vi.advanceTimersByTimeAsync(1999);
+    expect(fetchMock).toHaveBeenCalledTimes(1);
+    await vi.advanceTimersByTimeAsync(1);
+
+    const res = await promesa;
+    expect(res.status).toBe(200);
+    expect(new Headers(fetchMock.mock.calls[0][1].headers).get(CABECERA_TURNO)).toBeNull();
+    expect(new Headers(fetchMock.mock.calls[1][1].headers).get(CABECERA_TURNO)).toBe('turno-firmado');
+  });
+
+  it('devuelve los 503 que no son de la sala de espera', async () => {
+    const fetchMock = vi.fn().mockResolvedValue(new Response('{}', { status: 503 }));
+    vi.stubGlobal('fetch', fetchMock);
+
+    expect((await fetchConSalaEspera('/api/x/')).status).toBe(503);
+    expect(fetchMock).toHaveBeenCalledTimes(1);
+  });
+});